@@ -57,14 +57,34 @@ def get_dag_source(*, file_token: str, session: Session = NEW_SESSION) -> Respon
         # Check if user has read access to all the DAGs defined in the file
         if not get_auth_manager().batch_is_authorized_dag(requests):
             raise PermissionDenied()
-        dag_source = DagCode.code(path, session=session)
     except (BadSignature, FileNotFoundError):
         raise NotFound("Dag source not found")
 
     return_type = request.accept_mimetypes.best_match(["text/plain", "application/json"])
     if return_type == "text/plain":
-        return Response(dag_source, headers={"Content-Type": return_type})
+        return _get_dag_source_text(path, session=session)
     if return_type == "application/json":
+        dag_source = DagCode.code(path, session=session)
         content = dag_source_schema.dumps({"content": dag_source})
         return Response(content, headers={"Content-Type": return_type})
     return Response("Not Allowed Accept Header", status=HTTPStatus.NOT_ACCEPTABLE)
+
+
+def _get_dag_source_text(path: str, session: Session) -> Response:
+    """Stream the source code of a file, or the byte range of it requested with a ``Range`` header."""
+    size = DagCode.get_code_size(path, session=session)
+    headers = {"Content-Type": "text/plain", "Accept-Ranges": "bytes"}
+    # Multiple ranges are not supported, the whole code is sent instead.
+    byte_range = None
+    if request.range is not None and len(request.range.ranges) == 1:
+        byte_range = request.range.range_for_length(size)
+        if byte_range is None:
+            headers["Content-Range"] = f"bytes */{size}"
+            return Response(status=HTTPStatus.REQUESTED_RANGE_NOT_SATISFIABLE, headers=headers)
+    start, end = byte_range or (0, size)
+    headers["Content-Length"] = str(end - start)
+    status = HTTPStatus.OK
+    if byte_range is not None:
+        headers["Content-Range"] = f"bytes {start}-{end - 1}/{size}"
+        status = HTTPStatus.PARTIAL_CONTENT
+    return Response(DagCode.code_stream(path, start, end, session=session), status=status, headers=headers)
@@ -40,10 +40,12 @@ def _initialize_map() -> dict[str, Callable]:
     from airflow.dag_processing.processor import DagFileProcessor
     from airflow.models import Trigger, Variable, XCom
     from airflow.models.dag import DAG, DagModel
+    from airflow.models.dagfileparsingstats import DagFileParsingStats
     from airflow.models.dagrun import DagRun
     from airflow.models.dagwarning import DagWarning
     from airflow.models.serialized_dag import SerializedDagModel
     from airflow.models.taskinstance import TaskInstance
+    from airflow.models.triggererload import TriggererLoad
     from airflow.secrets.metastore import MetastoreBackend
 
     functions: list[Callable] = [
@@ -51,9 +53,14 @@ def _initialize_map() -> dict[str, Callable]:
         DagFileProcessor.manage_slas,
         DagFileProcessorManager.deactivate_stale_dags,
         DagModel.deactivate_deleted_dags,
+        DagFileParsingStats.record,
+        DagFileParsingStats.remove_deleted_files,
         DagModel.get_paused_dag_ids,
         DagModel.get_current,
         DagFileProcessorManager.clear_nonexistent_import_errors,
+        DagFileProcessorManager.update_last_parsed_time,
+        DagFileProcessorManager.count_serialized_dags,
+        DagFileProcessorManager.get_next_dagrun_create_after_by_file,
         DagWarning.purge_inactive_dag_warnings,
         Job._add_to_db,
         Job._fetch_from_db,
@@ -87,9 +94,12 @@ def _initialize_map() -> dict[str, Callable]:
         Trigger.bulk_fetch,
         Trigger.clean_unused,
         Trigger.submit_event,
+        Trigger.submit_events,
         Trigger.submit_failure,
         Trigger.ids_for_triggerer,
         Trigger.assign_unassigned,
+        TriggererLoad.record,
+        TriggererLoad.remove,
     ]
     return {f"{func.__module__}.{func.__qualname__}": func for func in functions}
 
@@ -0,0 +1,240 @@
+#
+# Licensed to the Apache Software Foundation (ASF) under one
+# or more contributor license agreements.  See the NOTICE file
+# distributed with this work for additional information
+# regarding copyright ownership.  The ASF licenses this file
+# to you under the Apache License, Version 2.0 (the
+# "License"); you may not use this file except in compliance
+# with the License.  You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+# KIND, either express or implied.  See the License for the
+# specific language governing permissions and limitations
+# under the License.
+"""Fingerprints of DAG files, to skip parsing the files which did not change since they were parsed."""
+
+from __future__ import annotations
+
+import ast
+import hashlib
+import os
+import time
+from typing import Iterable, Iterator, NamedTuple
+
+from airflow.models.variable import Variable
+from airflow.utils.log.logging_mixin import LoggingMixin
+
+
+def _iter_imported_module_names(node: ast.Import | ast.ImportFrom) -> Iterator[tuple[str, int]]:
+    """Yield the names of the modules imported by an import statement, with their relative level."""
+    if isinstance(node, ast.Import):
+        for alias in node.names:
+            yield alias.name, 0
+    else:
+        if node.module:
+            yield node.module, node.level
+        # The imported names may be submodules.
+        for alias in node.names:
+            if alias.name != "*":
+                yield f"{node.module}.{alias.name}" if node.module else alias.name, node.level
+
+
+def _resolve_module_files(
+    module_name: str, level: int, importer_path: str, search_paths: Iterable[str]
+) -> Iterator[str]:
+    """Yield the files of the module, and of its parent packages, found in the search paths."""
+    if level:
+        # Relative imports are resolved from the package of the importing module.
+        base = os.path.dirname(importer_path)
+        for _ in range(level - 1):
+            base = os.path.dirname(base)
+        bases: Iterable[str] = [base]
+    else:
+        bases = search_paths
+    parts = module_name.split(".")
+    for base in bases:
+        for i in range(1, len(parts) + 1):
+            path = os.path.join(base, *parts[:i])
+            if os.path.isfile(init_path := os.path.join(path, "__init__.py")):
+                yield init_path
+            elif os.path.isfile(module_path := f"{path}.py"):
+                yield module_path
+                break
+            elif not os.path.isdir(path):
+                # Namespace packages are directories without ``__init__.py``.
+                break
+
+
+def _get_variable_key(node: ast.Call) -> ast.expr | None:
+    """Return the key argument of a ``Variable.get`` call, or None if ``node`` is another call."""
+    func = node.func
+    if not (
+        isinstance(func, ast.Attribute)
+        and func.attr == "get"
+        and isinstance(func.value, ast.Name)
+        and func.value.id == "Variable"
+    ):
+        return None
+    if node.args:
+        return node.args[0]
+    for keyword in node.keywords:
+        if keyword.arg == "key":
+            return keyword.value
+    return None
+
+
+class _ModuleFingerprint(NamedTuple):
+    """
+    What the fingerprint of a DAG file needs from one of its modules, as long as it is not modified.
+
+    :param digest: the hash of the content of the module
+    :param dependencies: the files of the modules imported by the module from the search paths
+    :param variable_keys: the keys of the Variables the module gets, or None if it gets Variables with
+        non-literal keys
+    """
+
+    digest: str
+    dependencies: tuple[str, ...]
+    variable_keys: frozenset[str] | None
+
+
+class DagFileFingerprints(LoggingMixin):
+    """
+    Fingerprints of the DAG files parsed successfully, to know whether they changed since.
+
+    The fingerprint of a file hashes its content, the content of the modules it imports from the
+    given directories, transitively, and the values of the Variables it gets with a literal key.
+    Files getting Variables with other keys have no fingerprint, and are always parsed again.
+
+    What the fingerprints need from each module is cached as long as the module is not modified, and
+    the values of the Variables are cached for ``variable_ttl`` seconds.
+
+    A file may still give different DAGs when parsed again, for instance if it uses the current time,
+    environment variables or external resources. Its fingerprint can be invalidated explicitly, and
+    fingerprints expire after ``max_age`` seconds, so that such files are parsed again eventually.
+
+    :param search_paths: the directories the modules imported by the DAG files are looked for in
+    :param max_age: the number of seconds after which fingerprints expire, 0 meaning never
+    :param variable_ttl: the number of seconds the values of the Variables are cached for
+    """
+
+    def __init__(self, search_paths: Iterable[str], max_age: float, variable_ttl: float = 0):
+        super().__init__()
+        self._search_paths = [path for path in dict.fromkeys(search_paths) if os.path.isdir(path)]
+        self._max_age = max_age
+        self._variable_ttl = variable_ttl
+        # Map from file path to its fingerprint when last parsed successfully, and when it was recorded
+        self._fingerprints: dict[str, tuple[str, float]] = {}
+        # Map from module path to its modification time and size, and to what the fingerprints need of it
+        self._modules: dict[str, tuple[tuple[int, int], _ModuleFingerprint]] = {}
+        # Map from Variable key to its value, and when it was got
+        self._variable_values: dict[str, tuple[str | None, float]] = {}
+
+    def compute(self, file_path: str) -> str | None:
+        """
+        Compute the fingerprint of a DAG file.
+
+        :param file_path: the path of the DAG file
+        :return: the fingerprint, or None if the file cannot be fingerprinted
+        """
+        hasher = hashlib.sha256()
+        variable_keys: set[str] = set()
+        to_visit = [file_path]
+        visited: set[str] = set()
+        while to_visit:
+            path = to_visit.pop(0)
+            if path in visited:
+                continue
+            visited.add(path)
+            module = self._get_module_fingerprint(path)
+            if module is None or module.variable_keys is None:
+                return None
+            hasher.update(path.encode())
+            hasher.update(module.digest.encode())
+            to_visit.extend(module.dependencies)
+            variable_keys.update(module.variable_keys)
+
+        for key in sorted(variable_keys):
+            hasher.update(repr((key, self._get_variable(key))).encode())
+        return hasher.hexdigest()
+
+    def _get_module_fingerprint(self, path: str) -> _ModuleFingerprint | None:
+        """Get what the fingerprints need from a module, or None if it cannot be read."""
+        try:
+            stat = os.stat(path)
+        except OSError:
+            self._modules.pop(path, None)
+            return None
+        signature = (stat.st_mtime_ns, stat.st_size)
+        if (cached := self._modules.get(path)) is not None and cached[0] == signature:
+            return cached[1]
+
+        try:
+            with open(path, "rb") as f:
+                content = f.read()
+        except OSError:
+            return None
+        module_fingerprint = self._read_module(path, content)
+        self._modules[path] = (signature, module_fingerprint)
+        return module_fingerprint
+
+    def _read_module(self, path: str, content: bytes) -> _ModuleFingerprint:
+        digest = hashlib.sha256(content).hexdigest()
+        try:
+            module = ast.parse(content)
+        except (SyntaxError, ValueError):
+            # Zip files are not parsed, and parsing other files fails the same way until they change.
+            return _ModuleFingerprint(digest, (), frozenset())
+        dependencies: list[str] = []
+        variable_keys: set[str] = set()
+        for node in ast.walk(module):
+            if isinstance(node, (ast.Import, ast.ImportFrom)):
+                for module_name, level in _iter_imported_module_names(node):
+                    dependencies.extend(_resolve_module_files(module_name, level, path, self._search_paths))
+            elif isinstance(node, ast.Call):
+                key = _get_variable_key(node)
+                if key is None:
+                    continue
+                if not isinstance(key, ast.Constant) or not isinstance(key.value, str):
+                    return _ModuleFingerprint(digest, (), None)
+                variable_keys.add(key.value)
+        return _ModuleFingerprint(digest, tuple(dependencies), frozenset(variable_keys))
+
+    def _get_variable(self, key: str) -> str | None:
+        """Get the value of a Variable, cached for ``variable_ttl`` seconds."""
+        now = time.monotonic()
+        cached = self._variable_values.get(key)
+        if cached is not None and now - cached[1] < self._variable_ttl:
+            return cached[0]
+        value = Variable.get_variable_from_secrets(key)
+        self._variable_values[key] = (value, now)
+        return value
+
+    def is_unchanged(self, file_path: str, fingerprint: str | None) -> bool:
+        """Whether a file has the given fingerprint, as when last parsed successfully."""
+        if fingerprint is None or file_path not in self._fingerprints:
+            return False
+        recorded_fingerprint, recorded_at = self._fingerprints[file_path]
+        if self._max_age and time.monotonic() - recorded_at > self._max_age:
+            return False
+        return recorded_fingerprint == fingerprint
+
+    def record(self, file_path: str, fingerprint: str) -> None:
+        """Record the fingerprint of a file which was just parsed successfully."""
+        self._fingerprints[file_path] = (fingerprint, time.monotonic())
+
+    def invalidate(self, file_paths: Iterable[str] | None = None) -> None:
+        """
+        Forget the fingerprints of files, so that they are parsed again even if they did not change.
+
+        :param file_paths: the paths of the files, all files if None
+        """
+        if file_paths is None:
+            self._fingerprints.clear()
+            return
+        for file_path in file_paths:
+            self._fingerprints.pop(file_path, None)
@@ -35,17 +35,25 @@ from importlib import import_module
 from pathlib import Path
 from typing import TYPE_CHECKING, Any, Callable, Iterator, NamedTuple, cast
 
+import psutil
 from setproctitle import setproctitle
-from sqlalchemy import delete, select, update
+from sqlalchemy import delete, func, select, update
 from tabulate import tabulate
 
 import airflow.models
 from airflow.api_internal.internal_api_call import internal_api_call
 from airflow.callbacks.callback_requests import CallbackRequest, SlaCallbackRequest
 from airflow.configuration import conf
+from airflow.dag_processing.file_fingerprints import DagFileFingerprints
 from airflow.dag_processing.processor import DagFileProcessorProcess
+from airflow.dag_processing.processor_pool import DagFileProcessorPool, PooledDagFileProcessorProcess
+from airflow.dag_processing.resource_usage import DagFileResourceUsage
+from airflow.dag_processing.static_analysis import StaticDagFileAnalyzer
+from airflow.exceptions import AirflowException
 from airflow.models import errors
 from airflow.models.dag import DagModel
+from airflow.models.dagcode import DagCode
+from airflow.models.dagfileparsingstats import DagFileParsingStats
 from airflow.models.dagwarning import DagWarning
 from airflow.models.db_callback_request import DbCallbackRequest
 from airflow.models.serialized_dag import SerializedDagModel
@@ -78,6 +86,12 @@ class DagParsingStat(NamedTuple):
     all_files_processed: bool
 
 
+class DagFileReparseRequest(NamedTuple):
+    """Request to parse DAG files again even if they did not change, all files if ``file_paths`` is None."""
+
+    file_paths: list[str] | None
+
+
 class DagFileStat(NamedTuple):
     """Information about single processing of one file."""
 
@@ -188,6 +202,23 @@ class DagFileProcessorAgent(LoggingMixin, MultiprocessingStartMethodMixin):
             # when harvest_serialized_dags calls _heartbeat_manager.
             pass
 
+    def request_reparse(self, file_paths: list[str] | None = None) -> None:
+        """
+        Parse DAG files again when their turn comes, even if they did not change since last parsed.
+
+        This is only needed if ``[scheduler] skip_unchanged_dag_files`` is set.
+
+        :param file_paths: the paths of the DAG files, all files if None
+        """
+        if not self._parent_signal_conn:
+            raise ValueError("Process not started.")
+        try:
+            self._parent_signal_conn.send(DagFileReparseRequest(file_paths))
+        except ConnectionError:
+            # If this died cos of an error then we will noticed and restarted
+            # when harvest_serialized_dags calls _heartbeat_manager.
+            pass
+
     def get_callbacks_pipe(self) -> MultiprocessingConnection:
         """Return the pipe for sending Callbacks to DagProcessorManager."""
         if not self._parent_signal_conn:
@@ -366,6 +397,8 @@ class DagFileProcessorManager(LoggingMixin):
         # known files; this will be updated every `dag_dir_list_interval` and stuff added/removed accordingly
         self._file_paths: list[str] = []
         self._file_path_queue: deque[str] = deque()
+        # Map from queued file path to when it was queued, as given by time.monotonic()
+        self._file_queued_time: dict[str, float] = {}
         self._max_runs = max_runs
         # signal_conn is None for dag_processor_standalone mode.
         self._direct_scheduler_conn = signal_conn
@@ -430,6 +463,59 @@ class DagFileProcessorManager(LoggingMixin):
 
         self._log = logging.getLogger("airflow.processor_manager")
 
+        # Fingerprints of the files parsed successfully, if the files which did not change are not parsed again
+        self._file_fingerprints: DagFileFingerprints | None = None
+        if conf.getboolean("scheduler", "skip_unchanged_dag_files"):
+            self._file_fingerprints = DagFileFingerprints(
+                search_paths=[airflow.settings.DAGS_FOLDER, os.fspath(self._dag_directory)],
+                max_age=conf.getint("scheduler", "unchanged_dag_file_reparse_interval"),
+                variable_ttl=self._file_process_interval,
+            )
+        # Map from file path to the fingerprint of the file being processed
+        self._processed_fingerprints: dict[str, str] = {}
+
+        # Static analysis of the files, if the DAGs they define are looked for without executing them
+        self._static_analyzer: StaticDagFileAnalyzer | None = None
+        if conf.getboolean("scheduler", "static_dag_discovery"):
+            self._static_analyzer = StaticDagFileAnalyzer(
+                search_paths=[airflow.settings.DAGS_FOLDER, os.fspath(self._dag_directory)]
+            )
+        # Map from file path to the ids of the DAGs found statically in the file when it was last parsed
+        self._parsed_static_dag_ids: dict[str, frozenset[str]] = {}
+
+        # Pool of long-lived processes parsing the files, if they are not parsed in a new process each
+        self._processor_pool: DagFileProcessorPool | None = None
+        if conf.getboolean("scheduler", "parsing_worker_pool"):
+            if DagFileProcessorPool.is_supported():
+                self._processor_pool = DagFileProcessorPool(
+                    max_files_per_worker=conf.getint("scheduler", "parsing_worker_max_files"),
+                    preload_modules=[
+                        module.strip()
+                        for module in conf.get("scheduler", "parsing_worker_preload_modules").split(",")
+                        if module.strip()
+                    ],
+                )
+            else:
+                self.log.warning(
+                    "The forkserver start method is not available, or not supported on this Python "
+                    "version, parsing each file in a new process."
+                )
+
+        # Budgets of the processors, above which they are killed and their files quarantined
+        self._memory_budget = conf.getint("scheduler", "dag_file_memory_budget") * 1024 * 1024
+        self._cpu_budget = conf.getfloat("scheduler", "dag_file_cpu_budget")
+        self._quarantine_duration = conf.getint("scheduler", "dag_file_quarantine_duration")
+        # Map from file path to when the file was quarantined, until when, and why
+        self._quarantined_files: dict[str, tuple[datetime, datetime, str]] = {}
+        # Map from file path to the CPU time and resident memory of the process processing it, when it
+        # started processing it
+        self._processor_start_usage: dict[str, tuple[float, int]] = {}
+        # Map from file path to the resources used to process it last
+        self._file_resource_usage: dict[str, DagFileResourceUsage] = {}
+        # Whether to store the resources used in the DB, and the stats not stored yet, by file path
+        self._record_parsing_stats = conf.getboolean("scheduler", "record_dag_file_parsing_stats")
+        self._pending_parsing_stats: dict[str, dict[str, Any]] = {}
+
         self.waitables: dict[Any, MultiprocessingConnection | DagFileProcessorProcess] = (
             {
                 self._direct_scheduler_conn: self._direct_scheduler_conn,
@@ -472,7 +558,12 @@ class DagFileProcessorManager(LoggingMixin):
             "Checking for new files in %s every %s seconds", self._dag_directory, self.dag_dir_list_interval
         )
 
-        return self._run_parsing_loop()
+        try:
+            return self._run_parsing_loop()
+        finally:
+            # The idle workers would otherwise keep the process from exiting.
+            if self._processor_pool is not None:
+                self._processor_pool.close()
 
     def _scan_stale_dags(self):
         """Scan at fix internal DAGs which are no longer present in files."""
@@ -482,10 +573,19 @@ class DagFileProcessorManager(LoggingMixin):
             last_parsed = {
                 fp: self.get_last_finish_time(fp) for fp in self.file_paths if self.get_last_finish_time(fp)
             }
+            static_dag_ids = None
+            if self._static_analyzer is not None:
+                static_dag_ids = {}
+                for file_path in self.file_paths:
+                    info = self._static_analyzer.analyze(file_path)
+                    # Finding no DAG in a file is no evidence its DAGs were removed.
+                    if info is not None and info.is_static and info.dag_ids:
+                        static_dag_ids[file_path] = sorted(info.dag_ids)
             DagFileProcessorManager.deactivate_stale_dags(
                 last_parsed=last_parsed,
                 dag_directory=self.get_dag_directory(),
                 stale_dag_threshold=self.stale_dag_threshold,
+                static_dag_ids=static_dag_ids,
             )
             self.last_deactivate_stale_dags_time = timezone.utcnow()
 
@@ -497,15 +597,27 @@ class DagFileProcessorManager(LoggingMixin):
         last_parsed: dict[str, datetime | None],
         dag_directory: str,
         stale_dag_threshold: int,
+        static_dag_ids: dict[str, list[str]] | None = None,
         session: Session = NEW_SESSION,
     ):
         """
         Detect DAGs which are no longer present in files.
 
         Deactivate them and remove them in the serialized_dag table.
+
+        :param last_parsed: the time the files were last parsed, by file path
+        :param dag_directory: the directory of the DAG files
+        :param stale_dag_threshold: the number of seconds after which DAGs not updated when their file
+            was parsed are deactivated
+        :param static_dag_ids: the ids of the DAGs of the files whose DAGs were all found by static
+            analysis, by file path. Other DAGs of these files are deactivated right away, unless no DAG
+            was found in the file.
+        :param session: session for ORM operations
         """
         to_deactivate = set()
-        query = select(DagModel.dag_id, DagModel.fileloc, DagModel.last_parsed_time).where(DagModel.is_active)
+        query = select(
+            DagModel.dag_id, DagModel.fileloc, DagModel.last_parsed_time, DagModel.is_subdag
+        ).where(DagModel.is_active)
         standalone_dag_processor = conf.getboolean("scheduler", "standalone_dag_processor")
         if standalone_dag_processor:
             query = query.where(DagModel.processor_subdir == dag_directory)
@@ -522,6 +634,15 @@ class DagFileProcessorManager(LoggingMixin):
             ):
                 cls.logger().info("DAG %s is missing and will be deactivated.", dag.dag_id)
                 to_deactivate.add(dag.dag_id)
+            elif (
+                static_dag_ids
+                and not dag.is_subdag
+                and static_dag_ids.get(dag.fileloc)
+                and dag.dag_id not in static_dag_ids[dag.fileloc]
+            ):
+                # SubDAGs may be created by functions of other modules, and are not looked for.
+                cls.logger().info("DAG %s is no longer in its file and will be deactivated.", dag.dag_id)
+                to_deactivate.add(dag.dag_id)
 
         if to_deactivate:
             deactivated_dagmodel = session.execute(
@@ -572,6 +693,8 @@ class DagFileProcessorManager(LoggingMixin):
                     pass
                 elif isinstance(agent_signal, CallbackRequest):
                     self._add_callback_to_queue(agent_signal)
+                elif isinstance(agent_signal, DagFileReparseRequest):
+                    self.invalidate_file_fingerprints(agent_signal.file_paths)
                 else:
                     raise ValueError(f"Invalid message {type(agent_signal)}")
 
@@ -603,6 +726,7 @@ class DagFileProcessorManager(LoggingMixin):
             refreshed_dag_dir = self._refresh_dag_dir()
 
             self._kill_timed_out_processors()
+            self._kill_processors_over_budget()
 
             # Generate more file paths to process if we processed all the files already. Note for this
             # to clear down, we must have cleared all files found from scanning the dags dir _and_ have
@@ -630,6 +754,7 @@ class DagFileProcessorManager(LoggingMixin):
 
             # Collect anything else that has finished, but don't kick off any more processors
             self.collect_results()
+            self._flush_parsing_stats()
 
             self._print_stat()
 
@@ -779,6 +904,10 @@ class DagFileProcessorManager(LoggingMixin):
                 dag_filelocs,
                 processor_subdir=self.get_dag_directory(),
             )
+            if self._record_parsing_stats:
+                DagFileParsingStats.remove_deleted_files(
+                    self._file_paths, processor_subdir=self.get_dag_directory()
+                )
 
             return True
         return False
@@ -829,7 +958,18 @@ class DagFileProcessorManager(LoggingMixin):
         # Last Runtime: If the process ran before, how long did it take to
         # finish in seconds
         # Last Run: When the file finished processing in the previous run.
-        headers = ["File Path", "PID", "Runtime", "# DAGs", "# Errors", "Last Runtime", "Last Run"]
+        # Last CPU Time, Last Peak Memory: The resources used to process the file in the previous run.
+        headers = [
+            "File Path",
+            "PID",
+            "Runtime",
+            "# DAGs",
+            "# Errors",
+            "Last Runtime",
+            "Last Run",
+            "Last CPU Time",
+            "Last Peak Memory",
+        ]
 
         rows = []
         now = timezone.utcnow()
@@ -846,13 +986,26 @@ class DagFileProcessorManager(LoggingMixin):
                 seconds_ago = (now - last_run).total_seconds()
                 Stats.gauge(f"dag_processing.last_run.seconds_ago.{file_name}", seconds_ago)
 
-            rows.append((file_path, processor_pid, runtime, num_dags, num_errors, last_runtime, last_run))
+            resource_usage = self._file_resource_usage.get(file_path)
+            rows.append(
+                (
+                    file_path,
+                    processor_pid,
+                    runtime,
+                    num_dags,
+                    num_errors,
+                    last_runtime,
+                    last_run,
+                    resource_usage,
+                )
+            )
 
         # Sort by longest last runtime. (Can't sort None values in python3)
         rows.sort(key=lambda x: x[5] or 0.0, reverse=True)
 
         formatted_rows = []
-        for file_path, pid, runtime, num_dags, num_errors, last_runtime, last_run in rows:
+        for file_path, pid, runtime, num_dags, num_errors, last_runtime, last_run, resource_usage in rows:
+            peak_memory = resource_usage.peak_memory if resource_usage else None
             formatted_rows.append(
                 (
                     file_path,
@@ -862,6 +1015,8 @@ class DagFileProcessorManager(LoggingMixin):
                     num_errors,
                     f"{last_runtime:.2f}s" if last_runtime else None,
                     last_run.strftime("%Y-%m-%dT%H:%M:%S") if last_run else None,
+                    f"{resource_usage.cpu_time:.2f}s" if resource_usage else None,
+                    f"{peak_memory / 1024 ** 2:.0f} MiB" if peak_memory is not None else None,
                 )
             )
         log_str = (
@@ -974,6 +1129,7 @@ class DagFileProcessorManager(LoggingMixin):
 
         # clean up the queues; remove anything queued which no longer in the list, including callbacks
         self._file_path_queue = deque(x for x in self._file_path_queue if x in new_file_paths)
+        self._file_queued_time = {x: t for x, t in self._file_queued_time.items() if x in new_file_paths}
         Stats.gauge("dag_processing.file_path_queue_size", len(self._file_path_queue))
 
         callback_paths_to_del = [x for x in self._callback_to_execute if x not in new_file_paths]
@@ -995,6 +1151,10 @@ class DagFileProcessorManager(LoggingMixin):
         for key in to_remove:
             # Remove the stats for any dag files that don't exist anymore
             del self._file_stats[key]
+        for file_path in set(self._file_resource_usage).difference(self._file_paths):
+            del self._file_resource_usage[file_path]
+        for file_path in set(self._quarantined_files).difference(self._file_paths):
+            del self._quarantined_files[file_path]
 
         self._processors = filtered_processors
 
@@ -1027,15 +1187,44 @@ class DagFileProcessorManager(LoggingMixin):
             run_count=self.get_run_count(processor.file_path) + 1,
         )
         self._file_stats[processor.file_path] = stat
+        fingerprint = self._processed_fingerprints.pop(processor.file_path, None)
+        if self._file_fingerprints is not None:
+            if fingerprint is not None and count_import_errors == 0:
+                self._file_fingerprints.record(processor.file_path, fingerprint)
+            else:
+                # Files failing to parse are parsed again, in case they failed for external reasons.
+                self._file_fingerprints.invalidate([processor.file_path])
         file_name = Path(processor.file_path).stem
         Stats.timing(f"dag_processing.last_duration.{file_name}", last_duration)
         Stats.timing("dag_processing.last_duration", last_duration, tags={"file_name": file_name})
 
+        self._processor_start_usage.pop(processor.file_path, None)
+        resource_usage = processor.resource_usage
+        if resource_usage is not None:
+            last_cpu_time = timedelta(seconds=resource_usage.cpu_time)
+            Stats.timing(f"dag_processing.last_cpu_time.{file_name}", last_cpu_time)
+            Stats.timing("dag_processing.last_cpu_time", last_cpu_time, tags={"file_name": file_name})
+            if resource_usage.peak_memory is not None:
+                Stats.gauge(f"dag_processing.last_peak_memory.{file_name}", resource_usage.peak_memory)
+                Stats.gauge(
+                    "dag_processing.last_peak_memory",
+                    resource_usage.peak_memory,
+                    tags={"file_name": file_name},
+                )
+            self._add_parsing_stats(processor.file_path, last_finish_time, last_duration, resource_usage)
+
     def collect_results(self) -> None:
         """Collect the result from any finished DAG processors."""
         ready = multiprocessing.connection.wait(
             self.waitables.keys() - [self._direct_scheduler_conn], timeout=0
         )
+        # The connection to a pooled worker is not ready anymore once its result has been read, which
+        # ``wait_until_finished`` does.
+        ready.extend(
+            handle
+            for handle, processor in self.waitables.items()
+            if isinstance(processor, PooledDagFileProcessorProcess) and handle not in ready and processor.done
+        )
 
         for sentinel in ready:
             if sentinel is not self._direct_scheduler_conn:
@@ -1065,31 +1254,189 @@ class DagFileProcessorManager(LoggingMixin):
         # needs to be done before this process is forked to create the DAG parsing processes.
         SecretCache.init()
 
+        unchanged_file_paths = []
+        # Counted at most once per loop, for all the files of the queue, when a file is first unchanged
+        serialized_dag_counts: dict[str, int] | None = None
         while self._parallelism > len(self._processors) and self._file_path_queue:
             file_path = self._file_path_queue.popleft()
+            self._emit_queue_wait_metrics(file_path)
             # Stop creating duplicate processor i.e. processor with the same filepath
             if file_path in self._processors:
                 continue
 
             callback_to_execute_for_file = self._callback_to_execute[file_path]
-            processor = self._create_process(
-                file_path,
-                self._pickle_dags,
-                self._dag_ids,
-                self.get_dag_directory(),
-                callback_to_execute_for_file,
-            )
+            if self._static_analyzer is not None:
+                static_info = self._static_analyzer.analyze(file_path)
+                if static_info is not None and static_info.is_static:
+                    self._parsed_static_dag_ids[file_path] = static_info.dag_ids
+                else:
+                    self._parsed_static_dag_ids.pop(file_path, None)
+            if self._file_fingerprints is not None:
+                fingerprint = self._file_fingerprints.compute(file_path)
+                if not callback_to_execute_for_file and self._file_fingerprints.is_unchanged(
+                    file_path, fingerprint
+                ):
+                    if serialized_dag_counts is None:
+                        serialized_dag_counts = self._count_serialized_dags_of_queue(file_path)
+                    if self._serialized_dags_exist(file_path, serialized_dag_counts):
+                        del self._callback_to_execute[file_path]
+                        self._record_unchanged_file(file_path)
+                        unchanged_file_paths.append(file_path)
+                        continue
+                if fingerprint is not None:
+                    self._processed_fingerprints[file_path] = fingerprint
+            if self._processor_pool is not None:
+                processor = PooledDagFileProcessorProcess(
+                    pool=self._processor_pool,
+                    file_path=file_path,
+                    pickle_dags=self._pickle_dags,
+                    dag_ids=self._dag_ids,
+                    dag_directory=self.get_dag_directory(),
+                    callback_requests=callback_to_execute_for_file,
+                )
+            else:
+                processor = self._create_process(
+                    file_path,
+                    self._pickle_dags,
+                    self._dag_ids,
+                    self.get_dag_directory(),
+                    callback_to_execute_for_file,
+                )
 
             del self._callback_to_execute[file_path]
             Stats.incr("dag_processing.processes", tags={"file_path": file_path, "action": "start"})
 
             processor.start()
             self.log.debug("Started a process (PID: %s) to generate tasks for %s", processor.pid, file_path)
+            if self._cpu_budget or (self._memory_budget and self._processor_pool is not None):
+                # Workers of the processor pool have spent CPU time, and kept memory, on the files they
+                # processed before.
+                start_usage = self._get_processor_usage(processor)
+                if start_usage is not None:
+                    start_cpu_time, start_memory = start_usage
+                    if self._processor_pool is None:
+                        # New processes count the memory shared with the manager they were forked from.
+                        start_memory = 0
+                    self._processor_start_usage[file_path] = (start_cpu_time, start_memory)
             self._processors[file_path] = processor
             self.waitables[processor.waitable_handle] = processor
 
             Stats.gauge("dag_processing.file_path_queue_size", len(self._file_path_queue))
 
+        if unchanged_file_paths:
+            self.update_last_parsed_time(unchanged_file_paths)
+
+    def _emit_queue_wait_metrics(self, file_path: str) -> None:
+        """Emit how long a file waited in the queue before its turn came."""
+        queued_time = self._file_queued_time.pop(file_path, None)
+        if queued_time is None:
+            return
+        queue_wait = timedelta(seconds=time.monotonic() - queued_time)
+        file_name = Path(file_path).stem
+        Stats.timing(f"dag_processing.file_queue_wait.{file_name}", queue_wait)
+        Stats.timing("dag_processing.file_queue_wait", queue_wait, tags={"file_name": file_name})
+
+    def _record_unchanged_file(self, file_path: str) -> None:
+        """Record a file which did not change since last parsed as processed, without parsing it again."""
+        self.log.debug("Not parsing %s again as it did not change", file_path)
+        stat = self._file_stats.get(file_path, DagFileProcessorManager.DEFAULT_FILE_STAT)
+        self._file_stats[file_path] = DagFileStat(
+            num_dags=stat.num_dags,
+            import_errors=stat.import_errors,
+            last_finish_time=timezone.utcnow(),
+            last_duration=stat.last_duration,
+            run_count=stat.run_count + 1,
+        )
+        Stats.incr("dag_processing.unchanged_files_skipped")
+
+    def _count_serialized_dags_of_queue(self, file_path: str) -> dict[str, int]:
+        """Count the serialized DAGs of a file, and of the files of the queue which had DAGs, at once."""
+        file_paths = [
+            path
+            for path in (file_path, *self._file_path_queue)
+            if self._file_stats.get(path, self.DEFAULT_FILE_STAT).num_dags
+        ]
+        return self.count_serialized_dags(file_paths) if file_paths else {}
+
+    def _serialized_dags_exist(self, file_path: str, serialized_dag_counts: dict[str, int]) -> bool:
+        """
+        Whether the DAGs found when a file was last parsed are all still serialized.
+
+        DAGs deleted while their file did not change, e.g. by ``airflow dags delete``,
+        are only brought back by parsing the file again.
+
+        :param file_path: the path of the file
+        :param serialized_dag_counts: the number of serialized DAGs of the files, by file path
+        """
+        num_dags = self._file_stats.get(file_path, self.DEFAULT_FILE_STAT).num_dags
+        if not num_dags:
+            return True
+        if serialized_dag_counts.get(file_path, 0) >= num_dags:
+            return True
+        self.log.info("Parsing %s again as some of its DAGs are no longer serialized", file_path)
+        self._file_fingerprints.invalidate([file_path])
+        return False
+
+    @staticmethod
+    @internal_api_call
+    @provide_session
+    def count_serialized_dags(file_paths: list[str], session: Session = NEW_SESSION) -> dict[str, int]:
+        """
+        Count the serialized DAGs of files.
+
+        :param file_paths: the paths of the DAG files
+        :param session: session for ORM operations
+        :return: the number of serialized DAGs of the files having some, by file path
+        """
+        query = (
+            select(SerializedDagModel.fileloc, func.count())
+            .where(
+                SerializedDagModel.fileloc_hash.in_({DagCode.dag_fileloc_hash(path) for path in file_paths}),
+                SerializedDagModel.fileloc.in_(file_paths),
+            )
+            .group_by(SerializedDagModel.fileloc)
+        )
+        return {fileloc: count for fileloc, count in session.execute(query)}
+
+    def _static_dag_ids_changed(self, file_path: str) -> bool:
+        """Whether the DAGs found statically in a file changed since it was last parsed."""
+        if self._static_analyzer is None or file_path not in self._parsed_static_dag_ids:
+            return False
+        info = self._static_analyzer.analyze(file_path)
+        if info is None or not info.is_static:
+            return True
+        return info.dag_ids != self._parsed_static_dag_ids[file_path]
+
+    @staticmethod
+    @internal_api_call
+    @provide_session
+    def update_last_parsed_time(file_paths: list[str], session: Session = NEW_SESSION) -> None:
+        """
+        Update the last parsed time of the active DAGs of files which were not parsed again.
+
+        This keeps the DAGs from being deactivated as stale.
+
+        :param file_paths: the paths of the DAG files
+        :param session: session for ORM operations
+        """
+        session.execute(
+            update(DagModel)
+            .where(DagModel.fileloc.in_(file_paths), DagModel.is_active)
+            .values(last_parsed_time=timezone.utcnow())
+            .execution_options(synchronize_session=False)
+        )
+        session.commit()
+
+    def invalidate_file_fingerprints(self, file_paths: list[str] | None = None) -> None:
+        """
+        Parse DAG files again when their turn comes, even if they did not change since last parsed.
+
+        :param file_paths: the paths of the DAG files, all files if None
+        """
+        if self._file_fingerprints is not None:
+            self.log.info("Parsing %s again on their next turn", file_paths or "all DAG files")
+            self._file_fingerprints.invalidate(file_paths)
+
     def add_new_file_path_to_queue(self):
         for file_path in self.file_paths:
             if file_path not in self._file_stats:
@@ -1097,6 +1444,7 @@ class DagFileProcessorManager(LoggingMixin):
                 self.log.info("Adding new file %s to parsing queue", file_path)
                 self._file_stats[file_path] = DagFileProcessorManager.DEFAULT_FILE_STAT
                 self._file_path_queue.appendleft(file_path)
+                self._file_queued_time.setdefault(file_path, time.monotonic())
 
     def prepare_file_path_queue(self):
         """
@@ -1115,7 +1463,8 @@ class DagFileProcessorManager(LoggingMixin):
 
         files_with_mtime = {}
         file_paths = []
-        is_mtime_mode = list_mode == "modified_time"
+        # Files modified since last parsed are also parsed first in priority mode.
+        is_mtime_mode = list_mode in ("modified_time", "priority")
 
         file_paths_recently_processed = []
         file_paths_to_stop_watching = set()
@@ -1146,7 +1495,9 @@ class DagFileProcessorManager(LoggingMixin):
                 file_paths_recently_processed.append(file_path)
 
         # Sort file paths via last modified time
-        if is_mtime_mode:
+        if list_mode == "priority":
+            file_paths = self._sort_file_paths_by_priority(files_with_mtime, now)
+        elif is_mtime_mode:
             file_paths = sorted(files_with_mtime, key=files_with_mtime.get, reverse=True)
         elif list_mode == "alphabetical":
             file_paths.sort()
@@ -1155,6 +1506,10 @@ class DagFileProcessorManager(LoggingMixin):
             # set of files. Since we set the seed, the sort order will remain same per host
             random.Random(get_hostname()).shuffle(file_paths)
 
+        if self._static_analyzer is not None:
+            # Parse the files whose DAGs were added or removed first, the sort keeping the order otherwise.
+            file_paths.sort(key=lambda path: not self._static_dag_ids_changed(path))
+
         if file_paths_to_stop_watching:
             self.set_file_paths(
                 [path for path in self._file_paths if path not in file_paths_to_stop_watching]
@@ -1164,9 +1519,14 @@ class DagFileProcessorManager(LoggingMixin):
             file_path for file_path, stat in self._file_stats.items() if stat.run_count == self._max_runs
         ]
 
+        file_paths_quarantined = [
+            file_path for file_path in list(self._quarantined_files) if self._is_quarantined(file_path, now)
+        ]
+
         file_paths_to_exclude = file_paths_in_progress.union(
             file_paths_recently_processed,
             files_paths_at_run_limit,
+            file_paths_quarantined,
         )
 
         # Do not convert the following list to set as set does not preserve the order
@@ -1192,6 +1552,63 @@ class DagFileProcessorManager(LoggingMixin):
         self._add_paths_to_queue(files_paths_to_queue, False)
         Stats.incr("dag_processing.file_path_queue_update_count")
 
+    def _sort_file_paths_by_priority(self, files_with_mtime: dict[str, float], now: datetime) -> list[str]:
+        """
+        Sort file paths so that the files most needing to be parsed come first.
+
+        New files, and files modified since last parsed, come first, and files which failed to import
+        last. Otherwise, files are sorted by when their DAGs are due to create their next DAG run, then
+        by how long they took to parse, so that DAGs about to run are parsed right before running.
+
+        :param files_with_mtime: the paths of the files to sort, with their modification time
+        :param now: the current time
+        :return: the sorted paths
+        """
+        next_dagrun_create_after = self.get_next_dagrun_create_after_by_file()
+
+        def get_priority(file_path: str) -> tuple[int, float, float]:
+            stat = self._file_stats.get(file_path, self.DEFAULT_FILE_STAT)
+            if (
+                stat.last_finish_time is None
+                or files_with_mtime[file_path] > stat.last_finish_time.timestamp()
+            ):
+                tier = 0
+            elif stat.import_errors:
+                tier = 2
+            else:
+                tier = 1
+            # DAGs overdue to create their next DAG run come before DAGs due later, and files without
+            # scheduled DAGs come after them.
+            next_dagrun = next_dagrun_create_after.get(file_path)
+            seconds_to_next_dagrun = (next_dagrun - now).total_seconds() if next_dagrun else float("inf")
+            last_duration = stat.last_duration
+            if isinstance(last_duration, timedelta):
+                last_duration = last_duration.total_seconds()
+            return tier, seconds_to_next_dagrun, last_duration or 0.0
+
+        return sorted(files_with_mtime, key=get_priority)
+
+    @staticmethod
+    @internal_api_call
+    @provide_session
+    def get_next_dagrun_create_after_by_file(session: Session = NEW_SESSION) -> dict[str, datetime]:
+        """
+        Get when the active, unpaused DAGs of each DAG file are due to create their next DAG run.
+
+        :param session: session for ORM operations
+        :return: the earliest ``next_dagrun_create_after`` of the DAGs of each file, by file path
+        """
+        query = (
+            select(DagModel.fileloc, func.min(DagModel.next_dagrun_create_after))
+            .where(
+                DagModel.is_active,
+                ~DagModel.is_paused,
+                DagModel.next_dagrun_create_after.is_not(None),
+            )
+            .group_by(DagModel.fileloc)
+        )
+        return {fileloc: next_dagrun for fileloc, next_dagrun in session.execute(query)}
+
     def _kill_timed_out_processors(self):
         """Kill any file processors that timeout to defend against process hangs."""
         now = timezone.utcnow()
@@ -1210,6 +1627,9 @@ class DagFileProcessorManager(LoggingMixin):
                 # Deprecated; may be removed in a future Airflow release.
                 Stats.incr("dag_file_processor_timeouts")
                 processor.kill()
+                self._processed_fingerprints.pop(file_path, None)
+                if self._file_fingerprints is not None:
+                    self._file_fingerprints.invalidate([file_path])
 
                 # Clean up processor references
                 self.waitables.pop(processor.waitable_handle)
@@ -1228,6 +1648,126 @@ class DagFileProcessorManager(LoggingMixin):
         for proc in processors_to_remove:
             self._processors.pop(proc)
 
+    @staticmethod
+    def _get_processor_usage(processor: DagFileProcessorProcess) -> tuple[float, int] | None:
+        """Get the CPU time spent, and the resident memory used, by the process of a processor."""
+        try:
+            process = psutil.Process(processor.pid)
+            with process.oneshot():
+                cpu_times = process.cpu_times()
+                memory = process.memory_info().rss
+        except (psutil.Error, AirflowException):
+            # The process is gone.
+            return None
+        return cpu_times.user + cpu_times.system, memory
+
+    def _kill_processors_over_budget(self):
+        """Kill the processors using more memory or CPU time than allowed, and quarantine their files."""
+        if not self._memory_budget and not self._cpu_budget:
+            return
+        now = timezone.utcnow()
+        for file_path, processor in list(self._processors.items()):
+            usage = self._get_processor_usage(processor)
+            if usage is None:
+                # The process is done, its result is collected on the next loop.
+                continue
+            start_cpu_time, start_memory = self._processor_start_usage.get(file_path, (0.0, 0))
+            cpu_time = usage[0] - start_cpu_time
+            memory = usage[1] - start_memory
+            if self._memory_budget and memory > self._memory_budget:
+                reason = (
+                    f"Used {memory / 1024 ** 2:.0f} MiB of memory, above the budget of "
+                    f"{self._memory_budget / 1024 ** 2:.0f} MiB"
+                )
+            elif self._cpu_budget and cpu_time > self._cpu_budget:
+                reason = f"Used {cpu_time:.1f}s of CPU time, above the budget of {self._cpu_budget}s"
+            else:
+                continue
+
+            self.log.error(
+                "Processor for %s with PID %s: %s. Killing it, and quarantining the file.",
+                file_path,
+                processor.pid,
+                reason,
+            )
+            Stats.decr("dag_processing.processes", tags={"file_path": file_path, "action": "over_budget"})
+            Stats.incr("dag_processing.processor_over_budget", tags={"file_path": file_path})
+            processor.kill()
+            self._processed_fingerprints.pop(file_path, None)
+            self._processor_start_usage.pop(file_path, None)
+            if self._file_fingerprints is not None:
+                self._file_fingerprints.invalidate([file_path])
+            self.waitables.pop(processor.waitable_handle)
+            self._processors.pop(file_path)
+
+            duration = now - processor.start_time
+            self._file_stats[file_path] = DagFileStat(
+                num_dags=0,
+                import_errors=1,
+                last_finish_time=now,
+                last_duration=duration,
+                run_count=self.get_run_count(file_path) + 1,
+            )
+            if self._quarantine_duration:
+                self._quarantined_files[file_path] = (
+                    now,
+                    now + timedelta(seconds=self._quarantine_duration),
+                    reason,
+                )
+            self._add_parsing_stats(
+                file_path, now, duration, DagFileResourceUsage(cpu_time=cpu_time, peak_memory=memory)
+            )
+
+    def _is_quarantined(self, file_path: str, now: datetime) -> bool:
+        """Whether a file is quarantined, lifting the quarantine if it is over or the file was modified."""
+        if file_path not in self._quarantined_files:
+            return False
+        quarantined_at, quarantined_until, _ = self._quarantined_files[file_path]
+        try:
+            modified_time = datetime.fromtimestamp(os.path.getmtime(file_path), tz=timezone.utc)
+        except OSError:
+            modified_time = None
+        if now < quarantined_until and (modified_time is None or modified_time <= quarantined_at):
+            return True
+        self.log.info("Lifting the quarantine of %s", file_path)
+        del self._quarantined_files[file_path]
+        return False
+
+    def _add_parsing_stats(
+        self,
+        file_path: str,
+        parsed_at: datetime,
+        duration: timedelta,
+        resource_usage: DagFileResourceUsage,
+    ) -> None:
+        """Keep the resources used to process a file, to be stored in the DB with the others."""
+        self._file_resource_usage[file_path] = resource_usage
+        if not self._record_parsing_stats:
+            return
+        _, quarantined_until, quarantine_reason = self._quarantined_files.get(file_path, (None, None, None))
+        self._pending_parsing_stats[file_path] = {
+            "fileloc": file_path,
+            "processor_subdir": self.get_dag_directory(),
+            "last_parsed": parsed_at,
+            "duration": duration.total_seconds(),
+            "cpu_time": resource_usage.cpu_time,
+            "peak_memory": resource_usage.peak_memory,
+            "num_imported_modules": resource_usage.num_imported_modules,
+            "num_db_queries": resource_usage.num_db_queries,
+            "quarantined_until": quarantined_until,
+            "quarantine_reason": quarantine_reason,
+        }
+
+    def _flush_parsing_stats(self) -> None:
+        """Store the resources used to process the files processed since last stored."""
+        if not self._pending_parsing_stats:
+            return
+        try:
+            DagFileParsingStats.record(list(self._pending_parsing_stats.values()))
+        except Exception:
+            self.log.exception("Error storing the DAG file parsing stats")
+        self._pending_parsing_stats.clear()
+
     def _add_paths_to_queue(self, file_paths_to_enqueue: list[str], add_at_front: bool):
         """Add stuff to the back or front of the file queue, unless it's already present."""
         new_file_paths = list(p for p in file_paths_to_enqueue if p not in self._file_path_queue)
@@ -1235,6 +1775,9 @@ class DagFileProcessorManager(LoggingMixin):
             self._file_path_queue.extendleft(new_file_paths)
         else:
             self._file_path_queue.extend(new_file_paths)
+        queued_time = time.monotonic()
+        for file_path in new_file_paths:
+            self._file_queued_time.setdefault(file_path, queued_time)
         Stats.gauge("dag_processing.file_path_queue_size", len(self._file_path_queue))
 
     def max_runs_reached(self):
@@ -1261,6 +1804,8 @@ class DagFileProcessorManager(LoggingMixin):
         pids_to_kill = self.get_all_pids()
         if pids_to_kill:
             kill_child_processes_by_pids(pids_to_kill)
+        if self._processor_pool is not None:
+            self._processor_pool.close()
 
     def emit_metrics(self):
         """
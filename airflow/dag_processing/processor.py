@@ -38,6 +38,7 @@ from airflow.callbacks.callback_requests import (
     TaskCallbackRequest,
 )
 from airflow.configuration import conf
+from airflow.dag_processing.resource_usage import DagFileResourceUsage, ResourceUsageRecorder
 from airflow.exceptions import AirflowException, TaskNotFound
 from airflow.models import SlaMiss, errors
 from airflow.models.dag import DAG, DagModel
@@ -98,6 +99,8 @@ class DagFileProcessorProcess(LoggingMixin, MultiprocessingStartMethodMixin):
         self._process: multiprocessing.process.BaseProcess | None = None
         # The result of DagFileProcessor.process_file(file_path).
         self._result: tuple[int, int] | None = None
+        # The resources used to process the file, as reported with the result.
+        self._resource_usage: DagFileResourceUsage | None = None
         # Whether the process is done running.
         self._done = False
         # When the process started.
@@ -149,38 +152,19 @@ class DagFileProcessorProcess(LoggingMixin, MultiprocessingStartMethodMixin):
         set_context(log, file_path)
         setproctitle(f"airflow scheduler - DagFileProcessor {file_path}")
 
-        def _handle_dag_file_processing():
+        try:
             # Re-configure the ORM engine as there are issues with multiple processes
             settings.configure_orm()
-
-            # Change the thread name to differentiate log lines. This is
-            # really a separate process, but changing the name of the
-            # process doesn't work, so changing the thread name instead.
-            threading.current_thread().name = thread_name
-
-            log.info("Started process (PID=%s) to work on %s", os.getpid(), file_path)
-            dag_file_processor = DagFileProcessor(dag_ids=dag_ids, dag_directory=dag_directory, log=log)
-            result: tuple[int, int] = dag_file_processor.process_file(
+            result = DagFileProcessorProcess._process_file_with_logging(
+                log=log,
                 file_path=file_path,
                 pickle_dags=pickle_dags,
+                dag_ids=dag_ids,
+                thread_name=thread_name,
+                dag_directory=dag_directory,
                 callback_requests=callback_requests,
             )
             result_channel.send(result)
-
-        try:
-            DAG_PROCESSOR_LOG_TARGET = conf.get_mandatory_value("logging", "DAG_PROCESSOR_LOG_TARGET")
-            if DAG_PROCESSOR_LOG_TARGET == "stdout":
-                with Stats.timer() as timer:
-                    _handle_dag_file_processing()
-            else:
-                # The following line ensures that stdout goes to the same destination as the logs. If stdout
-                # gets sent to logs and logs are sent to stdout, this leads to an infinite loop. This
-                # necessitates this conditional based on the value of DAG_PROCESSOR_LOG_TARGET.
-                with redirect_stdout(StreamLogWriter(log, logging.INFO)), redirect_stderr(
-                    StreamLogWriter(log, logging.WARNING)
-                ), Stats.timer() as timer:
-                    _handle_dag_file_processing()
-            log.info("Processing %s took %.3f seconds", file_path, timer.duration)
         except Exception:
             # Log exceptions through the logging framework.
             log.exception("Got an exception! Propagating...")
@@ -192,6 +176,53 @@ class DagFileProcessorProcess(LoggingMixin, MultiprocessingStartMethodMixin):
 
             result_channel.close()
 
+    @staticmethod
+    def _process_file_with_logging(
+        log: logging.Logger,
+        file_path: str,
+        pickle_dags: bool,
+        dag_ids: list[str] | None,
+        thread_name: str,
+        dag_directory: str,
+        callback_requests: list[CallbackRequest],
+    ) -> tuple[tuple[int, int], DagFileResourceUsage | None]:
+        """
+        Process the given file in the current process, with its output sent to the processor logs.
+
+        This is shared by the processes launched for a single file and the workers of
+        :class:`~airflow.dag_processing.processor_pool.DagFileProcessorPool`.
+
+        :return: the number of DAGs found and the count of import errors, and the resources used
+        """
+        # Change the thread name to differentiate log lines. This is
+        # really a separate process, but changing the name of the
+        # process doesn't work, so changing the thread name instead.
+        threading.current_thread().name = thread_name
+
+        def _handle_dag_file_processing() -> tuple[int, int]:
+            log.info("Started process (PID=%s) to work on %s", os.getpid(), file_path)
+            dag_file_processor = DagFileProcessor(dag_ids=dag_ids, dag_directory=dag_directory, log=log)
+            return dag_file_processor.process_file(
+                file_path=file_path,
+                pickle_dags=pickle_dags,
+                callback_requests=callback_requests,
+            )
+
+        DAG_PROCESSOR_LOG_TARGET = conf.get_mandatory_value("logging", "DAG_PROCESSOR_LOG_TARGET")
+        if DAG_PROCESSOR_LOG_TARGET == "stdout":
+            with Stats.timer() as timer, ResourceUsageRecorder() as recorder:
+                result = _handle_dag_file_processing()
+        else:
+            # The following line ensures that stdout goes to the same destination as the logs. If stdout
+            # gets sent to logs and logs are sent to stdout, this leads to an infinite loop. This
+            # necessitates this conditional based on the value of DAG_PROCESSOR_LOG_TARGET.
+            with redirect_stdout(StreamLogWriter(log, logging.INFO)), redirect_stderr(
+                StreamLogWriter(log, logging.WARNING)
+            ), Stats.timer() as timer, ResourceUsageRecorder() as recorder:
+                result = _handle_dag_file_processing()
+        log.info("Processing %s took %.3f seconds", file_path, timer.duration)
+        return result, recorder.usage
+
     def start(self) -> None:
         """Launch the process and start processing the DAG."""
         if conf.getboolean("scheduler", "parsing_pre_import_modules", fallback=True):
@@ -320,7 +351,7 @@ class DagFileProcessorProcess(LoggingMixin, MultiprocessingStartMethodMixin):
 
         if self._parent_channel.poll():
             try:
-                self._result = self._parent_channel.recv()
+                self._result, self._resource_usage = self._parent_channel.recv()
                 self._done = True
                 self.log.debug("Waiting for %s", self._process)
                 self._process.join()
@@ -354,6 +385,11 @@ class DagFileProcessorProcess(LoggingMixin, MultiprocessingStartMethodMixin):
             raise AirflowException("Tried to get the result before it's done!")
         return self._result
 
+    @property
+    def resource_usage(self) -> DagFileResourceUsage | None:
+        """Resources used to process the file, if it was processed successfully."""
+        return self._resource_usage
+
     @property
     def start_time(self) -> datetime:
         """Time when this started to process the file."""
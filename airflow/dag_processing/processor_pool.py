@@ -0,0 +1,402 @@
+#
+# Licensed to the Apache Software Foundation (ASF) under one
+# or more contributor license agreements.  See the NOTICE file
+# distributed with this work for additional information
+# regarding copyright ownership.  The ASF licenses this file
+# to you under the Apache License, Version 2.0 (the
+# "License"); you may not use this file except in compliance
+# with the License.  You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+# KIND, either express or implied.  See the License for the
+# specific language governing permissions and limitations
+# under the License.
+"""
+Parse DAG files in a pool of long-lived worker processes.
+
+The workers are forked from a ``forkserver`` process which imported Airflow, and the configured modules,
+once and for all. Each of them parses files one after the other until it has parsed
+``[scheduler] parsing_worker_max_files`` files, at which point it exits and is replaced by a new worker,
+so that the memory leaked or the modules imported by the DAG files do not accumulate forever. The modules
+imported from the DAGs or plugins folder are unloaded after each file though, so that a file parsed again
+imports their current version.
+
+A process forked from a process which started a ``forkserver`` process inherits the state of the
+``forkserver`` module, and cannot use the parent's ``forkserver`` process: the module tries to wait for it,
+which fails since it is not a child of the current process. The multiprocessing API has no way to reset
+that state, so :func:`_start_forkserver` resets the private attributes of ``multiprocessing.forkserver``.
+These are the same on all the Python versions supported by Airflow, and the pool is only used if they
+exist, see :meth:`DagFileProcessorPool.is_supported`; a test checks that they still do.
+"""
+
+from __future__ import annotations
+
+import logging
+import multiprocessing
+import os
+import signal
+import sys
+import time
+from contextlib import suppress
+from multiprocessing import forkserver
+from typing import TYPE_CHECKING, Any
+
+from setproctitle import setproctitle
+
+from airflow import settings
+from airflow.dag_processing.processor import DagFileProcessorProcess
+from airflow.exceptions import AirflowException
+from airflow.secrets.cache import SecretCache
+from airflow.utils import timezone
+from airflow.utils.log.logging_mixin import LoggingMixin, set_context
+
+if TYPE_CHECKING:
+    from multiprocessing.connection import Connection as MultiprocessingConnection
+    from multiprocessing.context import ForkServerContext
+
+    from airflow.callbacks.callback_requests import CallbackRequest
+
+# Modules always imported by the forkserver process, so that they are not imported again by each worker.
+FORKSERVER_PRELOAD_MODULES = ["airflow.dag_processing.processor"]
+
+# PID of the process which started the forkserver process, if started by a pool
+_forkserver_owner_pid: int | None = None
+
+# The private attributes of ``multiprocessing.forkserver.ForkServer`` reset by ``_start_forkserver``
+_FORKSERVER_STATE_ATTRIBUTES = ("_forkserver_pid", "_forkserver_alive_fd", "_forkserver_address")
+
+
+def _can_reset_forkserver() -> bool:
+    """Whether the state of the ``forkserver`` module has the attributes ``_start_forkserver`` resets."""
+    server = getattr(forkserver, "_forkserver", None)
+    return server is not None and all(hasattr(server, name) for name in _FORKSERVER_STATE_ATTRIBUTES)
+
+
+def _start_forkserver(preload_modules: list[str]) -> None:
+    """
+    Start the forkserver process of the current process, if it is not started yet.
+
+    A forkserver process started by a parent process is inherited on fork, but the processes it starts
+    cannot be waited for reliably, so the current process starts a forkserver process of its own instead.
+    """
+    global _forkserver_owner_pid
+
+    server = forkserver._forkserver  # type: ignore[attr-defined]
+    if server._forkserver_pid is not None and _forkserver_owner_pid != os.getpid():
+        # The parent process keeps its forkserver process alive.
+        os.close(server._forkserver_alive_fd)
+        server._forkserver_address = None
+        server._forkserver_alive_fd = None
+        server._forkserver_pid = None
+    # This only has effect if the forkserver process is not started yet.
+    forkserver.set_forkserver_preload(preload_modules)
+    forkserver.ensure_running()
+    _forkserver_owner_pid = os.getpid()
+
+
+def _unload_modules(loaded_module_names: set[str], folders: list[str]) -> None:
+    """
+    Remove from ``sys.modules`` the modules imported from ``folders`` which were not loaded before.
+
+    This lets the next file parsed by the worker import again the helper modules of the DAGs folder, which
+    may have changed since, rather than reuse the ones imported by a previous file.
+
+    :param loaded_module_names: the names of the modules loaded before the file was parsed
+    :param folders: the folders whose modules are removed
+    """
+    prefixes = tuple(os.path.join(os.path.realpath(folder), "") for folder in folders if folder)
+    for name in set(sys.modules).difference(loaded_module_names):
+        module_file = getattr(sys.modules[name], "__file__", None)
+        if module_file and os.path.realpath(module_file).startswith(prefixes):
+            del sys.modules[name]
+
+
+def _run_worker(
+    connection: MultiprocessingConnection,
+    max_files: int,
+    secret_cache: Any,
+    secret_cache_ttl: Any,
+) -> None:
+    """
+    Parse the files requested through ``connection`` until ``max_files`` of them were parsed.
+
+    :param connection: the connection to receive the parse requests from, and to send back the results
+    :param max_files: the number of files to parse before exiting, 0 meaning no limit
+    :param secret_cache: the cache of ``SecretCache`` shared with the DAG processor manager, if any
+    :param secret_cache_ttl: the time-to-live of the entries of ``secret_cache``
+    """
+    # This runs in the worker process, which was not forked from the DAG processor manager.
+    log: logging.Logger = logging.getLogger("airflow.processor")
+    setproctitle("airflow scheduler - DagFileProcessor worker")
+    if secret_cache is not None:
+        SecretCache._cache = secret_cache
+        SecretCache._ttl = secret_cache_ttl
+
+    settings.configure_orm()
+    files_processed = 0
+    try:
+        while not max_files or files_processed < max_files:
+            try:
+                request = connection.recv()
+            except EOFError:
+                # The pool was closed.
+                break
+            file_path = request["file_path"]
+            set_context(log, file_path)
+            setproctitle(f"airflow scheduler - DagFileProcessor {file_path}")
+            loaded_module_names = set(sys.modules)
+            try:
+                result = DagFileProcessorProcess._process_file_with_logging(log=log, **request)
+            except Exception:
+                # Log exceptions through the logging framework.
+                log.exception("Got an exception! Propagating...")
+                raise
+            finally:
+                _unload_modules(loaded_module_names, [request["dag_directory"], settings.PLUGINS_FOLDER])
+            connection.send(result)
+            files_processed += 1
+    finally:
+        settings.dispose_orm()
+        connection.close()
+
+
+class DagFileProcessorWorker(LoggingMixin):
+    """
+    A long-lived worker process of :class:`DagFileProcessorPool`.
+
+    :param context: the multiprocessing context to start the worker process with
+    :param max_files: the number of files to parse before the worker exits, 0 meaning no limit
+    """
+
+    def __init__(self, context: ForkServerContext, max_files: int):
+        super().__init__()
+        self.max_files = max_files
+        self.files_processed = 0
+
+        parent_connection, child_connection = context.Pipe()
+        cache_enabled = SecretCache._cache is not None
+        self.process = context.Process(
+            target=_run_worker,
+            args=(
+                child_connection,
+                max_files,
+                SecretCache._cache,
+                SecretCache._ttl if cache_enabled else None,
+            ),
+            name="DagFileProcessorWorker",
+        )
+        self.process.start()
+        # Close the child side of the pipe, so that reading from the parent side fails if the worker dies.
+        child_connection.close()
+        self.connection = parent_connection
+
+    @property
+    def can_process_more_files(self) -> bool:
+        """Whether the worker is alive and has not parsed as many files as it is allowed to."""
+        if self.max_files and self.files_processed >= self.max_files:
+            return False
+        return not self.connection.closed and self.process.is_alive()
+
+    def process_file(self, **request) -> None:
+        """Request the worker to parse a file, the result being sent back through ``connection``."""
+        self.connection.send(request)
+        self.files_processed += 1
+
+    def stop(self) -> None:
+        """Let the worker exit once it is done with its current file, and kill it if it does not."""
+        self.connection.close()
+        # Arbitrary timeout -- the worker exits right away unless it is parsing a file.
+        self.process.join(timeout=5)
+        if self.process.is_alive():
+            self.kill()
+
+    def terminate(self, sigkill: bool = False) -> None:
+        """
+        Terminate (and then kill) the worker.
+
+        :param sigkill: whether to issue a SIGKILL if SIGTERM doesn't work.
+        """
+        self.process.terminate()
+        # Arbitrarily wait 5s for the process to die
+        self.process.join(timeout=5)
+        if sigkill:
+            self.kill()
+        self.connection.close()
+
+    def kill(self) -> None:
+        """Kill the worker, and reap it."""
+        if self.process.is_alive() and self.process.pid:
+            self.log.warning("Killing DagFileProcessorWorker (PID=%d)", self.process.pid)
+            with suppress(ProcessLookupError):
+                os.kill(self.process.pid, signal.SIGKILL)
+            while self.process.exitcode is None:
+                time.sleep(0.001)
+        self.connection.close()
+
+
+class DagFileProcessorPool(LoggingMixin):
+    """
+    Pool of long-lived worker processes parsing DAG files, forked from a ``forkserver`` process.
+
+    :param max_files_per_worker: the number of files a worker parses before it is replaced by a new one,
+        0 meaning no limit
+    :param preload_modules: additional modules imported by the ``forkserver`` process
+    """
+
+    def __init__(self, max_files_per_worker: int, preload_modules: list[str] | None = None):
+        super().__init__()
+        self._max_files_per_worker = max_files_per_worker
+        self._context = multiprocessing.get_context("forkserver")
+        _start_forkserver([*FORKSERVER_PRELOAD_MODULES, *(preload_modules or [])])
+        self._idle_workers: list[DagFileProcessorWorker] = []
+
+    @staticmethod
+    def is_supported() -> bool:
+        """Whether workers can be forked from a ``forkserver`` process on this platform and Python version."""
+        return "forkserver" in multiprocessing.get_all_start_methods() and _can_reset_forkserver()
+
+    def acquire(self) -> DagFileProcessorWorker:
+        """Get an idle worker, starting a new one if there is none."""
+        while self._idle_workers:
+            worker = self._idle_workers.pop()
+            if worker.can_process_more_files:
+                return worker
+            worker.stop()
+        return DagFileProcessorWorker(self._context, self._max_files_per_worker)
+
+    def release(self, worker: DagFileProcessorWorker) -> None:
+        """Give back a worker which is done parsing its file, stopping it if it is not to be reused."""
+        if worker.can_process_more_files:
+            self._idle_workers.append(worker)
+        else:
+            worker.stop()
+
+    def close(self) -> None:
+        """Stop the idle workers. Busy workers are stopped by their processors."""
+        while self._idle_workers:
+            self._idle_workers.pop().stop()
+
+
+class PooledDagFileProcessorProcess(DagFileProcessorProcess):
+    """
+    Runs DAG processing in a worker of a :class:`DagFileProcessorPool`.
+
+    :param pool: the pool to get the worker from
+    :param file_path: a Python file containing Airflow DAG definitions
+    :param pickle_dags: whether to serialize the DAG objects to the DB
+    :param dag_ids: If specified, only look at these DAG ID's
+    :param callback_requests: failure callback to execute
+    """
+
+    def __init__(
+        self,
+        pool: DagFileProcessorPool,
+        file_path: str,
+        pickle_dags: bool,
+        dag_ids: list[str] | None,
+        dag_directory: str,
+        callback_requests: list[CallbackRequest],
+    ):
+        super().__init__(
+            file_path=file_path,
+            pickle_dags=pickle_dags,
+            dag_ids=dag_ids,
+            dag_directory=dag_directory,
+            callback_requests=callback_requests,
+        )
+        self._pool = pool
+        self._worker: DagFileProcessorWorker | None = None
+
+    def start(self) -> None:
+        """Send the file to a worker of the pool."""
+        self._worker = self._pool.acquire()
+        self._start_time = timezone.utcnow()
+        self._worker.process_file(
+            file_path=self.file_path,
+            pickle_dags=self._pickle_dags,
+            dag_ids=self._dag_ids,
+            thread_name=f"DagFileProcessor{self._instance_id}",
+            dag_directory=self._dag_directory,
+            callback_requests=self._callback_requests,
+        )
+
+    def kill(self) -> None:
+        """Kill the worker processing the file, and ensure consistent state."""
+        if self._worker is None:
+            raise AirflowException("Tried to kill before starting!")
+        self._worker.kill()
+
+    def terminate(self, sigkill: bool = False) -> None:
+        """
+        Terminate (and then kill) the worker processing the file.
+
+        :param sigkill: whether to issue a SIGKILL if SIGTERM doesn't work.
+        """
+        if self._worker is None:
+            raise AirflowException("Tried to call terminate before starting!")
+        self._worker.terminate(sigkill=sigkill)
+
+    @property
+    def pid(self) -> int:
+        """PID of the worker processing the given file."""
+        if self._worker is None or self._worker.process.pid is None:
+            raise AirflowException("Tried to get PID before starting!")
+        return self._worker.process.pid
+
+    @property
+    def exit_code(self) -> int | None:
+        """
+        After the file is processed, this can be called to get the return code of the worker.
+
+        :return: the exit code of the worker, None if it is still alive
+        """
+        if self._worker is None:
+            raise AirflowException("Tried to get exit code before starting!")
+        if not self._done:
+            raise AirflowException("Tried to call retcode before process was finished!")
+        return self._worker.process.exitcode
+
+    @property
+    def done(self) -> bool:
+        """
+        Check if the worker is done processing the file.
+
+        :return: whether the file is processed
+        """
+        if self._worker is None:
+            raise AirflowException("Tried to see if it's done before starting!")
+
+        if self._done:
+            return True
+
+        if self._worker.connection.closed:
+            # The worker was killed or terminated.
+            self._done = True
+            return True
+
+        if self._worker.connection.poll():
+            try:
+                self._result, self._resource_usage = self._worker.connection.recv()
+            except EOFError:
+                # The worker failed to process the file, and exited.
+                self._done = True
+                self._worker.stop()
+                return True
+            self._done = True
+            self._pool.release(self._worker)
+            return True
+
+        if not self._worker.process.is_alive():
+            self._done = True
+            self._worker.stop()
+            return True
+
+        return False
+
+    @property
+    def waitable_handle(self):
+        return self._worker.connection if self._worker is not None else None
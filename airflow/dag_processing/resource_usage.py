@@ -0,0 +1,94 @@
+#
+# Licensed to the Apache Software Foundation (ASF) under one
+# or more contributor license agreements.  See the NOTICE file
+# distributed with this work for additional information
+# regarding copyright ownership.  The ASF licenses this file
+# to you under the Apache License, Version 2.0 (the
+# "License"); you may not use this file except in compliance
+# with the License.  You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+# KIND, either express or implied.  See the License for the
+# specific language governing permissions and limitations
+# under the License.
+"""Accounting of the resources used to process DAG files."""
+
+from __future__ import annotations
+
+import sys
+import time
+from typing import NamedTuple
+
+from sqlalchemy import event
+
+from airflow import settings
+
+try:
+    import resource
+except ImportError:  # Not available on Windows
+    resource = None  # type: ignore[assignment]
+
+
+class DagFileResourceUsage(NamedTuple):
+    """
+    Resources used to process a DAG file.
+
+    :param cpu_time: the CPU time spent, in user and system mode, in seconds
+    :param peak_memory: the peak resident memory of the process, in bytes, None if unknown. The workers of
+        a :class:`~airflow.dag_processing.processor_pool.DagFileProcessorPool` report their peak since
+        they started.
+    :param num_imported_modules: the number of modules imported, None if unknown
+    :param num_db_queries: the number of queries run on the metadata database, None if unknown
+    """
+
+    cpu_time: float
+    peak_memory: int | None = None
+    num_imported_modules: int | None = None
+    num_db_queries: int | None = None
+
+
+def _get_peak_memory() -> int | None:
+    if resource is None:
+        return None
+    peak_memory = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # macOS reports bytes, other platforms kilobytes.
+    return peak_memory if sys.platform == "darwin" else peak_memory * 1024
+
+
+class ResourceUsageRecorder:
+    """Record the resources used by the current process in a ``with`` block, in ``usage`` on exit."""
+
+    def __init__(self):
+        self.usage: DagFileResourceUsage | None = None
+        self._num_db_queries = 0
+        self._engine = None
+        self._start_cpu_time = 0.0
+        self._start_num_modules = 0
+
+    def _count_db_query(self, *args, **kwargs) -> None:
+        self._num_db_queries += 1
+
+    def __enter__(self) -> ResourceUsageRecorder:
+        """Start recording."""
+        # There is no engine when the metadata database is accessed through the internal API.
+        self._engine = settings.engine
+        if self._engine is not None:
+            event.listen(self._engine, "after_cursor_execute", self._count_db_query)
+        self._start_cpu_time = time.process_time()
+        self._start_num_modules = len(sys.modules)
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        """Stop recording, and compute the resources used."""
+        if self._engine is not None:
+            event.remove(self._engine, "after_cursor_execute", self._count_db_query)
+        self.usage = DagFileResourceUsage(
+            cpu_time=time.process_time() - self._start_cpu_time,
+            peak_memory=_get_peak_memory(),
+            num_imported_modules=max(len(sys.modules) - self._start_num_modules, 0),
+            num_db_queries=self._num_db_queries if self._engine is not None else None,
+        )
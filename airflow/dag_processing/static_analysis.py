@@ -0,0 +1,328 @@
+#
+# Licensed to the Apache Software Foundation (ASF) under one
+# or more contributor license agreements.  See the NOTICE file
+# distributed with this work for additional information
+# regarding copyright ownership.  The ASF licenses this file
+# to you under the Apache License, Version 2.0 (the
+# "License"); you may not use this file except in compliance
+# with the License.  You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+# KIND, either express or implied.  See the License for the
+# specific language governing permissions and limitations
+# under the License.
+"""Static analysis of DAG files, to find the DAGs they define without executing them."""
+
+from __future__ import annotations
+
+import ast
+import os
+import zipfile
+from typing import Iterable, NamedTuple
+
+from airflow.dag_processing.file_fingerprints import _resolve_module_files
+from airflow.utils.log.logging_mixin import LoggingMixin
+
+# Calls which may define names, or import modules, that the analysis cannot see.
+_DYNAMIC_CALLS = frozenset(
+    {"__import__", "eval", "exec", "globals", "import_module", "locals", "setattr", "vars"}
+)
+
+# Nodes whose children may run any number of times, including never.
+_REPEATED_OR_CONDITIONAL_NODES = (
+    ast.If,
+    ast.IfExp,
+    ast.For,
+    ast.AsyncFor,
+    ast.While,
+    ast.BoolOp,
+    ast.ListComp,
+    ast.SetComp,
+    ast.DictComp,
+    ast.GeneratorExp,
+    ast.ExceptHandler,
+    *([ast.Match] if hasattr(ast, "Match") else []),  # Python 3.10+
+)
+
+_TRY_NODES = (ast.Try, *([ast.TryStar] if hasattr(ast, "TryStar") else []))  # Python 3.11+
+
+
+class StaticDagFileInfo(NamedTuple):
+    """
+    What the static analysis of a DAG file found.
+
+    :param dag_ids: the ids of the DAGs defined by the file
+    :param dependencies: the files of the modules imported by the file from the search paths
+    :param is_static: whether all the DAGs of the file were found. If not, the file defines DAGs
+        dynamically, for instance in a loop or in a function of another module, and has to be
+        executed to find them.
+    """
+
+    dag_ids: frozenset[str]
+    dependencies: frozenset[str]
+    is_static: bool
+
+
+def _get_name(node: ast.expr) -> str | None:
+    """Return the name of a name or attribute expression, e.g. ``DAG`` for ``models.DAG``."""
+    if isinstance(node, ast.Name):
+        return node.id
+    if isinstance(node, ast.Attribute):
+        return node.attr
+    return None
+
+
+def _get_root_name(node: ast.expr) -> str | None:
+    """Return the variable an expression starts from, e.g. ``task`` for ``task.virtualenv(...)``."""
+    while isinstance(node, (ast.Attribute, ast.Call, ast.Subscript)):
+        node = node.func if isinstance(node, ast.Call) else node.value
+    return node.id if isinstance(node, ast.Name) else None
+
+
+def _get_argument(call: ast.Call, position: int, name: str) -> ast.expr | None:
+    """Return the argument of a call given at a position, or as a keyword."""
+    if len(call.args) > position and not any(isinstance(arg, ast.Starred) for arg in call.args):
+        return call.args[position]
+    for keyword in call.keywords:
+        if keyword.arg == name:
+            return keyword.value
+    return None
+
+
+def _is_main_check(node: ast.expr) -> bool:
+    """Whether a condition is ``__name__ == "__main__"``, which is false when the file is parsed."""
+    return (
+        isinstance(node, ast.Compare)
+        and isinstance(node.left, ast.Name)
+        and node.left.id == "__name__"
+        and len(node.comparators) == 1
+        and isinstance(node.comparators[0], ast.Constant)
+        and node.comparators[0].value == "__main__"
+    )
+
+
+class _ModuleAnalysis:
+    """
+    Find the DAGs defined by the code of a module, run when the module is imported.
+
+    DAGs are found when they are created once, with a literal id, by the ``DAG`` constructor or by
+    calling a function decorated with ``@dag``. Otherwise, or if the module calls functions which may
+    create DAGs, such as its own functions and classes, the module is not static. So does calling a
+    function imported from outside of Airflow, unless its result is only passed to another call, e.g.
+    ``pendulum.datetime(...)`` given as the start date of a DAG, rather than kept by the module.
+
+    :param airflow_names: the names imported from Airflow, mapped to the names they were imported as
+        from Airflow, e.g. ``DAG`` for ``from airflow.models.dag import DAG as AirflowDAG``
+    :param imported_names: the other names imported
+    """
+
+    def __init__(self, module: ast.Module, airflow_names: dict[str, str], imported_names: set[str]):
+        self.dag_ids: set[str] = set()
+        self.is_static = True
+        self._airflow_names = airflow_names
+        self._imported_names = imported_names
+        self._dag_functions: dict[str, ast.FunctionDef | ast.AsyncFunctionDef] = {}
+        self._dag_function_decorators: dict[str, ast.expr] = {}
+        self._local_callables: set[str] = set()
+        self._visited_dag_functions: set[str] = set()
+        # Calls whose result is kept by the module, or used as a context manager
+        self._statement_calls: set[ast.Call] = set()
+
+        for node in ast.walk(module):
+            if isinstance(node, ast.ClassDef):
+                self._local_callables.add(node.name)
+            elif isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+                airflow_decorators = [
+                    decorator
+                    for decorator in node.decorator_list
+                    if _get_root_name(decorator) in airflow_names
+                ]
+                for decorator in airflow_decorators:
+                    if (
+                        self._get_airflow_name(
+                            decorator.func if isinstance(decorator, ast.Call) else decorator
+                        )
+                        == "dag"
+                    ):
+                        self._dag_functions[node.name] = node
+                        self._dag_function_decorators[node.name] = decorator
+                # Functions decorated by Airflow, e.g. with ``@task``, create tasks when called.
+                if not airflow_decorators:
+                    self._local_callables.add(node.name)
+
+        for statement in module.body:
+            self._visit(statement, runs_once=True)
+
+    def _get_airflow_name(self, node: ast.expr) -> str | None:
+        """Return the Airflow name an expression refers to, e.g. ``DAG`` for ``AirflowDAG`` or ``models.DAG``."""
+        if isinstance(node, ast.Name):
+            return self._airflow_names.get(node.id)
+        if isinstance(node, ast.Attribute) and _get_root_name(node) in self._airflow_names:
+            return node.attr
+        return None
+
+    def _visit(self, node: ast.AST, runs_once: bool) -> None:
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.Lambda)):
+            # The body of a function only runs when it is called.
+            for child in getattr(node, "decorator_list", []):
+                self._visit(child, runs_once)
+            self._visit(node.args, runs_once)
+            return
+        if isinstance(node, ast.If) and _is_main_check(node.test):
+            for child in node.orelse:
+                self._visit(child, runs_once)
+            return
+        if isinstance(node, (ast.Expr, ast.Assign, ast.AnnAssign, ast.AugAssign)):
+            if isinstance(node.value, ast.Call):
+                self._statement_calls.add(node.value)
+        elif isinstance(node, (ast.With, ast.AsyncWith)):
+            self._statement_calls.update(
+                item.context_expr for item in node.items if isinstance(item.context_expr, ast.Call)
+            )
+        elif isinstance(node, ast.Call):
+            self._visit_call(node, runs_once)
+        if isinstance(node, _TRY_NODES):
+            # The body of a try statement is expected to run, unlike its handlers.
+            for child in node.body:
+                self._visit(child, runs_once)
+            for child in (*node.handlers, *node.orelse, *node.finalbody):
+                self._visit(child, runs_once=False)
+            return
+        children_run_once = runs_once and not isinstance(node, _REPEATED_OR_CONDITIONAL_NODES)
+        for child in ast.iter_child_nodes(node):
+            self._visit(child, children_run_once)
+
+    def _visit_call(self, node: ast.Call, runs_once: bool) -> None:
+        func = node.func
+        if self._get_airflow_name(func) == "DAG":
+            self._add_dag(_get_argument(node, 0, "dag_id"), runs_once)
+        elif isinstance(func, ast.Name) and func.id in self._dag_functions:
+            decorator = self._dag_function_decorators[func.id]
+            dag_decorator_call = decorator if isinstance(decorator, ast.Call) else None
+            dag_id = _get_argument(dag_decorator_call, 0, "dag_id") if dag_decorator_call else None
+            if dag_id is None or (isinstance(dag_id, ast.Constant) and not dag_id.value):
+                # DAGs are named after their function by default.
+                dag_id = ast.Constant(func.id)
+            self._add_dag(dag_id, runs_once)
+            if func.id not in self._visited_dag_functions:
+                self._visited_dag_functions.add(func.id)
+                for statement in self._dag_functions[func.id].body:
+                    self._visit(statement, runs_once)
+        elif (
+            (isinstance(func, ast.Name) and func.id in self._local_callables)
+            or (_get_root_name(func) in self._imported_names and node in self._statement_calls)
+            or _get_name(func) in _DYNAMIC_CALLS
+        ):
+            self.is_static = False
+
+    def _add_dag(self, dag_id: ast.expr | None, runs_once: bool) -> None:
+        if not runs_once or not (isinstance(dag_id, ast.Constant) and isinstance(dag_id.value, str)):
+            self.is_static = False
+            return
+        self.dag_ids.add(dag_id.value)
+
+
+class StaticDagFileAnalyzer(LoggingMixin):
+    """
+    Find the DAGs defined by DAG files, and the local modules they import, without executing them.
+
+    The analysis of a file is cached as long as the file is not modified. A file importing local
+    modules is only static if the modules are themselves static, and do not define DAGs.
+
+    :param search_paths: the directories the local modules imported by the DAG files are looked for in
+    """
+
+    def __init__(self, search_paths: Iterable[str]):
+        super().__init__()
+        self._search_paths = [path for path in dict.fromkeys(search_paths) if os.path.isdir(path)]
+        # Map from file path to its modification time and size, and to the analysis of its own code
+        self._cache: dict[str, tuple[tuple[int, int], StaticDagFileInfo | None]] = {}
+
+    def analyze(self, file_path: str) -> StaticDagFileInfo | None:
+        """
+        Analyze a DAG file.
+
+        :param file_path: the path of the DAG file
+        :return: the analysis of the file, or None if it cannot be analyzed, e.g. if it is a zip file
+            or has a syntax error
+        """
+        return self._analyze(file_path, visiting=set())
+
+    def _analyze(self, file_path: str, visiting: set[str]) -> StaticDagFileInfo | None:
+        info = self._analyze_module(file_path)
+        if info is None or not info.is_static:
+            return info
+        visiting.add(file_path)
+        for dependency in info.dependencies:
+            if dependency in visiting:
+                continue
+            dependency_info = self._analyze(dependency, visiting)
+            if dependency_info is None or not dependency_info.is_static or dependency_info.dag_ids:
+                return info._replace(is_static=False)
+        return info
+
+    def _analyze_module(self, file_path: str) -> StaticDagFileInfo | None:
+        """Analyze the code of a file, regardless of the modules it imports."""
+        try:
+            stat = os.stat(file_path)
+        except OSError:
+            self._cache.pop(file_path, None)
+            return None
+        signature = (stat.st_mtime_ns, stat.st_size)
+        if (cached := self._cache.get(file_path)) is not None and cached[0] == signature:
+            return cached[1]
+
+        info = None
+        try:
+            if not zipfile.is_zipfile(file_path):
+                with open(file_path, encoding="utf-8") as f:
+                    info = self._analyze_source(file_path, f.read())
+        except (OSError, SyntaxError, ValueError, RecursionError) as e:
+            self.log.debug("Cannot analyze %s: %s", file_path, e)
+        self._cache[file_path] = (signature, info)
+        return info
+
+    def _analyze_source(self, file_path: str, source: str) -> StaticDagFileInfo:
+        module = ast.parse(source)
+        airflow_names: dict[str, str] = {}
+        imported_names: set[str] = set()
+        dependencies: set[str] = set()
+        is_static = True
+        for node in ast.walk(module):
+            if isinstance(node, ast.Import):
+                for alias in node.names:
+                    bound_name = alias.asname or alias.name.partition(".")[0]
+                    if alias.name.partition(".")[0] == "airflow":
+                        # Modules are mapped to their full name, which is never the name of a DAG factory.
+                        airflow_names[bound_name] = alias.name if alias.asname else "airflow"
+                        continue
+                    imported_names.add(bound_name)
+                    dependencies.update(_resolve_module_files(alias.name, 0, file_path, self._search_paths))
+            elif isinstance(node, ast.ImportFrom):
+                module_name = node.module or ""
+                if any(alias.name == "*" for alias in node.names):
+                    # The names imported are unknown.
+                    is_static = False
+                if not node.level and module_name.partition(".")[0] == "airflow":
+                    airflow_names.update((alias.asname or alias.name, alias.name) for alias in node.names)
+                    continue
+                imported_names.update(alias.asname or alias.name for alias in node.names)
+                files = {
+                    file
+                    for name in [module_name, *(f"{module_name}.{alias.name}" for alias in node.names)]
+                    for file in _resolve_module_files(
+                        name.strip("."), node.level, file_path, self._search_paths
+                    )
+                }
+                dependencies.update(files)
+
+        analysis = _ModuleAnalysis(module, airflow_names, imported_names)
+        return StaticDagFileInfo(
+            dag_ids=frozenset(analysis.dag_ids),
+            dependencies=frozenset(dependencies - {file_path}),
+            is_static=is_static and analysis.is_static,
+        )
@@ -28,6 +28,7 @@ from airflow.listeners.listener import get_listener_manager
 from airflow.models.dataset import DatasetDagRunQueue, DatasetEvent, DatasetModel
 from airflow.stats import Stats
 from airflow.utils.log.logging_mixin import LoggingMixin
+from airflow.utils.scheduler_wakeup import notify_scheduler
 
 if TYPE_CHECKING:
     from sqlalchemy.orm.session import Session
@@ -101,6 +102,7 @@ class DatasetManager(LoggingMixin):
         Stats.incr("dataset.updates")
         if dataset_model.consuming_dags:
             self._queue_dagruns(dataset_model, session)
+            notify_scheduler(session=session)
         session.flush()
         return dataset_event
 
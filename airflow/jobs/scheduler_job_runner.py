@@ -25,14 +25,16 @@ import sys
 import time
 import warnings
 from collections import Counter
+from contextlib import nullcontext
 from dataclasses import dataclass
 from datetime import timedelta
 from functools import lru_cache, partial
 from pathlib import Path
-from typing import TYPE_CHECKING, Any, Callable, Collection, Iterable, Iterator
+from tempfile import gettempdir
+from typing import TYPE_CHECKING, Any, Callable, Collection, ContextManager, Iterable, Iterator, NamedTuple
 
-from sqlalchemy import and_, delete, func, not_, or_, select, text, update
-from sqlalchemy.exc import OperationalError
+from sqlalchemy import and_, case, delete, func, not_, or_, select, text, tuple_, update
+from sqlalchemy.exc import IntegrityError, OperationalError
 from sqlalchemy.orm import lazyload, load_only, make_transient, selectinload
 from sqlalchemy.sql import expression
 
@@ -46,7 +48,7 @@ from airflow.jobs.base_job_runner import BaseJobRunner
 from airflow.jobs.job import Job, perform_heartbeat
 from airflow.models.dag import DAG, DagModel
 from airflow.models.dagbag import DagBag
-from airflow.models.dagrun import DagRun
+from airflow.models.dagrun import DagRun, TIDependencyCheckRecord
 from airflow.models.dataset import (
     DagScheduleDatasetReference,
     DatasetDagRunQueue,
@@ -63,7 +65,9 @@ from airflow.utils import timezone
 from airflow.utils.event_scheduler import EventScheduler
 from airflow.utils.log.logging_mixin import LoggingMixin
 from airflow.utils.log.task_context_logger import TaskContextLogger
+from airflow.utils.loop_profiler import LoopPhaseProfiler, dump_sampled_stacks_in_background
 from airflow.utils.retries import MAX_DB_RETRIES, retry_db_transaction, run_with_db_retries
+from airflow.utils.scheduler_wakeup import SchedulerWakeupListener
 from airflow.utils.session import NEW_SESSION, create_session, provide_session
 from airflow.utils.sqlalchemy import (
     is_lock_not_available_error,
@@ -79,11 +83,12 @@ if TYPE_CHECKING:
     from datetime import datetime
     from types import FrameType
 
-    from sqlalchemy.engine import Result
     from sqlalchemy.orm import Query, Session
 
     from airflow.dag_processing.manager import DagFileProcessorAgent
+    from airflow.models.pool import PoolStats
     from airflow.models.taskinstance import TaskInstanceKey
+    from airflow.timetables.base import DataInterval
     from airflow.utils.sqlalchemy import (
         CommitProhibitorGuard,
     )
@@ -116,6 +121,219 @@ class ConcurrencyMap:
         return instance
 
 
+@dataclass
+class SlotAccounting:
+    """
+    Dataclass to represent the slots used by the task instances, as seen from the critical section.
+
+    It contains the stats of every pool and the concurrency map of the task instances in
+    ``EXECUTION_STATES``. Both are computed from a single aggregate query over the task instances,
+    then kept up to date in memory as task instances are queued.
+    """
+
+    pools: dict[str, PoolStats]
+    concurrency_map: ConcurrencyMap
+
+    @classmethod
+    def from_db(cls, *, lock_rows: bool, session: Session) -> SlotAccounting:
+        """
+        Get the pool stats and the concurrency map, locking the pool rows if ``lock_rows`` is set.
+
+        :param lock_rows: Whether to lock the pool rows, see ``Pool.slots_stats``
+        :param session: SQLAlchemy ORM Session
+        """
+        from airflow.models.pool import Pool
+
+        concurrency_mapping: dict[tuple[str, str, str], int] = Counter()
+
+        def get_state_counts() -> Iterable[tuple[str, TaskInstanceState, int]]:
+            # Only queried once the pool rows are locked, so that task instances queued by another
+            # scheduler in the meantime are accounted for.
+            slots_by_pool_state: dict[tuple[str, TaskInstanceState], int] = Counter()
+            rows = session.execute(
+                select(
+                    TI.dag_id,
+                    TI.run_id,
+                    TI.task_id,
+                    TI.pool,
+                    TI.state,
+                    func.count("*"),
+                    func.sum(TI.pool_slots),
+                )
+                .where(TI.state.in_(EXECUTION_STATES | {TaskInstanceState.DEFERRED}))
+                .group_by(TI.dag_id, TI.run_id, TI.task_id, TI.pool, TI.state)
+            )
+            for dag_id, run_id, task_id, pool, state, count, slots in rows:
+                if state in EXECUTION_STATES:
+                    concurrency_mapping[(dag_id, run_id, task_id)] += count
+                # Some databases return decimal.Decimal here.
+                slots_by_pool_state[(pool, state)] += int(slots)
+            return [(pool, state, slots) for (pool, state), slots in slots_by_pool_state.items()]
+
+        pools = Pool.slots_stats(lock_rows=lock_rows, get_state_counts=get_state_counts, session=session)
+        return cls(pools, ConcurrencyMap.from_concurrency_map(concurrency_mapping))
+
+    def record_queued(self, ti: TaskInstance) -> None:
+        """Account for the slots used by a task instance about to be queued."""
+        self.pools[ti.pool]["open"] -= ti.pool_slots
+        self.concurrency_map.dag_active_tasks_map[ti.dag_id] += 1
+        self.concurrency_map.task_concurrency_map[(ti.dag_id, ti.task_id)] += 1
+        self.concurrency_map.task_dagrun_concurrency_map[(ti.dag_id, ti.run_id, ti.task_id)] += 1
+
+
+class DagRunStateVersion(NamedTuple):
+    """
+    Version marker of the task instances of a DAG run, as seen by the scheduler.
+
+    Any change to the task instances of a run (state change, new or removed task
+    instances) bumps ``max_updated_at`` or ``ti_count``, so two equal versions mean
+    nothing the scheduler cares about changed in between.
+    """
+
+    dag_hash: str | None
+    ti_count: int
+    max_updated_at: datetime | None
+    num_time_dependent: int
+
+
+class ExaminedDagRuns:
+    """
+    The DAG runs examined by the scheduler since the records it keeps about them were last pruned.
+
+    The scheduler examines the active DAG runs in rotating batches. Every ``PRUNE_INTERVAL`` loops,
+    the records kept about the runs which were not examined since the last pruning are dropped, so
+    that the runs finished or deleted by another scheduler or through the API are not kept forever.
+    """
+
+    PRUNE_INTERVAL = 100
+
+    def __init__(self) -> None:
+        self._keys: set[tuple[str, str]] = set()
+        self._num_loops = 0
+
+    def add(self, keys: Iterable[tuple[str, str]]) -> set[tuple[str, str]] | None:
+        """
+        Record the DAG runs examined in a scheduler loop.
+
+        :param keys: the DAG id and run id of the runs
+        :return: the runs examined since the last pruning if the records are to be pruned to them now,
+            None otherwise
+        """
+        self._keys.update(keys)
+        self._num_loops += 1
+        if self._num_loops < self.PRUNE_INTERVAL:
+            return None
+        examined_keys = self._keys
+        self.clear()
+        return examined_keys
+
+    def clear(self) -> None:
+        self._keys = set()
+        self._num_loops = 0
+
+
+class DagRunSchedulingStateCache:
+    """
+    In-process cache of the last scheduling decision made for each active DAG run.
+
+    For every DAG run the scheduler examines, the version of its task instances is
+    fetched in one aggregate query. If it matches the version recorded the last time
+    the scheduler made a decision for that run, and no executor event was received for
+    it since, then ``DagRun.update_state`` would come to the same conclusion and can be
+    skipped.
+
+    Runs having task instances whose readiness depends on the wall clock (up for retry
+    or reschedule) or tasks depending on other runs (``depends_on_past`` and
+    ``wait_for_downstream``) are never skipped.
+
+    The decisions recorded for the runs which are no longer examined are pruned every
+    ``ExaminedDagRuns.PRUNE_INTERVAL`` refreshes.
+    """
+
+    TIME_DEPENDENT_STATES = (TaskInstanceState.UP_FOR_RETRY, TaskInstanceState.UP_FOR_RESCHEDULE)
+
+    def __init__(self) -> None:
+        self._examined: dict[tuple[str, str], DagRunStateVersion] = {}
+        self._current: dict[tuple[str, str], DagRunStateVersion] = {}
+        self._dags_with_cross_run_deps: dict[tuple[str, str | None], bool] = {}
+        self._refreshed_runs = ExaminedDagRuns()
+
+    def __len__(self) -> int:
+        """Get the number of DAG runs a scheduling decision is recorded for."""
+        return len(self._examined)
+
+    def refresh(self, dag_runs: Collection[DagRun], session: Session) -> None:
+        """Fetch the current version of the given DAG runs with a single query."""
+        self._current = {}
+        dag_hashes = {(dr.dag_id, dr.run_id): dr.dag_hash for dr in dag_runs}
+        keys_to_keep = self._refreshed_runs.add(dag_hashes)
+        if keys_to_keep is not None:
+            self.prune(keys_to_keep)
+        if not dag_runs:
+            return
+        query = (
+            select(
+                TI.dag_id,
+                TI.run_id,
+                func.count(),
+                func.max(TI.updated_at),
+                func.count(case((TI.state.in_(self.TIME_DEPENDENT_STATES), 1))),
+            )
+            .where(tuple_in_condition((TI.dag_id, TI.run_id), dag_hashes))
+            .group_by(TI.dag_id, TI.run_id)
+        )
+        for dag_id, run_id, ti_count, max_updated_at, num_time_dependent in session.execute(query):
+            self._current[(dag_id, run_id)] = DagRunStateVersion(
+                dag_hash=dag_hashes[(dag_id, run_id)],
+                ti_count=ti_count,
+                max_updated_at=max_updated_at,
+                num_time_dependent=num_time_dependent,
+            )
+
+    def _has_cross_run_deps(self, dag: DAG, dag_hash: str | None) -> bool:
+        key = (dag.dag_id, dag_hash)
+        if key not in self._dags_with_cross_run_deps:
+            self._dags_with_cross_run_deps[key] = any(
+                task.depends_on_past or task.wait_for_downstream for task in dag.tasks
+            )
+        return self._dags_with_cross_run_deps[key]
+
+    def is_unchanged(self, dag_run: DagRun, dag: DAG) -> bool:
+        """Whether the run is known to be in the same state as when it was last examined."""
+        key = (dag_run.dag_id, dag_run.run_id)
+        current = self._current.get(key)
+        if current is None or current.num_time_dependent or current.dag_hash != dag_run.dag_hash:
+            return False
+        if self._has_cross_run_deps(dag, dag_run.dag_hash):
+            return False
+        return self._examined.get(key) == current
+
+    def record(self, dag_run: DagRun) -> None:
+        """Record that a scheduling decision was made for the run at its current version."""
+        key = (dag_run.dag_id, dag_run.run_id)
+        current = self._current.get(key)
+        if current is None or dag_run.state != DagRunState.RUNNING:
+            self._examined.pop(key, None)
+        else:
+            # The DAG hash may have been refreshed while verifying the integrity of the run.
+            self._examined[key] = current._replace(dag_hash=dag_run.dag_hash)
+
+    def invalidate(self, dag_id: str, run_id: str) -> None:
+        """Force the next examination of the given run to re-evaluate its task instances."""
+        self._examined.pop((dag_id, run_id), None)
+
+    def prune(self, keys: Collection[tuple[str, str]]) -> None:
+        """Drop the decisions recorded for the runs other than the given ones."""
+        self._examined = {key: version for key, version in self._examined.items() if key in keys}
+        self._dags_with_cross_run_deps.clear()
+
+    def clear(self) -> None:
+        self._examined.clear()
+        self._current.clear()
+        self._dags_with_cross_run_deps.clear()
+        self._refreshed_runs.clear()
+
+
 def _is_parent_process() -> bool:
     """
     Whether this is a parent process.
@@ -232,6 +450,26 @@ class SchedulerJobRunner(BaseJobRunner, LoggingMixin):
         self.processor_agent: DagFileProcessorAgent | None = None
 
         self.dagbag = DagBag(dag_folder=self.subdir, read_dags_from_db=True, load_op_links=False)
+        self._use_partitioned_scheduling = conf.getboolean(
+            "scheduler", "use_partitioned_scheduling", fallback=False
+        )
+        # Half-open range of DagModel.partition_key this scheduler is responsible for,
+        # None to schedule all DAGs.
+        self._partition_key_range: tuple[int, int] | None = None
+        self._scheduling_state_cache: DagRunSchedulingStateCache | None = None
+        if conf.getboolean("scheduler", "use_scheduling_state_cache", fallback=False):
+            self._scheduling_state_cache = DagRunSchedulingStateCache()
+        # Record of the last dependency check of each DAG run, None to always check all task instances.
+        self._dependency_check_records: dict[tuple[str, str], TIDependencyCheckRecord] | None = None
+        if conf.getboolean("scheduler", "use_incremental_dependency_checks", fallback=False):
+            self._dependency_check_records = {}
+        self._dependency_check_examined_runs = ExaminedDagRuns()
+        self._wakeup_listener: SchedulerWakeupListener | None = None
+        if conf.getboolean("scheduler", "enable_wakeup_notifications", fallback=False):
+            self._wakeup_listener = SchedulerWakeupListener()
+        self._loop_profiler: LoopPhaseProfiler | None = None
+        if conf.getboolean("scheduler", "enable_loop_profiler", fallback=False):
+            self._loop_profiler = LoopPhaseProfiler(metric_prefix="scheduler.loop_phase_duration")
         self._task_context_logger: TaskContextLogger = TaskContextLogger(
             component_name=self.job_type,
             call_site_logger=self.log,
@@ -273,21 +511,26 @@ class SchedulerJobRunner(BaseJobRunner, LoggingMixin):
         self.job.executor.debug_dump()
         self.log.info("-" * 80)
 
-    def __get_concurrency_maps(self, states: Iterable[TaskInstanceState], session: Session) -> ConcurrencyMap:
-        """
-        Get the concurrency maps.
+        if self._loop_profiler:
+            self._loop_profiler.log_stats()
+            dump_sampled_stacks_in_background(
+                name="scheduler",
+                duration=conf.getfloat("scheduler", "loop_profiler_sample_seconds", fallback=30.0),
+                dump_dir=conf.get("scheduler", "loop_profiler_dump_dir", fallback="") or gettempdir(),
+            )
+            self.log.info("-" * 80)
 
-        :param states: List of states to query for
-        :return: Concurrency map
-        """
-        ti_concurrency_query: Result = session.execute(
-            select(TI.task_id, TI.run_id, TI.dag_id, func.count("*"))
-            .where(TI.state.in_(states))
-            .group_by(TI.task_id, TI.run_id, TI.dag_id)
-        )
-        return ConcurrencyMap.from_concurrency_map(
-            {(dag_id, run_id, task_id): count for task_id, run_id, dag_id, count in ti_concurrency_query}
-        )
+    def _loop_phase(self, name: str) -> ContextManager[None]:
+        """Time the code run in the context as a phase of the scheduler loop, if profiling is enabled."""
+        if self._loop_profiler:
+            return self._loop_profiler.phase(name)
+        return nullcontext()
+
+    def _loop_phase_action(self, action: Callable[[], Any]) -> Callable[[], Any]:
+        """Get the timer action, timed as a phase of the scheduler loop if profiling is enabled."""
+        if self._loop_profiler:
+            return self._loop_profiler.wrap(f"timers.{action.__name__}", action)
+        return action
 
     def _executable_task_instances_to_queued(self, max_tis: int, session: Session) -> list[TI]:
         """
@@ -304,7 +547,6 @@ class SchedulerJobRunner(BaseJobRunner, LoggingMixin):
         :param max_tis: Maximum number of TIs to queue in this loop.
         :return: list[airflow.models.TaskInstance]
         """
-        from airflow.models.pool import Pool
         from airflow.utils.db import DBLocks
 
         executable_tis: list[TI] = []
@@ -325,8 +567,12 @@ class SchedulerJobRunner(BaseJobRunner, LoggingMixin):
                 )
 
         # Get the pool settings. We get a lock on the pool rows, treating this as a "critical section"
-        # Throws an exception if lock cannot be obtained, rather than blocking
-        pools = Pool.slots_stats(lock_rows=True, session=session)
+        # Throws an exception if lock cannot be obtained, rather than blocking.
+        # The slots used per pool, dag and task are counted in the same query, and only updated in
+        # memory from there on, however many times candidate task instances are queried below.
+        slot_accounting = SlotAccounting.from_db(lock_rows=True, session=session)
+        pools = slot_accounting.pools
+        concurrency_map = slot_accounting.concurrency_map
 
         # If the pools are full, there is no point doing anything!
         # If _somehow_ the pool is overfull, don't let the limit go negative - it breaks SQL
@@ -340,9 +586,6 @@ class SchedulerJobRunner(BaseJobRunner, LoggingMixin):
 
         starved_pools = {pool_name for pool_name, stats in pools.items() if stats["open"] <= 0}
 
-        # dag_id to # of running tasks and (dag_id, task_id) to # of running tasks.
-        concurrency_map = self.__get_concurrency_maps(states=EXECUTION_STATES, session=session)
-
         # Number of tasks that cannot be scheduled because of no open slot in pool
         num_starving_tasks_total = 0
 
@@ -374,6 +617,9 @@ class SchedulerJobRunner(BaseJobRunner, LoggingMixin):
                 .order_by(-TI.priority_weight, DR.execution_date, TI.map_index)
             )
 
+            if self._partition_key_range is not None:
+                query = query.where(DM.in_partition(self._partition_key_range))
+
             if starved_pools:
                 query = query.where(not_(TI.pool.in_(starved_pools)))
 
@@ -556,14 +802,7 @@ class SchedulerJobRunner(BaseJobRunner, LoggingMixin):
                             continue
 
                 executable_tis.append(task_instance)
-                open_slots -= task_instance.pool_slots
-                concurrency_map.dag_active_tasks_map[dag_id] += 1
-                concurrency_map.task_concurrency_map[(task_instance.dag_id, task_instance.task_id)] += 1
-                concurrency_map.task_dagrun_concurrency_map[
-                    (task_instance.dag_id, task_instance.run_id, task_instance.task_id)
-                ] += 1
-
-                pool_stats["open"] = open_slots
+                slot_accounting.record_queued(task_instance)
 
             is_done = executable_tis or len(task_instances_to_examine) < max_tis
             # Check this to avoid accidental infinite loops
@@ -686,6 +925,9 @@ class SchedulerJobRunner(BaseJobRunner, LoggingMixin):
             # We create map (dag_id, task_id, execution_date) -> in-memory try_number
             ti_primary_key_to_try_number_map[ti_key.primary] = ti_key.try_number
 
+            if self._scheduling_state_cache is not None:
+                self._scheduling_state_cache.invalidate(ti_key.dag_id, ti_key.run_id)
+
             self.log.info("Received executor event with state %s for task instance %s", state, ti_key)
             if state in (TaskInstanceState.FAILED, TaskInstanceState.SUCCESS, TaskInstanceState.QUEUED):
                 tis_with_right_state.append(ti_key)
@@ -869,6 +1111,8 @@ class SchedulerJobRunner(BaseJobRunner, LoggingMixin):
                     self.processor_agent.end()
                 except Exception:
                     self.log.exception("Exception when executing DagFileProcessorAgent.end")
+            if self._wakeup_listener:
+                self._wakeup_listener.close()
             self.log.info("Exited execute loop")
         return None
 
@@ -921,72 +1165,87 @@ class SchedulerJobRunner(BaseJobRunner, LoggingMixin):
 
         timers = EventScheduler()
 
+        if self._use_partitioned_scheduling:
+            self._update_scheduler_partition()
+            timers.call_regular_interval(
+                conf.getfloat("scheduler", "partition_rebalance_interval", fallback=10.0),
+                self._loop_phase_action(self._update_scheduler_partition),
+            )
+
         # Check on start up, then every configured interval
         self.adopt_or_reset_orphaned_tasks()
 
         timers.call_regular_interval(
             conf.getfloat("scheduler", "orphaned_tasks_check_interval", fallback=300.0),
-            self.adopt_or_reset_orphaned_tasks,
+            self._loop_phase_action(self.adopt_or_reset_orphaned_tasks),
         )
 
         timers.call_regular_interval(
             conf.getfloat("scheduler", "trigger_timeout_check_interval", fallback=15.0),
-            self.check_trigger_timeouts,
+            self._loop_phase_action(self.check_trigger_timeouts),
         )
 
         timers.call_regular_interval(
             conf.getfloat("scheduler", "pool_metrics_interval", fallback=5.0),
-            self._emit_pool_metrics,
+            self._loop_phase_action(self._emit_pool_metrics),
         )
 
         timers.call_regular_interval(
             conf.getfloat("scheduler", "zombie_detection_interval", fallback=10.0),
-            self._find_zombies,
+            self._loop_phase_action(self._find_zombies),
         )
 
-        timers.call_regular_interval(60.0, self._update_dag_run_state_for_paused_dags)
+        timers.call_regular_interval(
+            60.0, self._loop_phase_action(self._update_dag_run_state_for_paused_dags)
+        )
 
         timers.call_regular_interval(
             conf.getfloat("scheduler", "task_queued_timeout_check_interval"),
-            self._fail_tasks_stuck_in_queued,
+            self._loop_phase_action(self._fail_tasks_stuck_in_queued),
         )
 
         timers.call_regular_interval(
             conf.getfloat("scheduler", "parsing_cleanup_interval"),
-            self._orphan_unreferenced_datasets,
+            self._loop_phase_action(self._orphan_unreferenced_datasets),
         )
 
         if self._standalone_dag_processor:
             timers.call_regular_interval(
                 conf.getfloat("scheduler", "parsing_cleanup_interval"),
-                self._cleanup_stale_dags,
+                self._loop_phase_action(self._cleanup_stale_dags),
             )
 
         for loop_count in itertools.count(start=1):
             with Stats.timer("scheduler.scheduler_loop_duration") as timer:
                 if self.using_sqlite and self.processor_agent:
-                    self.processor_agent.run_single_parsing_loop()
-                    # For the sqlite case w/ 1 thread, wait until the processor
-                    # is finished to avoid concurrent access to the DB.
-                    self.log.debug("Waiting for processors to finish since we're using sqlite")
-                    self.processor_agent.wait_until_finished()
+                    with self._loop_phase("dag_parsing"):
+                        self.processor_agent.run_single_parsing_loop()
+                        # For the sqlite case w/ 1 thread, wait until the processor
+                        # is finished to avoid concurrent access to the DB.
+                        self.log.debug("Waiting for processors to finish since we're using sqlite")
+                        self.processor_agent.wait_until_finished()
 
                 with create_session() as session:
                     num_queued_tis = self._do_scheduling(session)
 
-                    self.job.executor.heartbeat()
+                    with self._loop_phase("executor_heartbeat"):
+                        self.job.executor.heartbeat()
                     session.expunge_all()
-                    num_finished_events = self._process_executor_events(session=session)
+                    with self._loop_phase("process_executor_events"):
+                        num_finished_events = self._process_executor_events(session=session)
                 if self.processor_agent:
-                    self.processor_agent.heartbeat()
+                    with self._loop_phase("processor_agent_heartbeat"):
+                        self.processor_agent.heartbeat()
 
                 # Heartbeat the scheduler periodically
-                perform_heartbeat(
-                    job=self.job, heartbeat_callback=self.heartbeat_callback, only_if_necessary=True
-                )
+                with self._loop_phase("scheduler_heartbeat"):
+                    perform_heartbeat(
+                        job=self.job, heartbeat_callback=self.heartbeat_callback, only_if_necessary=True
+                    )
 
                 # Run any pending timed events
-                next_event = timers.run(blocking=False)
+                with self._loop_phase("timers"):
+                    next_event = timers.run(blocking=False)
                 self.log.debug("Next timed event is in %f", next_event)
 
             self.log.debug("Ran scheduling loop in %.2f seconds", timer.duration)
@@ -995,7 +1254,12 @@ class SchedulerJobRunner(BaseJobRunner, LoggingMixin):
                 # If the scheduler is doing things, don't sleep. This means when there is work to do, the
                 # scheduler will run "as quick as possible", but when it's stopped, it can sleep, dropping CPU
                 # usage when "idle"
-                time.sleep(min(self._scheduler_idle_sleep_time, next_event or 0))
+                sleep_time = min(self._scheduler_idle_sleep_time, next_event or 0)
+                if self._wakeup_listener:
+                    # Stop sleeping as soon as there is new work
+                    self._wakeup_listener.wait(sleep_time)
+                else:
+                    time.sleep(sleep_time)
 
             if loop_count >= self.num_runs > 0:
                 self.log.info(
@@ -1046,15 +1310,18 @@ class SchedulerJobRunner(BaseJobRunner, LoggingMixin):
         # Put a check in place to make sure we don't commit unexpectedly
         with prohibit_commit(session) as guard:
             if settings.USE_JOB_SCHEDULE:
-                self._create_dagruns_for_dags(guard, session)
+                with self._loop_phase("create_dagruns"):
+                    self._create_dagruns_for_dags(guard, session)
 
-            self._start_queued_dagruns(session)
+            with self._loop_phase("start_queued_dagruns"):
+                self._start_queued_dagruns(session)
             guard.commit()
-            dag_runs = self._get_next_dagruns_to_examine(DagRunState.RUNNING, session)
-            # Bulk fetch the currently active dag runs for the dags we are
-            # examining, rather than making one query per DagRun
+            with self._loop_phase("schedule_dag_runs"):
+                dag_runs = self._get_next_dagruns_to_examine(DagRunState.RUNNING, session)
+                # Bulk fetch the currently active dag runs for the dags we are
+                # examining, rather than making one query per DagRun
 
-            callback_tuples = self._schedule_all_dag_runs(guard, dag_runs, session)
+                callback_tuples = self._schedule_all_dag_runs(guard, dag_runs, session)
 
         # Send the callbacks after we commit to ensure the context is up to date when it gets run
         # cache saves time during scheduling of many dag_runs for same dag
@@ -1085,7 +1352,8 @@ class SchedulerJobRunner(BaseJobRunner, LoggingMixin):
                     timer.start()
 
                     # Find anything TIs in state SCHEDULED, try to QUEUE it (send it to the executor)
-                    num_queued_tis = self._critical_section_enqueue_task_instances(session=session)
+                    with self._loop_phase("critical_section"):
+                        num_queued_tis = self._critical_section_enqueue_task_instances(session=session)
 
                     # Make sure we only sent this metric if we obtained the lock, otherwise we'll skew the
                     # metric, way down
@@ -1107,12 +1375,14 @@ class SchedulerJobRunner(BaseJobRunner, LoggingMixin):
     @retry_db_transaction
     def _get_next_dagruns_to_examine(self, state: DagRunState, session: Session) -> Query:
         """Get Next DagRuns to Examine with retries."""
-        return DagRun.next_dagruns_to_examine(state, session)
+        return DagRun.next_dagruns_to_examine(state, session, partition_key_range=self._partition_key_range)
 
     @retry_db_transaction
     def _create_dagruns_for_dags(self, guard: CommitProhibitorGuard, session: Session) -> None:
         """Find Dag Models needing DagRuns and Create Dag Runs with retries in case of OperationalError."""
-        query, dataset_triggered_dag_info = DagModel.dags_needing_dagruns(session)
+        query, dataset_triggered_dag_info = DagModel.dags_needing_dagruns(
+            session, partition_key_range=self._partition_key_range
+        )
         all_dags_needing_dag_runs = set(query.all())
         dataset_triggered_dags = [
             dag for dag in all_dags_needing_dag_runs if dag.dag_id in dataset_triggered_dag_info
@@ -1151,6 +1421,9 @@ class SchedulerJobRunner(BaseJobRunner, LoggingMixin):
             DagRun.active_runs_of_dags(dag_ids=(dm.dag_id for dm in dag_models), session=session),
         )
 
+        new_dag_runs: list[DagRun] = []
+        # The DAGs whose next run fields are updated once the new runs are inserted
+        dags_to_update: list[tuple[DAG, DagModel, DataInterval]] = []
         for dag_model in dag_models:
             dag = self.dagbag.get_dag(dag_model.dag_id, session=session)
             if not dag:
@@ -1170,17 +1443,18 @@ class SchedulerJobRunner(BaseJobRunner, LoggingMixin):
             # instead of falling in a loop of Integrity Error.
             if (dag.dag_id, dag_model.next_dagrun) not in existing_dagruns:
                 try:
-                    dag.create_dagrun(
+                    dag_run = dag._build_dagrun(
                         run_type=DagRunType.SCHEDULED,
                         execution_date=dag_model.next_dagrun,
+                        run_id=None,
+                        start_date=None,
                         state=DagRunState.QUEUED,
                         data_interval=data_interval,
                         external_trigger=False,
-                        session=session,
+                        conf=None,
                         dag_hash=dag_hash,
                         creating_job_id=self.job.id,
                     )
-                    active_runs_of_dags[dag.dag_id] += 1
                 # Exceptions like ValueError, ParamValidationError, etc. are raised by
                 # dag.create_dagrun() when dag is misconfigured. The scheduler should not
                 # crash due to misconfigured dags. We should log any exception encountered
@@ -1188,6 +1462,21 @@ class SchedulerJobRunner(BaseJobRunner, LoggingMixin):
                 except Exception:
                     self.log.exception("Failed creating DagRun for %s", dag.dag_id)
                     continue
+                dag_run.dag = dag
+                new_dag_runs.append(dag_run)
+            dags_to_update.append((dag, dag_model, data_interval))
+
+        if new_dag_runs:
+            # Insert the DAG runs, then the task instances of all of them, in bulk rather than
+            # one DAG run at a time (which is what dag.create_dagrun() does).
+            new_dag_runs = self._insert_new_dag_runs(new_dag_runs, session=session)
+            DagRun.create_task_instances_for_new_runs(new_dag_runs, session=session)
+        created_dag_ids = {dag_run.dag_id for dag_run in new_dag_runs}
+        for dag, dag_model, data_interval in dags_to_update:
+            if (dag.dag_id, dag_model.next_dagrun) not in existing_dagruns:
+                if dag.dag_id not in created_dag_ids:
+                    continue
+                active_runs_of_dags[dag.dag_id] += 1
             if self._should_update_dag_next_dagruns(
                 dag,
                 dag_model,
@@ -1199,6 +1488,36 @@ class SchedulerJobRunner(BaseJobRunner, LoggingMixin):
         # TODO[HA]: Should we do a session.flush() so we don't have to keep lots of state/object in
         # memory for larger dags? or expunge_all()
 
+    def _insert_new_dag_runs(self, dag_runs: list[DagRun], session: Session) -> list[DagRun]:
+        """
+        Insert new DAG runs with one flush, or one DAG run at a time if that fails.
+
+        A DAG run violating a constraint, e.g. because its run_id is already used, is logged and
+        skipped, rather than failing the creation of the runs of the other DAGs. Other errors, e.g.
+        deadlocks, are raised for the transaction to be retried.
+
+        :return: the DAG runs inserted
+        """
+        try:
+            with session.begin_nested():
+                session.add_all(dag_runs)
+        except IntegrityError:
+            self.log.warning(
+                "Failed inserting %d DagRuns at once, inserting them one at a time", len(dag_runs)
+            )
+        else:
+            return dag_runs
+        inserted_dag_runs = []
+        for dag_run in dag_runs:
+            try:
+                with session.begin_nested():
+                    session.add(dag_run)
+            except IntegrityError:
+                self.log.exception("Failed creating DagRun for %s", dag_run.dag_id)
+            else:
+                inserted_dag_runs.append(dag_run)
+        return inserted_dag_runs
+
     def _create_dag_runs_dataset_triggered(
         self,
         dag_models: Collection[DagModel],
@@ -1399,10 +1718,42 @@ class SchedulerJobRunner(BaseJobRunner, LoggingMixin):
         session: Session,
     ) -> list[tuple[DagRun, DagCallbackRequest | None]]:
         """Make scheduling decisions for all `dag_runs`."""
+        if self._scheduling_state_cache is not None or self._dependency_check_records is not None:
+            dag_runs = list(dag_runs)
+        if self._scheduling_state_cache is not None:
+            self._scheduling_state_cache.refresh(dag_runs, session=session)
+        if self._dependency_check_records is not None:
+            self._prune_dependency_check_records(dag_runs)
         callback_tuples = [(run, self._schedule_dag_run(run, session=session)) for run in dag_runs]
         guard.commit()
         return callback_tuples
 
+    def _prune_dependency_check_records(self, dag_runs: Collection[DagRun]) -> None:
+        """
+        Drop the dependency check records of the runs not examined recently.
+
+        The records of runs finished or deleted by another scheduler or through the API are
+        otherwise kept forever. Like the decisions of the scheduling state cache, the records
+        are pruned every ``ExaminedDagRuns.PRUNE_INTERVAL`` loops.
+        """
+        if self._dependency_check_records is None:
+            return
+        keys_to_keep = self._dependency_check_examined_runs.add((dr.dag_id, dr.run_id) for dr in dag_runs)
+        if keys_to_keep is not None:
+            self._dependency_check_records = {
+                key: record for key, record in self._dependency_check_records.items() if key in keys_to_keep
+            }
+
+    def _get_dependency_check_record(self, dag_run: DagRun) -> TIDependencyCheckRecord | None:
+        """Get the record of the last dependency check of the run, starting anew if its DAG changed."""
+        if self._dependency_check_records is None:
+            return None
+        key = (dag_run.dag_id, dag_run.run_id)
+        record = self._dependency_check_records.get(key)
+        if record is None or record.dag_hash != dag_run.dag_hash:
+            record = self._dependency_check_records[key] = TIDependencyCheckRecord(dag_run.dag_hash)
+        return record
+
     def _schedule_dag_run(
         self,
         dag_run: DagRun,
@@ -1429,6 +1780,10 @@ class SchedulerJobRunner(BaseJobRunner, LoggingMixin):
             and dag_run.start_date < timezone.utcnow() - dag.dagrun_timeout
         ):
             dag_run.set_state(DagRunState.FAILED)
+            if self._scheduling_state_cache is not None:
+                self._scheduling_state_cache.invalidate(dag_run.dag_id, dag_run.run_id)
+            if self._dependency_check_records is not None:
+                self._dependency_check_records.pop((dag_run.dag_id, dag_run.run_id), None)
             unfinished_task_instances = session.scalars(
                 select(TI)
                 .where(TI.dag_id == dag_run.dag_id)
@@ -1466,8 +1821,26 @@ class SchedulerJobRunner(BaseJobRunner, LoggingMixin):
         if not self._verify_integrity_if_dag_changed(dag_run=dag_run, session=session):
             self.log.warning("The DAG disappeared before verifying integrity: %s. Skipping.", dag_run.dag_id)
             return callback
+
+        if self._scheduling_state_cache is not None:
+            if self._scheduling_state_cache.is_unchanged(dag_run, dag):
+                self.log.debug("Task instances of %s did not change since last examined, skipping", dag_run)
+                Stats.incr("scheduler.scheduling_state_cache.hit")
+                # Move the run to the back of the queue, as update_state would have done.
+                dag_run.last_scheduling_decision = timezone.utcnow()
+                return callback
+            Stats.incr("scheduler.scheduling_state_cache.miss")
+
         # TODO[HA]: Rename update_state -> schedule_dag_run, ?? something else?
-        schedulable_tis, callback_to_run = dag_run.update_state(session=session, execute_callbacks=False)
+        schedulable_tis, callback_to_run = dag_run.update_state(
+            session=session,
+            execute_callbacks=False,
+            dependency_check_record=self._get_dependency_check_record(dag_run),
+        )
+        if self._scheduling_state_cache is not None:
+            self._scheduling_state_cache.record(dag_run)
+        if self._dependency_check_records is not None and dag_run.state != DagRunState.RUNNING:
+            self._dependency_check_records.pop((dag_run.dag_id, dag_run.run_id), None)
 
         if self._should_update_dag_next_dagruns(dag, dag_model, last_dag_run=dag_run, session=session):
             dag_model.calculate_dagrun_date_fields(dag, dag.get_run_data_interval(dag_run))
@@ -1546,29 +1919,54 @@ class SchedulerJobRunner(BaseJobRunner, LoggingMixin):
         """
         self.log.debug("Calling SchedulerJob._fail_tasks_stuck_in_queued method")
 
-        tasks_stuck_in_queued = session.scalars(
-            select(TI).where(
-                TI.state == TaskInstanceState.QUEUED,
-                TI.queued_dttm < (timezone.utcnow() - timedelta(seconds=self._task_queued_timeout)),
-                TI.queued_by_job_id == self.job.id,
-            )
-        ).all()
-        try:
-            cleaned_up_task_instances = self.job.executor.cleanup_stuck_queued_tasks(
-                tis=tasks_stuck_in_queued
+        with Stats.timer("scheduler.scan_duration.fail_tasks_stuck_in_queued"):
+            # Scan the task instances in batches, in the order of the "ti_queued_by_job_queued_dttm" index,
+            # resuming after the last one of the previous batch: the cleaned up task instances stay queued
+            # until their executor events are processed.
+            query = (
+                select(TI)
+                .where(
+                    TI.state == TaskInstanceState.QUEUED,
+                    TI.queued_dttm < (timezone.utcnow() - timedelta(seconds=self._task_queued_timeout)),
+                    TI.queued_by_job_id == self.job.id,
+                )
+                .order_by(TI.queued_dttm, TI.dag_id, TI.task_id, TI.run_id, TI.map_index)
             )
-            cleaned_up_task_instances = set(cleaned_up_task_instances)
-            for ti in tasks_stuck_in_queued:
-                if repr(ti) in cleaned_up_task_instances:
-                    self._task_context_logger.warning(
-                        "Marking task instance %s stuck in queued as failed. "
-                        "If the task instance has available retries, it will be retried.",
-                        ti,
-                        ti=ti,
+            if self.job.max_tis_per_query > 0:
+                query = query.limit(self.job.max_tis_per_query)
+            scan_key = tuple_(TI.queued_dttm, TI.dag_id, TI.task_id, TI.run_id, TI.map_index)
+            last_scanned = None
+            while True:
+                batch_query = query if last_scanned is None else query.where(scan_key > tuple_(*last_scanned))
+                tasks_stuck_in_queued = session.scalars(batch_query).all()
+                if not tasks_stuck_in_queued:
+                    break
+                try:
+                    cleaned_up_task_instances = self.job.executor.cleanup_stuck_queued_tasks(
+                        tis=tasks_stuck_in_queued
                     )
-        except NotImplementedError:
-            self.log.debug("Executor doesn't support cleanup of stuck queued tasks. Skipping.")
-            ...
+                    cleaned_up_task_instances = set(cleaned_up_task_instances)
+                    for ti in tasks_stuck_in_queued:
+                        if repr(ti) in cleaned_up_task_instances:
+                            self._task_context_logger.warning(
+                                "Marking task instance %s stuck in queued as failed. "
+                                "If the task instance has available retries, it will be retried.",
+                                ti,
+                                ti=ti,
+                            )
+                except NotImplementedError:
+                    self.log.debug("Executor doesn't support cleanup of stuck queued tasks. Skipping.")
+                    break
+                if self.job.max_tis_per_query <= 0 or len(tasks_stuck_in_queued) < self.job.max_tis_per_query:
+                    break
+                last_ti = tasks_stuck_in_queued[-1]
+                last_scanned = (
+                    last_ti.queued_dttm,
+                    last_ti.dag_id,
+                    last_ti.task_id,
+                    last_ti.run_id,
+                    last_ti.map_index,
+                )
 
     @provide_session
     def _emit_pool_metrics(self, session: Session = NEW_SESSION) -> None:
@@ -1596,77 +1994,138 @@ class SchedulerJobRunner(BaseJobRunner, LoggingMixin):
         self.log.info("Adopting or resetting orphaned tasks for active dag runs")
         timeout = conf.getint("scheduler", "scheduler_health_check_threshold")
 
-        for attempt in run_with_db_retries(logger=self.log):
-            with attempt:
-                self.log.debug(
-                    "Running SchedulerJob.adopt_or_reset_orphaned_tasks with retries. Try %d of %d",
-                    attempt.retry_state.attempt_number,
-                    MAX_DB_RETRIES,
-                )
-                self.log.debug("Calling SchedulerJob.adopt_or_reset_orphaned_tasks method")
-                try:
-                    num_failed = session.execute(
-                        update(Job)
-                        .where(
-                            Job.job_type == "SchedulerJob",
-                            Job.state == JobState.RUNNING,
-                            Job.latest_heartbeat < (timezone.utcnow() - timedelta(seconds=timeout)),
-                        )
-                        .values(state=JobState.FAILED)
-                    ).rowcount
-
-                    if num_failed:
-                        self.log.info("Marked %d SchedulerJob instances as failed", num_failed)
-                        Stats.incr(self.__class__.__name__.lower() + "_end", num_failed)
-
-                    query = (
-                        select(TI)
-                        .options(lazyload("dag_run"))  # avoids double join to dag_run
-                        .where(TI.state.in_(State.adoptable_states))
-                        .join(TI.queued_by_job)
-                        .where(Job.state.is_distinct_from(JobState.RUNNING))
-                        .join(TI.dag_run)
-                        .where(
-                            DagRun.run_type != DagRunType.BACKFILL_JOB,
-                            DagRun.state == DagRunState.RUNNING,
-                        )
-                        .options(load_only(TI.dag_id, TI.task_id, TI.run_id))
+        with Stats.timer("scheduler.scan_duration.adopt_or_reset_orphaned_tasks"):
+            for attempt in run_with_db_retries(logger=self.log):
+                with attempt:
+                    self.log.debug(
+                        "Running SchedulerJob.adopt_or_reset_orphaned_tasks with retries. Try %d of %d",
+                        attempt.retry_state.attempt_number,
+                        MAX_DB_RETRIES,
                     )
-
-                    # Lock these rows, so that another scheduler can't try and adopt these too
-                    tis_to_adopt_or_reset = with_row_locks(query, of=TI, session=session, skip_locked=True)
-                    tis_to_adopt_or_reset = session.scalars(tis_to_adopt_or_reset).all()
-                    to_reset = self.job.executor.try_adopt_task_instances(tis_to_adopt_or_reset)
-
-                    reset_tis_message = []
-                    for ti in to_reset:
-                        reset_tis_message.append(repr(ti))
-                        ti.state = None
-                        ti.queued_by_job_id = None
-
-                    for ti in set(tis_to_adopt_or_reset) - set(to_reset):
-                        ti.queued_by_job_id = self.job.id
-
-                    Stats.incr("scheduler.orphaned_tasks.cleared", len(to_reset))
-                    Stats.incr("scheduler.orphaned_tasks.adopted", len(tis_to_adopt_or_reset) - len(to_reset))
-
-                    if to_reset:
-                        task_instance_str = "\n\t".join(reset_tis_message)
-                        self.log.info(
-                            "Reset the following %s orphaned TaskInstances:\n\t%s",
-                            len(to_reset),
-                            task_instance_str,
+                    self.log.debug("Calling SchedulerJob.adopt_or_reset_orphaned_tasks method")
+                    try:
+                        num_failed = session.execute(
+                            update(Job)
+                            .where(
+                                Job.job_type == "SchedulerJob",
+                                Job.state == JobState.RUNNING,
+                                Job.latest_heartbeat < (timezone.utcnow() - timedelta(seconds=timeout)),
+                            )
+                            .values(state=JobState.FAILED)
+                        ).rowcount
+
+                        if num_failed:
+                            self.log.info("Marked %d SchedulerJob instances as failed", num_failed)
+                            Stats.incr(self.__class__.__name__.lower() + "_end", num_failed)
+
+                        query = (
+                            select(TI)
+                            .options(lazyload("dag_run"))  # avoids double join to dag_run
+                            .where(TI.state.in_(State.adoptable_states))
+                            .join(TI.queued_by_job)
+                            .where(Job.state.is_distinct_from(JobState.RUNNING))
+                            # Adopted task instances are assigned to this job; let them out of the next batches
+                            # even if it is not running yet.
+                            .where(TI.queued_by_job_id != self.job.id)
+                            .join(TI.dag_run)
+                            .where(
+                                DagRun.run_type != DagRunType.BACKFILL_JOB,
+                                DagRun.state == DagRunState.RUNNING,
+                            )
+                            .options(load_only(TI.dag_id, TI.task_id, TI.run_id))
                         )
+                        if self.job.max_tis_per_query > 0:
+                            query = query.limit(self.job.max_tis_per_query)
+
+                        # Every task instance of a batch is adopted or reset, which takes it out of the query:
+                        # the next batch starts where the previous one ended.
+                        to_reset = []
+                        while True:
+                            # Lock these rows, so that another scheduler can't try and adopt these too
+                            tis_to_adopt_or_reset = with_row_locks(
+                                query, of=TI, session=session, skip_locked=True
+                            )
+                            tis_to_adopt_or_reset = session.scalars(tis_to_adopt_or_reset).all()
+                            batch_to_reset = self.job.executor.try_adopt_task_instances(tis_to_adopt_or_reset)
 
-                    # Issue SQL/finish "Unit of Work", but let @provide_session
-                    # commit (or if passed a session, let caller decide when to commit
-                    session.flush()
-                except OperationalError:
-                    session.rollback()
-                    raise
+                            for ti in batch_to_reset:
+                                ti.state = None
+                                ti.queued_by_job_id = None
+
+                            for ti in set(tis_to_adopt_or_reset) - set(batch_to_reset):
+                                ti.queued_by_job_id = self.job.id
+
+                            to_reset.extend(batch_to_reset)
+                            Stats.incr("scheduler.orphaned_tasks.cleared", len(batch_to_reset))
+                            Stats.incr(
+                                "scheduler.orphaned_tasks.adopted",
+                                len(tis_to_adopt_or_reset) - len(batch_to_reset),
+                            )
+                            if (
+                                self.job.max_tis_per_query <= 0
+                                or len(tis_to_adopt_or_reset) < self.job.max_tis_per_query
+                            ):
+                                break
+                            session.flush()
+
+                        if to_reset:
+                            task_instance_str = "\n\t".join(repr(ti) for ti in to_reset)
+                            self.log.info(
+                                "Reset the following %s orphaned TaskInstances:\n\t%s",
+                                len(to_reset),
+                                task_instance_str,
+                            )
+
+                        # Issue SQL/finish "Unit of Work", but let @provide_session
+                        # commit (or if passed a session, let caller decide when to commit
+                        session.flush()
+                    except OperationalError:
+                        session.rollback()
+                        raise
 
         return len(to_reset)
 
+    @provide_session
+    def _update_scheduler_partition(self, session: Session = NEW_SESSION) -> None:
+        """
+        Claim the share of the DAGs this scheduler is responsible for.
+
+        The partition key space is split evenly between the alive schedulers, ordered by job id, so
+        each scheduler only examines and queues the runs of its own DAGs and schedulers do not
+        compete for the same rows. The heartbeat of a scheduler job acts as its lease: once it has
+        not heartbeated for ``scheduler_health_check_threshold`` seconds, its share is taken over by
+        the remaining schedulers the next time they rebalance. Row level locks are still taken, so
+        two schedulers briefly overlapping during a rebalance is harmless.
+        """
+        timeout = conf.getint("scheduler", "scheduler_health_check_threshold")
+        alive_scheduler_ids = set(
+            session.scalars(
+                select(Job.id).where(
+                    Job.job_type == self.job_type,
+                    Job.state == JobState.RUNNING,
+                    Job.latest_heartbeat >= timezone.utcnow() - timedelta(seconds=timeout),
+                )
+            )
+        )
+        alive_scheduler_ids.add(self.job.id)
+        schedulers = sorted(alive_scheduler_ids)
+        index = schedulers.index(self.job.id)
+
+        key_space = DagModel.PARTITION_KEY_SPACE
+        partition_key_range = (
+            key_space * index // len(schedulers),
+            key_space * (index + 1) // len(schedulers),
+        )
+        if partition_key_range != self._partition_key_range:
+            self.log.info(
+                "Scheduling DAGs with partition keys in [%d, %d), as scheduler %d of %d",
+                *partition_key_range,
+                index + 1,
+                len(schedulers),
+            )
+            self._partition_key_range = partition_key_range
+        Stats.gauge("scheduler.partitioning.alive_schedulers", len(schedulers))
+
     @provide_session
     def check_trigger_timeouts(self, session: Session = NEW_SESSION) -> None:
         """Mark any "deferred" task as failed if the trigger or execution timeout has passed."""
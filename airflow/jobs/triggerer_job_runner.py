@@ -17,6 +17,8 @@
 from __future__ import annotations
 
 import asyncio
+import hashlib
+import json
 import logging
 import os
 import signal
@@ -24,11 +26,11 @@ import sys
 import threading
 import time
 import warnings
-from collections import deque
+from collections import Counter, deque
 from contextlib import suppress
 from copy import copy
 from queue import SimpleQueue
-from typing import TYPE_CHECKING, TypeVar
+from typing import TYPE_CHECKING, Any, AsyncIterator, Callable, Coroutine, Generator, Iterable, TypeVar
 
 from sqlalchemy import func, select
 
@@ -36,6 +38,7 @@ from airflow.configuration import conf
 from airflow.jobs.base_job_runner import BaseJobRunner
 from airflow.jobs.job import perform_heartbeat
 from airflow.models.trigger import ENCRYPTED_KWARGS_PREFIX, Trigger
+from airflow.models.triggererload import TriggererLoad
 from airflow.stats import Stats
 from airflow.triggers.base import BaseTrigger, TriggerEvent
 from airflow.typing_compat import TypedDict
@@ -237,14 +240,24 @@ def setup_queue_listener():
 
 U = TypeVar("U", bound=BaseTrigger)
 
+EVENT_BATCH_SIZE = 1000
+"""
+The maximum number of trigger events submitted together to resume their tasks.
+
+:meta private:
+"""
+
 
 class TriggererJobRunner(BaseJobRunner, LoggingMixin):
     """
     Run active triggers in asyncio and update their dependent tests/DAGs once their events have fired.
 
-    It runs as two threads:
+    It runs as several threads:
      - The main thread does DB calls/checkins
-     - A subthread runs all the async code
+     - Subthreads run all the async code, each in its own event loop. There are
+       ``[triggerer] num_loops`` of them, each running the triggers whose ID
+       hashes to it, so that a trigger blocking its loop only stalls the
+       triggers of the same loop.
     """
 
     job_type = "TriggererJob"
@@ -253,6 +266,7 @@ class TriggererJobRunner(BaseJobRunner, LoggingMixin):
         self,
         job: Job,
         capacity=None,
+        num_loops=None,
     ):
         super().__init__(job)
         if capacity is None:
@@ -261,8 +275,23 @@ class TriggererJobRunner(BaseJobRunner, LoggingMixin):
             self.capacity = capacity
         else:
             raise ValueError(f"Capacity number {capacity} is invalid")
+        if num_loops is None:
+            num_loops = conf.getint("triggerer", "num_loops", fallback=1)
+        if not isinstance(num_loops, int) or num_loops <= 0:
+            raise ValueError(f"Number of loops {num_loops} is invalid")
 
         self.health_check_threshold = conf.getint("triggerer", "triggerer_health_check_threshold")
+        self.max_rebalanced_triggers = conf.getint("triggerer", "max_rebalanced_triggers", fallback=10)
+        self.loop_lag_threshold = conf.getfloat("triggerer", "blocking_step_threshold", fallback=0.2)
+        # The load of the triggerer since it was last recorded
+        self._load_start_time = time.monotonic()
+        self._load_start_cpu_time = time.process_time()
+        self._load_loop_lag = 0.0
+        self._load_step_time_by_classpath: Counter[str] = Counter()
+        # Triggers are taken off other triggerers once per recorded load, for the loads to reflect them.
+        self._can_rebalance_triggers = False
+        # Map from trigger ID to the key the trigger is assigned to an event loop by, when deduplicated
+        self._trigger_loop_keys: dict[int, str | None] = {}
 
         should_queue = True
         if DISABLE_WRAPPER:
@@ -282,8 +311,26 @@ class TriggererJobRunner(BaseJobRunner, LoggingMixin):
             self.log.warning("Skipping trigger logger queue listener; disabled by handler setting.")
         else:
             self.listener = setup_queue_listener()
-        # Set up runner async thread
-        self.trigger_runner = TriggerRunner()
+        # Set up runner async threads
+        self.trigger_runners = [TriggerRunner(loop_index=loop_index) for loop_index in range(num_loops)]
+
+    @property
+    def trigger_runner(self) -> TriggerRunner:
+        """The runner of the first loop, the only one unless ``[triggerer] num_loops`` is more than 1."""
+        return self.trigger_runners[0]
+
+    @trigger_runner.setter
+    def trigger_runner(self, trigger_runner: TriggerRunner) -> None:
+        self.trigger_runners[0] = trigger_runner
+
+    @property
+    def stopping(self) -> bool:
+        """Whether any trigger runner was stopped, in which case the triggerer stops."""
+        return any(trigger_runner.stop for trigger_runner in self.trigger_runners)
+
+    def _stop_trigger_runners(self) -> None:
+        for trigger_runner in self.trigger_runners:
+            trigger_runner.stop = True
 
     @provide_session
     def heartbeat_callback(self, session: Session = NEW_SESSION) -> None:
@@ -310,7 +357,7 @@ class TriggererJobRunner(BaseJobRunner, LoggingMixin):
 
         Called when there is an external kill command (via the heartbeat mechanism, for example).
         """
-        self.trigger_runner.stop = True
+        self._stop_trigger_runners()
 
     def _kill_listener(self):
         if self.listener:
@@ -321,9 +368,9 @@ class TriggererJobRunner(BaseJobRunner, LoggingMixin):
     def _exit_gracefully(self, signum, frame) -> None:
         """Clean up processor_agent to avoid leaving orphan processes."""
         # The first time, try to exit nicely
-        if not self.trigger_runner.stop:
+        if not self.stopping:
             self.log.info("Exiting gracefully upon receiving signal %s", signum)
-            self.trigger_runner.stop = True
+            self._stop_trigger_runners()
             self._kill_listener()
         else:
             self.log.warning("Forcing exit due to second exit signal %s", signum)
@@ -332,11 +379,11 @@ class TriggererJobRunner(BaseJobRunner, LoggingMixin):
     def _execute(self) -> int | None:
         self.log.info("Starting the triggerer")
         try:
-            # set job_id so that it can be used in log file names
-            self.trigger_runner.job_id = self.job.id
-
-            # Kick off runner thread
-            self.trigger_runner.start()
+            for trigger_runner in self.trigger_runners:
+                # set job_id so that it can be used in log file names
+                trigger_runner.job_id = self.job.id
+                # Kick off runner thread
+                trigger_runner.start()
             # Start our own DB loop in the main thread
             self._run_trigger_loop()
         except Exception:
@@ -344,18 +391,23 @@ class TriggererJobRunner(BaseJobRunner, LoggingMixin):
             raise
         finally:
             self.log.info("Waiting for triggers to clean up")
-            # Tell the subthread to stop and then wait for it.
+            # Tell the subthreads to stop and then wait for them.
             # If the user interrupts/terms again, _graceful_exit will allow them
             # to force-kill here.
-            self.trigger_runner.stop = True
-            self.trigger_runner.join(30)
+            self._stop_trigger_runners()
+            deadline = time.monotonic() + 30
+            for trigger_runner in self.trigger_runners:
+                if trigger_runner.is_alive():
+                    trigger_runner.join(max(deadline - time.monotonic(), 0))
+            # The triggers of the triggerer are assigned to the others according to their load only.
+            TriggererLoad.remove(self.job.id)
             self.log.info("Exited trigger loop")
         return None
 
     def _run_trigger_loop(self) -> None:
         """Run synchronously and handle all database reads/writes; the main-thread trigger loop."""
-        while not self.trigger_runner.stop:
-            if not self.trigger_runner.is_alive():
+        while not self.stopping:
+            if not all(trigger_runner.is_alive() for trigger_runner in self.trigger_runners):
                 self.log.error("Trigger runner thread has died! Exiting.")
                 break
             # Clean out unused triggers
@@ -369,24 +421,86 @@ class TriggererJobRunner(BaseJobRunner, LoggingMixin):
             perform_heartbeat(self.job, heartbeat_callback=self.heartbeat_callback, only_if_necessary=True)
             # Collect stats
             self.emit_metrics()
+            self.record_load()
             # Idle sleep
             time.sleep(1)
 
     def load_triggers(self):
         """Query the database for the triggers we're supposed to be running and update the runner."""
-        Trigger.assign_unassigned(self.job.id, self.capacity, self.health_check_threshold)
+        Trigger.assign_unassigned(
+            self.job.id,
+            self.capacity,
+            self.health_check_threshold,
+            max_rebalanced_triggers=self.max_rebalanced_triggers if self._can_rebalance_triggers else 0,
+            loop_lag_threshold=self.loop_lag_threshold,
+        )
+        self._can_rebalance_triggers = False
         ids = Trigger.ids_for_triggerer(self.job.id)
-        self.trigger_runner.update_triggers(set(ids))
+        loop_keys = self._get_trigger_loop_keys(ids)
+        # Triggers always hash to the same loop, so they never move between loops.
+        ids_by_loop: list[set[int]] = [set() for _ in self.trigger_runners]
+        for trigger_id in ids:
+            loop_key = loop_keys.get(trigger_id) or trigger_id
+            ids_by_loop[hash(loop_key) % len(self.trigger_runners)].add(trigger_id)
+        for trigger_runner, loop_ids in zip(self.trigger_runners, ids_by_loop):
+            trigger_runner.update_triggers(loop_ids)
+
+    def _get_trigger_loop_keys(self, ids: Iterable[int]) -> dict[int, str | None]:
+        """
+        Get the keys of the triggers which are deduplicated, for identical triggers to run in the same loop.
+
+        Other triggers, and all triggers unless ``[triggerer] deduplicate_triggers`` is set, are assigned
+        to the event loops by ID.
+
+        :param ids: the IDs of the triggers assigned to the triggerer
+        :return: the key of the triggers, by trigger ID
+        """
+        if len(self.trigger_runners) == 1 or not self.trigger_runner.deduplicate_triggers:
+            return {}
+        ids = set(ids)
+        self._trigger_loop_keys = {
+            trigger_id: key for trigger_id, key in self._trigger_loop_keys.items() if trigger_id in ids
+        }
+        new_ids = ids.difference(self._trigger_loop_keys)
+        if new_ids:
+            for trigger_id, trigger in Trigger.bulk_fetch(new_ids).items():
+                try:
+                    kwargs = TriggerRunner.decrypt_trigger_kwargs(trigger)
+                except Exception:
+                    # The trigger fails once it is run.
+                    self._trigger_loop_keys[trigger_id] = None
+                    continue
+                self._trigger_loop_keys[trigger_id] = TriggerRunner.get_arguments_key(
+                    trigger.classpath, kwargs
+                )
+        return self._trigger_loop_keys
 
     def handle_events(self):
-        """Dispatch outbound events to the Trigger model which pushes them to the relevant task instances."""
-        while self.trigger_runner.events:
-            # Get the event and its trigger ID
-            trigger_id, event = self.trigger_runner.events.popleft()
-            # Tell the model to wake up its tasks
-            Trigger.submit_event(trigger_id=trigger_id, event=event)
-            # Emit stat event
-            Stats.incr("triggers.succeeded")
+        """
+        Dispatch outbound events to the Trigger model which pushes them to the relevant task instances.
+
+        The events of all the loops are submitted together, in batches of ``EVENT_BATCH_SIZE``, so that
+        many triggers firing at once resume their tasks with a few queries.
+        """
+        events: list[tuple[int, TriggerEvent]] = []
+        fired_at: list[float | None] = []
+        for trigger_runner in self.trigger_runners:
+            while trigger_runner.events:
+                # Get the event and its trigger ID
+                trigger_id, event = trigger_runner.events.popleft()
+                events.append((trigger_id, event))
+                fired_at.append(trigger_runner.event_fired_at.pop(trigger_id, None))
+        if not events:
+            return
+        for batch_start in range(0, len(events), EVENT_BATCH_SIZE):
+            # Tell the model to wake up their tasks
+            Trigger.submit_events(events[batch_start : batch_start + EVENT_BATCH_SIZE])
+        # Emit stat events
+        Stats.incr("triggers.succeeded", len(events))
+        resumed_at = time.monotonic()
+        for event_fired_at in fired_at:
+            if event_fired_at is not None:
+                Stats.timing("triggers.event_resume_delay", (resumed_at - event_fired_at) * 1000)
 
     def handle_failed_triggers(self):
         """
@@ -394,18 +508,74 @@ class TriggererJobRunner(BaseJobRunner, LoggingMixin):
 
         Task Instances that depend on them need failing.
         """
-        while self.trigger_runner.failed_triggers:
-            # Tell the model to fail this trigger's deps
-            trigger_id, saved_exc = self.trigger_runner.failed_triggers.popleft()
-            Trigger.submit_failure(trigger_id=trigger_id, exc=saved_exc)
-            # Emit stat event
-            Stats.incr("triggers.failed")
+        for trigger_runner in self.trigger_runners:
+            while trigger_runner.failed_triggers:
+                # Tell the model to fail this trigger's deps
+                trigger_id, saved_exc = trigger_runner.failed_triggers.popleft()
+                Trigger.submit_failure(trigger_id=trigger_id, exc=saved_exc)
+                # Emit stat event
+                Stats.incr("triggers.failed")
 
     def emit_metrics(self):
-        Stats.gauge(f"triggers.running.{self.job.hostname}", len(self.trigger_runner.triggers))
-        Stats.gauge(
-            "triggers.running", len(self.trigger_runner.triggers), tags={"hostname": self.job.hostname}
+        num_running = sum(len(trigger_runner.triggers) for trigger_runner in self.trigger_runners)
+        Stats.gauge(f"triggers.running.{self.job.hostname}", num_running)
+        Stats.gauge("triggers.running", num_running, tags={"hostname": self.job.hostname})
+        for trigger_runner in self.trigger_runners:
+            loop_lag, trigger_runner.max_loop_lag = trigger_runner.max_loop_lag, 0.0
+            self._load_loop_lag = max(self._load_loop_lag, loop_lag)
+            Stats.gauge(f"triggers.loop_lag.{self.job.hostname}.{trigger_runner.loop_index}", loop_lag)
+            Stats.gauge(
+                "triggers.loop_lag",
+                loop_lag,
+                tags={"hostname": self.job.hostname, "loop": trigger_runner.loop_index},
+            )
+        step_time_by_classpath: Counter[str] = Counter()
+        for trigger_runner in self.trigger_runners:
+            step_time, trigger_runner.step_time_by_classpath = (
+                trigger_runner.step_time_by_classpath,
+                Counter(),
+            )
+            step_time_by_classpath.update(step_time)
+        for classpath, step_time in step_time_by_classpath.items():
+            Stats.gauge(f"triggers.step_time.{classpath}", step_time)
+            Stats.gauge("triggers.step_time", step_time, tags={"classpath": classpath})
+        self._load_step_time_by_classpath.update(step_time_by_classpath)
+
+    def record_load(self):
+        """
+        Heartbeat the load of the triggerer, for triggers to be assigned to the least loaded triggerers.
+
+        The load is measured since it was last recorded, which is done at most once per job heartbeat.
+        Triggers are taken off other triggerers at most once per recorded load.
+        """
+        elapsed = time.monotonic() - self._load_start_time
+        if elapsed < self.job.heartrate:
+            return
+        cpu_time = time.process_time()
+        num_triggers_by_classpath = Counter(
+            details["classpath"]
+            for trigger_runner in self.trigger_runners
+            # Copy the triggers, which are updated by the runner thread.
+            for details in list(trigger_runner.triggers.values())
+            if "classpath" in details
+        )
+        TriggererLoad.record(
+            triggerer_id=self.job.id,
+            loop_lag=self._load_loop_lag,
+            cpu_usage=(cpu_time - self._load_start_cpu_time) / elapsed,
+            load_by_classpath={
+                classpath: {
+                    "count": num_triggers_by_classpath[classpath],
+                    "busy": self._load_step_time_by_classpath[classpath] / elapsed,
+                }
+                for classpath in num_triggers_by_classpath.keys() | self._load_step_time_by_classpath.keys()
+            },
         )
+        self._load_start_time = time.monotonic()
+        self._load_start_cpu_time = cpu_time
+        self._load_loop_lag = 0.0
+        self._load_step_time_by_classpath = Counter()
+        self._can_rebalance_triggers = True
 
 
 class TriggerDetails(TypedDict):
@@ -414,16 +584,60 @@ class TriggerDetails(TypedDict):
     task: asyncio.Task
     name: str
     events: int
+    # IDs of the triggers sharing the same run, when deduplicated
+    shared_ids: set[int]
+    classpath: str
+    # Number of steps of the run, and the time spent running them, in seconds
+    steps: int
+    step_time: float
+    # Time spent in the steps which blocked the event loop, in seconds
+    blocked_time: float
+
+
+class _StepTimedCoroutine:
+    """
+    Wrap a coroutine to time each of its steps, i.e. each time it runs in the event loop until it awaits.
+
+    :param coro: the coroutine
+    :param on_step: called with the duration of each step, in seconds
+    """
+
+    def __init__(self, coro: Coroutine, on_step: Callable[[float], None]):
+        self._coro = coro
+        self._on_step = on_step
+
+    def __await__(self) -> Generator[Any, Any, Any]:
+        """Run the coroutine step by step."""
+        iterator = self._coro.__await__()
+        value: Any = None
+        exc: BaseException | None = None
+        while True:
+            start = time.monotonic()
+            try:
+                yielded = iterator.send(value) if exc is None else iterator.throw(exc)
+            except StopIteration as e:
+                return e.value
+            finally:
+                self._on_step(time.monotonic() - start)
+            try:
+                value, exc = (yield yielded), None
+            except GeneratorExit:
+                iterator.close()
+                raise
+            except BaseException as e:
+                value, exc = None, e
 
 
 class TriggerRunner(threading.Thread, LoggingMixin):
     """
-    Runtime environment for all triggers.
+    Runtime environment for the triggers of an event loop.
 
     Mainly runs inside its own thread, where it hands control off to an asyncio
     event loop, but is also sometimes interacted with from the main thread
     (where all the DB queries are done). All communication between threads is
     done via Deques.
+
+    :param loop_index: the index of the loop among the loops of the triggerer
     """
 
     # Maps trigger IDs to their running tasks and other info
@@ -441,21 +655,51 @@ class TriggerRunner(threading.Thread, LoggingMixin):
     # Outbound queue of events
     events: deque[tuple[int, TriggerEvent]]
 
+    # When the first event in the outbound queue of each trigger fired, from time.monotonic()
+    event_fired_at: dict[int, float]
+
     # Outbound queue of failed triggers
     failed_triggers: deque[tuple[int, BaseException]]
 
+    # IDs of the triggers sharing the latest run of identical triggers, by key of the triggers
+    shared_trigger_ids: dict[str, set[int]]
+
+    # Time spent running the steps of triggers since last reset, in seconds, by classpath
+    step_time_by_classpath: Counter[str]
+
+    # Number of steps of triggers which blocked the event loop, by classpath
+    blocking_steps_by_classpath: Counter[str]
+
+    # Classpaths of the triggers run in the offload loop, rather than in the event loop of the runner
+    offloaded_classpaths: set[str]
+
     # Should-we-stop flag
     stop: bool = False
 
-    def __init__(self):
-        super().__init__()
+    # Longest time the event loop was late to run the watchdog since last reset, in seconds
+    max_loop_lag: float = 0.0
+
+    def __init__(self, loop_index: int = 0):
+        super().__init__(name=f"TriggerRunner-{loop_index}")
+        self.loop_index = loop_index
         self.triggers = {}
         self.trigger_cache = {}
         self.to_create = deque()
         self.to_cancel = deque()
         self.events = deque()
+        self.event_fired_at = {}
         self.failed_triggers = deque()
+        self.shared_trigger_ids = {}
+        self.step_time_by_classpath = Counter()
+        self.blocking_steps_by_classpath = Counter()
+        self.offloaded_classpaths = set()
         self.job_id = None
+        self.deduplicate_triggers = conf.getboolean("triggerer", "deduplicate_triggers", fallback=False)
+        self.blocking_step_threshold = conf.getfloat("triggerer", "blocking_step_threshold", fallback=0.2)
+        self.offload_blocking_triggers_after = conf.getint(
+            "triggerer", "offload_blocking_triggers_after", fallback=0
+        )
+        self._offload_loop: asyncio.AbstractEventLoop | None = None
 
     def run(self):
         """Sync entrypoint - just run a run in an async loop."""
@@ -480,30 +724,210 @@ class TriggerRunner(threading.Thread, LoggingMixin):
                 # Every minute, log status
                 if time.time() - last_status >= 60:
                     count = len(self.triggers)
-                    self.log.info("%i triggers currently running", count)
+                    self.log.info("%i triggers currently running in loop %i", count, self.loop_index)
+                    self.log_blocking_triggers()
                     last_status = time.time()
         except Exception:
             self.stop = True
             raise
+        finally:
+            if self._offload_loop is not None:
+                self._offload_loop.call_soon_threadsafe(self._offload_loop.stop)
         # Wait for watchdog to complete
         await watchdog
 
+    def log_blocking_triggers(self, limit: int = 5) -> None:
+        """Log the running triggers which blocked the event loop for the longest time."""
+        blocking = sorted(
+            (details for details in self.triggers.values() if details.get("blocked_time")),
+            key=lambda details: details["blocked_time"],
+            reverse=True,
+        )
+        for details in blocking[:limit]:
+            self.log.info(
+                "Trigger %s (%s) blocked the event loop for %.2f seconds in total, in %i steps",
+                details["name"],
+                details["classpath"],
+                details["blocked_time"],
+                details["steps"],
+            )
+
     async def create_triggers(self):
-        """Drain the to_create queue and create all new triggers that have been requested in the DB."""
+        """
+        Drain the to_create queue and create all new triggers that have been requested in the DB.
+
+        When ``[triggerer] deduplicate_triggers`` is set, a trigger identical to a trigger which
+        is running, and did not fire yet, shares its run, and gets its events.
+        """
         while self.to_create:
             trigger_id, trigger_instance = self.to_create.popleft()
             if trigger_id not in self.triggers:
                 ti: TaskInstance = trigger_instance.task_instance
-                self.triggers[trigger_id] = {
-                    "task": asyncio.create_task(self.run_trigger(trigger_id, trigger_instance)),
-                    "name": f"{ti.dag_id}/{ti.run_id}/{ti.task_id}/{ti.map_index}/{ti.try_number} "
-                    f"(ID {trigger_id})",
-                    "events": 0,
-                }
+                name = (
+                    f"{ti.dag_id}/{ti.run_id}/{ti.task_id}/{ti.map_index}/{ti.try_number} (ID {trigger_id})"
+                )
+                key = self.get_trigger_key(trigger_instance) if self.deduplicate_triggers else None
+                shared_run = self._get_shared_run(key)
+                if shared_run is not None:
+                    shared_run["shared_ids"].add(trigger_id)
+                    self.triggers[trigger_id] = {
+                        "task": shared_run["task"],
+                        "name": name,
+                        "events": 0,
+                        "shared_ids": shared_run["shared_ids"],
+                        "classpath": shared_run["classpath"],
+                    }
+                    self.log.info("Trigger %s shares the run of trigger %s", name, shared_run["name"])
+                else:
+                    shared_ids = {trigger_id}
+                    if key is not None:
+                        self.shared_trigger_ids[key] = shared_ids
+                    classpath = f"{type(trigger_instance).__module__}.{type(trigger_instance).__qualname__}"
+                    self.triggers[trigger_id] = {
+                        "task": asyncio.create_task(
+                            self._run_timed(
+                                trigger_id, classpath, self.run_trigger(trigger_id, trigger_instance)
+                            )
+                        ),
+                        "name": name,
+                        "events": 0,
+                        "shared_ids": shared_ids,
+                        "classpath": classpath,
+                        "steps": 0,
+                        "step_time": 0.0,
+                        "blocked_time": 0.0,
+                    }
             else:
                 self.log.warning("Trigger %s had insertion attempted twice", trigger_id)
             await asyncio.sleep(0)
 
+    async def _run_timed(self, trigger_id: int, classpath: str, coro: Coroutine) -> Any:
+        """Run the coroutine of a trigger, timing each of its steps."""
+        return await _StepTimedCoroutine(
+            coro, lambda duration: self.record_trigger_step(trigger_id, classpath, duration)
+        )
+
+    def record_trigger_step(self, trigger_id: int, classpath: str, duration: float) -> None:
+        """
+        Record the time a trigger ran in the event loop, in a step of its coroutine.
+
+        Steps taking more than ``[triggerer] blocking_step_threshold`` seconds blocked the
+        event loop, and are reported. When ``[triggerer] offload_blocking_triggers_after``
+        is set, the new triggers of a class whose triggers blocked the event loop that many
+        times are run in the offload loop.
+        """
+        self.step_time_by_classpath[classpath] += duration
+        details = self.triggers.get(trigger_id)
+        if details is not None and "steps" in details:
+            details["steps"] += 1
+            details["step_time"] += duration
+        if duration <= self.blocking_step_threshold:
+            return
+        name = details["name"] if details is not None else f"(ID {trigger_id})"
+        self.log.warning("Trigger %s (%s) blocked the event loop for %.2f seconds", name, classpath, duration)
+        if details is not None and "blocked_time" in details:
+            details["blocked_time"] += duration
+        Stats.timing(f"triggers.blocking_step_duration.{classpath}", duration * 1000)
+        Stats.timing("triggers.blocking_step_duration", duration * 1000, tags={"classpath": classpath})
+        self.blocking_steps_by_classpath[classpath] += 1
+        if (
+            self.offload_blocking_triggers_after
+            and self.blocking_steps_by_classpath[classpath] >= self.offload_blocking_triggers_after
+            and classpath not in self.offloaded_classpaths
+        ):
+            self.log.warning(
+                "Triggers of class %s blocked the event loop %i times, "
+                "new triggers of the class will run in the offload loop",
+                classpath,
+                self.blocking_steps_by_classpath[classpath],
+            )
+            self.offloaded_classpaths.add(classpath)
+
+    def _get_offload_loop(self) -> asyncio.AbstractEventLoop:
+        """Return the event loop of the offload thread, starting it the first time."""
+        if self._offload_loop is None:
+            loop = asyncio.new_event_loop()
+            threading.Thread(
+                target=loop.run_forever, name=f"TriggerRunner-{self.loop_index}-offload", daemon=True
+            ).start()
+            self._offload_loop = loop
+        return self._offload_loop
+
+    async def _run_offloaded(self, trigger: BaseTrigger) -> AsyncIterator[TriggerEvent]:
+        """
+        Run a trigger in the offload loop, in its own thread, and yield its events in the current loop.
+
+        The triggers which block their event loop only delay each other there.
+        """
+        loop = asyncio.get_running_loop()
+        events: asyncio.Queue[TriggerEvent] = asyncio.Queue()
+
+        async def run_in_offload_loop():
+            self.set_individual_trigger_logging(trigger)
+            async for event in trigger.run():
+                loop.call_soon_threadsafe(events.put_nowait, event)
+
+        run = asyncio.wrap_future(
+            asyncio.run_coroutine_threadsafe(run_in_offload_loop(), self._get_offload_loop())
+        )
+        get_event: asyncio.Future | None = None
+        try:
+            while True:
+                get_event = asyncio.ensure_future(events.get())
+                await asyncio.wait([get_event, run], return_when=asyncio.FIRST_COMPLETED)
+                if get_event.done():
+                    yield get_event.result()
+                    continue
+                # Events are queued before the run completes.
+                while not events.empty():
+                    yield events.get_nowait()
+                run.result()
+                return
+        finally:
+            if get_event is not None:
+                get_event.cancel()
+            run.cancel()
+
+    def _get_shared_run(self, key: str | None) -> TriggerDetails | None:
+        """Return the details of a trigger whose run can be shared by a trigger with the given key."""
+        if key is None:
+            return None
+        running = [
+            self.triggers[trigger_id]
+            for trigger_id in self.shared_trigger_ids.get(key, ())
+            if trigger_id in self.triggers
+        ]
+        # A trigger which fired already may not fire again, so new triggers do not share its run.
+        if not running or running[0]["task"].done() or any(details["events"] for details in running):
+            return None
+        return running[0]
+
+    @staticmethod
+    def get_trigger_key(trigger: BaseTrigger) -> str | None:
+        """
+        Return the key of a trigger, the same for the triggers which have the same class and arguments.
+
+        :return: the key, or None if the arguments of the trigger cannot be compared
+        """
+        try:
+            classpath, kwargs = trigger.serialize()
+        except Exception:
+            return None
+        return TriggerRunner.get_arguments_key(classpath, kwargs)
+
+    @staticmethod
+    def get_arguments_key(classpath: str, kwargs: dict[str, Any]) -> str | None:
+        """
+        Return the key of a trigger given its class path and arguments, see :meth:`get_trigger_key`.
+
+        :return: the key, or None if the arguments cannot be compared
+        """
+        try:
+            canonical = json.dumps([classpath, kwargs], sort_keys=True, default=repr)
+        except Exception:
+            return None
+        return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
     async def cancel_triggers(self):
         """
         Drain the to_cancel queue and ensure all triggers that are not in the DB are cancelled.
@@ -513,9 +937,21 @@ class TriggerRunner(threading.Thread, LoggingMixin):
         while self.to_cancel:
             trigger_id = self.to_cancel.popleft()
             if trigger_id in self.triggers:
-                # We only delete if it did not exit already
-                self.triggers[trigger_id]["task"].cancel()
+                shared_ids = self.triggers[trigger_id].get("shared_ids")
+                if shared_ids is not None and len(shared_ids) > 1:
+                    # Other triggers share the run, which goes on for them
+                    shared_ids.discard(trigger_id)
+                    del self.triggers[trigger_id]
+                else:
+                    # We only delete if it did not exit already
+                    self.triggers[trigger_id]["task"].cancel()
             await asyncio.sleep(0)
+        self._forget_finished_shared_runs()
+
+    def _forget_finished_shared_runs(self) -> None:
+        for key, shared_ids in list(self.shared_trigger_ids.items()):
+            if not shared_ids:
+                del self.shared_trigger_ids[key]
 
     async def cleanup_finished_triggers(self):
         """
@@ -533,7 +969,7 @@ class TriggerRunner(threading.Thread, LoggingMixin):
                     # These are "expected" exceptions and we stop processing here
                     # If we don't, then the system requesting a trigger be removed -
                     # which turns into CancelledError - results in a failure.
-                    del self.triggers[trigger_id]
+                    self._remove_finished_trigger(trigger_id)
                     continue
                 except BaseException as e:
                     # This is potentially bad, so log it.
@@ -553,8 +989,14 @@ class TriggerRunner(threading.Thread, LoggingMixin):
                         details["name"],
                     )
                     self.failed_triggers.append((trigger_id, saved_exc))
-                del self.triggers[trigger_id]
+                self._remove_finished_trigger(trigger_id)
             await asyncio.sleep(0)
+        self._forget_finished_shared_runs()
+
+    def _remove_finished_trigger(self, trigger_id: int) -> None:
+        shared_ids = self.triggers.pop(trigger_id).get("shared_ids")
+        if shared_ids is not None:
+            shared_ids.discard(trigger_id)
 
     async def block_watchdog(self):
         """
@@ -565,8 +1007,8 @@ class TriggerRunner(threading.Thread, LoggingMixin):
         there are badly-written triggers taking longer than that and blocking
         the event loop.
 
-        Unfortunately, we can't tell what trigger is blocking things, but
-        we can at least detect the top-level problem.
+        The steps of the triggers are also timed, which tells what trigger is
+        blocking things; see :meth:`record_trigger_step`.
         """
         while not self.stop:
             last_run = time.monotonic()
@@ -574,6 +1016,9 @@ class TriggerRunner(threading.Thread, LoggingMixin):
             # We allow a generous amount of buffer room for now, since it might
             # be a busy event loop.
             time_elapsed = time.monotonic() - last_run
+            loop_lag = max(time_elapsed - 0.1, 0.0)
+            self.max_loop_lag = max(self.max_loop_lag, loop_lag)
+            Stats.timing("triggers.event_loop_lag", loop_lag * 1000, tags={"loop": self.loop_index})
             if time_elapsed > 0.2:
                 self.log.info(
                     "Triggerer's async thread was blocked for %.2f seconds, "
@@ -597,13 +1042,26 @@ class TriggerRunner(threading.Thread, LoggingMixin):
     async def run_trigger(self, trigger_id, trigger):
         """Run a trigger (they are async generators) and push their events into our outbound event deque."""
         name = self.triggers[trigger_id]["name"]
+        # The triggers sharing this run, which may join or leave while it runs
+        shared_ids = self.triggers[trigger_id].get("shared_ids", {trigger_id})
         self.log.info("trigger %s starting", name)
+        classpath = f"{type(trigger).__module__}.{type(trigger).__qualname__}"
         try:
             self.set_individual_trigger_logging(trigger)
-            async for event in trigger.run():
-                self.log.info("Trigger %s fired: %s", self.triggers[trigger_id]["name"], event)
-                self.triggers[trigger_id]["events"] += 1
-                self.events.append((trigger_id, event))
+            if classpath in self.offloaded_classpaths:
+                self.log.info("trigger %s runs in the offload loop", name)
+                trigger_events = self._run_offloaded(trigger)
+            else:
+                trigger_events = trigger.run()
+            async for event in trigger_events:
+                self.log.info("Trigger %s fired: %s", name, event)
+                fired_at = time.monotonic()
+                for shared_id in sorted(shared_ids):
+                    if shared_id not in self.triggers:
+                        continue
+                    self.triggers[shared_id]["events"] += 1
+                    self.event_fired_at.setdefault(shared_id, fired_at)
+                    self.events.append((shared_id, event))
         except asyncio.CancelledError:
             if timeout := trigger.task_instance.trigger_timeout:
                 timeout = timeout.replace(tzinfo=timezone.utc) if not timeout.tzinfo else timeout
@@ -713,6 +1171,11 @@ class TriggerRunner(threading.Thread, LoggingMixin):
 
     def trigger_row_to_trigger_instance(self, trigger_row: Trigger, trigger_class: type[U]) -> U:
         """Convert a Trigger row into a Trigger instance."""
+        return trigger_class(**self.decrypt_trigger_kwargs(trigger_row))
+
+    @staticmethod
+    def decrypt_trigger_kwargs(trigger_row: Trigger) -> dict[str, Any]:
+        """Get the arguments of a Trigger row, decrypting the encrypted ones."""
         from airflow.models.crypto import get_fernet
 
         decrypted_kwargs = {}
@@ -724,4 +1187,4 @@ class TriggerRunner(threading.Thread, LoggingMixin):
                 ).decode("utf-8")
             else:
                 decrypted_kwargs[k] = v
-        return trigger_class(**decrypted_kwargs)
+        return decrypted_kwargs
@@ -0,0 +1,49 @@
+#
+# Licensed to the Apache Software Foundation (ASF) under one
+# or more contributor license agreements.  See the NOTICE file
+# distributed with this work for additional information
+# regarding copyright ownership.  The ASF licenses this file
+# to you under the Apache License, Version 2.0 (the
+# "License"); you may not use this file except in compliance
+# with the License.  You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+# KIND, either express or implied.  See the License for the
+# specific language governing permissions and limitations
+# under the License.
+
+"""Add partition_key to DagModel.
+
+Revision ID: da586464ee97
+Revises: 8e1c784a4fc7
+Create Date: 2024-03-20 10:12:41.472131
+
+"""
+
+import sqlalchemy as sa
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = "da586464ee97"
+down_revision = "8e1c784a4fc7"
+branch_labels = None
+depends_on = None
+airflow_version = "2.9.0"
+
+
+def upgrade():
+    """Apply Add partition_key to DagModel."""
+    # The column is filled in when the DAGs are next written to the DB by the DAG processor.
+    with op.batch_alter_table("dag") as batch_op:
+        batch_op.add_column(sa.Column("partition_key", sa.Integer(), nullable=True))
+
+
+def downgrade():
+    """Unapply Add partition_key to DagModel."""
+    with op.batch_alter_table("dag") as batch_op:
+        batch_op.drop_column("partition_key")
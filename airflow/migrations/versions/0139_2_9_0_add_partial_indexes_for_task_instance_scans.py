@@ -0,0 +1,65 @@
+#
+# Licensed to the Apache Software Foundation (ASF) under one
+# or more contributor license agreements.  See the NOTICE file
+# distributed with this work for additional information
+# regarding copyright ownership.  The ASF licenses this file
+# to you under the Apache License, Version 2.0 (the
+# "License"); you may not use this file except in compliance
+# with the License.  You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+# KIND, either express or implied.  See the License for the
+# specific language governing permissions and limitations
+# under the License.
+
+"""Add partial indexes for the scans of queued and orphaned task instances.
+
+Revision ID: d71a5ab0c87b
+Revises: da586464ee97
+Create Date: 2024-03-22 09:41:05.218433
+
+"""
+
+import sqlalchemy as sa
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = "d71a5ab0c87b"
+down_revision = "da586464ee97"
+branch_labels = None
+depends_on = None
+airflow_version = "2.9.0"
+
+ADOPTABLE_STATES = "state IN ('queued', 'running', 'restarting')"
+
+
+def upgrade():
+    """Apply Add partial indexes for the scans of queued and orphaned task instances."""
+    # Since mysql lacks partial indices, these are full indices on mysql.
+    op.create_index(
+        "ti_queued_by_job_queued_dttm",
+        "task_instance",
+        ["queued_by_job_id", "queued_dttm"],
+        unique=False,
+        postgresql_where=sa.text("state='queued'"),
+        sqlite_where=sa.text("state='queued'"),
+    )
+    op.create_index(
+        "ti_adoptable_queued_by_job",
+        "task_instance",
+        ["queued_by_job_id"],
+        unique=False,
+        postgresql_where=sa.text(ADOPTABLE_STATES),
+        sqlite_where=sa.text(ADOPTABLE_STATES),
+    )
+
+
+def downgrade():
+    """Unapply Add partial indexes for the scans of queued and orphaned task instances."""
+    op.drop_index("ti_adoptable_queued_by_job", table_name="task_instance")
+    op.drop_index("ti_queued_by_job_queued_dttm", table_name="task_instance")
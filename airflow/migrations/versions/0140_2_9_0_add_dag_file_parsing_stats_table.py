@@ -0,0 +1,61 @@
+#
+# Licensed to the Apache Software Foundation (ASF) under one
+# or more contributor license agreements.  See the NOTICE file
+# distributed with this work for additional information
+# regarding copyright ownership.  The ASF licenses this file
+# to you under the Apache License, Version 2.0 (the
+# "License"); you may not use this file except in compliance
+# with the License.  You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+# KIND, either express or implied.  See the License for the
+# specific language governing permissions and limitations
+# under the License.
+
+"""Add dag_file_parsing_stats table.
+
+Revision ID: 4b3a3f1c9e2d
+Revises: d71a5ab0c87b
+Create Date: 2024-03-25 14:02:37.816942
+
+"""
+
+import sqlalchemy as sa
+from alembic import op
+
+from airflow.migrations.db_types import TIMESTAMP
+
+# revision identifiers, used by Alembic.
+revision = "4b3a3f1c9e2d"
+down_revision = "d71a5ab0c87b"
+branch_labels = None
+depends_on = None
+airflow_version = "2.9.0"
+
+
+def upgrade():
+    """Apply Add dag_file_parsing_stats table."""
+    op.create_table(
+        "dag_file_parsing_stats",
+        sa.Column("fileloc_hash", sa.BigInteger(), autoincrement=False, nullable=False),
+        sa.Column("fileloc", sa.String(length=2000), nullable=False),
+        sa.Column("processor_subdir", sa.String(length=2000), nullable=True),
+        sa.Column("last_parsed", TIMESTAMP, nullable=False),
+        sa.Column("duration", sa.Float(), nullable=False),
+        sa.Column("cpu_time", sa.Float(), nullable=True),
+        sa.Column("peak_memory", sa.BigInteger(), nullable=True),
+        sa.Column("num_imported_modules", sa.Integer(), nullable=True),
+        sa.Column("num_db_queries", sa.Integer(), nullable=True),
+        sa.Column("quarantined_until", TIMESTAMP, nullable=True),
+        sa.Column("quarantine_reason", sa.Text(), nullable=True),
+        sa.PrimaryKeyConstraint("fileloc_hash", name=op.f("dag_file_parsing_stats_pkey")),
+    )
+
+
+def downgrade():
+    """Unapply Add dag_file_parsing_stats table."""
+    op.drop_table("dag_file_parsing_stats")
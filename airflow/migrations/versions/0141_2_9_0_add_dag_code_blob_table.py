@@ -0,0 +1,83 @@
+#
+# Licensed to the Apache Software Foundation (ASF) under one
+# or more contributor license agreements.  See the NOTICE file
+# distributed with this work for additional information
+# regarding copyright ownership.  The ASF licenses this file
+# to you under the Apache License, Version 2.0 (the
+# "License"); you may not use this file except in compliance
+# with the License.  You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+# KIND, either express or implied.  See the License for the
+# specific language governing permissions and limitations
+# under the License.
+
+"""Add dag_code_blob table to store deduplicated, compressed DAG code.
+
+Revision ID: 6f0a4b1d2c8e
+Revises: 4b3a3f1c9e2d
+Create Date: 2024-03-27 10:41:12.503618
+
+"""
+
+import zlib
+
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy.dialects import mysql
+
+# revision identifiers, used by Alembic.
+revision = "6f0a4b1d2c8e"
+down_revision = "4b3a3f1c9e2d"
+branch_labels = None
+depends_on = None
+airflow_version = "2.9.0"
+
+
+def upgrade():
+    """Apply Add dag_code_blob table to store deduplicated, compressed DAG code."""
+    op.create_table(
+        "dag_code_blob",
+        sa.Column("source_hash", sa.String(length=64), nullable=False),
+        sa.Column("source_size", sa.BigInteger(), nullable=False),
+        sa.Column(
+            "compressed_source", sa.LargeBinary().with_variant(mysql.MEDIUMBLOB(), "mysql"), nullable=False
+        ),
+        sa.PrimaryKeyConstraint("source_hash", name=op.f("dag_code_blob_pkey")),
+    )
+    # The code of the existing rows is moved to dag_code_blob when their file changes.
+    with op.batch_alter_table("dag_code") as batch_op:
+        batch_op.add_column(sa.Column("source_hash", sa.String(length=64), nullable=True))
+        batch_op.alter_column(
+            "source_code",
+            existing_type=sa.Text().with_variant(mysql.MEDIUMTEXT(), "mysql"),
+            nullable=True,
+        )
+
+
+def downgrade():
+    """Unapply Add dag_code_blob table to store deduplicated, compressed DAG code."""
+    conn = op.get_bind()
+    rows = conn.execute(
+        sa.text(
+            "SELECT dag_code.fileloc_hash, dag_code_blob.compressed_source FROM dag_code "
+            "JOIN dag_code_blob ON dag_code.source_hash = dag_code_blob.source_hash"
+        )
+    ).fetchall()
+    for fileloc_hash, compressed_source in rows:
+        conn.execute(
+            sa.text("UPDATE dag_code SET source_code = :source_code WHERE fileloc_hash = :fileloc_hash"),
+            {"source_code": zlib.decompress(compressed_source).decode("utf-8"), "fileloc_hash": fileloc_hash},
+        )
+    with op.batch_alter_table("dag_code") as batch_op:
+        batch_op.alter_column(
+            "source_code",
+            existing_type=sa.Text().with_variant(mysql.MEDIUMTEXT(), "mysql"),
+            nullable=False,
+        )
+        batch_op.drop_column("source_hash")
+    op.drop_table("dag_code_blob")
@@ -0,0 +1,58 @@
+#
+# Licensed to the Apache Software Foundation (ASF) under one
+# or more contributor license agreements.  See the NOTICE file
+# distributed with this work for additional information
+# regarding copyright ownership.  The ASF licenses this file
+# to you under the Apache License, Version 2.0 (the
+# "License"); you may not use this file except in compliance
+# with the License.  You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+# KIND, either express or implied.  See the License for the
+# specific language governing permissions and limitations
+# under the License.
+
+"""Add triggerer_load table.
+
+Revision ID: 9d1e5c7b3a24
+Revises: 6f0a4b1d2c8e
+Create Date: 2024-03-28 10:41:09.382115
+
+"""
+
+import sqlalchemy as sa
+import sqlalchemy_jsonfield
+from alembic import op
+
+from airflow.migrations.db_types import TIMESTAMP
+from airflow.settings import json
+
+# revision identifiers, used by Alembic.
+revision = "9d1e5c7b3a24"
+down_revision = "6f0a4b1d2c8e"
+branch_labels = None
+depends_on = None
+airflow_version = "2.9.0"
+
+
+def upgrade():
+    """Apply Add triggerer_load table."""
+    op.create_table(
+        "triggerer_load",
+        sa.Column("triggerer_id", sa.Integer(), autoincrement=False, nullable=False),
+        sa.Column("updated_at", TIMESTAMP, nullable=False),
+        sa.Column("num_triggers", sa.Integer(), nullable=False),
+        sa.Column("loop_lag", sa.Float(), nullable=False),
+        sa.Column("cpu_usage", sa.Float(), nullable=False),
+        sa.Column("load_by_classpath", sqlalchemy_jsonfield.JSONField(json=json), nullable=False),
+        sa.PrimaryKeyConstraint("triggerer_id", name=op.f("triggerer_load_pkey")),
+    )
+
+
+def downgrade():
+    """Unapply Add triggerer_load table."""
+    op.drop_table("triggerer_load")
@@ -30,6 +30,7 @@ import time
 import traceback
 import warnings
 import weakref
+import zlib
 from collections import abc, defaultdict, deque
 from contextlib import ExitStack
 from datetime import datetime, timedelta
@@ -128,6 +129,7 @@ from airflow.utils.dates import cron_presets, date_range as utils_date_range
 from airflow.utils.decorators import fixup_decorator_warning_stack
 from airflow.utils.helpers import at_most_one, exactly_one, validate_key
 from airflow.utils.log.logging_mixin import LoggingMixin
+from airflow.utils.scheduler_wakeup import notify_scheduler
 from airflow.utils.session import NEW_SESSION, provide_session
 from airflow.utils.sqlalchemy import (
     Interval,
@@ -146,6 +148,7 @@ if TYPE_CHECKING:
     from pendulum.tz.timezone import FixedTimezone, Timezone
     from sqlalchemy.orm.query import Query
     from sqlalchemy.orm.session import Session
+    from sqlalchemy.sql.elements import ColumnElement
 
     from airflow.decorators import TaskDecoratorCollection
     from airflow.models.dagbag import DagBag
@@ -2951,6 +2954,50 @@ class DAG(LoggingMixin):
         :param dag_hash: Hash of Serialized DAG
         :param data_interval: Data interval of the DagRun
         """
+        run = self._build_dagrun(
+            state=state,
+            execution_date=execution_date,
+            run_id=run_id,
+            start_date=start_date,
+            external_trigger=external_trigger,
+            conf=conf,
+            run_type=run_type,
+            dag_hash=dag_hash,
+            creating_job_id=creating_job_id,
+            data_interval=data_interval,
+        )
+        session.add(run)
+        session.flush()
+
+        run.dag = self
+
+        # create the associated task instances
+        # state is None at the moment of creation
+        run.verify_integrity(session=session)
+
+        if run.run_type != DagRunType.BACKFILL_JOB:
+            notify_scheduler(session=session)
+
+        return run
+
+    def _build_dagrun(
+        self,
+        state: DagRunState,
+        execution_date: datetime | None,
+        run_id: str | None,
+        start_date: datetime | None,
+        external_trigger: bool | None,
+        conf: dict | None,
+        run_type: DagRunType | None,
+        dag_hash: str | None,
+        creating_job_id: int | None,
+        data_interval: tuple[datetime, datetime] | None,
+    ) -> DagRun:
+        """
+        Validate the arguments of ``create_dagrun`` and build the DAG run.
+
+        The DAG run is neither added to a session nor given task instances.
+        """
         logical_date = timezone.coerce_datetime(execution_date)
 
         if data_interval and not isinstance(data_interval, DataInterval):
@@ -2960,7 +3007,7 @@ class DAG(LoggingMixin):
             warnings.warn(
                 "Calling `DAG.create_dagrun()` without an explicit data interval is deprecated",
                 RemovedInAirflow3Warning,
-                stacklevel=3,
+                stacklevel=4,
             )
             if run_type == DagRunType.MANUAL:
                 data_interval = self.timetable.infer_manual_data_interval(run_after=logical_date)
@@ -3010,7 +3057,7 @@ class DAG(LoggingMixin):
         copied_params.update(conf or {})
         copied_params.validate()
 
-        run = DagRun(
+        return DagRun(
             dag_id=self.dag_id,
             run_id=run_id,
             execution_date=logical_date,
@@ -3023,16 +3070,6 @@ class DAG(LoggingMixin):
             creating_job_id=creating_job_id,
             data_interval=data_interval,
         )
-        session.add(run)
-        session.flush()
-
-        run.dag = self
-
-        # create the associated task instances
-        # state is None at the moment of creation
-        run.verify_integrity(session=session)
-
-        return run
 
     @classmethod
     @provide_session
@@ -3133,6 +3170,8 @@ class DAG(LoggingMixin):
                 orm_dag.owners = dag.owner
             orm_dag.is_active = True
             orm_dag.has_import_errors = False
+            if orm_dag.partition_key is None:
+                orm_dag.partition_key = DagModel.get_partition_key(orm_dag.dag_id)
             orm_dag.last_parsed_time = timezone.utcnow()
             orm_dag.default_view = dag.default_view
             orm_dag.description = dag.description
@@ -3625,6 +3664,10 @@ class DagModel(Base):
     # Earliest time at which this ``next_dagrun`` can be created.
     next_dagrun_create_after = Column(UtcDateTime)
 
+    # Stable hash of the dag_id, used to split the DAGs between schedulers when
+    # ``[scheduler] use_partitioned_scheduling`` is enabled.
+    partition_key = Column(Integer)
+
     __table_args__ = (
         Index("idx_root_dag_id", root_dag_id, unique=False),
         Index("idx_next_dagrun_create_after", next_dagrun_create_after, unique=False),
@@ -3645,6 +3688,8 @@ class DagModel(Base):
     NUM_DAGS_PER_DAGRUN_QUERY = airflow_conf.getint(
         "scheduler", "max_dagruns_to_create_per_loop", fallback=10
     )
+    # partition_key is in the [0, PARTITION_KEY_SPACE) range.
+    PARTITION_KEY_SPACE = 1 << 16
 
     def __init__(self, concurrency=None, **kwargs):
         super().__init__(**kwargs)
@@ -3671,9 +3716,32 @@ class DagModel(Base):
             # Be safe -- this will be updated later once the DAG is parsed
             self.has_task_concurrency_limits = True
 
+        if self.partition_key is None and self.dag_id is not None:
+            self.partition_key = self.get_partition_key(self.dag_id)
+
     def __repr__(self):
         return f"<DAG: {self.dag_id}>"
 
+    @classmethod
+    def get_partition_key(cls, dag_id: str) -> int:
+        """Get the partition key of a DAG; it must not depend on the process computing it."""
+        return zlib.crc32(dag_id.encode("utf-8")) % cls.PARTITION_KEY_SPACE
+
+    @classmethod
+    def in_partition(cls, partition_key_range: tuple[int, int]) -> ColumnElement[bool]:
+        """
+        Filter DAGs belonging to the given partition.
+
+        DAGs without a partition key are considered part of every partition.
+
+        :param partition_key_range: Half-open range of partition keys ``[start, stop)``
+        """
+        start, stop = partition_key_range
+        return or_(
+            cls.partition_key.is_(None),
+            and_(cls.partition_key >= start, cls.partition_key < stop),
+        )
+
     @property
     def next_dagrun_data_interval(self) -> DataInterval | None:
         return _get_model_data_interval(
@@ -3817,13 +3885,19 @@ class DagModel(Base):
                 dag_model.is_active = False
 
     @classmethod
-    def dags_needing_dagruns(cls, session: Session) -> tuple[Query, dict[str, tuple[datetime, datetime]]]:
+    def dags_needing_dagruns(
+        cls,
+        session: Session,
+        partition_key_range: tuple[int, int] | None = None,
+    ) -> tuple[Query, dict[str, tuple[datetime, datetime]]]:
         """
         Return (and lock) a list of Dag objects that are due to create a new DagRun.
 
         This will return a resultset of rows that is row-level-locked with a "SELECT ... FOR UPDATE" query,
         you should ensure that any scheduling decisions are made in a single transaction -- as soon as the
         transaction is committed it will be unlocked.
+
+        :param partition_key_range: If set, only return DAGs in this partition (see ``in_partition``)
         """
         from airflow.models.serialized_dag import SerializedDagModel
 
@@ -3894,6 +3968,8 @@ class DagModel(Base):
             .order_by(cls.next_dagrun_create_after)
             .limit(cls.NUM_DAGS_PER_DAGRUN_QUERY)
         )
+        if partition_key_range is not None:
+            query = query.where(cls.in_partition(partition_key_range))
 
         return (
             session.scalars(with_row_locks(query, of=cls, session=session, skip_locked=True)),
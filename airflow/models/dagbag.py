@@ -26,10 +26,12 @@ import textwrap
 import traceback
 import warnings
 import zipfile
+from collections import OrderedDict
 from datetime import datetime, timedelta
 from pathlib import Path
-from typing import TYPE_CHECKING, NamedTuple
+from typing import TYPE_CHECKING, Collection, NamedTuple
 
+from sqlalchemy import select
 from sqlalchemy.exc import OperationalError
 from tabulate import tabulate
 
@@ -55,7 +57,7 @@ from airflow.utils.file import (
 )
 from airflow.utils.log.logging_mixin import LoggingMixin
 from airflow.utils.retries import MAX_DB_RETRIES, run_with_db_retries
-from airflow.utils.session import NEW_SESSION, provide_session
+from airflow.utils.session import NEW_SESSION, create_session, provide_session
 from airflow.utils.timeout import timeout
 from airflow.utils.types import NOTSET
 
@@ -63,6 +65,7 @@ if TYPE_CHECKING:
     from sqlalchemy.orm import Session
 
     from airflow.models.dag import DAG
+    from airflow.models.serialized_dag import SerializedDagModel
     from airflow.utils.types import ArgNotSet
 
 
@@ -94,6 +97,8 @@ class DagBag(LoggingMixin):
     :param load_op_links: Should the extra operator link be loaded via plugins when
         de-serializing the DAG? This flag is set to False in Scheduler so that Extra Operator links
         are not loaded to not run User code in Scheduler.
+    :param max_size: the maximum number of DAGs kept in memory when reading DAGs from DB, the least
+        recently used DAGs being evicted once it is reached. 0 means no limit.
     """
 
     def __init__(
@@ -105,6 +110,7 @@ class DagBag(LoggingMixin):
         store_serialized_dags: bool | None = None,
         load_op_links: bool = True,
         collect_dags: bool = True,
+        max_size: int = 0,
     ):
         # Avoid circular import
 
@@ -130,7 +136,9 @@ class DagBag(LoggingMixin):
 
         dag_folder = dag_folder or settings.DAGS_FOLDER
         self.dag_folder = dag_folder
-        self.dags: dict[str, DAG] = {}
+        # Ordered from the least to the most recently used when the number of DAGs read from DB is bounded
+        self.dags: dict[str, DAG] = OrderedDict() if read_dags_from_db and max_size else {}
+        self.max_size = max_size if read_dags_from_db else 0
         # the file's last modified timestamp when we last read it
         self.file_last_changed: dict[str, datetime] = {}
         self.import_errors: dict[str, str] = {}
@@ -187,47 +195,7 @@ class DagBag(LoggingMixin):
         from airflow.models.dag import DagModel
 
         if self.read_dags_from_db:
-            # Import here so that serialized dag is only imported when serialization is enabled
-            from airflow.models.serialized_dag import SerializedDagModel
-
-            if dag_id not in self.dags:
-                # Load from DB if not (yet) in the bag
-                self._add_dag_from_db(dag_id=dag_id, session=session)
-                return self.dags.get(dag_id)
-
-            # If DAG is in the DagBag, check the following
-            # 1. if time has come to check if DAG is updated (controlled by min_serialized_dag_fetch_secs)
-            # 2. check the last_updated and hash columns in SerializedDag table to see if
-            # Serialized DAG is updated
-            # 3. if (2) is yes, fetch the Serialized DAG.
-            # 4. if (2) returns None (i.e. Serialized DAG is deleted), remove dag from dagbag
-            # if it exists and return None.
-            min_serialized_dag_fetch_secs = timedelta(seconds=settings.MIN_SERIALIZED_DAG_FETCH_INTERVAL)
-            if (
-                dag_id in self.dags_last_fetched
-                and timezone.utcnow() > self.dags_last_fetched[dag_id] + min_serialized_dag_fetch_secs
-            ):
-                sd_latest_version_and_updated_datetime = (
-                    SerializedDagModel.get_latest_version_hash_and_updated_datetime(
-                        dag_id=dag_id, session=session
-                    )
-                )
-                if not sd_latest_version_and_updated_datetime:
-                    self.log.warning("Serialized DAG %s no longer exists", dag_id)
-                    del self.dags[dag_id]
-                    del self.dags_last_fetched[dag_id]
-                    del self.dags_hash[dag_id]
-                    return None
-
-                sd_latest_version, sd_last_updated_datetime = sd_latest_version_and_updated_datetime
-
-                if (
-                    sd_last_updated_datetime > self.dags_last_fetched[dag_id]
-                    or sd_latest_version != self.dags_hash[dag_id]
-                ):
-                    self._add_dag_from_db(dag_id=dag_id, session=session)
-
-            return self.dags.get(dag_id)
+            return self.get_dags([dag_id], session=session).get(dag_id)
 
         # If asking for a known subdag, we want to refresh the parent
         dag = None
@@ -265,6 +233,89 @@ class DagBag(LoggingMixin):
                 del self.dags[dag_id]
         return self.dags.get(dag_id)
 
+    @provide_session
+    def get_dags(self, dag_ids: Collection[str], session: Session = NEW_SESSION) -> dict[str, DAG]:
+        """
+        Get DAGs read from DB, refreshing the expired ones in bulk.
+
+        DAGs not in the bag yet, or updated in the DB since they were last fetched, are read from DB.
+        Whether the DAGs were updated is only checked every ``[core] min_serialized_dag_fetch_interval``.
+        DAGs whose serialized DAG no longer exists are removed from the bag.
+
+        :param dag_ids: the ids of the DAGs
+        :param session: ORM Session
+        :return: the DAGs found, by DAG id
+        """
+        if not self.read_dags_from_db:
+            return {dag_id: dag for dag_id in dag_ids if (dag := self.get_dag(dag_id, session=session))}
+
+        # Import here so that serialized dag is only imported when serialization is enabled
+        from airflow.models.serialized_dag import SerializedDagModel
+
+        to_fetch = [dag_id for dag_id in dag_ids if dag_id not in self.dags]
+        min_serialized_dag_fetch_secs = timedelta(seconds=settings.MIN_SERIALIZED_DAG_FETCH_INTERVAL)
+        now = timezone.utcnow()
+        to_check = [
+            dag_id
+            for dag_id in dag_ids
+            if dag_id in self.dags_last_fetched
+            and now > self.dags_last_fetched[dag_id] + min_serialized_dag_fetch_secs
+        ]
+        if to_check:
+            # Check the last_updated and hash columns in SerializedDag table to see if the DAGs were updated
+            latest_versions = {
+                dag_id: (dag_hash, last_updated)
+                for dag_id, dag_hash, last_updated in session.execute(
+                    select(
+                        SerializedDagModel.dag_id,
+                        SerializedDagModel.dag_hash,
+                        SerializedDagModel.last_updated,
+                    ).where(SerializedDagModel.dag_id.in_(to_check))
+                )
+            }
+            for dag_id in to_check:
+                if dag_id not in latest_versions:
+                    self.log.warning("Serialized DAG %s no longer exists", dag_id)
+                    del self.dags[dag_id]
+                    del self.dags_last_fetched[dag_id]
+                    del self.dags_hash[dag_id]
+                    continue
+                dag_hash, last_updated = latest_versions[dag_id]
+                if last_updated > self.dags_last_fetched[dag_id] or dag_hash != self.dags_hash[dag_id]:
+                    to_fetch.append(dag_id)
+
+        fetched_dag_ids = set(to_fetch)
+        if to_fetch:
+            self._add_dags_from_db(to_fetch, session=session)
+
+        dags = {}
+        for dag_id in dag_ids:
+            dag = self.dags.get(dag_id)
+            if dag is None:
+                continue
+            dags[dag_id] = dag
+            if dag_id not in fetched_dag_ids:
+                Stats.incr("dagbag.cache.hit")
+            if self.max_size:
+                self.dags.move_to_end(dag_id)  # type: ignore[attr-defined]
+        self._evict_dags()
+        return dags
+
+    def _add_dags_from_db(self, dag_ids: Collection[str], session: Session) -> None:
+        """Add DAGs to DagBag from DB."""
+        from airflow.models.serialized_dag import SerializedDagModel
+
+        Stats.incr("dagbag.cache.miss", len(dag_ids))
+        rows = session.scalars(select(SerializedDagModel).where(SerializedDagModel.dag_id.in_(dag_ids)))
+        found_dag_ids = set()
+        for row in rows:
+            found_dag_ids.add(row.dag_id)
+            self._add_row_from_db(row)
+        for dag_id in dag_ids:
+            if dag_id not in found_dag_ids:
+                # SubDAGs are stored in the serialized DAG of their root DAG.
+                self._add_dag_from_db(dag_id=dag_id, session=session)
+
     def _add_dag_from_db(self, dag_id: str, session: Session):
         """Add DAG to DagBag from DB."""
         from airflow.models.serialized_dag import SerializedDagModel
@@ -272,7 +323,9 @@ class DagBag(LoggingMixin):
         row = SerializedDagModel.get(dag_id, session)
         if not row:
             return None
+        self._add_row_from_db(row)
 
+    def _add_row_from_db(self, row: SerializedDagModel) -> None:
         row.load_op_links = self.load_op_links
         dag = row.dag
         for subdag in dag.subdags:
@@ -281,6 +334,16 @@ class DagBag(LoggingMixin):
         self.dags_last_fetched[dag.dag_id] = timezone.utcnow()
         self.dags_hash[dag.dag_id] = row.dag_hash
 
+    def _evict_dags(self) -> None:
+        """Evict the least recently used DAGs read from DB, if there are more of them than allowed."""
+        if not self.max_size:
+            return
+        while len(self.dags) > self.max_size:
+            dag_id, _ = self.dags.popitem(last=False)  # type: ignore[call-arg]
+            self.dags_last_fetched.pop(dag_id, None)
+            self.dags_hash.pop(dag_id, None)
+            Stats.incr("dagbag.cache.evicted")
+
     def process_file(self, filepath, only_if_updated=True, safe_mode=True):
         """Given a path to a python module or zip file, import the module and look for dag objects within."""
         from airflow.models.dag import DagContext
@@ -577,6 +640,14 @@ class DagBag(LoggingMixin):
 
             # The dagbag contains all rows in serialized_dag table. Deleted DAGs are deleted
             # from the table by the scheduler job.
+            if self.max_size:
+                # Only the most recently read DAGs are kept, the others being evicted as they are read.
+                self.dags.clear()
+                with create_session() as session:
+                    for row in SerializedDagModel.iter_all_rows(session=session):
+                        self._add_row_from_db(row)
+                        self._evict_dags()
+                return
             self.dags = SerializedDagModel.read_all_dags()
 
             # Adds subdags.
@@ -624,35 +695,31 @@ class DagBag(LoggingMixin):
 
         log = cls.logger()
 
-        def _serialize_dag_capturing_errors(dag, session, processor_subdir):
+        def _serialize_dags_capturing_errors(dags, session, processor_subdir):
             """
-            Try to serialize the dag to the DB, but make a note of any errors.
+            Try to serialize the dags to the DB, but make a note of any errors.
 
             We can't place them directly in import_errors, as this may be retried, and work the next time
             """
-            if dag.is_subdag:
-                return []
-            try:
-                # We can't use bulk_write_to_db as we want to capture each error individually
-                dag_was_updated = SerializedDagModel.write_dag(
-                    dag,
-                    min_update_interval=settings.MIN_SERIALIZED_DAG_UPDATE_INTERVAL,
-                    session=session,
-                    processor_subdir=processor_subdir,
-                )
-                if dag_was_updated:
-                    DagBag._sync_perm_for_dag(dag, session=session)
-                return []
-            except OperationalError:
-                raise
-            except Exception:
-                log.exception("Failed to write serialized DAG: %s", dag.fileloc)
-                dagbag_import_error_traceback_depth = conf.getint(
-                    "core", "dagbag_import_error_traceback_depth"
+            updated_dags, errors = SerializedDagModel.write_dags(
+                [dag for dag in dags.values() if not dag.is_subdag],
+                min_update_interval=settings.MIN_SERIALIZED_DAG_UPDATE_INTERVAL,
+                session=session,
+                processor_subdir=processor_subdir,
+            )
+            for dag in updated_dags:
+                DagBag._sync_perm_for_dag(dag, session=session)
+            dagbag_import_error_traceback_depth = conf.getint("core", "dagbag_import_error_traceback_depth")
+            serialize_errors = []
+            for dag_id, e in errors.items():
+                log.error("Failed to write serialized DAG: %s", dags[dag_id].fileloc, exc_info=e)
+                exc_traceback = traceback.format_exception(
+                    type(e), e, e.__traceback__, limit=-dagbag_import_error_traceback_depth
                 )
-                return [(dag.fileloc, traceback.format_exc(limit=-dagbag_import_error_traceback_depth))]
+                serialize_errors.append((dags[dag_id].fileloc, "".join(exc_traceback)))
+            return serialize_errors
 
-        # Retry 'DAG.bulk_write_to_db' & 'SerializedDagModel.bulk_sync_to_db' in case
+        # Retry 'DAG.bulk_write_to_db' & 'SerializedDagModel.write_dags' in case
         # of any Operational Errors
         # In case of failures, provide_session handles rollback
         import_errors = {}
@@ -667,10 +734,7 @@ class DagBag(LoggingMixin):
                 log.debug("Calling the DAG.bulk_sync_to_db method")
                 try:
                     # Write Serialized DAGs to DB, capturing errors
-                    for dag in dags.values():
-                        serialize_errors.extend(
-                            _serialize_dag_capturing_errors(dag, session, processor_subdir)
-                        )
+                    serialize_errors.extend(_serialize_dags_capturing_errors(dags, session, processor_subdir))
 
                     DAG.bulk_write_to_db(dags.values(), processor_subdir=processor_subdir, session=session)
                 except OperationalError:
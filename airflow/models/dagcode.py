@@ -16,33 +16,90 @@
 # under the License.
 from __future__ import annotations
 
+import hashlib
 import logging
 import os
 import struct
+import zlib
 from datetime import datetime
-from typing import TYPE_CHECKING, Collection, Iterable
+from typing import TYPE_CHECKING, Collection, Iterable, Iterator
 
-from sqlalchemy import BigInteger, Column, String, Text, delete, select
-from sqlalchemy.dialects.mysql import MEDIUMTEXT
+from sqlalchemy import BigInteger, Column, LargeBinary, String, Text, delete, exc, select
+from sqlalchemy.dialects.mysql import MEDIUMBLOB, MEDIUMTEXT
+from sqlalchemy.orm import object_session
 from sqlalchemy.sql.expression import literal
 
 from airflow.exceptions import AirflowException, DagCodeNotFound
 from airflow.models.base import Base
 from airflow.utils import timezone
 from airflow.utils.file import correct_maybe_zipped, open_maybe_zipped
-from airflow.utils.session import NEW_SESSION, provide_session
-from airflow.utils.sqlalchemy import UtcDateTime
+from airflow.utils.session import NEW_SESSION, create_session, provide_session
+from airflow.utils.sqlalchemy import UtcDateTime, with_row_locks
 
 if TYPE_CHECKING:
     from sqlalchemy.orm import Session
 
 log = logging.getLogger(__name__)
 
+# Size of the chunks of decompressed code yielded when streaming code.
+CODE_STREAM_CHUNK_SIZE = 64 * 1024
+
+
+class DagCodeBlob(Base):
+    """A table for the code of DAG files, compressed, and keyed by the hash of the code.
+
+    DAG files with the same code, such as generated DAG files, share the same row. Rows are
+    deleted once no DagCode references them. DAG processors lock the rows they check before
+    referencing or deleting them, and write the code again if it is missing when syncing a file.
+    """
+
+    __tablename__ = "dag_code_blob"
+
+    # SHA-256 hex digest of the code encoded in UTF-8
+    source_hash = Column(String(64), primary_key=True)
+    # Size of the code encoded in UTF-8, in bytes
+    source_size = Column(BigInteger, nullable=False)
+    compressed_source = Column(LargeBinary().with_variant(MEDIUMBLOB(), "mysql"), nullable=False)
+
+    @staticmethod
+    def hash_source(source: str) -> str:
+        """Return the hash of a source code, the key of its row."""
+        return hashlib.sha256(source.encode("utf-8")).hexdigest()
+
+    @staticmethod
+    def iter_decompressed(
+        compressed: bytes, start: int = 0, end: int | None = None, chunk_size: int = CODE_STREAM_CHUNK_SIZE
+    ) -> Iterator[bytes]:
+        """Decompress a range of compressed code lazily, in chunks.
+
+        :param compressed: the compressed code
+        :param start: the offset of the first byte of the range
+        :param end: the offset after the last byte of the range, the end of the code if None
+        :param chunk_size: the maximum size of the chunks
+        """
+        decompressor = zlib.decompressobj()
+        data = compressed
+        offset = 0
+        while not decompressor.eof and (end is None or offset < end):
+            chunk = decompressor.decompress(data, chunk_size)
+            data = decompressor.unconsumed_tail
+            if not chunk and not data:
+                break
+            chunk_start, offset = offset, offset + len(chunk)
+            if offset <= start:
+                continue
+            chunk = chunk[max(start - chunk_start, 0) :]
+            if end is not None and offset > end:
+                chunk = chunk[: len(chunk) - (offset - end)]
+            if chunk:
+                yield chunk
+
 
 class DagCode(Base):
     """A table for DAGs code.
 
-    dag_code table contains code of DAG files synchronized by scheduler.
+    dag_code table contains code of DAG files synchronized by scheduler. The code is stored
+    compressed in dag_code_blob, shared by the files with the same code.
 
     For details on dag serialization see SerializedDagModel
     """
@@ -53,7 +110,9 @@ class DagCode(Base):
     fileloc = Column(String(2000), nullable=False)
     # The max length of fileloc exceeds the limit of indexing.
     last_updated = Column(UtcDateTime, nullable=False)
-    source_code = Column(Text().with_variant(MEDIUMTEXT(), "mysql"), nullable=False)
+    source_hash = Column(String(64), nullable=True)
+    # The code of the rows written before the code was stored in dag_code_blob, until the file changes.
+    _source_code = Column("source_code", Text().with_variant(MEDIUMTEXT(), "mysql"), nullable=True)
 
     def __init__(self, full_filepath: str, source_code: str | None = None):
         self.fileloc = full_filepath
@@ -61,6 +120,39 @@ class DagCode(Base):
         self.last_updated = timezone.utcnow()
         self.source_code = source_code or DagCode.code(self.fileloc)
 
+    @property
+    def source_code(self) -> str:
+        """The code of the file, from dag_code_blob unless the row predates it."""
+        cached = self.__dict__.get("_source")
+        if cached is not None and cached[0] == self.source_hash:
+            return cached[1]
+        if self.source_hash is None:
+            return self._source_code
+        session = object_session(self)
+        if session is not None:
+            compressed = self._get_compressed_source(self.source_hash, session)
+        else:
+            with create_session() as session:
+                compressed = self._get_compressed_source(self.source_hash, session)
+        source = zlib.decompress(compressed).decode("utf-8")
+        self.__dict__["_source"] = (self.source_hash, source)
+        return source
+
+    @source_code.setter
+    def source_code(self, source: str) -> None:
+        self.source_hash = DagCodeBlob.hash_source(source)
+        self.__dict__["_source"] = (self.source_hash, source)
+        self._source_code = None
+
+    @staticmethod
+    def _get_compressed_source(source_hash: str, session: Session) -> bytes:
+        compressed = session.scalar(
+            select(DagCodeBlob.compressed_source).where(DagCodeBlob.source_hash == source_hash)
+        )
+        if compressed is None:
+            raise DagCodeNotFound()
+        return compressed
+
     @provide_session
     def sync_to_db(self, session: Session = NEW_SESSION) -> None:
         """Write code into database.
@@ -109,10 +201,9 @@ class DagCode(Base):
         existing_filelocs = {dag_code.fileloc for dag_code in existing_orm_dag_codes}
         missing_filelocs = filelocs.difference(existing_filelocs)
 
-        for fileloc in missing_filelocs:
-            orm_dag_code = DagCode(fileloc, cls._get_code_from_file(fileloc))
-            session.add(orm_dag_code)
-
+        new_dag_codes = [DagCode(fileloc, cls._get_code_from_file(fileloc)) for fileloc in missing_filelocs]
+        updated_dag_codes = []
+        dereferenced_hashes = set()
         for fileloc in existing_filelocs:
             current_version = existing_orm_dag_codes_by_fileloc_hashes[filelocs_to_hashes[fileloc]]
             file_mod_time = datetime.fromtimestamp(
@@ -121,9 +212,122 @@ class DagCode(Base):
 
             if file_mod_time > current_version.last_updated:
                 orm_dag_code = existing_orm_dag_codes_map[fileloc]
+                previous_hash = orm_dag_code.source_hash
                 orm_dag_code.last_updated = file_mod_time
                 orm_dag_code.source_code = cls._get_code_from_file(orm_dag_code.fileloc)
-                session.merge(orm_dag_code)
+                if previous_hash is not None and previous_hash != orm_dag_code.source_hash:
+                    dereferenced_hashes.add(previous_hash)
+                updated_dag_codes.append(orm_dag_code)
+
+        unchanged_dag_codes = set(existing_orm_dag_codes).difference(updated_dag_codes)
+        cls._write_blobs([*new_dag_codes, *updated_dag_codes], unchanged_dag_codes, session=session)
+        session.add_all(new_dag_codes)
+        for orm_dag_code in updated_dag_codes:
+            session.merge(orm_dag_code)
+        if dereferenced_hashes:
+            session.flush()
+            cls._remove_unreferenced_blobs(dereferenced_hashes, session=session)
+
+    @classmethod
+    def _write_blobs(
+        cls,
+        dag_codes: Collection[DagCode],
+        unchanged_dag_codes: Collection[DagCode],
+        session: Session,
+    ) -> None:
+        """Write the code of DagCode objects to dag_code_blob, unless code with the same hash is there.
+
+        The code already there which new or changed DagCode objects reference is locked until the end
+        of the transaction, for other DAG processors not to remove it meanwhile, as no committed DagCode
+        references it yet. The code of unchanged DagCode objects is referenced by committed rows, and
+        is only checked for.
+
+        :param dag_codes: the DagCode objects whose code was read from their file
+        :param unchanged_dag_codes: the DagCode objects whose code did not change. Their code is
+            read again from their file if it is missing, e.g. if it was removed concurrently.
+        :param session: ORM Session
+        """
+        hashes = {dag_code.source_hash for dag_code in dag_codes if dag_code.source_hash is not None}
+        unchanged_hashes = {
+            dag_code.source_hash for dag_code in unchanged_dag_codes if dag_code.source_hash is not None
+        }.difference(hashes)
+        existing_hashes = set(cls._lock_blobs(hashes, session=session)) if hashes else set()
+        if unchanged_hashes:
+            existing_hashes.update(
+                session.scalars(
+                    select(DagCodeBlob.source_hash).where(DagCodeBlob.source_hash.in_(unchanged_hashes))
+                )
+            )
+        sources = {dag_code.source_hash: dag_code.source_code for dag_code in dag_codes}
+        for dag_code in unchanged_dag_codes:
+            if dag_code.source_hash in unchanged_hashes and dag_code.source_hash not in existing_hashes:
+                log.warning("The code of %s is missing, writing it again", dag_code.fileloc)
+                dag_code.source_code = cls._get_code_from_file(dag_code.fileloc)
+                sources[dag_code.source_hash] = dag_code.source_code
+        rows = []
+        for source_hash, source in sources.items():
+            if source_hash in existing_hashes:
+                continue
+            encoded = source.encode("utf-8")
+            rows.append(
+                {
+                    "source_hash": source_hash,
+                    "source_size": len(encoded),
+                    "compressed_source": zlib.compress(encoded),
+                }
+            )
+        if not rows:
+            return
+        # Other DAG processors may write the same code concurrently.
+        if session.bind.dialect.name == "postgresql":
+            from sqlalchemy.dialects.postgresql import insert
+
+            session.execute(insert(DagCodeBlob).on_conflict_do_nothing(), rows)
+            return
+        for row in rows:
+            try:
+                with session.begin_nested():
+                    session.add(DagCodeBlob(**row))
+            except exc.IntegrityError:
+                log.debug("Skipping code with hash %s, already written", row["source_hash"])
+
+    @staticmethod
+    def _lock_blobs(source_hashes: Collection[str], session: Session) -> list[str]:
+        """Lock the code of dag_code_blob with the given hashes, returning the hashes of the code there.
+
+        The rows are locked in the order of their hashes, for DAG processors not to deadlock.
+        """
+        return session.scalars(
+            with_row_locks(
+                select(DagCodeBlob.source_hash)
+                .where(DagCodeBlob.source_hash.in_(source_hashes))
+                .order_by(DagCodeBlob.source_hash),
+                of=DagCodeBlob,
+                session=session,
+            )
+        ).all()
+
+    @classmethod
+    def _remove_unreferenced_blobs(cls, source_hashes: Collection[str], session: Session) -> None:
+        """Delete the code of dag_code_blob with the given hashes which no DagCode references.
+
+        The code is locked before looking for references, for DAG processors referencing it
+        concurrently to either commit their reference first, or to find it missing and write it again.
+        """
+        locked_hashes = cls._lock_blobs(source_hashes, session=session)
+        if not locked_hashes:
+            return
+        referenced_hashes = set(
+            session.scalars(select(DagCode.source_hash).where(DagCode.source_hash.in_(locked_hashes)))
+        )
+        unreferenced_hashes = set(locked_hashes) - referenced_hashes
+        if not unreferenced_hashes:
+            return
+        session.execute(
+            delete(DagCodeBlob)
+            .where(DagCodeBlob.source_hash.in_(unreferenced_hashes))
+            .execution_options(synchronize_session=False)
+        )
 
     @classmethod
     @provide_session
@@ -143,15 +347,17 @@ class DagCode(Base):
 
         log.debug("Deleting code from %s table ", cls.__tablename__)
 
-        session.execute(
-            delete(cls)
-            .where(
-                cls.fileloc_hash.notin_(alive_fileloc_hashes),
-                cls.fileloc.notin_(alive_dag_filelocs),
-                cls.fileloc.contains(processor_subdir),
-            )
-            .execution_options(synchronize_session="fetch")
+        deleted_code = (
+            cls.fileloc_hash.notin_(alive_fileloc_hashes),
+            cls.fileloc.notin_(alive_dag_filelocs),
+            cls.fileloc.contains(processor_subdir),
+        )
+        dereferenced_hashes = set(
+            session.scalars(select(cls.source_hash).where(*deleted_code, cls.source_hash.is_not(None)))
         )
+        session.execute(delete(cls).where(*deleted_code).execution_options(synchronize_session="fetch"))
+        if dereferenced_hashes:
+            cls._remove_unreferenced_blobs(dereferenced_hashes, session=session)
 
     @classmethod
     @provide_session
@@ -185,6 +391,60 @@ class DagCode(Base):
         """
         return cls._get_code_from_db(fileloc, session)
 
+    @classmethod
+    @provide_session
+    def get_code_size(cls, fileloc: str, session: Session = NEW_SESSION) -> int:
+        """Return the size of the source code for a given fileloc, encoded in UTF-8.
+
+        :param fileloc: file path of a DAG
+        :param session: ORM Session
+        :return: size of the source code in bytes
+        """
+        row = session.execute(
+            select(DagCodeBlob.source_size, cls._source_code)
+            .select_from(cls)
+            .outerjoin(DagCodeBlob, DagCodeBlob.source_hash == cls.source_hash)
+            .where(cls.fileloc_hash == cls.dag_fileloc_hash(fileloc))
+        ).one_or_none()
+        source_size, legacy_source = row or (None, None)
+        if source_size is not None:
+            return source_size
+        if legacy_source is None:
+            raise DagCodeNotFound()
+        return len(legacy_source.encode("utf-8"))
+
+    @classmethod
+    @provide_session
+    def code_stream(
+        cls,
+        fileloc: str,
+        start: int = 0,
+        end: int | None = None,
+        session: Session = NEW_SESSION,
+    ) -> Iterator[bytes]:
+        """Return the source code for a given fileloc, encoded in UTF-8, as a stream of chunks.
+
+        The code is decompressed as the stream is consumed, and only up to the end of the range.
+
+        :param fileloc: file path of a DAG
+        :param start: the offset of the first byte of the range to read
+        :param end: the offset after the last byte of the range to read, the end of the code if None
+        :param session: ORM Session
+        :return: iterator over the chunks of the range of the source code
+        """
+        row = session.execute(
+            select(DagCodeBlob.compressed_source, cls._source_code)
+            .select_from(cls)
+            .outerjoin(DagCodeBlob, DagCodeBlob.source_hash == cls.source_hash)
+            .where(cls.fileloc_hash == cls.dag_fileloc_hash(fileloc))
+        ).one_or_none()
+        compressed, legacy_source = row or (None, None)
+        if compressed is not None:
+            return DagCodeBlob.iter_decompressed(compressed, start, end)
+        if legacy_source is None:
+            raise DagCodeNotFound()
+        return iter([legacy_source.encode("utf-8")[start:end]])
+
     @staticmethod
     def _get_code_from_file(fileloc):
         with open_maybe_zipped(fileloc, "r") as f:
@@ -210,7 +470,5 @@ class DagCode(Base):
         """
         # Hashing is needed because the length of fileloc is 2000 as an Airflow convention,
         # which is over the limit of indexing.
-        import hashlib
-
         # Only 7 bytes because MySQL BigInteger can hold only 8 bytes (signed).
         return struct.unpack(">Q", hashlib.sha1(full_filepath.encode("utf-8")).digest()[-8:])[0] >> 8
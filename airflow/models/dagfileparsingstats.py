@@ -0,0 +1,104 @@
+#
+# Licensed to the Apache Software Foundation (ASF) under one
+# or more contributor license agreements.  See the NOTICE file
+# distributed with this work for additional information
+# regarding copyright ownership.  The ASF licenses this file
+# to you under the Apache License, Version 2.0 (the
+# "License"); you may not use this file except in compliance
+# with the License.  You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+# KIND, either express or implied.  See the License for the
+# specific language governing permissions and limitations
+# under the License.
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Any, Collection
+
+from sqlalchemy import BigInteger, Column, Float, Integer, String, Text, delete, select
+
+from airflow.api_internal.internal_api_call import internal_api_call
+from airflow.models.base import Base
+from airflow.models.dagcode import DagCode
+from airflow.utils.session import NEW_SESSION, provide_session
+from airflow.utils.sqlalchemy import UtcDateTime
+
+if TYPE_CHECKING:
+    from sqlalchemy.orm import Session
+
+
+class DagFileParsingStats(Base):
+    """
+    A table to store the resources used to parse DAG files, the last time they were parsed.
+
+    The DAG processor stores them when ``[scheduler] record_dag_file_parsing_stats`` is enabled,
+    along with the quarantine of the files whose parsing exceeded the memory or CPU budgets.
+    """
+
+    __tablename__ = "dag_file_parsing_stats"
+
+    fileloc_hash = Column(BigInteger, primary_key=True, autoincrement=False)
+    fileloc = Column(String(2000), nullable=False)
+    processor_subdir = Column(String(2000), nullable=True)
+    last_parsed = Column(UtcDateTime, nullable=False)
+    # In seconds
+    duration = Column(Float, nullable=False)
+    cpu_time = Column(Float, nullable=True)
+    # In bytes
+    peak_memory = Column(BigInteger, nullable=True)
+    num_imported_modules = Column(Integer, nullable=True)
+    num_db_queries = Column(Integer, nullable=True)
+    quarantined_until = Column(UtcDateTime, nullable=True)
+    quarantine_reason = Column(Text, nullable=True)
+
+    @classmethod
+    @internal_api_call
+    @provide_session
+    def record(cls, stats: list[dict[str, Any]], session: Session = NEW_SESSION) -> None:
+        """
+        Store the stats of DAG files, replacing their previous stats.
+
+        :param stats: the stats of each file, as dicts from column name to value, including ``fileloc``
+        :param session: ORM Session
+        """
+        stats_by_hash = {DagCode.dag_fileloc_hash(file_stats["fileloc"]): file_stats for file_stats in stats}
+        existing_rows = {
+            row.fileloc_hash: row
+            for row in session.scalars(select(cls).where(cls.fileloc_hash.in_(stats_by_hash)))
+        }
+        for fileloc_hash, file_stats in stats_by_hash.items():
+            row = existing_rows.get(fileloc_hash)
+            if row is None:
+                row = cls(fileloc_hash=fileloc_hash)
+                session.add(row)
+            for column, value in file_stats.items():
+                setattr(row, column, value)
+
+    @classmethod
+    @internal_api_call
+    @provide_session
+    def remove_deleted_files(
+        cls,
+        alive_filelocs: Collection[str],
+        processor_subdir: str,
+        session: Session = NEW_SESSION,
+    ) -> None:
+        """
+        Delete the stats of the files not in ``alive_filelocs``.
+
+        :param alive_filelocs: the paths of the DAG files which still exist
+        :param processor_subdir: the directory of the DAG processor
+        :param session: ORM Session
+        """
+        session.execute(
+            delete(cls)
+            .where(
+                cls.fileloc.notin_(alive_filelocs),
+                cls.processor_subdir == processor_subdir,
+            )
+            .execution_options(synchronize_session="fetch")
+        )
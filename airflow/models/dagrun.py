@@ -97,6 +97,87 @@ class TISchedulingDecision(NamedTuple):
     finished_tis: list[TI]
 
 
+class TIDependencyCheckRecord:
+    """
+    Record of the last dependency check of the task instances of a DAG run.
+
+    Passed to successive calls of ``DagRun.update_state`` for the same run, it lets them skip the
+    dependency check of the task instances found not ready the previous time, when neither they nor
+    the task instances of their upstream tasks changed since: the check would fail again. The cost
+    of a scheduling decision then grows with the number of changes rather than with the size of the
+    run.
+
+    A task instance is considered changed when its state or ``updated_at`` differ, so changes made
+    by any process are seen. Only task instances with no state are skipped, and only for tasks whose
+    dependencies are all evaluated from the other task instances of the run: the ones of mapped
+    tasks, of tasks depending on past runs and of tasks with other dependencies (such as
+    rescheduling sensors) are always checked.
+
+    :param dag_hash: Hash of the serialized DAG the record is valid for
+    """
+
+    def __init__(self, dag_hash: str | None) -> None:
+        self.dag_hash = dag_hash
+        self._ti_versions: dict[tuple[str, int], tuple[TaskInstanceState | None, datetime | None]] = {}
+        self._unready: set[tuple[str, int]] = set()
+        # Task ids whose change may change the outcome of the dependency check of a task,
+        # None when the check must always run.
+        self._relevant_task_ids: dict[str, frozenset[str] | None] = {}
+
+    def _get_relevant_task_ids(self, task: Operator) -> frozenset[str] | None:
+        if task.task_id not in self._relevant_task_ids:
+            from airflow.models.baseoperator import BaseOperator
+            from airflow.models.mappedoperator import MappedOperator
+
+            # The default dependencies are evaluated from the other task instances of the run.
+            if (
+                isinstance(task, MappedOperator)
+                or task.get_closest_mapped_task_group() is not None
+                or task.depends_on_past
+                or task.wait_for_downstream
+                or not task.deps <= BaseOperator.deps
+            ):
+                relevant_task_ids = None
+            else:
+                relevant_task_ids = frozenset(
+                    itertools.chain(
+                        (task.task_id,),
+                        task.upstream_task_ids,
+                        (setup.task_id for setup in task.get_upstreams_only_setups()),
+                    )
+                )
+            self._relevant_task_ids[task.task_id] = relevant_task_ids
+        return self._relevant_task_ids[task.task_id]
+
+    def get_unchanged_unready(self, tis: Iterable[TI]) -> set[tuple[str, int]]:
+        """Get the ``(task_id, map_index)`` of the task instances whose dependencies need no check."""
+        tis = list(tis)
+        current_keys = set()
+        changed_task_ids = set()
+        for ti in tis:
+            key = (ti.task_id, ti.map_index)
+            current_keys.add(key)
+            if self._ti_versions.get(key) != (ti.state, ti.updated_at):
+                changed_task_ids.add(ti.task_id)
+        changed_task_ids.update(task_id for task_id, _ in self._ti_versions.keys() - current_keys)
+
+        unchanged_unready = set()
+        for ti in tis:
+            key = (ti.task_id, ti.map_index)
+            if ti.state is not None or key not in self._unready:
+                continue
+            relevant_task_ids = self._get_relevant_task_ids(ti.task)
+            if relevant_task_ids is not None and relevant_task_ids.isdisjoint(changed_task_ids):
+                unchanged_unready.add(key)
+        return unchanged_unready
+
+    def record(self, tis: Iterable[TI], ready_tis: Iterable[TI]) -> None:
+        """Record the task instances of the run once their dependencies are checked."""
+        ready_keys = {(ti.task_id, ti.map_index) for ti in ready_tis}
+        self._ti_versions = {(ti.task_id, ti.map_index): (ti.state, ti.updated_at) for ti in tis}
+        self._unready = {key for key, (state, _) in self._ti_versions.items() if state is None} - ready_keys
+
+
 def _creator_note(val):
     """Creator the ``note`` association proxy."""
     if isinstance(val, str):
@@ -385,6 +466,7 @@ class DagRun(Base, LoggingMixin):
         state: DagRunState,
         session: Session,
         max_number: int | None = None,
+        partition_key_range: tuple[int, int] | None = None,
     ) -> Query:
         """
         Return the next DagRuns that the scheduler should attempt to schedule.
@@ -393,6 +475,8 @@ class DagRun(Base, LoggingMixin):
         query, you should ensure that any scheduling decisions are made in a single transaction -- as soon as
         the transaction is committed it will be unlocked.
 
+        :param partition_key_range: If set, only return runs of the DAGs in this partition
+            (see ``DagModel.in_partition``)
         """
         from airflow.models.dag import DagModel
 
@@ -407,6 +491,8 @@ class DagRun(Base, LoggingMixin):
             .join(DagModel, DagModel.dag_id == cls.dag_id)
             .where(DagModel.is_paused == false(), DagModel.is_active == true())
         )
+        if partition_key_range is not None:
+            query = query.where(DagModel.in_partition(partition_key_range))
         if state == DagRunState.QUEUED:
             # For dag runs in the queued state, we check if they have reached the max_active_runs limit
             # and if so we drop them
@@ -745,7 +831,10 @@ class DagRun(Base, LoggingMixin):
 
     @provide_session
     def update_state(
-        self, session: Session = NEW_SESSION, execute_callbacks: bool = True
+        self,
+        session: Session = NEW_SESSION,
+        execute_callbacks: bool = True,
+        dependency_check_record: TIDependencyCheckRecord | None = None,
     ) -> tuple[list[TI], DagCallbackRequest | None]:
         """
         Determine the overall state of the DagRun based on the state of its TaskInstances.
@@ -753,6 +842,9 @@ class DagRun(Base, LoggingMixin):
         :param session: Sqlalchemy ORM Session
         :param execute_callbacks: Should dag callbacks (success/failure, SLA etc.) be invoked
             directly (default: true) or recorded as a pending request in the ``returned_callback`` property
+        :param dependency_check_record: Record of the last dependency check of this run, to only check
+            the dependencies of the task instances affected by the changes made since; it is updated
+            in place
         :return: Tuple containing tis that can be scheduled in the current loop & `returned_callback` that
             needs to be executed
         """
@@ -785,7 +877,7 @@ class DagRun(Base, LoggingMixin):
             "dagrun.dependency-check", tags=self.stats_tags
         ):
             dag = self.get_dag()
-            info = self.task_instance_scheduling_decisions(session)
+            info = self.task_instance_scheduling_decisions(session, dependency_check_record)
 
             tis = info.tis
             schedulable_tis = info.schedulable_tis
@@ -917,7 +1009,11 @@ class DagRun(Base, LoggingMixin):
         return schedulable_tis, callback
 
     @provide_session
-    def task_instance_scheduling_decisions(self, session: Session = NEW_SESSION) -> TISchedulingDecision:
+    def task_instance_scheduling_decisions(
+        self,
+        session: Session = NEW_SESSION,
+        dependency_check_record: TIDependencyCheckRecord | None = None,
+    ) -> TISchedulingDecision:
         tis = self.get_task_instances(session=session, state=State.task_states)
         self.log.debug("number of tis tasks for %s: %s task(s)", self, len(tis))
 
@@ -941,6 +1037,16 @@ class DagRun(Base, LoggingMixin):
         if unfinished_tis:
             schedulable_tis = [ut for ut in unfinished_tis if ut.state in SCHEDULEABLE_STATES]
             self.log.debug("number of scheduleable tasks for %s: %s task(s)", self, len(schedulable_tis))
+            if dependency_check_record is not None:
+                unchanged_unready = dependency_check_record.get_unchanged_unready(tis)
+                schedulable_tis = [
+                    ut for ut in schedulable_tis if (ut.task_id, ut.map_index) not in unchanged_unready
+                ]
+                self.log.debug(
+                    "skipping the dependency check of %s unchanged task(s) for %s",
+                    len(unchanged_unready),
+                    self,
+                )
             schedulable_tis, changed_tis, expansion_happened = self._get_ready_tis(
                 schedulable_tis,
                 finished_tis,
@@ -958,6 +1064,9 @@ class DagRun(Base, LoggingMixin):
             schedulable_tis = []
             changed_tis = False
 
+        if dependency_check_record is not None:
+            dependency_check_record.record(tis, schedulable_tis)
+
         return TISchedulingDecision(
             tis=tis,
             schedulable_tis=schedulable_tis,
@@ -1177,11 +1286,7 @@ class DagRun(Base, LoggingMixin):
         )
 
         def task_filter(task: Operator) -> bool:
-            return task.task_id not in task_ids and (
-                self.is_backfill
-                or (task.start_date is None or task.start_date <= self.execution_date)
-                and (task.end_date is None or self.execution_date <= task.end_date)
-            )
+            return task.task_id not in task_ids and self._is_task_in_run(task)
 
         created_counts: dict[str, int] = defaultdict(int)
         task_creator = self._get_task_creator(created_counts, task_instance_mutation_hook, hook_is_noop)
@@ -1191,6 +1296,57 @@ class DagRun(Base, LoggingMixin):
         tis_to_create = self._create_tasks(tasks_to_create, task_creator, session=session)
         self._create_task_instances(self.dag_id, tis_to_create, created_counts, hook_is_noop, session=session)
 
+    @classmethod
+    def create_task_instances_for_new_runs(cls, dag_runs: Iterable[DagRun], *, session: Session) -> None:
+        """
+        Create the task instances of newly created DAG runs, with a single bulk insert.
+
+        This is what ``verify_integrity`` does for each DAG run, without looking for the existing task
+        instances of the runs first: there cannot be any yet.
+
+        :param dag_runs: DAG runs just added to the session, with their ``dag`` attribute set
+        :param session: Sqlalchemy ORM Session
+        """
+        from airflow.settings import task_instance_mutation_hook
+
+        hook_is_noop: Literal[True, False] = getattr(task_instance_mutation_hook, "is_noop", False)
+
+        tis_to_create: list[dict[str, Any]] | list[TI] = []
+        created_counts_by_run: list[tuple[DagRun, dict[str, int]]] = []
+        for dag_run in dag_runs:
+            created_counts: dict[str, int] = defaultdict(int)
+            task_creator = dag_run._get_task_creator(
+                created_counts, task_instance_mutation_hook, hook_is_noop
+            )
+            tasks_to_create = (
+                task for task in dag_run.get_dag().task_dict.values() if dag_run._is_task_in_run(task)
+            )
+            tis_to_create.extend(dag_run._create_tasks(tasks_to_create, task_creator, session=session))
+            created_counts_by_run.append((dag_run, created_counts))
+
+        if hook_is_noop:
+            session.bulk_insert_mappings(TI, tis_to_create)
+        else:
+            session.bulk_save_objects(tis_to_create)
+
+        for dag_run, created_counts in created_counts_by_run:
+            dag_run._emit_task_instance_created_metrics(created_counts)
+        session.flush()
+
+    def _is_task_in_run(self, task: Operator) -> bool:
+        """Whether the task is part of this DAG run, based on the start and end dates of the task."""
+        return (
+            self.is_backfill
+            or (task.start_date is None or task.start_date <= self.execution_date)
+            and (task.end_date is None or self.execution_date <= task.end_date)
+        )
+
+    def _emit_task_instance_created_metrics(self, created_counts: dict[str, int]) -> None:
+        for task_type, count in created_counts.items():
+            Stats.incr(f"task_instance_created_{task_type}", count, tags=self.stats_tags)
+            # Same metric with tagging
+            Stats.incr("task_instance_created", count, tags={**self.stats_tags, "task_type": task_type})
+
     def _check_for_removed_or_restored_tasks(
         self, dag: DAG, ti_mutation_hook, *, session: Session
     ) -> set[str]:
@@ -1383,10 +1539,7 @@ class DagRun(Base, LoggingMixin):
             else:
                 session.bulk_save_objects(tasks)
 
-            for task_type, count in created_counts.items():
-                Stats.incr(f"task_instance_created_{task_type}", count, tags=self.stats_tags)
-                # Same metric with tagging
-                Stats.incr("task_instance_created", count, tags={**self.stats_tags, "task_type": task_type})
+            self._emit_task_instance_created_metrics(created_counts)
             session.flush()
         except IntegrityError:
             self.log.info(
@@ -17,7 +17,7 @@
 # under the License.
 from __future__ import annotations
 
-from typing import TYPE_CHECKING, Any
+from typing import TYPE_CHECKING, Any, Callable, Iterable
 
 from sqlalchemy import Boolean, Column, Integer, String, Text, func, select
 
@@ -152,6 +152,7 @@ class Pool(Base):
     def slots_stats(
         *,
         lock_rows: bool = False,
+        get_state_counts: Callable[[], Iterable[tuple[str, TaskInstanceState, int]]] | None = None,
         session: Session = NEW_SESSION,
     ) -> dict[str, PoolStats]:
         """
@@ -162,6 +163,8 @@ class Pool(Base):
         OperationalError.
 
         :param lock_rows: Should we attempt to obtain a row-level lock on all the Pool rows returns
+        :param get_state_counts: If set, called once the Pool rows are fetched to get the number of
+            slots used by the task instances, as ``(pool, state, slots)`` rows, instead of querying them
         :param session: SQLAlchemy ORM Session
         """
         from airflow.models.taskinstance import TaskInstance  # Avoid circular import
@@ -184,11 +187,14 @@ class Pool(Base):
         allowed_execution_states = EXECUTION_STATES | {
             TaskInstanceState.DEFERRED,
         }
-        state_count_by_pool = session.execute(
-            select(TaskInstance.pool, TaskInstance.state, func.sum(TaskInstance.pool_slots))
-            .filter(TaskInstance.state.in_(allowed_execution_states))
-            .group_by(TaskInstance.pool, TaskInstance.state)
-        )
+        if get_state_counts is not None:
+            state_count_by_pool = get_state_counts()
+        else:
+            state_count_by_pool = session.execute(
+                select(TaskInstance.pool, TaskInstance.state, func.sum(TaskInstance.pool_slots))
+                .filter(TaskInstance.state.in_(allowed_execution_states))
+                .group_by(TaskInstance.pool, TaskInstance.state)
+            )
 
         # calculate queued and running metrics
         for pool_name, state, count in state_count_by_pool:
@@ -19,9 +19,10 @@
 from __future__ import annotations
 
 import logging
+import struct
 import zlib
 from datetime import timedelta
-from typing import TYPE_CHECKING, Collection
+from typing import TYPE_CHECKING, Any, Collection, Iterable, Iterator
 
 import sqlalchemy_jsonfield
 from sqlalchemy import BigInteger, Column, Index, LargeBinary, String, and_, exc, or_, select
@@ -35,7 +36,12 @@ from airflow.models.dag import DagModel
 from airflow.models.dagcode import DagCode
 from airflow.models.dagrun import DagRun
 from airflow.serialization.serialized_objects import DagDependency, SerializedDAG
-from airflow.settings import COMPRESS_SERIALIZED_DAGS, MIN_SERIALIZED_DAG_UPDATE_INTERVAL, json
+from airflow.settings import (
+    COMPRESS_SERIALIZED_DAGS,
+    INDEX_SERIALIZED_DAG_TASKS,
+    MIN_SERIALIZED_DAG_UPDATE_INTERVAL,
+    json,
+)
 from airflow.utils import timezone
 from airflow.utils.hashlib_wrapper import md5
 from airflow.utils.session import NEW_SESSION, provide_session
@@ -51,6 +57,92 @@ if TYPE_CHECKING:
 
 log = logging.getLogger(__name__)
 
+# Prefix of the data of the serialized DAGs whose tasks are indexed. zlib streams never start with a
+# null byte, so it tells them apart from the data of the other compressed serialized DAGs.
+_INDEXED_DATA_MAGIC = b"\x00AFDAG1"
+_INDEXED_DATA_HEADER_SIZE = struct.Struct(">I")
+
+
+def _get_upstream_task_ids(tasks: list[dict[str, Any]]) -> dict[str, list[str]]:
+    """Get the IDs of the upstream tasks of each of the serialized tasks, by task ID."""
+    upstream_task_ids: dict[str, list[str]] = {task["task_id"]: [] for task in tasks}
+    for task in tasks:
+        for downstream_task_id in task.get("downstream_task_ids", []):
+            upstream_task_ids[downstream_task_id].append(task["task_id"])
+    return upstream_task_ids
+
+
+def _with_upstream_task_ids(task_ids: Iterable[str], upstream_task_ids: dict[str, list[str]]) -> list[str]:
+    """
+    Get the IDs of the given tasks and of all their upstream tasks, in the order of ``upstream_task_ids``.
+
+    :raises TaskNotFound: if there is no such task
+    """
+    selected = set()
+    to_visit = list(task_ids)
+    while to_visit:
+        task_id = to_visit.pop()
+        if task_id in selected:
+            continue
+        if task_id not in upstream_task_ids:
+            raise TaskNotFound(f"Task {task_id} not found")
+        selected.add(task_id)
+        to_visit.extend(upstream_task_ids[task_id])
+    return [task_id for task_id in upstream_task_ids if task_id in selected]
+
+
+def _encode_indexed_data(dag_data: dict[str, Any]) -> bytes:
+    """
+    Encode a serialized DAG with an index of its tasks.
+
+    The data is made of the magic prefix, the size of the header, the header, then each task compressed
+    separately. The header is the compressed serialized DAG without its tasks, along with the offset and
+    size of each task after the header, and the IDs of its upstream tasks.
+    """
+    tasks = dag_data["dag"]["tasks"]
+    upstream_task_ids = _get_upstream_task_ids(tasks)
+    task_index = {}
+    chunks = []
+    offset = 0
+    for task in tasks:
+        chunk = zlib.compress(json.dumps(task, sort_keys=True).encode("utf-8"))
+        task_index[task["task_id"]] = [offset, len(chunk), upstream_task_ids[task["task_id"]]]
+        chunks.append(chunk)
+        offset += len(chunk)
+
+    dag_data = {**dag_data, "dag": {k: v for k, v in dag_data["dag"].items() if k != "tasks"}}
+    header = zlib.compress(json.dumps({**dag_data, "task_index": task_index}).encode("utf-8"))
+    return b"".join([_INDEXED_DATA_MAGIC, _INDEXED_DATA_HEADER_SIZE.pack(len(header)), header, *chunks])
+
+
+def _decode_indexed_data(data: bytes, task_ids: Iterable[str] | None = None) -> tuple[dict[str, Any], int]:
+    """
+    Decode a serialized DAG encoded by :func:`_encode_indexed_data`.
+
+    :param data: the encoded serialized DAG
+    :param task_ids: the IDs of the tasks to decode, along with their upstream tasks, all tasks if None
+    :return: the serialized DAG, with only the tasks decoded, and the number of tasks of the DAG
+    """
+    header_start = len(_INDEXED_DATA_MAGIC) + _INDEXED_DATA_HEADER_SIZE.size
+    (header_size,) = _INDEXED_DATA_HEADER_SIZE.unpack_from(data, len(_INDEXED_DATA_MAGIC))
+    tasks_start = header_start + header_size
+    dag_data = json.loads(zlib.decompress(data[header_start:tasks_start]))
+    task_index = dag_data.pop("task_index")
+
+    if task_ids is None:
+        selected_task_ids: Iterable[str] = task_index
+    else:
+        selected_task_ids = _with_upstream_task_ids(
+            task_ids, {task_id: upstream for task_id, (_, _, upstream) in task_index.items()}
+        )
+    tasks = []
+    for task_id in selected_task_ids:
+        offset, size, _ = task_index[task_id]
+        chunk_start = tasks_start + offset
+        tasks.append(json.loads(zlib.decompress(data[chunk_start : chunk_start + size])))
+    dag_data["dag"]["tasks"] = tasks
+    return dag_data, len(task_index)
+
 
 class SerializedDagModel(Base):
     """A table for serialized DAGs.
@@ -115,7 +207,10 @@ class SerializedDagModel(Base):
 
         self.dag_hash = md5(dag_data_json).hexdigest()
 
-        if COMPRESS_SERIALIZED_DAGS:
+        if INDEX_SERIALIZED_DAG_TASKS:
+            self._data = None
+            self._data_compressed = _encode_indexed_data(dag_data)
+        elif COMPRESS_SERIALIZED_DAGS:
             self._data = None
             self._data_compressed = zlib.compress(dag_data_json)
         else:
@@ -181,6 +276,93 @@ class SerializedDagModel(Base):
         log.debug("DAG: %s written to the DB", dag.dag_id)
         return True
 
+    @classmethod
+    @provide_session
+    def write_dags(
+        cls,
+        dags: Collection[DAG],
+        min_update_interval: int | None = None,
+        processor_subdir: str | None = None,
+        session: Session = NEW_SESSION,
+    ) -> tuple[list[DAG], dict[str, Exception]]:
+        """
+        Serialize DAGs and write the ones which changed into database, in bulk.
+
+        This behaves as :meth:`write_dag` called for each DAG, but the DAGs updated recently and the
+        hashes of the existing records are queried for all the DAGs at once, and the new or changed
+        records are written in multi-row statements.
+
+        :param dags: the DAGs to be written into database
+        :param min_update_interval: minimal interval in seconds to update serialized DAG
+        :param processor_subdir: the DAG processor subdir of the DAGs
+        :param session: ORM Session
+
+        :returns: the DAGs written to the DB, and the errors serializing DAGs by DAG ID
+        """
+        dags_by_id = {dag.dag_id: dag for dag in dags}
+        if not dags_by_id:
+            return [], {}
+
+        if min_update_interval is not None:
+            recently_updated_dag_ids = set(
+                session.scalars(
+                    select(cls.dag_id).where(
+                        cls.dag_id.in_(dags_by_id),
+                        (timezone.utcnow() - timedelta(seconds=min_update_interval)) < cls.last_updated,
+                    )
+                )
+            )
+            for dag_id in recently_updated_dag_ids:
+                del dags_by_id[dag_id]
+
+        new_serialized_dags: dict[str, SerializedDagModel] = {}
+        errors: dict[str, Exception] = {}
+        for dag_id, dag in dags_by_id.items():
+            try:
+                new_serialized_dags[dag_id] = cls(dag, processor_subdir)
+            except Exception as e:
+                errors[dag_id] = e
+
+        serialized_dags_db = {
+            row.dag_id: row
+            for row in session.execute(
+                select(cls.dag_id, cls.dag_hash, cls.processor_subdir).where(
+                    cls.dag_id.in_(new_serialized_dags)
+                )
+            )
+        }
+        to_insert = []
+        to_update = []
+        for dag_id, new_serialized_dag in new_serialized_dags.items():
+            mapping = {
+                "dag_id": new_serialized_dag.dag_id,
+                "fileloc": new_serialized_dag.fileloc,
+                "fileloc_hash": new_serialized_dag.fileloc_hash,
+                "_data": new_serialized_dag._data,
+                "_data_compressed": new_serialized_dag._data_compressed,
+                "last_updated": new_serialized_dag.last_updated,
+                "dag_hash": new_serialized_dag.dag_hash,
+                "processor_subdir": new_serialized_dag.processor_subdir,
+            }
+            serialized_dag_db = serialized_dags_db.get(dag_id)
+            if serialized_dag_db is None:
+                to_insert.append(mapping)
+            elif (
+                serialized_dag_db.dag_hash != new_serialized_dag.dag_hash
+                or serialized_dag_db.processor_subdir != new_serialized_dag.processor_subdir
+            ):
+                to_update.append(mapping)
+            else:
+                log.debug("Serialized DAG (%s) is unchanged. Skipping writing to DB", dag_id)
+
+        if to_insert:
+            log.debug("Inserting %d Serialized DAGs to the DB", len(to_insert))
+            session.bulk_insert_mappings(cls, to_insert)
+        if to_update:
+            log.debug("Updating %d Serialized DAGs in the DB", len(to_update))
+            session.bulk_update_mappings(cls, to_update)
+        return [dags_by_id[mapping["dag_id"]] for mapping in (*to_insert, *to_update)], errors
+
     @classmethod
     @provide_session
     def read_all_dags(cls, session: Session = NEW_SESSION) -> dict[str, SerializedDAG]:
@@ -189,10 +371,8 @@ class SerializedDagModel(Base):
         :param session: ORM Session
         :returns: a dict of DAGs read from database
         """
-        serialized_dags = session.scalars(select(cls))
-
         dags = {}
-        for row in serialized_dags:
+        for row in cls.iter_all_rows(session=session):
             log.debug("Deserializing DAG: %s", row.dag_id)
             dag = row.dag
 
@@ -207,11 +387,32 @@ class SerializedDagModel(Base):
                 )
         return dags
 
+    @classmethod
+    def iter_all_rows(cls, session: Session, batch_size: int = 100) -> Iterator[SerializedDagModel]:
+        """Read all rows in serialized_dag table, fetching them in batches.
+
+        Only a batch of rows is held in memory at once, each row being expunged from the session
+        once the next one is read.
+
+        :param session: ORM Session, used until the iteration is over
+        :param batch_size: the number of rows fetched at once
+        :returns: the rows read from database
+        """
+        dag_ids = session.scalars(select(cls.dag_id).order_by(cls.dag_id)).all()
+        for i in range(0, len(dag_ids), batch_size):
+            rows = session.scalars(select(cls).where(cls.dag_id.in_(dag_ids[i : i + batch_size]))).all()
+            for row in rows:
+                yield row
+                # The rows already read are not needed anymore.
+                session.expunge(row)
+
     @property
     def data(self) -> dict | None:
         # use __data_cache to avoid decompress and loads
         if not hasattr(self, "__data_cache") or self.__data_cache is None:
-            if self._data_compressed:
+            if self._data_compressed and self._data_compressed.startswith(_INDEXED_DATA_MAGIC):
+                self.__data_cache, _ = _decode_indexed_data(self._data_compressed)
+            elif self._data_compressed:
                 self.__data_cache = json.loads(zlib.decompress(self._data_compressed))
             else:
                 self.__data_cache = self._data
@@ -230,6 +431,28 @@ class SerializedDagModel(Base):
             raise ValueError("invalid or missing serialized DAG data")
         return SerializedDAG.from_dict(data)
 
+    def get_partial_dag(self, task_ids: Collection[str]) -> SerializedDAG:
+        """
+        Deserialize the DAG with only the given tasks and their upstream tasks.
+
+        The DAG is partial, as returned by :meth:`DAG.partial_subset`. If the tasks of the DAG are
+        indexed, the other tasks are not even decompressed.
+
+        :param task_ids: the IDs of the tasks to deserialize
+        :raises TaskNotFound: if the DAG has no such task
+        """
+        SerializedDAG._load_operator_extra_links = self.load_op_links
+        if self._data_compressed and self._data_compressed.startswith(_INDEXED_DATA_MAGIC):
+            data, num_tasks = _decode_indexed_data(self._data_compressed, task_ids)
+        else:
+            data = self.data if isinstance(self.data, dict) else json.loads(self.data)
+            tasks = data["dag"]["tasks"]
+            tasks_by_id = {task["task_id"]: task for task in tasks}
+            selected_task_ids = _with_upstream_task_ids(task_ids, _get_upstream_task_ids(tasks))
+            data = {**data, "dag": {**data["dag"], "tasks": [tasks_by_id[i] for i in selected_task_ids]}}
+            num_tasks = len(tasks)
+        return SerializedDAG.from_dict(data, partial=len(data["dag"]["tasks"]) < num_tasks)
+
     @classmethod
     @provide_session
     def remove_dag(cls, dag_id: str, session: Session = NEW_SESSION) -> None:
@@ -323,20 +546,18 @@ class SerializedDagModel(Base):
         """
         Save DAGs as Serialized DAG objects in the database.
 
-        Each DAG is saved in a separate database query.
-
         :param dags: the DAG objects to save to the DB
         :param session: ORM Session
         :return: None
         """
-        for dag in dags:
-            if not dag.is_subdag:
-                SerializedDagModel.write_dag(
-                    dag=dag,
-                    min_update_interval=MIN_SERIALIZED_DAG_UPDATE_INTERVAL,
-                    processor_subdir=processor_subdir,
-                    session=session,
-                )
+        _, errors = SerializedDagModel.write_dags(
+            [dag for dag in dags if not dag.is_subdag],
+            min_update_interval=MIN_SERIALIZED_DAG_UPDATE_INTERVAL,
+            processor_subdir=processor_subdir,
+            session=session,
+        )
+        if errors:
+            raise next(iter(errors.values()))
 
     @classmethod
     @provide_session
@@ -418,6 +639,11 @@ class SerializedDagModel(Base):
         try:
             model = session.get(SerializedDagModel, dag_id)
             if model:
+                if INDEX_SERIALIZED_DAG_TASKS:
+                    # Stopping the remaining tasks of fail_stop DAGs needs all the tasks of the DAG.
+                    dag = model.get_partial_dag([task_id])
+                    if not dag.fail_stop:
+                        return dag.get_task(task_id)
                 return model.dag.get_task(task_id)
         except (exc.NoResultFound, TaskNotFound):
             return None
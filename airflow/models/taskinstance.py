@@ -112,6 +112,7 @@ from airflow.utils.net import get_hostname
 from airflow.utils.operator_helpers import context_to_airflow_vars
 from airflow.utils.platform import getuser
 from airflow.utils.retries import run_with_db_retries
+from airflow.utils.scheduler_wakeup import notify_scheduler
 from airflow.utils.session import NEW_SESSION, create_session, provide_session
 from airflow.utils.sqlalchemy import (
     ExecutorConfigType,
@@ -869,6 +870,7 @@ def _handle_failure(
 
     if not test_mode:
         TaskInstance.save_to_db(failure_context["ti"], session)
+        notify_scheduler(session=session)
 
 
 def _get_try_number(*, task_instance: TaskInstance | TaskInstancePydantic):
@@ -1298,6 +1300,23 @@ class TaskInstance(Base, LoggingMixin):
         Index("ti_pool", pool, state, priority_weight),
         Index("ti_job_id", job_id),
         Index("ti_trigger_id", trigger_id),
+        # The below indexes support the periodic scans of the task instances queued by each scheduler job
+        # (stuck in queued and orphaned ones). They only cover the few rows in the scanned states, so they
+        # stay small however many task instances the table holds. Since mysql lacks partial indices, they
+        # are full indices on mysql.
+        Index(
+            "ti_queued_by_job_queued_dttm",
+            queued_by_job_id,
+            queued_dttm,
+            postgresql_where=text("state='queued'"),
+            sqlite_where=text("state='queued'"),
+        ),
+        Index(
+            "ti_adoptable_queued_by_job",
+            queued_by_job_id,
+            postgresql_where=text("state IN ('queued', 'running', 'restarting')"),
+            sqlite_where=text("state IN ('queued', 'running', 'restarting')"),
+        ),
         PrimaryKeyConstraint("dag_id", "task_id", "run_id", "map_index", name="task_instance_pkey"),
         ForeignKeyConstraint(
             [trigger_id],
@@ -2470,6 +2489,8 @@ class TaskInstance(Base, LoggingMixin):
                 session.merge(self).task = self.task
                 if self.state == TaskInstanceState.SUCCESS:
                     self._register_dataset_changes(session=session)
+                # Downstream tasks may be ready to be scheduled.
+                notify_scheduler(session=session)
 
                 session.commit()
                 if self.state == TaskInstanceState.SUCCESS:
@@ -17,6 +17,7 @@
 from __future__ import annotations
 
 import datetime
+from collections import Counter
 from traceback import format_exception
 from typing import TYPE_CHECKING, Any, Iterable
 
@@ -27,8 +28,10 @@ from sqlalchemy.sql.functions import coalesce
 from airflow.api_internal.internal_api_call import internal_api_call
 from airflow.models.base import Base
 from airflow.models.taskinstance import TaskInstance
+from airflow.models.triggererload import TriggererLoad
 from airflow.utils import timezone
 from airflow.utils.retries import run_with_db_retries
+from airflow.utils.scheduler_wakeup import notify_scheduler
 from airflow.utils.session import NEW_SESSION, provide_session
 from airflow.utils.sqlalchemy import ExtendedJSON, UtcDateTime, with_row_locks
 from airflow.utils.state import TaskInstanceState
@@ -36,10 +39,37 @@ from airflow.utils.state import TaskInstanceState
 if TYPE_CHECKING:
     from sqlalchemy.orm import Session
 
-    from airflow.triggers.base import BaseTrigger
+    from airflow.triggers.base import BaseTrigger, TriggerEvent
 
 ENCRYPTED_KWARGS_PREFIX = "encrypted__"
 
+# The time a trigger is assumed to run per second at least, so that the triggers whose run time is
+# too small to measure are balanced by count.
+_MIN_TRIGGER_COST = 1e-6
+
+
+def _estimate_trigger_costs(loads: Iterable[TriggererLoad]) -> tuple[dict[str, float], float]:
+    """
+    Estimate the time a trigger runs per second from the load of the triggerers, by classpath.
+
+    :return: the costs by classpath, and the average cost of a trigger, for the other classpaths
+    """
+    count_by_classpath: Counter[str] = Counter()
+    busy_by_classpath: Counter[str] = Counter()
+    for load in loads:
+        for classpath, classpath_load in load.load_by_classpath.items():
+            count_by_classpath[classpath] += classpath_load["count"]
+            busy_by_classpath[classpath] += classpath_load["busy"]
+    costs = {
+        classpath: max(busy_by_classpath[classpath] / count, _MIN_TRIGGER_COST)
+        for classpath, count in count_by_classpath.items()
+        if count
+    }
+    total_count = sum(count_by_classpath.values())
+    if not total_count:
+        return costs, _MIN_TRIGGER_COST
+    return costs, max(sum(busy_by_classpath.values()) / total_count, _MIN_TRIGGER_COST)
+
 
 class Trigger(Base):
     """
@@ -158,19 +188,59 @@ class Trigger(Base):
     @provide_session
     def submit_event(cls, trigger_id, event, session: Session = NEW_SESSION) -> None:
         """Take an event from an instance of itself, and trigger all dependent tasks to resume."""
-        for task_instance in session.scalars(
-            select(TaskInstance).where(
-                TaskInstance.trigger_id == trigger_id, TaskInstance.state == TaskInstanceState.DEFERRED
-            )
-        ):
-            # Add the event's payload into the kwargs for the task
-            next_kwargs = task_instance.next_kwargs or {}
-            next_kwargs["event"] = event.payload
-            task_instance.next_kwargs = next_kwargs
-            # Remove ourselves as its trigger
-            task_instance.trigger_id = None
-            # Finally, mark it as scheduled so it gets re-queued
-            task_instance.state = TaskInstanceState.SCHEDULED
+        cls.submit_events([(trigger_id, event)], session=session)
+
+    @classmethod
+    @internal_api_call
+    @provide_session
+    def submit_events(cls, events: Iterable[tuple[int, TriggerEvent]], session: Session = NEW_SESSION) -> int:
+        """
+        Take the events of several triggers, and resume all their dependent tasks at once.
+
+        The task instances are found with one query, and updated with one bulk UPDATE,
+        rather than with queries for each event. Only the first event of each trigger is
+        used, since its tasks are no longer deferred once it is submitted.
+
+        :param events: the IDs of the triggers which fired, with their events
+        :param session: ORM Session
+        :return: the number of task instances resumed
+        """
+        payloads: dict[int, Any] = {}
+        for trigger_id, event in events:
+            payloads.setdefault(trigger_id, event.payload)
+        if not payloads:
+            return 0
+        deferred_tis = session.execute(
+            select(
+                TaskInstance.dag_id,
+                TaskInstance.task_id,
+                TaskInstance.run_id,
+                TaskInstance.map_index,
+                TaskInstance.trigger_id,
+                TaskInstance.next_kwargs,
+            ).where(TaskInstance.trigger_id.in_(payloads), TaskInstance.state == TaskInstanceState.DEFERRED)
+        ).all()
+        if not deferred_tis:
+            return 0
+        session.bulk_update_mappings(
+            TaskInstance,
+            [
+                {
+                    "dag_id": ti.dag_id,
+                    "task_id": ti.task_id,
+                    "run_id": ti.run_id,
+                    "map_index": ti.map_index,
+                    # Add the event's payload into the kwargs for the task
+                    "next_kwargs": {**(ti.next_kwargs or {}), "event": payloads[ti.trigger_id]},
+                    # Remove the trigger, and mark the task as scheduled so it gets re-queued
+                    "trigger_id": None,
+                    "state": TaskInstanceState.SCHEDULED,
+                }
+                for ti in deferred_tis
+            ],
+        )
+        notify_scheduler(session=session)
+        return len(deferred_tis)
 
     @classmethod
     @internal_api_call
@@ -216,7 +286,13 @@ class Trigger(Base):
     @internal_api_call
     @provide_session
     def assign_unassigned(
-        cls, triggerer_id, capacity, health_check_threshold, session: Session = NEW_SESSION
+        cls,
+        triggerer_id,
+        capacity,
+        health_check_threshold,
+        max_rebalanced_triggers: int = 0,
+        loop_lag_threshold: float | None = None,
+        session: Session = NEW_SESSION,
     ) -> None:
         """
         Assign unassigned triggers based on a number of conditions.
@@ -224,6 +300,15 @@ class Trigger(Base):
         Takes a triggerer_id, the capacity for that triggerer and the Triggerer job heartrate
         health check threshold, and assigns unassigned triggers until that capacity is reached,
         or there are no more unassigned triggers.
+
+        When the triggerer heartbeats its load, see :class:`~airflow.models.triggererload.TriggererLoad`,
+        it only takes its share of the triggers, so that the alive triggerers have the same load; see
+        :meth:`select_balanced_triggers`.
+
+        :param max_rebalanced_triggers: the maximum number of triggers to take from a more loaded
+            triggerer, so that new triggerers take load off the others gradually
+        :param loop_lag_threshold: the lag of the event loops above which a triggerer takes no
+            triggers, as long as other triggerers can
         """
         from airflow.jobs.job import Job  # To avoid circular import
 
@@ -240,22 +325,169 @@ class Trigger(Base):
                 Job.job_type == "TriggererJob",
             )
         ).all()
+        TriggererLoad.remove_dead(alive_triggerer_ids, session=session)
 
         # Find triggers who do NOT have an alive triggerer_id, and then assign
         # up to `capacity` of those to us.
         trigger_ids_query = cls.get_sorted_triggers(
             capacity=capacity, alive_triggerer_ids=alive_triggerer_ids, session=session
         )
-        if trigger_ids_query:
+        trigger_ids = [i.id for i in trigger_ids_query]
+        if trigger_ids or max_rebalanced_triggers:
+            trigger_ids = cls.select_balanced_triggers(
+                triggerer_id,
+                capacity=capacity,
+                unassigned_trigger_ids=trigger_ids,
+                alive_triggerer_ids=alive_triggerer_ids,
+                max_rebalanced_triggers=max_rebalanced_triggers,
+                loop_lag_threshold=loop_lag_threshold,
+                session=session,
+            )
+        if trigger_ids:
             session.execute(
                 update(cls)
-                .where(cls.id.in_([i.id for i in trigger_ids_query]))
+                .where(cls.id.in_(trigger_ids))
                 .values(triggerer_id=triggerer_id)
                 .execution_options(synchronize_session=False)
             )
 
         session.commit()
 
+    @classmethod
+    def select_balanced_triggers(
+        cls,
+        triggerer_id: int,
+        capacity: int,
+        unassigned_trigger_ids: list[int],
+        alive_triggerer_ids: list[int],
+        max_rebalanced_triggers: int,
+        loop_lag_threshold: float | None,
+        session: Session,
+    ) -> list[int]:
+        """
+        Select the triggers a triggerer takes to have its share of the load of the alive triggerers.
+
+        The load of a triggerer is the time its event loops spend running triggers, or its CPU usage
+        if higher, as it last heartbeated it, plus the estimated cost of the triggers assigned to it
+        since, minus that of the triggers moved off it since. The triggerers whose event loops lag more
+        than ``loop_lag_threshold`` take no triggers, unless all of them do. The triggerer takes the
+        unassigned triggers, in order, until its load would reach the average; then, if it is still
+        below the average, up to ``max_rebalanced_triggers`` triggers of the most loaded triggerer.
+
+        A triggerer which does not heartbeat its load takes all the unassigned triggers.
+
+        :param triggerer_id: the ID of the triggerer
+        :param capacity: the maximum number of triggers the triggerer can take
+        :param unassigned_trigger_ids: the IDs of the triggers without an alive triggerer, by priority
+        :param alive_triggerer_ids: the IDs of the alive triggerers
+        :param max_rebalanced_triggers: the maximum number of triggers to take from another triggerer
+        :param loop_lag_threshold: the lag of the event loops above which a triggerer takes no triggers
+        :param session: ORM Session
+        :return: the IDs of the triggers to assign to the triggerer
+        """
+        loads = {
+            load.triggerer_id: load
+            for load in session.scalars(
+                select(TriggererLoad).where(TriggererLoad.triggerer_id.in_(alive_triggerer_ids))
+            )
+        }
+        if triggerer_id not in loads:
+            return unassigned_trigger_ids
+
+        costs, default_cost = _estimate_trigger_costs(loads.values())
+        counts = dict(
+            session.execute(
+                select(cls.triggerer_id, func.count(cls.id))
+                .where(cls.triggerer_id.in_(alive_triggerer_ids))
+                .group_by(cls.triggerer_id)
+            ).all()
+        )
+        triggerer_loads: dict[int, float] = {}
+        for alive_triggerer_id in alive_triggerer_ids:
+            load = loads.get(alive_triggerer_id)
+            count = counts.get(alive_triggerer_id, 0)
+            if load is None:
+                triggerer_loads[alive_triggerer_id] = count * default_cost
+            else:
+                # The triggers assigned to, or moved off, the triggerer since the load was heartbeated
+                moved_load = (count - load.num_triggers) * default_cost
+                triggerer_loads[alive_triggerer_id] = max(
+                    max(load.busy, load.cpu_usage) + moved_load, _MIN_TRIGGER_COST * count
+                )
+
+        lagging_triggerer_ids = {
+            load.triggerer_id
+            for load in loads.values()
+            if loop_lag_threshold is not None and load.loop_lag > loop_lag_threshold
+        }
+        balanced_triggerer_ids = [
+            alive_triggerer_id
+            for alive_triggerer_id in alive_triggerer_ids
+            if alive_triggerer_id not in lagging_triggerer_ids
+        ] or alive_triggerer_ids
+        if triggerer_id not in balanced_triggerer_ids:
+            return []
+
+        classpaths = dict(
+            session.execute(select(cls.id, cls.classpath).where(cls.id.in_(unassigned_trigger_ids))).all()
+        )
+        unassigned_costs = [
+            costs.get(classpaths.get(trigger_id, ""), default_cost) for trigger_id in unassigned_trigger_ids
+        ]
+        average_load = (
+            sum(triggerer_loads[balanced_id] for balanced_id in balanced_triggerer_ids)
+            + sum(unassigned_costs)
+        ) / len(balanced_triggerer_ids)
+        # The load the triggerer can take
+        budget = average_load - triggerer_loads[triggerer_id]
+
+        trigger_ids: list[int] = []
+        for trigger_id, cost in zip(unassigned_trigger_ids, unassigned_costs):
+            if budget <= 0:
+                break
+            trigger_ids.append(trigger_id)
+            budget -= cost
+
+        other_triggerer_ids = [
+            alive_triggerer_id
+            for alive_triggerer_id in alive_triggerer_ids
+            if alive_triggerer_id != triggerer_id
+        ]
+        limit = min(max_rebalanced_triggers, capacity - len(trigger_ids))
+        if budget <= 0 or limit <= 0 or not other_triggerer_ids:
+            return trigger_ids
+        # Take load off the most loaded triggerer, lagging ones first, without making it less loaded
+        # than the average.
+        donor_id = max(
+            other_triggerer_ids,
+            key=lambda other_id: (other_id in lagging_triggerer_ids, triggerer_loads[other_id]),
+        )
+        excess = triggerer_loads[donor_id]
+        if donor_id not in lagging_triggerer_ids:
+            excess -= average_load
+        for trigger_id, classpath in cls.get_rebalanced_triggers(donor_id, limit=limit, session=session):
+            cost = costs.get(classpath, default_cost)
+            if cost > min(budget, excess):
+                break
+            trigger_ids.append(trigger_id)
+            budget -= cost
+            excess -= cost
+        return trigger_ids
+
+    @classmethod
+    def get_rebalanced_triggers(cls, triggerer_id, limit, session):
+        """Return the IDs and classpaths of the triggers to move first off a triggerer, by priority."""
+        query = with_row_locks(
+            select(cls.id, cls.classpath)
+            .join(TaskInstance, cls.id == TaskInstance.trigger_id, isouter=False)
+            .where(cls.triggerer_id == triggerer_id)
+            .order_by(coalesce(TaskInstance.priority_weight, 0), cls.created_date.desc())
+            .limit(limit),
+            session,
+            skip_locked=True,
+        )
+        return session.execute(query).all()
+
     @classmethod
     def get_sorted_triggers(cls, capacity, alive_triggerer_ids, session):
         query = with_row_locks(
@@ -0,0 +1,118 @@
+#
+# Licensed to the Apache Software Foundation (ASF) under one
+# or more contributor license agreements.  See the NOTICE file
+# distributed with this work for additional information
+# regarding copyright ownership.  The ASF licenses this file
+# to you under the Apache License, Version 2.0 (the
+# "License"); you may not use this file except in compliance
+# with the License.  You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+# KIND, either express or implied.  See the License for the
+# specific language governing permissions and limitations
+# under the License.
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Any, Collection
+
+import sqlalchemy_jsonfield
+from sqlalchemy import Column, Float, Integer, delete, select
+
+from airflow.api_internal.internal_api_call import internal_api_call
+from airflow.models.base import Base
+from airflow.settings import json
+from airflow.utils import timezone
+from airflow.utils.session import NEW_SESSION, provide_session
+from airflow.utils.sqlalchemy import UtcDateTime
+
+if TYPE_CHECKING:
+    from sqlalchemy.orm import Session
+
+
+class TriggererLoad(Base):
+    """
+    A table to store the load of the triggerers, as last heartbeated by them.
+
+    Triggers are assigned to the least loaded triggerers, see
+    :meth:`~airflow.models.trigger.Trigger.assign_unassigned`.
+    """
+
+    __tablename__ = "triggerer_load"
+
+    # The ID of the triggerer job
+    triggerer_id = Column(Integer, primary_key=True, autoincrement=False)
+    updated_at = Column(UtcDateTime, nullable=False)
+    num_triggers = Column(Integer, nullable=False)
+    # Longest delay of the event loops of the triggerer, in seconds
+    loop_lag = Column(Float, nullable=False)
+    # CPU time used by the triggerer process per second
+    cpu_usage = Column(Float, nullable=False)
+    # Map from trigger classpath to the number of triggers of the class running, and to the time
+    # spent running them per second
+    load_by_classpath = Column(sqlalchemy_jsonfield.JSONField(json=json), nullable=False, default={})
+
+    @property
+    def busy(self) -> float:
+        """Time the event loops of the triggerer spent running triggers per second."""
+        return sum(load["busy"] for load in self.load_by_classpath.values())
+
+    @classmethod
+    @internal_api_call
+    @provide_session
+    def record(
+        cls,
+        triggerer_id: int,
+        loop_lag: float,
+        cpu_usage: float,
+        load_by_classpath: dict[str, dict[str, Any]],
+        session: Session = NEW_SESSION,
+    ) -> None:
+        """
+        Store the load of a triggerer, replacing its previous load.
+
+        :param triggerer_id: the ID of the triggerer job
+        :param loop_lag: the longest delay of the event loops of the triggerer, in seconds
+        :param cpu_usage: the CPU time used by the triggerer process per second
+        :param load_by_classpath: map from trigger classpath to a dict with the number of triggers of the
+            class running, as ``count``, and the time spent running them per second, as ``busy``
+        :param session: ORM Session
+        """
+        row = session.scalar(select(cls).where(cls.triggerer_id == triggerer_id))
+        if row is None:
+            row = cls(triggerer_id=triggerer_id)
+            session.add(row)
+        row.updated_at = timezone.utcnow()
+        row.num_triggers = sum(load["count"] for load in load_by_classpath.values())
+        row.loop_lag = loop_lag
+        row.cpu_usage = cpu_usage
+        row.load_by_classpath = load_by_classpath
+
+    @classmethod
+    @internal_api_call
+    @provide_session
+    def remove(cls, triggerer_id: int, session: Session = NEW_SESSION) -> None:
+        """
+        Delete the load of a triggerer, once it exits.
+
+        :param triggerer_id: the ID of the triggerer job
+        :param session: ORM Session
+        """
+        session.execute(delete(cls).where(cls.triggerer_id == triggerer_id))
+
+    @classmethod
+    def remove_dead(cls, alive_triggerer_ids: Collection[int], session: Session) -> None:
+        """
+        Delete the load of the triggerers which are no longer alive, e.g. which were killed.
+
+        :param alive_triggerer_ids: the IDs of the alive triggerer jobs
+        :param session: ORM Session
+        """
+        session.execute(
+            delete(cls)
+            .where(cls.triggerer_id.not_in(alive_triggerer_ids))
+            .execution_options(synchronize_session=False)
+        )
@@ -27,10 +27,11 @@ import weakref
 from dataclasses import dataclass
 from inspect import signature
 from textwrap import dedent
-from typing import TYPE_CHECKING, Any, Collection, Iterable, Mapping, NamedTuple, Union
+from typing import TYPE_CHECKING, Any, Callable, Collection, Iterable, Mapping, NamedTuple, Union
 
 import attrs
 import lazy_object_proxy
+import pendulum
 from dateutil import relativedelta
 from pendulum.tz.timezone import FixedTimezone, Timezone
 
@@ -126,6 +127,24 @@ def _get_default_mapped_partial() -> dict[str, Any]:
     return BaseSerialization.serialize(default)[Encoding.VAR]
 
 
+@cache
+def _get_forbidden_template_fields() -> frozenset[str]:
+    """Get the BaseOperator fields which cannot be templated."""
+    # Though allow some of the BaseOperator fields to be templated anyway
+    return frozenset(inspect.signature(BaseOperator.__init__).parameters) - {"email"}
+
+
+def _is_empty_dict_or_list(value: Any) -> bool:
+    """Check whether ``value in [{}, []]``, without comparing the values of the builtin types."""
+    value_type = type(value)
+    if value_type is dict or value_type is list:
+        return not value
+    if value_type is ParamsDict:
+        # Comparing a ParamsDict resolves all its params.
+        return not len(value)
+    return value in [{}, []]
+
+
 def encode_relativedelta(var: relativedelta.relativedelta) -> dict[str, Any]:
     """Encode a relativedelta object."""
     encoded = {k: v for k, v in var.__dict__.items() if not k.startswith("_") and v}
@@ -317,6 +336,15 @@ _type_to_class = {
 _class_to_type = {cls_: type_ for type_, classes in _type_to_class.items() for cls_ in classes}
 
 
+class _AttributePlan(NamedTuple):
+    """How to serialize an attribute of the instances of a class, precomputed for the class."""
+
+    key: str
+    is_constructor_param: bool
+    default: Any
+    is_excluded_in_context: bool
+
+
 class BaseSerialization:
     """BaseSerialization provides utils for serialization."""
 
@@ -339,6 +367,12 @@ class BaseSerialization:
 
     _CONSTRUCTOR_PARAMS: dict[str, Parameter] = {}
 
+    # Serialized fields which are serialized separately, after the others
+    _fields_serialized_separately: frozenset[str] = frozenset()
+
+    # Serialization plans of the attributes, by serialization class and class of the serialized objects
+    _serialization_plans: dict[tuple[type[BaseSerialization], type], tuple[_AttributePlan, ...]] = {}
+
     SERIALIZER_VERSION = 1
 
     @classmethod
@@ -399,17 +433,57 @@ class BaseSerialization:
             attrname, var, instance
         )
 
+    @classmethod
+    def _is_excluded_in_context(cls, attrname: str) -> bool:
+        """
+        Check whether the attribute being excluded from serialization depends on the instance.
+
+        Subclasses overriding :meth:`_is_excluded` for some attributes must return True for them.
+        """
+        return False
+
+    @classmethod
+    def _get_serialization_plan(cls, object_type: type) -> tuple[_AttributePlan, ...]:
+        """Get how to serialize the attributes of the instances of ``object_type``."""
+        try:
+            return cls._serialization_plans[cls, object_type]
+        except KeyError:
+            pass
+        plan = tuple(
+            _AttributePlan(
+                key=key,
+                is_constructor_param=key in cls._CONSTRUCTOR_PARAMS,
+                default=cls._CONSTRUCTOR_PARAMS.get(key),
+                is_excluded_in_context=cls._is_excluded_in_context(key),
+            )
+            for key in object_type.get_serialized_fields()
+            if key not in cls._fields_serialized_separately
+        )
+        cls._serialization_plans[cls, object_type] = plan
+        return plan
+
     @classmethod
     def serialize_to_json(
         cls, object_to_serialize: BaseOperator | MappedOperator | DAG, decorated_fields: set
     ) -> dict[str, Any]:
         """Serialize an object to JSON."""
         serialized_object: dict[str, Any] = {}
-        keys_to_serialize = object_to_serialize.get_serialized_fields()
-        for key in keys_to_serialize:
+        excluded_types = cls._excluded_types
+        for key, is_constructor_param, default, is_excluded_in_context in cls._get_serialization_plan(
+            type(object_to_serialize)
+        ):
             # None is ignored in serialized form and is added back in deserialization.
             value = getattr(object_to_serialize, key, None)
-            if cls._is_excluded(value, key, object_to_serialize):
+            if is_excluded_in_context:
+                if cls._is_excluded(value, key, object_to_serialize):
+                    continue
+            # Same as _is_excluded, without calling it for each attribute.
+            elif value is None:
+                if not is_constructor_param or default is None:
+                    continue
+            elif isinstance(value, excluded_types) or (
+                is_constructor_param and (default is value or _is_empty_dict_or_list(value))
+            ):
                 continue
 
             if key == "_operator_name":
@@ -453,6 +527,10 @@ class BaseSerialization:
                 "Setting use_pydantic_models = True requires AIP-44 (in progress) feature flag to be true. "
                 "This parameter will be removed eventually when new serialization is used by AIP-44"
             )
+        # Most values are of a few builtin types, serialized without going through the checks below.
+        serializer = _SERIALIZERS.get(type(var))
+        if serializer is not None:
+            return serializer(cls, var, strict, use_pydantic_models)
         if cls._is_primitive(var):
             # enum.IntEnum is an int instance, it causes json dumps error so we use its value.
             if isinstance(var, enum.Enum):
@@ -587,44 +665,10 @@ class BaseSerialization:
         var = encoded_var[Encoding.VAR]
         type_ = encoded_var[Encoding.TYPE]
 
-        if type_ == DAT.DICT:
-            return {k: cls.deserialize(v, use_pydantic_models) for k, v in var.items()}
-        elif type_ == DAT.DAG:
-            return SerializedDAG.deserialize_dag(var)
-        elif type_ == DAT.OP:
-            return SerializedBaseOperator.deserialize_operator(var)
-        elif type_ == DAT.DATETIME:
-            return from_timestamp(var)
-        elif type_ == DAT.POD:
-            if not _has_kubernetes():
-                raise RuntimeError("Cannot deserialize POD objects without kubernetes libraries installed!")
-            pod = PodGenerator.deserialize_model_dict(var)
-            return pod
-        elif type_ == DAT.TIMEDELTA:
-            return datetime.timedelta(seconds=var)
-        elif type_ == DAT.TIMEZONE:
-            return decode_timezone(var)
-        elif type_ == DAT.RELATIVEDELTA:
-            return decode_relativedelta(var)
-        elif type_ == DAT.SET:
-            return {cls.deserialize(v, use_pydantic_models) for v in var}
-        elif type_ == DAT.TUPLE:
-            return tuple(cls.deserialize(v, use_pydantic_models) for v in var)
-        elif type_ == DAT.PARAM:
-            return cls._deserialize_param(var)
-        elif type_ == DAT.XCOM_REF:
-            return _XComRef(var)  # Delay deserializing XComArg objects until we have the entire DAG.
-        elif type_ == DAT.DATASET:
-            return Dataset(**var)
-        elif type_ == DAT.DATASET_ANY:
-            return DatasetAny(*(cls.deserialize(x) for x in var))
-        elif type_ == DAT.DATASET_ALL:
-            return DatasetAll(*(cls.deserialize(x) for x in var))
-        elif type_ == DAT.SIMPLE_TASK_INSTANCE:
-            return SimpleTaskInstance(**cls.deserialize(var))
-        elif type_ == DAT.CONNECTION:
-            return Connection(**var)
-        elif use_pydantic_models and _ENABLE_AIP_44:
+        deserializer = _DESERIALIZERS.get(type_)
+        if deserializer is not None:
+            return deserializer(cls, var, use_pydantic_models)
+        if use_pydantic_models and _ENABLE_AIP_44:
             if type_ == DAT.BASE_JOB:
                 return JobPydantic.parse_obj(var)
             elif type_ == DAT.TASK_INSTANCE:
@@ -637,10 +681,7 @@ class BaseSerialization:
                 return DatasetPydantic.parse_obj(var)
             elif type_ == DAT.LOG_TEMPLATE:
                 return LogTemplatePydantic.parse_obj(var)
-        elif type_ == DAT.ARG_NOT_SET:
-            return NOTSET
-        else:
-            raise TypeError(f"Invalid type {type_!s} in deserialization.")
+        raise TypeError(f"Invalid type {type_!s} in deserialization.")
 
     _deserialize_datetime = from_timestamp
     _deserialize_timezone = parse_timezone
@@ -671,7 +712,7 @@ class BaseSerialization:
         ``field = field or {}`` set.
         """
         if attrname in cls._CONSTRUCTOR_PARAMS and (
-            cls._CONSTRUCTOR_PARAMS[attrname] is value or (value in [{}, []])
+            cls._CONSTRUCTOR_PARAMS[attrname] is value or _is_empty_dict_or_list(value)
         ):
             return True
         return False
@@ -747,6 +788,118 @@ class BaseSerialization:
         return ParamsDict(op_params)
 
 
+def _serialize_as_is(cls: type[BaseSerialization], var: Any, strict: bool, use_pydantic_models: bool) -> Any:
+    return var
+
+
+def _serialize_dict(cls: type[BaseSerialization], var: dict, strict: bool, use_pydantic_models: bool) -> Any:
+    return cls._encode(
+        {
+            str(k): cls.serialize(v, strict=strict, use_pydantic_models=use_pydantic_models)
+            for k, v in var.items()
+        },
+        type_=DAT.DICT,
+    )
+
+
+def _serialize_list(cls: type[BaseSerialization], var: list, strict: bool, use_pydantic_models: bool) -> Any:
+    return [cls.serialize(v, strict=strict, use_pydantic_models=use_pydantic_models) for v in var]
+
+
+def _serialize_datetime(
+    cls: type[BaseSerialization], var: datetime.datetime, strict: bool, use_pydantic_models: bool
+) -> Any:
+    return cls._encode(var.timestamp(), type_=DAT.DATETIME)
+
+
+def _serialize_timedelta(
+    cls: type[BaseSerialization], var: datetime.timedelta, strict: bool, use_pydantic_models: bool
+) -> Any:
+    return cls._encode(var.total_seconds(), type_=DAT.TIMEDELTA)
+
+
+def _serialize_set(cls: type[BaseSerialization], var: set, strict: bool, use_pydantic_models: bool) -> Any:
+    # FIXME: casts set to list in customized serialization in future.
+    try:
+        return cls._encode(
+            sorted(cls.serialize(v, strict=strict, use_pydantic_models=use_pydantic_models) for v in var),
+            type_=DAT.SET,
+        )
+    except TypeError:
+        return cls._encode(
+            [cls.serialize(v, strict=strict, use_pydantic_models=use_pydantic_models) for v in var],
+            type_=DAT.SET,
+        )
+
+
+def _serialize_tuple(
+    cls: type[BaseSerialization], var: tuple, strict: bool, use_pydantic_models: bool
+) -> Any:
+    # FIXME: casts tuple to list in customized serialization in future.
+    return cls._encode(
+        [cls.serialize(v, strict=strict, use_pydantic_models=use_pydantic_models) for v in var],
+        type_=DAT.TUPLE,
+    )
+
+
+# Serializers of the values of exactly these types, giving the same result as BaseSerialization.serialize
+# going through its checks. Subclasses of these types, such as enums, still go through the checks.
+_SERIALIZERS: dict[type, Callable[[type[BaseSerialization], Any, bool, bool], Any]] = {
+    type(None): _serialize_as_is,
+    int: _serialize_as_is,
+    bool: _serialize_as_is,
+    float: _serialize_as_is,
+    str: _serialize_as_is,
+    dict: _serialize_dict,
+    list: _serialize_list,
+    datetime.datetime: _serialize_datetime,
+    pendulum.DateTime: _serialize_datetime,
+    datetime.timedelta: _serialize_timedelta,
+    set: _serialize_set,
+    tuple: _serialize_tuple,
+}
+
+
+def _deserialize_pod(cls: type[BaseSerialization], var: Any, use_pydantic_models: bool) -> Any:
+    if not _has_kubernetes():
+        raise RuntimeError("Cannot deserialize POD objects without kubernetes libraries installed!")
+    return PodGenerator.deserialize_model_dict(var)
+
+
+_DESERIALIZERS_BY_TYPE: dict[DAT, Callable[[type[BaseSerialization], Any, bool], Any]] = {
+    DAT.DICT: lambda cls, var, use_pydantic_models: {
+        k: cls.deserialize(v, use_pydantic_models) for k, v in var.items()
+    },
+    DAT.DAG: lambda cls, var, use_pydantic_models: SerializedDAG.deserialize_dag(var),
+    DAT.OP: lambda cls, var, use_pydantic_models: SerializedBaseOperator.deserialize_operator(var),
+    DAT.DATETIME: lambda cls, var, use_pydantic_models: from_timestamp(var),
+    DAT.POD: _deserialize_pod,
+    DAT.TIMEDELTA: lambda cls, var, use_pydantic_models: datetime.timedelta(seconds=var),
+    DAT.TIMEZONE: lambda cls, var, use_pydantic_models: decode_timezone(var),
+    DAT.RELATIVEDELTA: lambda cls, var, use_pydantic_models: decode_relativedelta(var),
+    DAT.SET: lambda cls, var, use_pydantic_models: {cls.deserialize(v, use_pydantic_models) for v in var},
+    DAT.TUPLE: lambda cls, var, use_pydantic_models: tuple(
+        cls.deserialize(v, use_pydantic_models) for v in var
+    ),
+    DAT.PARAM: lambda cls, var, use_pydantic_models: cls._deserialize_param(var),
+    # Delay deserializing XComArg objects until we have the entire DAG.
+    DAT.XCOM_REF: lambda cls, var, use_pydantic_models: _XComRef(var),
+    DAT.DATASET: lambda cls, var, use_pydantic_models: Dataset(**var),
+    DAT.DATASET_ANY: lambda cls, var, use_pydantic_models: DatasetAny(*(cls.deserialize(x) for x in var)),
+    DAT.DATASET_ALL: lambda cls, var, use_pydantic_models: DatasetAll(*(cls.deserialize(x) for x in var)),
+    DAT.SIMPLE_TASK_INSTANCE: lambda cls, var, use_pydantic_models: SimpleTaskInstance(
+        **cls.deserialize(var)
+    ),
+    DAT.CONNECTION: lambda cls, var, use_pydantic_models: Connection(**var),
+    DAT.ARG_NOT_SET: lambda cls, var, use_pydantic_models: NOTSET,
+}
+# The types are strings once loaded from JSON, which do not hash as the enum members.
+_DESERIALIZERS = {
+    **_DESERIALIZERS_BY_TYPE,
+    **{type_.value: deserializer for type_, deserializer in _DESERIALIZERS_BY_TYPE.items()},
+}
+
+
 class DependencyDetector:
     """
     Detects dependencies between DAGs.
@@ -823,6 +976,9 @@ class SerializedBaseOperator(BaseOperator, BaseSerialization):
 
     _decorated_fields = {"executor_config"}
 
+    # Params are serialized by _serialize_params_dict
+    _fields_serialized_separately = frozenset({"params"})
+
     _CONSTRUCTOR_PARAMS = {
         k: v.default
         for k, v in signature(BaseOperator.__init__).parameters.items()
@@ -917,9 +1073,7 @@ class SerializedBaseOperator(BaseOperator, BaseSerialization):
         # Store all template_fields as they are if there are JSON Serializable
         # If not, store them as strings
         # And raise an exception if the field is not templateable
-        forbidden_fields = set(inspect.signature(BaseOperator.__init__).parameters.keys())
-        # Though allow some of the BaseOperator fields to be templated anyway
-        forbidden_fields.difference_update({"email"})
+        forbidden_fields = _get_forbidden_template_fields()
         if op.template_fields:
             for template_field in op.template_fields:
                 if template_field in forbidden_fields:
@@ -1178,6 +1332,10 @@ class SerializedBaseOperator(BaseOperator, BaseSerialization):
         deps.update(get_custom_dep())  # todo: remove in 3.0
         return deps
 
+    @classmethod
+    def _is_excluded_in_context(cls, attrname: str) -> bool:
+        return attrname.endswith("_date")
+
     @classmethod
     def _is_excluded(cls, var: Any, attrname: str, op: DAGNode):
         if var is not None and op.has_dag() and attrname.endswith("_date"):
@@ -1388,9 +1546,16 @@ class SerializedDAG(DAG, BaseSerialization):
             raise SerializationError(f"Failed to serialize DAG {dag.dag_id!r}: {e}")
 
     @classmethod
-    def deserialize_dag(cls, encoded_dag: dict[str, Any]) -> SerializedDAG:
-        """Deserializes a DAG from a JSON object."""
+    def deserialize_dag(cls, encoded_dag: dict[str, Any], partial: bool = False) -> SerializedDAG:
+        """
+        Deserializes a DAG from a JSON object.
+
+        :param encoded_dag: the JSON object
+        :param partial: whether only some of the tasks of the DAG are in the JSON object, as for
+            :meth:`DAG.partial_subset`. The upstream tasks of each of them must be there too.
+        """
         dag = SerializedDAG(dag_id=encoded_dag["_dag_id"])
+        dag.partial = partial
 
         for k, v in encoded_dag.items():
             if k == "_downstream_task_ids":
@@ -1429,6 +1594,11 @@ class SerializedDAG(DAG, BaseSerialization):
         else:
             dag.timetable = create_timetable(dag.schedule_interval, dag.timezone)
 
+        if partial:
+            # Removing downstream references to tasks that were not deserialized
+            for task in dag.task_dict.values():
+                task.downstream_task_ids.intersection_update(dag.task_dict)
+
         # Set _task_group
         if "_task_group" in encoded_dag:
             dag._task_group = TaskGroupSerialization.deserialize_task_group(
@@ -1437,6 +1607,13 @@ class SerializedDAG(DAG, BaseSerialization):
                 dag.task_dict,
                 dag,
             )
+            if partial:
+                task_groups = dag.task_group.get_task_group_dict()
+                for group in task_groups.values():
+                    group.upstream_group_ids.intersection_update(task_groups)
+                    group.downstream_group_ids.intersection_update(task_groups)
+                    group.upstream_task_ids.intersection_update(dag.task_dict)
+                    group.downstream_task_ids.intersection_update(dag.task_dict)
         else:
             # This must be old data that had no task_group. Create a root TaskGroup and add
             # all tasks to it.
@@ -1459,6 +1636,10 @@ class SerializedDAG(DAG, BaseSerialization):
 
         return dag
 
+    @classmethod
+    def _is_excluded_in_context(cls, attrname: str) -> bool:
+        return attrname == "_access_control"
+
     @classmethod
     def _is_excluded(cls, var: Any, attrname: str, op: DAGNode):
         # {} is explicitly different from None in the case of DAG-level access control
@@ -1477,12 +1658,17 @@ class SerializedDAG(DAG, BaseSerialization):
         return json_dict
 
     @classmethod
-    def from_dict(cls, serialized_obj: dict) -> SerializedDAG:
-        """Deserializes a python dict in to the DAG and operators it contains."""
+    def from_dict(cls, serialized_obj: dict, partial: bool = False) -> SerializedDAG:
+        """
+        Deserializes a python dict in to the DAG and operators it contains.
+
+        :param serialized_obj: the python dict
+        :param partial: whether only some of the tasks of the DAG are in the dict, see :meth:`deserialize_dag`
+        """
         ver = serialized_obj.get("__version", "<not present>")
         if ver != cls.SERIALIZER_VERSION:
             raise ValueError(f"Unsure how to deserialize version {ver!r}")
-        return cls.deserialize_dag(serialized_obj["dag"])
+        return cls.deserialize_dag(serialized_obj["dag"], partial=partial)
 
 
 class TaskGroupSerialization(BaseSerialization):
@@ -1558,6 +1744,10 @@ class TaskGroupSerialization(BaseSerialization):
             if _type == DAT.OP
             else cls.deserialize_task_group(val, group, task_dict, dag=dag)
             for label, (_type, val) in encoded_group["children"].items()
+            # Only some of the tasks are deserialized for partial DAGs, leave out the others, and the
+            # TaskGroups which would be empty.
+            if not dag.partial
+            or (val in task_dict if _type == DAT.OP else cls._contains_tasks(val, task_dict))
         }
         group.upstream_group_ids.update(cls.deserialize(encoded_group["upstream_group_ids"]))
         group.downstream_group_ids.update(cls.deserialize(encoded_group["downstream_group_ids"]))
@@ -1565,6 +1755,14 @@ class TaskGroupSerialization(BaseSerialization):
         group.downstream_task_ids.update(cls.deserialize(encoded_group["downstream_task_ids"]))
         return group
 
+    @classmethod
+    def _contains_tasks(cls, encoded_group: dict[str, Any], task_dict: dict[str, Operator]) -> bool:
+        """Whether a serialized TaskGroup contains any of the given tasks, directly or not."""
+        return any(
+            val in task_dict if _type == DAT.OP else cls._contains_tasks(val, task_dict)
+            for _type, val in encoded_group["children"].values()
+        )
+
 
 @dataclass(frozen=True, order=True)
 class DagDependency:
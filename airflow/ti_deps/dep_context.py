@@ -17,6 +17,7 @@
 # under the License.
 from __future__ import annotations
 
+from collections import defaultdict
 from typing import TYPE_CHECKING
 
 import attr
@@ -84,6 +85,10 @@ class DepContext:
     have_changed_ti_states: bool = False
     """Have any of the TIs state's been changed as a result of evaluating dependencies"""
 
+    _finished_tis_index: tuple[list[TaskInstance], int, dict[str, list[TaskInstance]]] | None = attr.ib(
+        default=None, init=False, repr=False, eq=False
+    )
+
     def ensure_finished_tis(self, dag_run: DagRun, session: Session) -> list[TaskInstance]:
         """
         Ensure finished_tis is populated if it's currently None, which allows running tasks without dag_run.
@@ -104,3 +109,29 @@ class DepContext:
         else:
             finished_tis = self.finished_tis
         return finished_tis
+
+    def ensure_finished_tis_by_task_id(
+        self, dag_run: DagRun, session: Session
+    ) -> dict[str, list[TaskInstance]]:
+        """
+        Get the finished task instances of the run, grouped by task_id.
+
+        The grouping is computed once and shared by all the task instances evaluated with
+        this context, so looking up the finished upstreams of a task instance only costs
+        as much as its number of upstream task instances, instead of all the finished
+        task instances of the run.
+
+        :param dag_run: The DagRun for which to find finished tasks
+        :return: A mapping of task_id to the finished task instances of this task
+        """
+        finished_tis = self.ensure_finished_tis(dag_run, session)
+        if (
+            self._finished_tis_index is None
+            or self._finished_tis_index[0] is not finished_tis
+            or self._finished_tis_index[1] != len(finished_tis)
+        ):
+            by_task_id: dict[str, list[TaskInstance]] = defaultdict(list)
+            for ti in finished_tis:
+                by_task_id[ti.task_id].append(ti)
+            self._finished_tis_index = (finished_tis, len(finished_tis), by_task_id)
+        return self._finished_tis_index[2]
@@ -44,9 +44,7 @@ class NotPreviouslySkippedDep(BaseTIDep):
 
         upstream = ti.task.get_direct_relatives(upstream=True)
 
-        finished_tis = dep_context.ensure_finished_tis(ti.get_dagrun(session), session)
-
-        finished_task_ids = {t.task_id for t in finished_tis}
+        finished_task_ids = dep_context.ensure_finished_tis_by_task_id(ti.get_dagrun(session), session)
 
         for parent in upstream:
             if isinstance(parent, SkipMixin):
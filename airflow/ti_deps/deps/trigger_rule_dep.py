@@ -67,10 +67,9 @@ class _UpstreamTIStates(NamedTuple):
         counter: dict[str, int] = Counter()
         setup_counter: dict[str, int] = Counter()
         for ti in finished_upstreams:
-            curr_state = {ti.state: 1}
-            counter.update(curr_state)
+            counter[ti.state] += 1
             if ti.task.is_setup:
-                setup_counter.update(curr_state)
+                setup_counter[ti.state] += 1
         return _UpstreamTIStates(
             success=counter.get(TaskInstanceState.SUCCESS, 0),
             skipped=counter.get(TaskInstanceState.SKIPPED, 0),
@@ -184,6 +183,21 @@ class TriggerRuleDep(BaseTIDep):
                 return True
             return False
 
+        def _iter_finished_upstream_tis(relevant_ids: set[str] | KeysView[str]) -> Iterator[TaskInstance]:
+            """Iterate over the finished task instances of the given upstream tasks.
+
+            The finished task instances of the run are indexed by task_id once per
+            dependency context, so this only goes through the task instances of the
+            upstream tasks instead of all the finished task instances of the run.
+            """
+            finished_tis_by_task_id = dep_context.ensure_finished_tis_by_task_id(
+                ti.get_dagrun(session), session
+            )
+            for upstream_id in relevant_ids:
+                for upstream_ti in finished_tis_by_task_id.get(upstream_id, ()):
+                    if _is_relevant_upstream(upstream=upstream_ti, relevant_ids=relevant_ids):
+                        yield upstream_ti
+
         def _iter_upstream_conditions(relevant_tasks: dict) -> Iterator[ColumnOperators]:
             # Optimization: If the current task is not in a mapped task group,
             # it depends on all upstream task instances.
@@ -225,11 +239,7 @@ class TriggerRuleDep(BaseTIDep):
             task = ti.task
 
             indirect_setups = {k: v for k, v in relevant_setups.items() if k not in task.upstream_task_ids}
-            finished_upstream_tis = (
-                x
-                for x in dep_context.ensure_finished_tis(ti.get_dagrun(session), session)
-                if _is_relevant_upstream(upstream=x, relevant_ids=indirect_setups.keys())
-            )
+            finished_upstream_tis = _iter_finished_upstream_tis(relevant_ids=indirect_setups.keys())
             upstream_states = _UpstreamTIStates.calculate(finished_upstream_tis)
 
             # all of these counts reflect indirect setups which are relevant for this ti
@@ -313,11 +323,7 @@ class TriggerRuleDep(BaseTIDep):
             upstream_tasks = {t.task_id: t for t in task.upstream_list}
             trigger_rule = task.trigger_rule
 
-            finished_upstream_tis = (
-                finished_ti
-                for finished_ti in dep_context.ensure_finished_tis(ti.get_dagrun(session), session)
-                if _is_relevant_upstream(upstream=finished_ti, relevant_ids=ti.task.upstream_task_ids)
-            )
+            finished_upstream_tis = _iter_finished_upstream_tis(relevant_ids=ti.task.upstream_task_ids)
             upstream_states = _UpstreamTIStates.calculate(finished_upstream_tis)
 
             success = upstream_states.success
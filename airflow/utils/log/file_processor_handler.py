@@ -61,6 +61,9 @@ class FileProcessorHandler(logging.Handler):
         :param filename: filename in which the dag is located
         """
         local_loc = self._init_file(filename)
+        if self.handler is not None:
+            # Processes parsing several files in a row switch to the log file of each of them.
+            self.handler.close()
         self.handler = NonCachingFileHandler(local_loc)
         self.handler.setFormatter(self.formatter)
         self.handler.setLevel(self.level)
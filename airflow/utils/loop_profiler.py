@@ -0,0 +1,223 @@
+#
+# Licensed to the Apache Software Foundation (ASF) under one
+# or more contributor license agreements.  See the NOTICE file
+# distributed with this work for additional information
+# regarding copyright ownership.  The ASF licenses this file
+# to you under the Apache License, Version 2.0 (the
+# "License"); you may not use this file except in compliance
+# with the License.  You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+# KIND, either express or implied.  See the License for the
+# specific language governing permissions and limitations
+# under the License.
+"""Instrumentation to find out where the time of a long-running loop is spent."""
+
+from __future__ import annotations
+
+import math
+import os
+import sys
+import threading
+import time
+from collections import Counter, defaultdict, deque
+from contextlib import contextmanager
+from datetime import timedelta
+from functools import partial, wraps
+from typing import TYPE_CHECKING, Callable, Generator, NamedTuple, TypeVar
+
+from sqlalchemy import event
+
+from airflow import settings
+from airflow.stats import Stats
+from airflow.utils import timezone
+from airflow.utils.log.logging_mixin import LoggingMixin
+
+if TYPE_CHECKING:
+    from types import FrameType
+
+T = TypeVar("T")
+
+
+class PhaseStats(NamedTuple):
+    """Rolling statistics of one phase of a loop, durations in seconds."""
+
+    count: int
+    p50: float
+    p90: float
+    p99: float
+    max: float
+    mean_queries: float
+
+
+def _percentile(sorted_values: list[float], percent: float) -> float:
+    """Get the nearest-rank percentile of a non-empty sorted list."""
+    return sorted_values[max(0, math.ceil(len(sorted_values) * percent / 100) - 1)]
+
+
+class LoopPhaseProfiler(LoggingMixin):
+    """
+    Record the duration and the number of SQL queries of each phase of a loop.
+
+    The last ``window_size`` samples of each phase are kept to compute rolling percentiles, and every
+    duration is also sent as a ``<metric_prefix>.<phase>`` timer. SQL queries are counted on the
+    Airflow DB engine, so queries sent by other threads of the process while a phase runs are counted
+    too. Phases can be nested, in which case the queries of the inner phase are also counted in the
+    outer one.
+
+    :param metric_prefix: Prefix of the timers sent for each phase
+    :param window_size: Number of samples of each phase to compute the percentiles on
+    """
+
+    def __init__(self, metric_prefix: str, window_size: int = 1000) -> None:
+        super().__init__()
+        self.metric_prefix = metric_prefix
+        self._durations: dict[str, deque[float]] = defaultdict(partial(deque, maxlen=window_size))
+        self._queries: dict[str, deque[int]] = defaultdict(partial(deque, maxlen=window_size))
+        self._num_queries = 0
+        self._engine = None
+
+    def _count_query(self, *args, **kwargs) -> None:
+        self._num_queries += 1
+
+    def _listen(self) -> None:
+        if self._engine is None and settings.engine is not None:
+            self._engine = settings.engine
+            event.listen(self._engine, "after_cursor_execute", self._count_query)
+
+    def close(self) -> None:
+        """Stop counting the SQL queries."""
+        if self._engine is not None:
+            event.remove(self._engine, "after_cursor_execute", self._count_query)
+            self._engine = None
+
+    @contextmanager
+    def phase(self, name: str) -> Generator[None, None, None]:
+        """Time the code run in the context as the ``name`` phase; it is not recorded if it raises."""
+        self._listen()
+        num_queries = self._num_queries
+        start = time.monotonic()
+        yield
+        duration = time.monotonic() - start
+        self._durations[name].append(duration)
+        self._queries[name].append(self._num_queries - num_queries)
+        Stats.timing(f"{self.metric_prefix}.{name}", timedelta(seconds=duration))
+
+    def wrap(self, name: str, func: Callable[..., T]) -> Callable[..., T]:
+        """Get a function running ``func`` as the ``name`` phase."""
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            with self.phase(name):
+                return func(*args, **kwargs)
+
+        return wrapper
+
+    def get_stats(self) -> dict[str, PhaseStats]:
+        """Get the rolling statistics of every phase recorded so far."""
+        stats = {}
+        for name, durations in self._durations.items():
+            sorted_durations = sorted(durations)
+            queries = self._queries[name]
+            stats[name] = PhaseStats(
+                count=len(sorted_durations),
+                p50=_percentile(sorted_durations, 50),
+                p90=_percentile(sorted_durations, 90),
+                p99=_percentile(sorted_durations, 99),
+                max=sorted_durations[-1],
+                mean_queries=sum(queries) / len(queries),
+            )
+        return stats
+
+    def log_stats(self) -> None:
+        """Log the rolling statistics of every phase, slowest (by p90) first."""
+        stats = sorted(self.get_stats().items(), key=lambda item: item[1].p90, reverse=True)
+        lines = [f"{'phase':<50} {'count':>7} {'p50':>9} {'p90':>9} {'p99':>9} {'max':>9} {'queries':>8}"]
+        lines.extend(
+            f"{name:<50} {s.count:>7} {s.p50:>9.4f} {s.p90:>9.4f} {s.p99:>9.4f} {s.max:>9.4f} "
+            f"{s.mean_queries:>8.1f}"
+            for name, s in stats
+        )
+        self.log.info("Loop phases (durations in seconds, mean SQL queries):\n\t%s", "\n\t".join(lines))
+
+
+def _frame_label(frame: FrameType) -> str:
+    # ";" separates the frames in the folded format
+    module = frame.f_globals.get("__name__", "?")
+    return f"{module}:{frame.f_code.co_name}".replace(";", ":")
+
+
+class StackSampler(LoggingMixin):
+    """
+    Sample the stack of a thread at a regular interval.
+
+    The samples are aggregated in the "folded" format (one ``frame;frame;frame count`` line per
+    distinct stack, root frame first) read by flamegraph tools such as ``flamegraph.pl`` or
+    speedscope.
+
+    :param thread_id: Identifier of the thread to sample, the calling thread if not set
+    :param interval: Seconds between two samples
+    """
+
+    def __init__(self, thread_id: int | None = None, interval: float = 0.01) -> None:
+        super().__init__()
+        self.thread_id = thread_id if thread_id is not None else threading.get_ident()
+        self.interval = interval
+        self.stacks: Counter[str] = Counter()
+
+    def sample(self) -> None:
+        """Take one sample of the stack of the thread."""
+        frame = sys._current_frames().get(self.thread_id)
+        labels = []
+        while frame is not None:
+            labels.append(_frame_label(frame))
+            frame = frame.f_back
+        if labels:
+            self.stacks[";".join(reversed(labels))] += 1
+
+    def run(self, duration: float) -> None:
+        """Sample the stack of the thread for ``duration`` seconds; must not run in the sampled thread."""
+        deadline = time.monotonic() + duration
+        while time.monotonic() < deadline:
+            self.sample()
+            time.sleep(self.interval)
+
+    def dump(self, path: str) -> None:
+        """Write the samples to ``path`` in the folded format."""
+        with open(path, "w") as f:
+            for stack, count in self.stacks.most_common():
+                f.write(f"{stack} {count}\n")
+
+
+def dump_sampled_stacks_in_background(
+    name: str, duration: float, dump_dir: str, interval: float = 0.01
+) -> threading.Thread:
+    """
+    Sample the stack of the calling thread for ``duration`` seconds, without blocking it.
+
+    The samples are written in the folded format to a ``<name>-<pid>-<timestamp>.folded`` file in
+    ``dump_dir`` once done.
+
+    :param name: Prefix of the name of the dump file
+    :param duration: Seconds to sample the stack for
+    :param dump_dir: Directory to write the dump file to
+    :param interval: Seconds between two samples
+    """
+    sampler = StackSampler(interval=interval)
+    path = os.path.join(
+        dump_dir, f"{name}-{os.getpid()}-{timezone.utcnow().strftime('%Y%m%dT%H%M%S')}.folded"
+    )
+
+    def run():
+        sampler.run(duration)
+        sampler.dump(path)
+        sampler.log.info("Wrote %d stack samples to %s", sum(sampler.stacks.values()), path)
+
+    sampler.log.info("Sampling the stack for %.1f seconds", duration)
+    thread = threading.Thread(target=run, name=f"{name}-stack-sampler", daemon=True)
+    thread.start()
+    return thread
@@ -0,0 +1,192 @@
+#
+# Licensed to the Apache Software Foundation (ASF) under one
+# or more contributor license agreements.  See the NOTICE file
+# distributed with this work for additional information
+# regarding copyright ownership.  The ASF licenses this file
+# to you under the Apache License, Version 2.0 (the
+# "License"); you may not use this file except in compliance
+# with the License.  You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+# KIND, either express or implied.  See the License for the
+# specific language governing permissions and limitations
+# under the License.
+"""
+Wake up idle schedulers as soon as there is new work for them.
+
+On Postgres, notifications go through ``LISTEN``/``NOTIFY`` and are delivered once the transaction
+making the change is committed. On other databases, they are sent as datagrams to the schedulers
+running on the same host, through Unix sockets in a shared directory.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import select
+import socket
+import time
+from contextlib import suppress
+from tempfile import gettempdir
+from typing import TYPE_CHECKING, Any
+
+from sqlalchemy import event, text
+
+from airflow import settings
+from airflow.configuration import conf
+from airflow.utils.log.logging_mixin import LoggingMixin
+
+if TYPE_CHECKING:
+    from sqlalchemy.orm import Session
+
+log = logging.getLogger(__name__)
+
+WAKEUP_CHANNEL = "airflow_scheduler_wakeup"
+# Key of Session.info set when the schedulers are to be woken up once the transaction is committed
+_WAKEUP_PENDING = "airflow_scheduler_wakeup_pending"
+
+
+def _is_enabled() -> bool:
+    return conf.getboolean("scheduler", "enable_wakeup_notifications", fallback=False)
+
+
+def _get_socket_dir() -> str:
+    return os.path.join(gettempdir(), WAKEUP_CHANNEL)
+
+
+def _send_wakeup_datagrams() -> None:
+    """Send a datagram to every scheduler listening on this host, removing the stale sockets."""
+    socket_dir = _get_socket_dir()
+    try:
+        socket_names = os.listdir(socket_dir)
+    except FileNotFoundError:
+        return
+    with socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM) as sock:
+        sock.setblocking(False)
+        for socket_name in socket_names:
+            path = os.path.join(socket_dir, socket_name)
+            try:
+                sock.sendto(b"", path)
+            except (ConnectionRefusedError, FileNotFoundError):
+                # The scheduler is gone without removing its socket.
+                with suppress(OSError):
+                    os.unlink(path)
+            except BlockingIOError:
+                # The scheduler has wake-ups pending already.
+                pass
+
+
+def _send_wakeup_after_commit(session: Session) -> None:
+    if session.info.pop(_WAKEUP_PENDING, False):
+        try:
+            _send_wakeup_datagrams()
+        except OSError:
+            # The transaction is committed already, and the schedulers wake up on their own anyway.
+            log.debug("Failed to wake up the schedulers", exc_info=True)
+
+
+def notify_scheduler(session: Session) -> None:
+    """
+    Wake up the idle schedulers once the current transaction of ``session`` is committed.
+
+    Nothing is done unless ``[scheduler] enable_wakeup_notifications`` is set.
+    """
+    if not _is_enabled():
+        return
+    if session.get_bind().dialect.name == "postgresql":
+        # Notifications of the same channel and payload are sent only once per transaction.
+        session.execute(text("SELECT pg_notify(:channel, '')").bindparams(channel=WAKEUP_CHANNEL))
+    elif hasattr(socket, "AF_UNIX"):
+        session.info[_WAKEUP_PENDING] = True
+        if not event.contains(session, "after_commit", _send_wakeup_after_commit):
+            event.listen(session, "after_commit", _send_wakeup_after_commit)
+
+
+class SchedulerWakeupListener(LoggingMixin):
+    """
+    Wait for the notifications sent by ``notify_scheduler``, in place of sleeping a fixed time.
+
+    If listening fails, waiting falls back to sleeping, and listening is attempted again on the next
+    wait.
+    """
+
+    def __init__(self) -> None:
+        super().__init__()
+        self._use_postgres = settings.engine.dialect.name == "postgresql"
+        self._connection: Any = None
+        self._socket: socket.socket | None = None
+        self._socket_path = os.path.join(_get_socket_dir(), f"{os.getpid()}.sock")
+
+    def _listen(self) -> None:
+        if self._use_postgres:
+            if self._connection is None:
+                # A connection of its own, not returned to the pool since it keeps listening.
+                pool_connection = settings.engine.raw_connection()
+                pool_connection.detach()
+                self._connection = pool_connection.dbapi_connection
+                self._connection.autocommit = True
+                with self._connection.cursor() as cursor:
+                    cursor.execute(f"LISTEN {WAKEUP_CHANNEL}")
+        elif self._socket is None and hasattr(socket, "AF_UNIX"):
+            os.makedirs(os.path.dirname(self._socket_path), exist_ok=True)
+            with suppress(FileNotFoundError):
+                os.unlink(self._socket_path)
+            self._socket = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+            self._socket.bind(self._socket_path)
+            self._socket.setblocking(False)
+
+    def _drain(self) -> bool:
+        """Consume the pending notifications, and return whether there were any."""
+        if self._connection is not None:
+            self._connection.poll()
+            notified = bool(self._connection.notifies)
+            self._connection.notifies.clear()
+            return notified
+        notified = False
+        if self._socket is not None:
+            with suppress(BlockingIOError):
+                while True:
+                    self._socket.recv(1)
+                    notified = True
+        return notified
+
+    def wait(self, timeout: float) -> bool:
+        """
+        Wait for a notification for up to ``timeout`` seconds.
+
+        Notifications received since the last wait return immediately.
+
+        :param timeout: Maximum number of seconds to wait for
+        :return: Whether a notification was received
+        """
+        try:
+            self._listen()
+            if self._drain():
+                return True
+            listened = self._connection if self._connection is not None else self._socket
+            if listened is None:
+                time.sleep(timeout)
+                return False
+            readable, _, _ = select.select([listened], [], [], timeout)
+            return bool(readable) and self._drain()
+        except Exception:
+            self.log.warning("Failed to wait for wake-up notifications, sleeping instead", exc_info=True)
+            self.close()
+            time.sleep(timeout)
+            return False
+
+    def close(self) -> None:
+        """Stop listening for notifications."""
+        if self._connection is not None:
+            with suppress(Exception):
+                self._connection.close()
+            self._connection = None
+        if self._socket is not None:
+            self._socket.close()
+            self._socket = None
+            with suppress(FileNotFoundError):
+                os.unlink(self._socket_path)
@@ -416,6 +416,9 @@ class CommitProhibitorGuard:
         self.session = session
 
     def _validate_commit(self, _):
+        if self.session.in_nested_transaction():
+            # Releasing a savepoint keeps the outer transaction, and its locks, going.
+            return
         if self.expected_commit:
             self.expected_commit = False
             return
@@ -652,7 +652,14 @@ export interface paths {
     };
   };
   "/dagSources/{file_token}": {
-    /** Get a source code using file token. */
+    /**
+     * Get a source code using file token.
+     *
+     * The plain text source code can be read partially, by requesting a single byte range
+     * of the source code encoded in UTF-8 with a `Range` header.
+     *
+     * *Changed in version 2.9.0*&#58; The `Range` header is supported.
+     */
     get: operations["get_dag_source"];
     parameters: {
       path: {
@@ -4436,7 +4443,14 @@ export interface operations {
       404: components["responses"]["NotFound"];
     };
   };
-  /** Get a source code using file token. */
+  /**
+   * Get a source code using file token.
+   *
+   * The plain text source code can be read partially, by requesting a single byte range
+   * of the source code encoded in UTF-8 with a `Range` header.
+   *
+   * *Changed in version 2.9.0*&#58; The `Range` header is supported.
+   */
   get_dag_source: {
     parameters: {
       path: {
@@ -4447,6 +4461,14 @@ export interface operations {
          */
         file_token: components["parameters"]["FileToken"];
       };
+      header: {
+        /**
+         * The byte range of the plain text source code to read, e.g. `bytes=0-1023`.
+         *
+         * *New in version 2.9.0*
+         */
+        Range?: string;
+      };
     };
     responses: {
       /** Success. */
@@ -4458,10 +4480,26 @@ export interface operations {
           "plain/text": string;
         };
       };
+      /**
+       * The byte range of the source code requested.
+       *
+       * *New in version 2.9.0*
+       */
+      206: {
+        content: {
+          "plain/text": string;
+        };
+      };
       401: components["responses"]["Unauthenticated"];
       403: components["responses"]["PermissionDenied"];
       404: components["responses"]["NotFound"];
       406: components["responses"]["NotAcceptable"];
+      /**
+       * The byte range requested is not in the source code.
+       *
+       * *New in version 2.9.0*
+       */
+      416: never;
     };
   };
   get_dag_warnings: {
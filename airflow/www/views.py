@@ -5277,10 +5277,12 @@ class DagRunModelView(AirflowModelView):
         try:
             count = 0
             altered_tis = []
-            for dr in session.scalars(select(DagRun).where(DagRun.id.in_(dagrun.id for dagrun in drs))):
+            dag_runs = session.scalars(select(DagRun).where(DagRun.id.in_(dagrun.id for dagrun in drs))).all()
+            dags = get_airflow_app().dag_bag.get_dags({dr.dag_id for dr in dag_runs}, session=session)
+            for dr in dag_runs:
                 count += 1
                 altered_tis += set_dag_run_state_to_failed(
-                    dag=get_airflow_app().dag_bag.get_dag(dr.dag_id),
+                    dag=dags.get(dr.dag_id),
                     run_id=dr.run_id,
                     commit=True,
                     session=session,
@@ -5305,10 +5307,12 @@ class DagRunModelView(AirflowModelView):
         try:
             count = 0
             altered_tis = []
-            for dr in session.scalars(select(DagRun).where(DagRun.id.in_(dagrun.id for dagrun in drs))):
+            dag_runs = session.scalars(select(DagRun).where(DagRun.id.in_(dagrun.id for dagrun in drs))).all()
+            dags = get_airflow_app().dag_bag.get_dags({dr.dag_id for dr in dag_runs}, session=session)
+            for dr in dag_runs:
                 count += 1
                 altered_tis += set_dag_run_state_to_success(
-                    dag=get_airflow_app().dag_bag.get_dag(dr.dag_id),
+                    dag=dags.get(dr.dag_id),
                     run_id=dr.run_id,
                     commit=True,
                     session=session,
@@ -5329,9 +5333,11 @@ class DagRunModelView(AirflowModelView):
             count = 0
             cleared_ti_count = 0
             dag_to_tis: dict[DAG, list[TaskInstance]] = {}
-            for dr in session.scalars(select(DagRun).where(DagRun.id.in_(dagrun.id for dagrun in drs))):
+            dag_runs = session.scalars(select(DagRun).where(DagRun.id.in_(dagrun.id for dagrun in drs))).all()
+            dags = get_airflow_app().dag_bag.get_dags({dr.dag_id for dr in dag_runs}, session=session)
+            for dr in dag_runs:
                 count += 1
-                dag = get_airflow_app().dag_bag.get_dag(dr.dag_id)
+                dag = dags.get(dr.dag_id)
                 tis_to_clear = dag_to_tis.setdefault(dag, [])
                 tis_to_clear += dr.get_task_instances()
 
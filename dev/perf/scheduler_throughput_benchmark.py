@@ -0,0 +1,469 @@
+#!/usr/bin/env python3
+# Licensed to the Apache Software Foundation (ASF) under one
+# or more contributor license agreements.  See the NOTICE file
+# distributed with this work for additional information
+# regarding copyright ownership.  The ASF licenses this file
+# to you under the Apache License, Version 2.0 (the
+# "License"); you may not use this file except in compliance
+# with the License.  You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+# KIND, either express or implied.  See the License for the
+# specific language governing permissions and limitations
+# under the License.
+"""
+End to end benchmark of the scheduler throughput on generated DAG farms.
+
+The scheduler runs in-process against whatever database ``[database] sql_alchemy_conn``
+(or ``--sql-alchemy-conn``) points to, with an executor completing every task instance
+as soon as it is queued, so that the measures only reflect the scheduling overhead.
+
+Run it against a scratch database, initialized with ``airflow db migrate``: every DAG
+not part of the farm is paused while the benchmark runs, and the runs of the farm are
+deleted before each repeat. The DAGs are unpaused again at the end, except for the farm.
+"""
+
+from __future__ import annotations
+
+import gc
+import json
+import math
+import os
+import platform
+import statistics
+import sys
+import time
+from collections import defaultdict
+from datetime import timedelta
+
+import rich_click as click
+
+DAG_ID_PREFIX = "perf_throughput"
+SHAPES = ("wide", "deep", "mapped", "dataset")
+
+
+def _percentile(values, percent):
+    """Get the nearest-rank percentile of ``values``, None if empty."""
+    if not values:
+        return None
+    sorted_values = sorted(values)
+    return sorted_values[max(0, math.ceil(len(sorted_values) * percent / 100) - 1)]
+
+
+def _distribution(values):
+    return {
+        "count": len(values),
+        "mean": statistics.mean(values) if values else None,
+        "p50": _percentile(values, 50),
+        "p90": _percentile(values, 90),
+        "p99": _percentile(values, 99),
+        "max": max(values, default=None),
+    }
+
+
+def get_instant_executor_class():
+    """
+    Create the executor class completing every task instance as soon as it is queued.
+
+    The class is created lazily so that the environment is configured before Airflow is imported.
+    """
+    from sqlalchemy import select
+
+    from airflow.datasets.manager import dataset_manager
+    from airflow.executors.base_executor import BaseExecutor
+    from airflow.models.taskinstance import TaskInstance
+    from airflow.utils import timezone
+    from airflow.utils.session import create_session
+    from airflow.utils.sqlalchemy import tuple_in_condition
+    from airflow.utils.state import TaskInstanceState
+
+    class InstantSuccessExecutor(BaseExecutor):
+        """
+        Executor marking the task instances successful on the next sync, without running them.
+
+        What the task runner would do on success is emulated: the task instance is updated in the
+        database and the dataset events of the task outlets are registered. The time each task
+        instance is queued and completed at is recorded to compute the latencies.
+
+        :param dags: The DAGs of the farm, by DAG id
+        """
+
+        def __init__(self, dags):
+            super().__init__()
+            self.dags = dags
+            self._to_complete = []
+            self.queued_at = {}
+            self.completed_at = {}
+            self.heartbeat_times = []
+
+        def execute_async(self, key, command, queue=None, executor_config=None):
+            self.queued_at[key] = time.monotonic()
+            self._to_complete.append(key)
+
+        def heartbeat(self):
+            self.heartbeat_times.append(time.monotonic())
+            super().heartbeat()
+
+        def sync(self):
+            if not self._to_complete:
+                return
+            keys, self._to_complete = self._to_complete, []
+            with create_session() as session:
+                tis = session.scalars(
+                    select(TaskInstance).where(
+                        tuple_in_condition(
+                            (
+                                TaskInstance.dag_id,
+                                TaskInstance.task_id,
+                                TaskInstance.run_id,
+                                TaskInstance.map_index,
+                            ),
+                            [(k.dag_id, k.task_id, k.run_id, k.map_index) for k in keys],
+                        )
+                    )
+                )
+                now = timezone.utcnow()
+                for ti in tis:
+                    ti._try_number += 1
+                    ti.state = TaskInstanceState.SUCCESS
+                    ti.start_date = ti.end_date = now
+                    ti.duration = 0
+                    for outlet in self.dags[ti.dag_id].get_task(ti.task_id).outlets:
+                        dataset_manager.register_dataset_change(
+                            task_instance=ti, dataset=outlet, session=session
+                        )
+            completed_at = time.monotonic()
+            for key in keys:
+                self.completed_at[key] = completed_at
+                self.success(key)
+
+        def end(self):
+            self.sync()
+
+        def terminate(self):
+            pass
+
+    return InstantSuccessExecutor
+
+
+def build_dag_farm(shape, num_dags, size, num_runs):
+    """
+    Generate the DAGs of the farm.
+
+    * ``wide``: one task fanning out to ``size`` parallel tasks, joined by a last task.
+    * ``deep``: a chain of ``size`` tasks.
+    * ``mapped``: a task mapped over ``size`` values, followed by a downstream task.
+    * ``dataset``: a producer DAG updating a dataset, consumed by a DAG of ``size`` parallel tasks.
+
+    The scheduled DAGs have exactly ``num_runs`` runs to catch up on.
+    """
+    from airflow.datasets import Dataset
+    from airflow.models.dag import DAG
+    from airflow.operators.bash import BashOperator
+    from airflow.utils import timezone
+
+    end_date = timezone.utcnow().replace(hour=0, minute=0, second=0, microsecond=0) - timedelta(days=1)
+    start_date = end_date - timedelta(days=num_runs - 1)
+    dag_kwargs = {
+        "start_date": start_date,
+        "end_date": end_date,
+        "catchup": True,
+        "max_active_runs": num_runs,
+        "max_active_tasks": 100_000,
+        "is_paused_upon_creation": False,
+    }
+
+    def task(task_id):
+        # Never run: the executor completes the task instances instead.
+        return BashOperator(task_id=task_id, bash_command="true")
+
+    dags = []
+    for i in range(num_dags):
+        dag_id = f"{DAG_ID_PREFIX}_{shape}_{i}"
+        if shape == "wide":
+            with DAG(dag_id, schedule="@daily", **dag_kwargs) as dag:
+                task("start") >> [task(f"task_{j}") for j in range(size)] >> task("end")
+            dags.append(dag)
+        elif shape == "deep":
+            with DAG(dag_id, schedule="@daily", **dag_kwargs) as dag:
+                previous = task("task_0")
+                for j in range(1, size):
+                    previous = previous >> task(f"task_{j}")
+            dags.append(dag)
+        elif shape == "mapped":
+            with DAG(dag_id, schedule="@daily", **dag_kwargs) as dag:
+                mapped = BashOperator.partial(task_id="mapped").expand(bash_command=["true"] * size)
+                mapped >> task("end")
+            dags.append(dag)
+        elif shape == "dataset":
+            dataset = Dataset(f"{DAG_ID_PREFIX}://{dag_id}")
+            with DAG(f"{dag_id}_producer", schedule="@daily", **dag_kwargs) as producer:
+                BashOperator(task_id="produce", bash_command="true", outlets=[dataset])
+            # The runs triggered by the dataset are dated when created, after the end date.
+            consumer_kwargs = {**dag_kwargs, "end_date": None}
+            with DAG(f"{dag_id}_consumer", schedule=[dataset], **consumer_kwargs) as consumer:
+                for j in range(size):
+                    task(f"task_{j}")
+            dags.extend((producer, consumer))
+        else:
+            raise ValueError(f"Unknown DAG shape {shape!r}")
+    return dags
+
+
+def get_paused_states(session):
+    """Get whether each DAG of the database is paused, to restore it after the benchmark."""
+    from sqlalchemy import select
+
+    from airflow.models.dag import DagModel
+
+    return dict(session.execute(select(DagModel.dag_id, DagModel.is_paused)).all())
+
+
+def restore_paused_states(paused_states, session):
+    """Restore whether the DAGs are paused, leaving the DAGs written by the benchmark paused."""
+    from sqlalchemy import update
+
+    from airflow.models.dag import DagModel
+
+    session.execute(update(DagModel).values(is_paused=True))
+    unpaused_dag_ids = [dag_id for dag_id, is_paused in paused_states.items() if not is_paused]
+    for start in range(0, len(unpaused_dag_ids), 1000):
+        session.execute(
+            update(DagModel)
+            .where(DagModel.dag_id.in_(unpaused_dag_ids[start : start + 1000]))
+            .values(is_paused=False)
+        )
+
+
+def write_dag_farm(dags, session):
+    """Write the DAGs to the database, pausing all the other DAGs."""
+    from sqlalchemy import update
+
+    from airflow.models.dag import DAG, DagModel
+    from airflow.models.serialized_dag import SerializedDagModel
+
+    session.execute(update(DagModel).values(is_paused=True))
+    DAG.bulk_write_to_db(dags, session=session)
+    for dag in dags:
+        SerializedDagModel.write_dag(dag, session=session)
+    session.execute(
+        update(DagModel).where(DagModel.dag_id.in_([dag.dag_id for dag in dags])).values(is_paused=False)
+    )
+
+
+def reset_dag_farm(dags, session):
+    """Delete the runs of the DAGs and their dataset events, so that they are scheduled anew."""
+    from sqlalchemy import delete
+
+    from airflow.models.dag import DagModel
+    from airflow.models.dagrun import DagRun
+    from airflow.models.dataset import DatasetDagRunQueue, DatasetEvent
+    from airflow.models.taskinstance import TaskInstance
+
+    dag_ids = [dag.dag_id for dag in dags]
+    session.execute(delete(DatasetDagRunQueue).where(DatasetDagRunQueue.target_dag_id.in_(dag_ids)))
+    session.execute(delete(DatasetEvent).where(DatasetEvent.source_dag_id.in_(dag_ids)))
+    session.execute(delete(TaskInstance).where(TaskInstance.dag_id.in_(dag_ids)))
+    session.execute(delete(DagRun).where(DagRun.dag_id.in_(dag_ids)))
+    session.flush()
+    for dag in dags:
+        dag_model = session.get(DagModel, dag.dag_id)
+        dag_model.calculate_dagrun_date_fields(dag, None)
+
+
+def is_dag_farm_done(dag_ids, session):
+    """Whether all the runs of the DAGs are created and finished, with no dataset event pending."""
+    from sqlalchemy import func, select
+
+    from airflow.models.dag import DagModel
+    from airflow.models.dagrun import DagRun
+    from airflow.models.dataset import DatasetDagRunQueue
+    from airflow.utils.state import DagRunState
+
+    pending = (
+        select(func.count())
+        .select_from(DagModel)
+        .where(DagModel.dag_id.in_(dag_ids), DagModel.next_dagrun_create_after.is_not(None))
+        .scalar_subquery()
+        + select(func.count())
+        .select_from(DagRun)
+        .where(DagRun.dag_id.in_(dag_ids), DagRun.state.in_((DagRunState.QUEUED, DagRunState.RUNNING)))
+        .scalar_subquery()
+        + select(func.count())
+        .select_from(DatasetDagRunQueue)
+        .where(DatasetDagRunQueue.target_dag_id.in_(dag_ids))
+        .scalar_subquery()
+    )
+    return session.scalar(select(pending)) == 0
+
+
+def compute_latencies(dags, executor):
+    """
+    Get the task-to-task latencies: from the last upstream task instance completed to queuing.
+
+    The upstream task instances are the ones of the upstream tasks in the same run or, for the
+    first tasks of the DAGs triggered by datasets, the last one updating the datasets before.
+    """
+    completed_at = defaultdict(float)
+    dataset_updated_at = defaultdict(list)
+    for key, at in executor.completed_at.items():
+        task_key = (key.dag_id, key.run_id, key.task_id)
+        completed_at[task_key] = max(completed_at[task_key], at)
+        for outlet in dags[key.dag_id].get_task(key.task_id).outlets:
+            dataset_updated_at[outlet.uri].append(at)
+
+    latencies = []
+    for key, queued_at in executor.queued_at.items():
+        dag = dags[key.dag_id]
+        upstream_ids = dag.get_task(key.task_id).upstream_task_ids
+        if upstream_ids:
+            upstream_completed_at = [
+                completed_at[(key.dag_id, key.run_id, upstream_id)]
+                for upstream_id in upstream_ids
+                if (key.dag_id, key.run_id, upstream_id) in completed_at
+            ]
+        elif dag.dataset_triggers is not None:
+            upstream_completed_at = [
+                at
+                for uri, _ in dag.dataset_triggers.iter_datasets()
+                for at in dataset_updated_at[uri]
+                if at <= queued_at
+            ]
+        else:
+            upstream_completed_at = []
+        if upstream_completed_at:
+            latencies.append(queued_at - max(upstream_completed_at))
+    return latencies
+
+
+def run_benchmark(dags):
+    """Run the scheduler until every run of the DAGs is finished, and get the measures."""
+    from airflow.jobs.job import Job, run_job
+    from airflow.jobs.scheduler_job_runner import SchedulerJobRunner
+    from airflow.utils.session import create_session
+
+    dags_by_id = {dag.dag_id: dag for dag in dags}
+    executor = get_instant_executor_class()(dags=dags_by_id)
+    job_runner = SchedulerJobRunner(job=Job(executor=executor), subdir=os.devnull)
+
+    sync = executor.sync
+
+    def sync_and_stop_when_done():
+        sync()
+        with create_session() as session:
+            if is_dag_farm_done(list(dags_by_id), session):
+                # Exit after the current loop.
+                job_runner.num_runs = 1
+
+    executor.sync = sync_and_stop_when_done
+
+    gc.disable()
+    start = time.monotonic()
+    try:
+        run_job(job=job_runner.job, execute_callable=job_runner._execute)
+    finally:
+        gc.enable()
+    duration = time.monotonic() - start
+
+    num_tis = len(executor.completed_at)
+    heartbeat_times = executor.heartbeat_times
+    return {
+        "duration": duration,
+        "task_instances": num_tis,
+        "task_instances_per_second": num_tis / duration if duration else None,
+        "loops": len(heartbeat_times),
+        "loop_duration": _distribution([b - a for a, b in zip(heartbeat_times, heartbeat_times[1:])]),
+        "task_to_task_latency": _distribution(compute_latencies(dags_by_id, executor)),
+    }
+
+
+def configure_environment(sql_alchemy_conn, parallelism):
+    """Configure Airflow through the environment, before it is imported."""
+    if sql_alchemy_conn:
+        os.environ["AIRFLOW__DATABASE__SQL_ALCHEMY_CONN"] = sql_alchemy_conn
+    os.environ["AIRFLOW__CORE__LOAD_EXAMPLES"] = "False"
+    os.environ["AIRFLOW__CORE__PARALLELISM"] = str(parallelism)
+    os.environ["AIRFLOW__CORE__MAX_ACTIVE_TASKS_PER_DAG"] = str(parallelism)
+    os.environ["AIRFLOW__CORE__DEFAULT_POOL_TASK_SLOT_COUNT"] = str(parallelism)
+    # The DAGs are read from the database: no DAG file processing in the scheduler.
+    os.environ["AIRFLOW__SCHEDULER__STANDALONE_DAG_PROCESSOR"] = "True"
+    os.environ["AIRFLOW__SCHEDULER__SCHEDULER_IDLE_SLEEP_TIME"] = "0"
+    os.environ["AIRFLOW__SCHEDULER__NUM_RUNS"] = "-1"
+
+
+@click.command()
+@click.option("--shape", type=click.Choice(SHAPES), multiple=True, help="DAG shapes to run, all by default")
+@click.option("--num-dags", default=10, help="number of DAGs (producer/consumer pairs for datasets)")
+@click.option("--size", default=50, help="number of tasks (or mapped task instances) per DAG")
+@click.option("--num-runs", default=3, help="number of runs of each scheduled DAG")
+@click.option("--repeat", default=3, help="number of times to run each shape, to reduce variance")
+@click.option("--parallelism", default=1024, help="parallelism and pool size of the scheduler")
+@click.option("--sql-alchemy-conn", default=None, help="database to run against, the configured one if unset")
+@click.option("--output", type=click.File("w"), default="-", help="file to write the JSON report to")
+def main(shape, num_dags, size, num_runs, repeat, parallelism, sql_alchemy_conn, output):
+    """
+    Measure the scheduler throughput on generated DAG farms.
+
+    For each DAG shape, the scheduler is run until all the runs of the farm are
+    finished, ``--repeat`` times. The report gives, for each repeat, the task
+    instances completed per second, the distribution of the scheduler loop
+    durations and of the task-to-task latencies (from the last upstream task
+    instance completing to the downstream one being queued), in seconds.
+
+    Reports of different versions, configurations or databases can be compared as
+    long as they are generated with the same options.
+    """
+    configure_environment(sql_alchemy_conn, parallelism)
+
+    import airflow
+    from airflow import settings
+    from airflow.utils.session import create_session
+
+    report = {
+        "airflow_version": airflow.__version__,
+        "python_version": platform.python_version(),
+        "database": settings.engine.dialect.name,
+        "options": {
+            "num_dags": num_dags,
+            "size": size,
+            "num_runs": num_runs,
+            "repeat": repeat,
+            "parallelism": parallelism,
+        },
+        "shapes": {},
+    }
+    with create_session() as session:
+        paused_states = get_paused_states(session)
+    try:
+        for dag_shape in shape or SHAPES:
+            dags = build_dag_farm(dag_shape, num_dags, size, num_runs)
+            with create_session() as session:
+                write_dag_farm(dags, session)
+            results = []
+            for count in range(repeat):
+                with create_session() as session:
+                    reset_dag_farm(dags, session)
+                results.append(run_benchmark(dags))
+                print(
+                    f"{dag_shape} run {count + 1}: {results[-1]['task_instances']} task instances in "
+                    f"{results[-1]['duration']:.2f}s",
+                    file=sys.stderr,
+                )
+            report["shapes"][dag_shape] = {
+                "task_instances_per_second": _distribution([r["task_instances_per_second"] for r in results]),
+                "runs": results,
+            }
+    finally:
+        with create_session() as session:
+            restore_paused_states(paused_states, session)
+
+    json.dump(report, output, indent=2)
+    output.write("\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+# Licensed to the Apache Software Foundation (ASF) under one
+# or more contributor license agreements.  See the NOTICE file
+# distributed with this work for additional information
+# regarding copyright ownership.  The ASF licenses this file
+# to you under the Apache License, Version 2.0 (the
+# "License"); you may not use this file except in compliance
+# with the License.  You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+# KIND, either express or implied.  See the License for the
+# specific language governing permissions and limitations
+# under the License.
+from __future__ import annotations
+
+import os
+import statistics
+import time
+from unittest import mock
+
+import rich_click as click
+
+PERF_DAG_ID = "perf_scheduling_state_cache"
+
+
+def create_dag(num_tasks):
+    """
+    Create a linear DAG of ``num_tasks`` tasks and write it to the serialized_dag table.
+    """
+    from airflow.models.dag import DAG
+    from airflow.models.serialized_dag import SerializedDagModel
+    from airflow.operators.empty import EmptyOperator
+    from airflow.utils import timezone
+
+    with DAG(PERF_DAG_ID, start_date=timezone.datetime(2020, 1, 1), schedule="@daily") as dag:
+        previous = None
+        for i in range(num_tasks):
+            task = EmptyOperator(task_id=f"task_{i}")
+            if previous:
+                previous >> task
+            previous = task
+
+    dag.sync_to_db()
+    SerializedDagModel.write_dag(dag)
+    return dag
+
+
+def create_running_dag_runs(dag, num_runs, session):
+    """
+    Create ``num_runs`` running DAG runs, each waiting on its first task to finish.
+    """
+    from datetime import timedelta
+
+    from airflow.models.dagrun import DagRun
+    from airflow.utils.state import DagRunState, TaskInstanceState
+    from airflow.utils.types import DagRunType
+
+    session.query(DagRun).filter(DagRun.dag_id == dag.dag_id).delete()
+    for i in range(num_runs):
+        execution_date = dag.start_date + timedelta(days=i)
+        dag_run = dag.create_dagrun(
+            run_type=DagRunType.MANUAL,
+            run_id=f"perf_{i}",
+            execution_date=execution_date,
+            data_interval=dag.infer_automated_data_interval(execution_date),
+            state=DagRunState.RUNNING,
+            external_trigger=True,
+            session=session,
+        )
+        dag_run.get_task_instance("task_0", session=session).state = TaskInstanceState.RUNNING
+    session.commit()
+
+
+def time_scheduling_loops(num_loops, use_cache, session):
+    """
+    Time ``SchedulerJobRunner._schedule_all_dag_runs`` over all the active runs of the DAG.
+    """
+    from airflow.jobs.job import Job
+    from airflow.jobs.scheduler_job_runner import SchedulerJobRunner
+    from airflow.models.dagrun import DagRun
+
+    with mock.patch.dict(os.environ, {"AIRFLOW__SCHEDULER__USE_SCHEDULING_STATE_CACHE": str(use_cache)}):
+        job_runner = SchedulerJobRunner(job=Job(), subdir=os.devnull)
+
+    times = []
+    for _ in range(num_loops):
+        dag_runs = session.query(DagRun).filter(DagRun.dag_id == PERF_DAG_ID).all()
+        start = time.perf_counter()
+        job_runner._schedule_all_dag_runs(mock.MagicMock(), dag_runs, session)
+        times.append(time.perf_counter() - start)
+        session.commit()
+    # The first loop always evaluates every run; report it separately from the steady state.
+    return times[0], statistics.mean(times[1:])
+
+
+@click.command()
+@click.option("--num-tasks", default=50, help="number of tasks in the DAG")
+@click.option("--num-loops", default=5, help="number of scheduling loops to time for each run count")
+@click.argument("run_counts", type=int, nargs=-1)
+def main(num_tasks, num_loops, run_counts):
+    """
+    Measure the scheduling loop time against the number of active DAG runs.
+
+    The DAG runs are all waiting on a running task, i.e. nothing changes between
+    two loops. The loops are timed with and without
+    ``[scheduler] use_scheduling_state_cache``.
+    """
+    from airflow.utils import db
+
+    run_counts = run_counts or (100, 500, 1000, 3000)
+    if num_loops < 2:
+        raise click.BadParameter("at least two loops are needed", param_hint="--num-loops")
+
+    dag = create_dag(num_tasks)
+
+    print(f"{'runs':>8} {'cache':>6} {'first loop (s)':>15} {'next loops (s)':>15}")
+    for num_runs in run_counts:
+        with db.create_session() as session:
+            create_running_dag_runs(dag, num_runs, session)
+            for use_cache in (False, True):
+                first, steady = time_scheduling_loops(num_loops, use_cache, session)
+                print(f"{num_runs:>8} {str(use_cache):>6} {first:>15.4f} {steady:>15.4f}")
+
+
+if __name__ == "__main__":
+    main()
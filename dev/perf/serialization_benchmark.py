@@ -0,0 +1,208 @@
+#!/usr/bin/env python3
+# Licensed to the Apache Software Foundation (ASF) under one
+# or more contributor license agreements.  See the NOTICE file
+# distributed with this work for additional information
+# regarding copyright ownership.  The ASF licenses this file
+# to you under the Apache License, Version 2.0 (the
+# "License"); you may not use this file except in compliance
+# with the License.  You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+# KIND, either express or implied.  See the License for the
+# specific language governing permissions and limitations
+# under the License.
+"""
+Micro-benchmark of the serialization and deserialization of representative DAGs.
+
+No database is needed: DAGs are generated in memory, and only the conversion between
+DAG objects and their serialized form (as stored in the ``serialized_dag`` table) is measured.
+"""
+
+from __future__ import annotations
+
+import json
+import platform
+import statistics
+import sys
+import time
+from datetime import datetime, timedelta
+
+import rich_click as click
+
+SHAPES = ("wide", "deep", "task_groups", "mapped", "templated", "datasets")
+OPERATIONS = ("serialize_dag", "to_dict", "to_json", "from_json", "from_dict")
+
+
+def build_dag(shape, size):
+    """
+    Generate a DAG of the given shape.
+
+    * ``wide``: one task fanning out to ``size`` parallel tasks, joined by a last task.
+    * ``deep``: a chain of ``size`` tasks.
+    * ``task_groups``: ``size`` tasks in nested task groups of 10 tasks, with params.
+    * ``mapped``: ``size`` mapped tasks, with mapped task groups.
+    * ``templated``: ``size`` tasks with templated fields, default args and callbacks.
+    * ``datasets``: ``size`` tasks updating datasets, in a DAG scheduled on datasets.
+    """
+    from airflow.datasets import Dataset
+    from airflow.decorators import task, task_group
+    from airflow.models.dag import DAG
+    from airflow.models.param import Param
+    from airflow.operators.bash import BashOperator
+    from airflow.operators.python import PythonOperator
+    from airflow.utils.task_group import TaskGroup
+
+    dag_kwargs = {"start_date": datetime(2024, 1, 1), "schedule": "@daily"}
+    dag_id = f"serialization_benchmark_{shape}"
+    if shape == "wide":
+        with DAG(dag_id, **dag_kwargs) as dag:
+            start = BashOperator(task_id="start", bash_command="true")
+            end = BashOperator(task_id="end", bash_command="true")
+            start >> [BashOperator(task_id=f"task_{i}", bash_command="true") for i in range(size)] >> end
+    elif shape == "deep":
+        with DAG(dag_id, **dag_kwargs) as dag:
+            previous = BashOperator(task_id="task_0", bash_command="true")
+            for i in range(1, size):
+                previous = previous >> BashOperator(task_id=f"task_{i}", bash_command="true")
+    elif shape == "task_groups":
+        params = {"count": Param(10, type="integer", minimum=0), "name": Param("x", type="string")}
+        with DAG(dag_id, params=params, **dag_kwargs) as dag:
+            for i in range(0, size, 10):
+                with TaskGroup(f"group_{i // 10}"):
+                    with TaskGroup("inner"):
+                        for j in range(i, min(i + 10, size)):
+                            BashOperator(task_id=f"task_{j}", bash_command="echo {{ params.name }}")
+    elif shape == "mapped":
+        with DAG(dag_id, **dag_kwargs) as dag:
+
+            @task
+            def generate():
+                return [1, 2, 3]
+
+            @task
+            def consume(value):
+                return value
+
+            @task_group
+            def group(value):
+                consume(value)
+
+            values = generate()
+            for i in range(size // 2):
+                consume.override(task_id=f"consume_{i}").expand(value=values)
+                group.override(group_id=f"group_{i}").expand(value=values)
+    elif shape == "templated":
+        default_args = {
+            "owner": "benchmark",
+            "retries": 3,
+            "retry_delay": timedelta(minutes=5),
+            "email": ["benchmark@example.com"],
+            "on_failure_callback": print,
+        }
+        with DAG(dag_id, default_args=default_args, **dag_kwargs) as dag:
+            for i in range(size):
+                PythonOperator(
+                    task_id=f"task_{i}",
+                    python_callable=print,
+                    op_kwargs={"date": "{{ ds }}", "index": i, "values": list(range(10))},
+                    templates_dict={"query": "SELECT * FROM table WHERE ds = '{{ ds }}'"},
+                    execution_timeout=timedelta(hours=1),
+                )
+    elif shape == "datasets":
+        schedule = [Dataset(f"benchmark://upstream/{i}") for i in range(10)]
+        with DAG(dag_id, start_date=dag_kwargs["start_date"], schedule=schedule) as dag:
+            for i in range(size):
+                BashOperator(
+                    task_id=f"task_{i}",
+                    bash_command="true",
+                    outlets=[Dataset(f"benchmark://downstream/{i}")],
+                )
+    else:
+        raise ValueError(f"Unknown DAG shape {shape!r}")
+    return dag
+
+
+def _measure(func, repeat):
+    """Call ``func`` ``repeat`` times, and get the distribution of the durations in seconds."""
+    durations = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        durations.append(time.perf_counter() - start)
+    return {
+        "min": min(durations),
+        "median": statistics.median(durations),
+        "max": max(durations),
+    }
+
+
+def run_benchmark(dag, repeat):
+    """Measure each operation on the DAG."""
+    from airflow.serialization.serialized_objects import SerializedDAG
+
+    serialized = SerializedDAG.to_dict(dag)
+    serialized_json = json.dumps(serialized)
+    loaded = json.loads(serialized_json)
+    operations = {
+        # Without validating the schema
+        "serialize_dag": lambda: SerializedDAG.serialize_dag(dag),
+        "to_dict": lambda: SerializedDAG.to_dict(dag),
+        "to_json": lambda: json.dumps(SerializedDAG.to_dict(dag)),
+        "from_json": lambda: SerializedDAG.from_dict(json.loads(serialized_json)),
+        "from_dict": lambda: SerializedDAG.from_dict(loaded),
+    }
+    result = {"num_tasks": len(dag.task_dict), "serialized_size": len(serialized_json)}
+    for name, func in operations.items():
+        # Warm up the caches, as a long-running DAG processor would be.
+        func()
+        result[name] = _measure(func, repeat)
+    return result
+
+
+@click.command()
+@click.option("--shape", type=click.Choice(SHAPES), multiple=True, help="DAG shapes to run, all by default")
+@click.option("--size", default=1000, help="number of tasks per DAG")
+@click.option("--repeat", default=5, help="number of times to run each operation, to reduce variance")
+@click.option("--output", type=click.File("w"), default="-", help="file to write the JSON report to")
+def main(shape, size, repeat, output):
+    """
+    Measure the serialization and deserialization of generated DAGs.
+
+    For each DAG shape, each operation is run ``--repeat`` times, and the report gives
+    the minimum, median and maximum durations in seconds:
+
+    * ``serialize_dag``: serializing the DAG, without validating the result against the schema.
+    * ``to_dict``: serializing and validating the DAG, as when writing it to the database.
+    * ``to_json``: the same, then dumping it to JSON.
+    * ``from_json``: loading the JSON and deserializing the DAG, as when reading it from the database.
+    * ``from_dict``: deserializing the DAG only.
+
+    Reports of different versions can be compared as long as they are generated with the
+    same options.
+    """
+    import airflow
+
+    report = {
+        "airflow_version": airflow.__version__,
+        "python_version": platform.python_version(),
+        "options": {"size": size, "repeat": repeat},
+        "shapes": {},
+    }
+    for dag_shape in shape or SHAPES:
+        dag = build_dag(dag_shape, size)
+        report["shapes"][dag_shape] = result = run_benchmark(dag, repeat)
+        print(
+            f"{dag_shape}: " + ", ".join(f"{name} {result[name]['median']:.3f}s" for name in OPERATIONS),
+            file=sys.stderr,
+        )
+
+    json.dump(report, output, indent=2)
+    output.write("\n")
+
+
+if __name__ == "__main__":
+    main()
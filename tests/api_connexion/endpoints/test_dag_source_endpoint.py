@@ -202,3 +202,65 @@ class TestGetSource:
         )
         assert response.status_code == 403
         assert read_dag.status_code == 200
+
+    @pytest.mark.parametrize(
+        "range_header, expected_range",
+        [
+            pytest.param("bytes=0-9", (0, 10), id="start"),
+            pytest.param("bytes=10-", (10, None), id="open_ended"),
+            pytest.param("bytes=-5", (-5, None), id="suffix"),
+        ],
+    )
+    def test_should_respond_206_range(self, url_safe_serializer, range_header, expected_range):
+        dagbag = DagBag(dag_folder=EXAMPLE_DAG_FILE)
+        dagbag.sync_to_db()
+        test_dag: DAG = dagbag.dags[TEST_DAG_ID]
+        with open(test_dag.fileloc, "rb") as f:
+            source = f.read()
+
+        url = f"/api/v1/dagSources/{url_safe_serializer.dumps(test_dag.fileloc)}"
+        response = self.client.get(
+            url,
+            headers={"Accept": "text/plain", "Range": range_header},
+            environ_overrides={"REMOTE_USER": "test"},
+        )
+
+        start, end = expected_range
+        expected = source[slice(start, end)]
+        assert 206 == response.status_code
+        assert expected == response.data
+        start = start % len(source)
+        assert f"bytes {start}-{start + len(expected) - 1}/{len(source)}" == response.headers["Content-Range"]
+
+    def test_should_respond_200_full_source_without_range(self, url_safe_serializer):
+        dagbag = DagBag(dag_folder=EXAMPLE_DAG_FILE)
+        dagbag.sync_to_db()
+        test_dag: DAG = dagbag.dags[TEST_DAG_ID]
+        with open(test_dag.fileloc, "rb") as f:
+            source = f.read()
+
+        url = f"/api/v1/dagSources/{url_safe_serializer.dumps(test_dag.fileloc)}"
+        response = self.client.get(
+            url, headers={"Accept": "text/plain"}, environ_overrides={"REMOTE_USER": "test"}
+        )
+
+        assert 200 == response.status_code
+        assert source == response.data
+        assert "bytes" == response.headers["Accept-Ranges"]
+        assert str(len(source)) == response.headers["Content-Length"]
+
+    def test_should_respond_416_unsatisfiable_range(self, url_safe_serializer):
+        dagbag = DagBag(dag_folder=EXAMPLE_DAG_FILE)
+        dagbag.sync_to_db()
+        test_dag: DAG = dagbag.dags[TEST_DAG_ID]
+        size = os.path.getsize(test_dag.fileloc)
+
+        url = f"/api/v1/dagSources/{url_safe_serializer.dumps(test_dag.fileloc)}"
+        response = self.client.get(
+            url,
+            headers={"Accept": "text/plain", "Range": f"bytes={size}-"},
+            environ_overrides={"REMOTE_USER": "test"},
+        )
+
+        assert 416 == response.status_code
+        assert f"bytes */{size}" == response.headers["Content-Range"]
@@ -0,0 +1,143 @@
+#
+# Licensed to the Apache Software Foundation (ASF) under one
+# or more contributor license agreements.  See the NOTICE file
+# distributed with this work for additional information
+# regarding copyright ownership.  The ASF licenses this file
+# to you under the Apache License, Version 2.0 (the
+# "License"); you may not use this file except in compliance
+# with the License.  You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+# KIND, either express or implied.  See the License for the
+# specific language governing permissions and limitations
+# under the License.
+from __future__ import annotations
+
+import textwrap
+from unittest import mock
+
+import pytest
+
+from airflow.dag_processing.file_fingerprints import DagFileFingerprints
+from airflow.models.variable import Variable
+from tests.test_utils.db import clear_db_variables
+
+
+@pytest.fixture
+def dag_folder(tmp_path):
+    (tmp_path / "common").mkdir()
+    (tmp_path / "common" / "__init__.py").write_text("")
+    (tmp_path / "common" / "helpers.py").write_text("from .constants import OWNER\n")
+    (tmp_path / "common" / "constants.py").write_text("OWNER = 'airflow'\n")
+    (tmp_path / "dag.py").write_text(
+        textwrap.dedent(
+            """
+            import os
+            from airflow import DAG
+            from common.helpers import OWNER
+
+            dag = DAG("dag", default_args={"owner": OWNER})
+            """
+        )
+    )
+    return tmp_path
+
+
+class TestDagFileFingerprints:
+    def test_fingerprint_changes_with_file_and_local_imports(self, dag_folder):
+        fingerprints = DagFileFingerprints(search_paths=[str(dag_folder)], max_age=0)
+        dag_file = str(dag_folder / "dag.py")
+        fingerprint = fingerprints.compute(dag_file)
+        assert fingerprint is not None
+        assert fingerprints.compute(dag_file) == fingerprint
+
+        # Imported transitively, through a relative import.
+        (dag_folder / "common" / "constants.py").write_text("OWNER = 'someone else'\n")
+        assert fingerprints.compute(dag_file) not in (None, fingerprint)
+
+        fingerprint = fingerprints.compute(dag_file)
+        with open(dag_file, "a") as f:
+            f.write("# A comment\n")
+        assert fingerprints.compute(dag_file) not in (None, fingerprint)
+
+    def test_missing_file_has_no_fingerprint(self, dag_folder):
+        fingerprints = DagFileFingerprints(search_paths=[str(dag_folder)], max_age=0)
+        assert fingerprints.compute(str(dag_folder / "missing.py")) is None
+
+    @pytest.mark.db_test
+    def test_fingerprint_changes_with_variables(self, dag_folder):
+        clear_db_variables()
+        dag_file = dag_folder / "variable_dag.py"
+        dag_file.write_text(
+            'from airflow.models import Variable\nschedule = Variable.get("schedule", None)\n'
+        )
+        fingerprints = DagFileFingerprints(search_paths=[str(dag_folder)], max_age=0)
+        fingerprint = fingerprints.compute(str(dag_file))
+        assert fingerprint is not None
+
+        Variable.set("schedule", "@daily")
+        try:
+            assert fingerprints.compute(str(dag_file)) not in (None, fingerprint)
+        finally:
+            clear_db_variables()
+
+    def test_modules_are_only_read_again_once_modified(self, dag_folder):
+        fingerprints = DagFileFingerprints(search_paths=[str(dag_folder)], max_age=0)
+        dag_file = str(dag_folder / "dag.py")
+        fingerprint = fingerprints.compute(dag_file)
+
+        with mock.patch("airflow.dag_processing.file_fingerprints.open") as mock_open:
+            assert fingerprints.compute(dag_file) == fingerprint
+        mock_open.assert_not_called()
+
+    def test_variables_are_cached(self, dag_folder):
+        dag_file = dag_folder / "variable_dag.py"
+        dag_file.write_text('from airflow.models import Variable\nschedule = Variable.get("schedule")\n')
+        fingerprints = DagFileFingerprints(search_paths=[str(dag_folder)], max_age=0, variable_ttl=30)
+
+        with mock.patch.object(Variable, "get_variable_from_secrets", return_value="@daily") as mock_get:
+            with mock.patch("airflow.dag_processing.file_fingerprints.time.monotonic", return_value=1000):
+                fingerprint = fingerprints.compute(str(dag_file))
+            mock_get.return_value = "@hourly"
+            with mock.patch("airflow.dag_processing.file_fingerprints.time.monotonic", return_value=1020):
+                assert fingerprints.compute(str(dag_file)) == fingerprint
+            with mock.patch("airflow.dag_processing.file_fingerprints.time.monotonic", return_value=1031):
+                assert fingerprints.compute(str(dag_file)) not in (None, fingerprint)
+        assert mock_get.call_count == 2
+
+    def test_variables_with_non_literal_keys_have_no_fingerprint(self, dag_folder):
+        dag_file = dag_folder / "variable_dag.py"
+        dag_file.write_text(
+            "from airflow.models import Variable\nfor env in ('dev', 'prod'):\n    Variable.get(f'{env}_schedule')\n"
+        )
+        fingerprints = DagFileFingerprints(search_paths=[str(dag_folder)], max_age=0)
+        assert fingerprints.compute(str(dag_file)) is None
+
+    def test_is_unchanged(self, dag_folder):
+        fingerprints = DagFileFingerprints(search_paths=[str(dag_folder)], max_age=60)
+        dag_file = str(dag_folder / "dag.py")
+        fingerprint = fingerprints.compute(dag_file)
+        assert not fingerprints.is_unchanged(dag_file, fingerprint)
+
+        fingerprints.record(dag_file, fingerprint)
+        assert fingerprints.is_unchanged(dag_file, fingerprint)
+        assert not fingerprints.is_unchanged(dag_file, "other fingerprint")
+        assert not fingerprints.is_unchanged(dag_file, None)
+
+        fingerprints.invalidate([dag_file])
+        assert not fingerprints.is_unchanged(dag_file, fingerprint)
+
+    def test_fingerprints_expire(self, dag_folder):
+        fingerprints = DagFileFingerprints(search_paths=[str(dag_folder)], max_age=60)
+        dag_file = str(dag_folder / "dag.py")
+        fingerprint = fingerprints.compute(dag_file)
+        with mock.patch("airflow.dag_processing.file_fingerprints.time.monotonic", return_value=1000):
+            fingerprints.record(dag_file, fingerprint)
+        with mock.patch("airflow.dag_processing.file_fingerprints.time.monotonic", return_value=1030):
+            assert fingerprints.is_unchanged(dag_file, fingerprint)
+        with mock.patch("airflow.dag_processing.file_fingerprints.time.monotonic", return_value=1061):
+            assert not fingerprints.is_unchanged(dag_file, fingerprint)
@@ -37,7 +37,7 @@ from unittest.mock import MagicMock, Mock, PropertyMock
 
 import pytest
 import time_machine
-from sqlalchemy import func
+from sqlalchemy import func, select
 
 from airflow.callbacks.callback_requests import CallbackRequest, DagCallbackRequest, SlaCallbackRequest
 from airflow.config_templates.airflow_local_settings import DEFAULT_LOGGING_CONFIG
@@ -45,15 +45,18 @@ from airflow.configuration import conf
 from airflow.dag_processing.manager import (
     DagFileProcessorAgent,
     DagFileProcessorManager,
+    DagFileReparseRequest,
     DagFileStat,
     DagParsingSignal,
     DagParsingStat,
 )
 from airflow.dag_processing.processor import DagFileProcessorProcess
+from airflow.dag_processing.resource_usage import DagFileResourceUsage
 from airflow.jobs.dag_processor_job_runner import DagProcessorJobRunner
 from airflow.jobs.job import Job
 from airflow.models import DagBag, DagModel, DbCallbackRequest, errors
 from airflow.models.dagcode import DagCode
+from airflow.models.dagfileparsingstats import DagFileParsingStats
 from airflow.models.serialized_dag import SerializedDagModel
 from airflow.utils import timezone
 from airflow.utils.net import get_hostname
@@ -61,7 +64,13 @@ from airflow.utils.session import create_session
 from tests.core.test_logging_config import SETTINGS_FILE_VALID, settings_context
 from tests.models import TEST_DAGS_FOLDER
 from tests.test_utils.config import conf_vars
-from tests.test_utils.db import clear_db_callbacks, clear_db_dags, clear_db_runs, clear_db_serialized_dags
+from tests.test_utils.db import (
+    clear_db_callbacks,
+    clear_db_dag_file_parsing_stats,
+    clear_db_dags,
+    clear_db_runs,
+    clear_db_serialized_dags,
+)
 
 pytestmark = pytest.mark.db_test
 
@@ -123,6 +132,7 @@ class TestDagProcessorJobRunner:
         clear_db_serialized_dags()
         clear_db_dags()
         clear_db_callbacks()
+        clear_db_dag_file_parsing_stats()
 
     def teardown_class(self):
         clear_db_runs()
@@ -188,6 +198,415 @@ class TestDagProcessorJobRunner:
         child_pipe.close()
         parent_pipe.close()
 
+    @conf_vars({("scheduler", "skip_unchanged_dag_files"): "True"})
+    @mock.patch.object(DagFileProcessorManager, "count_serialized_dags")
+    @mock.patch.object(DagFileProcessorManager, "update_last_parsed_time")
+    @mock.patch.object(DagFileProcessorManager, "_create_process")
+    def test_unchanged_files_are_not_parsed_again(
+        self, mock_create_process, mock_update_last_parsed_time, mock_count_serialized_dags, tmp_path
+    ):
+        file_path = os.fspath(tmp_path / "temp_dag.py")
+        pathlib.Path(file_path).write_text('"airflow DAG"')
+        mock_count_serialized_dags.return_value = {file_path: 1}
+        manager = DagFileProcessorManager(
+            dag_directory=tmp_path,
+            max_runs=1,
+            processor_timeout=timedelta(days=365),
+            signal_conn=MagicMock(),
+            dag_ids=[],
+            pickle_dags=False,
+            async_mode=True,
+        )
+        processor = mock_create_process.return_value
+        processor.file_path = file_path
+        processor.result = (1, 0)
+        processor.resource_usage = None
+        processor.start_time = timezone.utcnow()
+
+        manager._file_path_queue = deque([file_path])
+        manager.start_new_processes()
+        assert mock_create_process.call_count == 1
+        manager._processors.pop(file_path)
+        manager._collect_results_from_processor(processor)
+
+        manager._file_path_queue = deque([file_path])
+        manager.start_new_processes()
+        assert mock_create_process.call_count == 1
+        mock_update_last_parsed_time.assert_called_once_with([file_path])
+        mock_count_serialized_dags.assert_called_once_with([file_path])
+        stat = manager._file_stats[file_path]
+        assert (stat.num_dags, stat.import_errors, stat.run_count) == (1, 0, 2)
+
+        # Files are parsed again once invalidated, or once changed.
+        manager.invalidate_file_fingerprints([file_path])
+        manager._file_path_queue = deque([file_path])
+        manager.start_new_processes()
+        assert mock_create_process.call_count == 2
+        manager._processors.pop(file_path)
+        manager._collect_results_from_processor(processor)
+
+        pathlib.Path(file_path).write_text('"airflow DAG, changed"')
+        manager._file_path_queue = deque([file_path])
+        manager.start_new_processes()
+        assert mock_create_process.call_count == 3
+        manager._processors.pop(file_path)
+        manager._collect_results_from_processor(processor)
+
+        # Files are parsed again once their DAGs are deleted, even if unchanged.
+        mock_count_serialized_dags.return_value = {}
+        manager._file_path_queue = deque([file_path])
+        manager.start_new_processes()
+        assert mock_create_process.call_count == 4
+        mock_count_serialized_dags.assert_called_with([file_path])
+
+    @conf_vars({("scheduler", "static_dag_discovery"): "True"})
+    @mock.patch.object(DagFileProcessorManager, "_create_process")
+    def test_files_without_static_dags_are_parsed(self, mock_create_process, tmp_path):
+        dag_file_path = os.fspath(tmp_path / "dag.py")
+        pathlib.Path(dag_file_path).write_text("from airflow import DAG\ndag = DAG('dag')\n")
+        helper_file_path = os.fspath(tmp_path / "helper.py")
+        pathlib.Path(helper_file_path).write_text("# Not an airflow DAG\ndef helper():\n    pass\n")
+        manager = DagFileProcessorManager(
+            dag_directory=tmp_path,
+            max_runs=1,
+            processor_timeout=timedelta(days=365),
+            signal_conn=MagicMock(),
+            dag_ids=[],
+            pickle_dags=False,
+            async_mode=True,
+        )
+
+        manager._parallelism = 2
+        manager._file_path_queue = deque([helper_file_path, dag_file_path])
+        manager.start_new_processes()
+
+        # Finding no DAG in a file is no evidence it defines none.
+        assert [call.args[0] for call in mock_create_process.call_args_list] == [
+            helper_file_path,
+            dag_file_path,
+        ]
+        assert manager._parsed_static_dag_ids == {
+            helper_file_path: frozenset(),
+            dag_file_path: frozenset(["dag"]),
+        }
+
+    @conf_vars(
+        {
+            ("scheduler", "static_dag_discovery"): "True",
+            ("scheduler", "file_parsing_sort_mode"): "alphabetical",
+        }
+    )
+    def test_files_with_changed_dags_are_queued_first(self, tmp_path):
+        file_paths = [os.fspath(tmp_path / f"dag_{i}.py") for i in range(3)]
+        for i, file_path in enumerate(file_paths):
+            pathlib.Path(file_path).write_text(f"from airflow import DAG\ndag = DAG('dag_{i}')\n")
+        manager = DagFileProcessorManager(
+            dag_directory=tmp_path,
+            max_runs=1,
+            processor_timeout=timedelta(days=365),
+            signal_conn=MagicMock(),
+            dag_ids=[],
+            pickle_dags=False,
+            async_mode=True,
+        )
+        manager.set_file_paths(file_paths)
+        manager._parsed_static_dag_ids = {file_path: frozenset() for file_path in file_paths}
+        manager._parsed_static_dag_ids[file_paths[0]] = frozenset(["dag_0"])
+        manager._parsed_static_dag_ids[file_paths[2]] = frozenset(["dag_2"])
+
+        manager.prepare_file_path_queue()
+
+        assert list(manager._file_path_queue) == [file_paths[1], file_paths[0], file_paths[2]]
+
+    def test_update_last_parsed_time(self):
+        with create_session() as session:
+            session.add_all(
+                [
+                    DagModel(dag_id="unchanged", fileloc="/dags/unchanged.py", is_active=True),
+                    DagModel(dag_id="other", fileloc="/dags/other.py", is_active=True),
+                ]
+            )
+        DagFileProcessorManager.update_last_parsed_time(["/dags/unchanged.py"])
+
+        with create_session() as session:
+            last_parsed_times = dict(
+                session.execute(select(DagModel.dag_id, DagModel.last_parsed_time)).all()
+            )
+        assert last_parsed_times["unchanged"] is not None
+        assert last_parsed_times["other"] is None
+
+    def test_count_serialized_dags(self):
+        test_dag_path = str(TEST_DAG_FOLDER / "test_example_bash_operator.py")
+        dagbag = DagBag(test_dag_path, read_dags_from_db=False, include_examples=False)
+        SerializedDagModel.write_dag(dagbag.get_dag("test_example_bash_operator"))
+
+        assert DagFileProcessorManager.count_serialized_dags([test_dag_path, "/dags/other.py"]) == {
+            test_dag_path: 1
+        }
+
+    def test_get_next_dagrun_create_after_by_file(self):
+        now = timezone.utcnow()
+        with create_session() as session:
+            session.add_all(
+                [
+                    DagModel(
+                        dag_id="later",
+                        fileloc="/dags/dags.py",
+                        is_active=True,
+                        is_paused=False,
+                        next_dagrun_create_after=now + timedelta(hours=1),
+                    ),
+                    DagModel(
+                        dag_id="sooner",
+                        fileloc="/dags/dags.py",
+                        is_active=True,
+                        is_paused=False,
+                        next_dagrun_create_after=now + timedelta(minutes=1),
+                    ),
+                    DagModel(
+                        dag_id="paused",
+                        fileloc="/dags/paused.py",
+                        is_active=True,
+                        is_paused=True,
+                        next_dagrun_create_after=now,
+                    ),
+                    DagModel(dag_id="unscheduled", fileloc="/dags/unscheduled.py", is_active=True),
+                ]
+            )
+
+        assert DagFileProcessorManager.get_next_dagrun_create_after_by_file() == {
+            "/dags/dags.py": now + timedelta(minutes=1)
+        }
+
+    @conf_vars({("scheduler", "file_parsing_sort_mode"): "priority"})
+    def test_file_paths_in_queue_sorted_by_priority(self, tmp_path):
+        now = timezone.utcnow()
+        names = ["failing", "unscheduled_slow", "unscheduled_fast", "due_later", "overdue", "new"]
+        file_paths = {name: os.fspath(tmp_path / f"{name}.py") for name in names}
+        for file_path in file_paths.values():
+            pathlib.Path(file_path).touch()
+            modified_time = (now - timedelta(hours=2)).timestamp()
+            os.utime(file_path, (modified_time, modified_time))
+        manager = DagFileProcessorManager(
+            dag_directory=tmp_path,
+            max_runs=1,
+            processor_timeout=timedelta(days=365),
+            signal_conn=MagicMock(),
+            dag_ids=[],
+            pickle_dags=False,
+            async_mode=True,
+        )
+        manager.set_file_paths(list(file_paths.values()))
+        for name, import_errors, last_duration in [
+            ("failing", 1, 0.1),
+            ("unscheduled_slow", 0, 10),
+            ("unscheduled_fast", 0, 1),
+            ("due_later", 0, 1),
+            ("overdue", 0, 5),
+        ]:
+            manager._file_stats[file_paths[name]] = DagFileStat(
+                num_dags=1,
+                import_errors=import_errors,
+                last_finish_time=now - timedelta(hours=1),
+                last_duration=timedelta(seconds=last_duration),
+                run_count=0,
+            )
+        next_dagrun_create_after = {
+            file_paths["failing"]: now - timedelta(hours=1),
+            file_paths["due_later"]: now + timedelta(minutes=5),
+            file_paths["overdue"]: now - timedelta(minutes=1),
+        }
+
+        with mock.patch.object(
+            DagFileProcessorManager,
+            "get_next_dagrun_create_after_by_file",
+            return_value=next_dagrun_create_after,
+        ):
+            manager.prepare_file_path_queue()
+        assert list(manager._file_path_queue) == [
+            file_paths[name]
+            for name in ["new", "overdue", "due_later", "unscheduled_fast", "unscheduled_slow", "failing"]
+        ]
+
+        # Files modified since last parsed are parsed first.
+        os.utime(file_paths["failing"])
+        manager._file_path_queue.clear()
+        with mock.patch.object(
+            DagFileProcessorManager,
+            "get_next_dagrun_create_after_by_file",
+            return_value=next_dagrun_create_after,
+        ):
+            manager.prepare_file_path_queue()
+        assert list(manager._file_path_queue)[:2] == [file_paths["failing"], file_paths["new"]]
+
+    @mock.patch("airflow.dag_processing.manager.Stats.timing")
+    @mock.patch.object(DagFileProcessorManager, "_create_process")
+    def test_queue_wait_metrics(self, mock_create_process, mock_timing, tmp_path):
+        file_path = os.fspath(tmp_path / "dag.py")
+        manager = DagFileProcessorManager(
+            dag_directory=tmp_path,
+            max_runs=1,
+            processor_timeout=timedelta(days=365),
+            signal_conn=MagicMock(),
+            dag_ids=[],
+            pickle_dags=False,
+            async_mode=True,
+        )
+        manager.set_file_paths([file_path])
+        with mock.patch("airflow.dag_processing.manager.time.monotonic", return_value=100):
+            manager._add_paths_to_queue([file_path], False)
+        with mock.patch("airflow.dag_processing.manager.time.monotonic", return_value=105):
+            manager.start_new_processes()
+
+        mock_timing.assert_has_calls(
+            [
+                mock.call("dag_processing.file_queue_wait.dag", timedelta(seconds=5)),
+                mock.call("dag_processing.file_queue_wait", timedelta(seconds=5), tags={"file_name": "dag"}),
+            ]
+        )
+        assert manager._file_queued_time == {}
+
+    @conf_vars(
+        {
+            ("scheduler", "dag_file_memory_budget"): "1",
+            ("scheduler", "record_dag_file_parsing_stats"): "True",
+        }
+    )
+    def test_processors_over_budget_are_killed_and_files_quarantined(self, tmp_path):
+        file_path = os.fspath(tmp_path / "dag.py")
+        pathlib.Path(file_path).write_text("")
+        manager = DagFileProcessorManager(
+            dag_directory=tmp_path,
+            max_runs=-1,
+            processor_timeout=timedelta(days=365),
+            signal_conn=MagicMock(),
+            dag_ids=[],
+            pickle_dags=False,
+            async_mode=True,
+        )
+        manager.set_file_paths([file_path])
+        processor = MagicMock()
+        # The test process uses more than 1 MiB of memory.
+        processor.pid = os.getpid()
+        processor.start_time = timezone.utcnow()
+        manager._processors[file_path] = processor
+        manager.waitables[processor.waitable_handle] = processor
+
+        manager._kill_processors_over_budget()
+
+        processor.kill.assert_called_once()
+        assert manager._processors == {}
+        assert manager._file_stats[file_path].import_errors == 1
+        assert file_path in manager._quarantined_files
+        manager._flush_parsing_stats()
+        with create_session() as session:
+            stats = session.scalars(select(DagFileParsingStats)).one()
+            assert stats.fileloc == file_path
+            assert stats.peak_memory > 1024**2
+            assert stats.quarantined_until is not None
+            assert "above the budget of 1 MiB" in stats.quarantine_reason
+
+        # The file is not parsed again until it is modified.
+        manager._file_stats[file_path] = manager._file_stats[file_path]._replace(
+            last_finish_time=timezone.utcnow() - timedelta(hours=1)
+        )
+        manager.prepare_file_path_queue()
+        assert list(manager._file_path_queue) == []
+        modified_time = (timezone.utcnow() + timedelta(seconds=1)).timestamp()
+        os.utime(file_path, (modified_time, modified_time))
+        manager.prepare_file_path_queue()
+        assert list(manager._file_path_queue) == [file_path]
+        assert manager._quarantined_files == {}
+
+    @conf_vars({("scheduler", "dag_file_memory_budget"): "64"})
+    def test_memory_budget_counts_from_when_the_file_started_processing(self, tmp_path):
+        file_path = os.fspath(tmp_path / "dag.py")
+        manager = DagFileProcessorManager(
+            dag_directory=tmp_path,
+            max_runs=-1,
+            processor_timeout=timedelta(days=365),
+            signal_conn=MagicMock(),
+            dag_ids=[],
+            pickle_dags=False,
+            async_mode=True,
+        )
+        processor = MagicMock()
+        # The test process uses more than 64 MiB of memory, as would a pooled worker having parsed files.
+        processor.pid = os.getpid()
+        processor.start_time = timezone.utcnow()
+        manager._processors[file_path] = processor
+        manager._processor_start_usage[file_path] = manager._get_processor_usage(processor)
+
+        manager._kill_processors_over_budget()
+
+        processor.kill.assert_not_called()
+        assert manager._processors == {file_path: processor}
+
+    @conf_vars({("scheduler", "record_dag_file_parsing_stats"): "True"})
+    def test_parsing_stats_are_recorded(self, tmp_path):
+        file_paths = [os.fspath(tmp_path / "dag.py"), os.fspath(tmp_path / "deleted_dag.py")]
+        manager = DagFileProcessorManager(
+            dag_directory=tmp_path,
+            max_runs=1,
+            processor_timeout=timedelta(days=365),
+            signal_conn=MagicMock(),
+            dag_ids=[],
+            pickle_dags=False,
+            async_mode=True,
+        )
+        for file_path in file_paths:
+            processor = MagicMock()
+            processor.file_path = file_path
+            processor.result = (1, 0)
+            processor.start_time = timezone.utcnow() - timedelta(seconds=2)
+            processor.resource_usage = DagFileResourceUsage(
+                cpu_time=1.5, peak_memory=200 * 1024**2, num_imported_modules=12, num_db_queries=7
+            )
+            manager._collect_results_from_processor(processor)
+        manager._flush_parsing_stats()
+
+        with create_session() as session:
+            stats = session.scalars(select(DagFileParsingStats).order_by(DagFileParsingStats.fileloc)).all()
+            assert [
+                (s.fileloc, s.cpu_time, s.peak_memory, s.num_imported_modules, s.num_db_queries)
+                for s in stats
+            ] == [(file_path, 1.5, 200 * 1024**2, 12, 7) for file_path in file_paths]
+            assert stats[0].duration >= 2
+            assert stats[0].processor_subdir == os.fspath(tmp_path)
+
+        DagFileParsingStats.remove_deleted_files([file_paths[0]], processor_subdir=os.fspath(tmp_path))
+        with create_session() as session:
+            assert session.scalars(select(DagFileParsingStats.fileloc)).all() == [file_paths[0]]
+
+    @mock.patch("airflow.dag_processing.manager.Stats")
+    def test_resource_usage_metrics(self, mock_stats, tmp_path):
+        manager = DagFileProcessorManager(
+            dag_directory=tmp_path,
+            max_runs=1,
+            processor_timeout=timedelta(days=365),
+            signal_conn=MagicMock(),
+            dag_ids=[],
+            pickle_dags=False,
+            async_mode=True,
+        )
+        processor = MagicMock()
+        processor.file_path = os.fspath(tmp_path / "dag.py")
+        processor.result = (1, 0)
+        processor.start_time = timezone.utcnow()
+        processor.resource_usage = DagFileResourceUsage(
+            cpu_time=1.5, peak_memory=200 * 1024**2, num_imported_modules=12, num_db_queries=7
+        )
+        manager._collect_results_from_processor(processor)
+
+        mock_stats.timing.assert_any_call("dag_processing.last_cpu_time.dag", timedelta(seconds=1.5))
+        mock_stats.timing.assert_any_call(
+            "dag_processing.last_cpu_time", timedelta(seconds=1.5), tags={"file_name": "dag"}
+        )
+        mock_stats.gauge.assert_any_call("dag_processing.last_peak_memory.dag", 200 * 1024**2)
+        mock_stats.gauge.assert_any_call(
+            "dag_processing.last_peak_memory", 200 * 1024**2, tags={"file_name": "dag"}
+        )
+
     @conf_vars({("core", "load_examples"): "False"})
     def test_max_runs_when_no_files(self, tmp_path):
         child_pipe, parent_pipe = multiprocessing.Pipe()
@@ -644,6 +1063,29 @@ class TestDagProcessorJobRunner:
             )
             assert serialized_dag_count == 0
 
+    def test_deactivate_dags_no_longer_found_statically(self):
+        with create_session() as session:
+            session.add_all(
+                [
+                    DagModel(dag_id="kept", fileloc="/dags/dag.py", is_active=True),
+                    DagModel(dag_id="removed", fileloc="/dags/dag.py", is_active=True),
+                    DagModel(dag_id="dynamic", fileloc="/dags/dynamic.py", is_active=True),
+                    DagModel(dag_id="not_found", fileloc="/dags/no_dag.py", is_active=True),
+                ]
+            )
+
+        DagFileProcessorManager.deactivate_stale_dags(
+            last_parsed={},
+            dag_directory="/dags",
+            stale_dag_threshold=50,
+            static_dag_ids={"/dags/dag.py": ["kept"], "/dags/no_dag.py": []},
+        )
+
+        with create_session() as session:
+            active_dag_ids = session.scalars(select(DagModel.dag_id).where(DagModel.is_active)).all()
+            assert sorted(active_dag_ids) == ["dynamic", "kept", "not_found"]
+            session.query(DagModel).delete()
+
     @conf_vars(
         {
             ("core", "load_examples"): "False",
@@ -1497,6 +1939,14 @@ class TestDagFileProcessorAgent:
         retval = processor_agent.get_callbacks_pipe()
         assert retval == processor_agent._parent_signal_conn
 
+    def test_request_reparse(self):
+        processor_agent = DagFileProcessorAgent("", 1, timedelta(days=365), [], False, False)
+        processor_agent._parent_signal_conn = Mock()
+        processor_agent.request_reparse(["/dags/dag.py"])
+        processor_agent._parent_signal_conn.send.assert_called_once_with(
+            DagFileReparseRequest(["/dags/dag.py"])
+        )
+
     def test_get_callbacks_pipe_no_parent_signal_conn(self):
         with pytest.raises(ValueError, match="Process not started"):
             processor_agent = DagFileProcessorAgent("", 1, timedelta(days=365), [], False, False)
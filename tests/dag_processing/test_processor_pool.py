@@ -0,0 +1,199 @@
+#
+# Licensed to the Apache Software Foundation (ASF) under one
+# or more contributor license agreements.  See the NOTICE file
+# distributed with this work for additional information
+# regarding copyright ownership.  The ASF licenses this file
+# to you under the Apache License, Version 2.0 (the
+# "License"); you may not use this file except in compliance
+# with the License.  You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+# KIND, either express or implied.  See the License for the
+# specific language governing permissions and limitations
+# under the License.
+from __future__ import annotations
+
+import multiprocessing.connection
+import pathlib
+import textwrap
+from datetime import timedelta
+
+import pytest
+
+from airflow.dag_processing.manager import DagFileProcessorManager, DagParsingSignal, DagParsingStat
+from airflow.dag_processing.processor_pool import (
+    DagFileProcessorPool,
+    PooledDagFileProcessorProcess,
+    _can_reset_forkserver,
+)
+from airflow.models.serialized_dag import SerializedDagModel
+from airflow.utils.session import create_session
+from tests.test_utils.config import conf_vars
+from tests.test_utils.db import clear_db_dags, clear_db_import_errors, clear_db_serialized_dags
+
+pytestmark = [
+    pytest.mark.db_test,
+    pytest.mark.skipif(
+        "forkserver" not in multiprocessing.get_all_start_methods(), reason="forkserver is not available"
+    ),
+]
+
+TEST_DAG_FOLDER = pathlib.Path(__file__).parents[1].resolve() / "dags"
+TEST_DAG_FILE = str(TEST_DAG_FOLDER / "test_example_bash_operator.py")
+
+
+@pytest.fixture
+def pool():
+    clear_db_dags()
+    clear_db_serialized_dags()
+    clear_db_import_errors()
+    pool = DagFileProcessorPool(max_files_per_worker=2)
+    yield pool
+    pool.close()
+    clear_db_dags()
+    clear_db_serialized_dags()
+    clear_db_import_errors()
+
+
+def _process(pool, file_path, timeout=60) -> PooledDagFileProcessorProcess:
+    processor = PooledDagFileProcessorProcess(
+        pool=pool,
+        file_path=file_path,
+        pickle_dags=False,
+        dag_ids=[],
+        dag_directory=str(TEST_DAG_FOLDER),
+        callback_requests=[],
+    )
+    processor.start()
+    multiprocessing.connection.wait([processor.waitable_handle], timeout=timeout)
+    assert processor.done
+    return processor
+
+
+def test_forkserver_state_can_be_reset():
+    """
+    The pool resets private attributes of ``multiprocessing.forkserver``, which a new Python version may change.
+    """
+    assert _can_reset_forkserver()
+    assert DagFileProcessorPool.is_supported()
+
+
+class TestDagFileProcessorPool:
+    def test_workers_are_reused_then_replaced(self, pool):
+        processors = [_process(pool, TEST_DAG_FILE) for _ in range(3)]
+
+        assert [processor.result for processor in processors] == [(1, 0)] * 3
+        assert all(processor.resource_usage.cpu_time > 0 for processor in processors)
+        # The first worker is replaced once it processed two files.
+        assert processors[0].pid == processors[1].pid
+        assert processors[2].pid != processors[0].pid
+        assert processors[0].exit_code == 0
+
+    def test_kill(self, pool, tmp_path):
+        dag_file = tmp_path / "hanging_dag.py"
+        dag_file.write_text(
+            textwrap.dedent(
+                """
+                import time
+
+                # airflow DAG
+                time.sleep(60)
+                """
+            )
+        )
+        processor = PooledDagFileProcessorProcess(
+            pool=pool,
+            file_path=str(dag_file),
+            pickle_dags=False,
+            dag_ids=[],
+            dag_directory=str(tmp_path),
+            callback_requests=[],
+        )
+        processor.start()
+        assert not processor.done
+
+        processor.kill()
+
+        assert processor.done
+        assert processor.result is None
+        assert processor.exit_code is not None
+        # The killed worker is not reused.
+        assert pool._idle_workers == []
+        assert _process(pool, TEST_DAG_FILE).pid != processor.pid
+
+    def test_modules_of_dag_folder_are_imported_again(self, pool, tmp_path):
+        helper_file = tmp_path / "helper_mod.py"
+        helper_file.write_text('DAG_ID = "v1"\n')
+        dag_file = tmp_path / "dag_with_helper.py"
+        dag_file.write_text(
+            textwrap.dedent(
+                """
+                import os
+                import sys
+
+                sys.path.insert(0, os.path.dirname(__file__))
+
+                import helper_mod
+                from airflow import DAG
+
+                dag = DAG(helper_mod.DAG_ID, schedule=None)
+                """
+            )
+        )
+
+        def parse():
+            processor = PooledDagFileProcessorProcess(
+                pool=pool,
+                file_path=str(dag_file),
+                pickle_dags=False,
+                dag_ids=[],
+                dag_directory=str(tmp_path),
+                callback_requests=[],
+            )
+            processor.start()
+            multiprocessing.connection.wait([processor.waitable_handle], timeout=60)
+            assert processor.done
+            return processor
+
+        first = parse()
+        helper_file.write_text('DAG_ID = "v2"\n')
+        second = parse()
+
+        assert first.pid == second.pid
+        with create_session() as session:
+            dag_ids = {dag_id for (dag_id,) in session.query(SerializedDagModel.dag_id)}
+        assert dag_ids == {"v1", "v2"}
+
+
+@conf_vars({("scheduler", "parsing_worker_pool"): "True", ("core", "load_examples"): "False"})
+def test_manager_parses_files_in_pool(pool):
+    child_pipe, parent_pipe = multiprocessing.Pipe()
+    manager = DagFileProcessorManager(
+        dag_directory=TEST_DAG_FILE,
+        max_runs=1,
+        processor_timeout=timedelta(days=365),
+        signal_conn=child_pipe,
+        dag_ids=[],
+        pickle_dags=False,
+        async_mode=False,
+    )
+    assert manager._processor_pool is not None
+
+    parent_pipe.send(DagParsingSignal.AGENT_RUN_ONCE)
+    manager._run_parsing_loop()
+    manager._processor_pool.close()
+
+    stats = []
+    while parent_pipe.poll(timeout=0.01):
+        stats.append(parent_pipe.recv())
+    assert [stat for stat in stats if isinstance(stat, DagParsingStat)][-1].done
+    assert manager._processors == {}
+    assert manager._file_stats[TEST_DAG_FILE].num_dags == 1
+    with create_session() as session:
+        assert session.query(SerializedDagModel).filter_by(dag_id="test_example_bash_operator").count() == 1
+    child_pipe.close()
+    parent_pipe.close()
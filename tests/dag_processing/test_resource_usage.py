@@ -0,0 +1,52 @@
+#
+# Licensed to the Apache Software Foundation (ASF) under one
+# or more contributor license agreements.  See the NOTICE file
+# distributed with this work for additional information
+# regarding copyright ownership.  The ASF licenses this file
+# to you under the Apache License, Version 2.0 (the
+# "License"); you may not use this file except in compliance
+# with the License.  You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+# KIND, either express or implied.  See the License for the
+# specific language governing permissions and limitations
+# under the License.
+from __future__ import annotations
+
+import sys
+import types
+
+import pytest
+from sqlalchemy import text
+
+from airflow.dag_processing.resource_usage import ResourceUsageRecorder
+from airflow.utils.session import create_session
+
+
+class TestResourceUsageRecorder:
+    @pytest.mark.db_test
+    def test_records_resources_used_in_block(self, monkeypatch):
+        with ResourceUsageRecorder() as recorder:
+            with create_session() as session:
+                session.execute(text("SELECT 1"))
+                session.execute(text("SELECT 2"))
+            monkeypatch.setitem(sys.modules, "recorded_module", types.ModuleType("recorded_module"))
+            sum(range(100_000))
+        with create_session() as session:
+            session.execute(text("SELECT 3"))
+
+        usage = recorder.usage
+        assert usage.num_db_queries == 2
+        assert usage.num_imported_modules == 1
+        assert usage.cpu_time > 0
+        assert usage.peak_memory > 0
+
+    def test_no_db_queries_without_engine(self, monkeypatch):
+        monkeypatch.setattr("airflow.dag_processing.resource_usage.settings.engine", None)
+        with ResourceUsageRecorder() as recorder:
+            pass
+        assert recorder.usage.num_db_queries is None
@@ -0,0 +1,285 @@
+#
+# Licensed to the Apache Software Foundation (ASF) under one
+# or more contributor license agreements.  See the NOTICE file
+# distributed with this work for additional information
+# regarding copyright ownership.  The ASF licenses this file
+# to you under the Apache License, Version 2.0 (the
+# "License"); you may not use this file except in compliance
+# with the License.  You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+# KIND, either express or implied.  See the License for the
+# specific language governing permissions and limitations
+# under the License.
+from __future__ import annotations
+
+import pathlib
+import textwrap
+import zipfile
+
+import pytest
+
+from airflow.dag_processing.static_analysis import StaticDagFileAnalyzer
+from airflow.models.dagbag import DagBag
+
+TEST_DAG_FOLDER = pathlib.Path(__file__).parents[1].resolve() / "dags"
+
+
+def _analyze(tmp_path, code):
+    dag_file = tmp_path / "dag.py"
+    dag_file.write_text(textwrap.dedent(code))
+    return StaticDagFileAnalyzer(search_paths=[str(tmp_path)]).analyze(str(dag_file))
+
+
+class TestStaticDagFileAnalyzer:
+    @pytest.mark.parametrize(
+        "code, dag_ids",
+        [
+            pytest.param(
+                """
+                from airflow import DAG
+                from airflow.operators.empty import EmptyOperator
+
+                with DAG("with_dag", schedule="@daily") as dag:
+                    for i in range(3):
+                        EmptyOperator(task_id=f"task_{i}")
+
+                other_dag = DAG(dag_id="assigned_dag", schedule=None)
+                """,
+                {"with_dag", "assigned_dag"},
+                id="constructor",
+            ),
+            pytest.param(
+                """
+                from airflow.models.dag import DAG as AirflowDAG
+                import airflow.models.dag as dag_module
+
+                aliased_dag = AirflowDAG("aliased_dag")
+                module_dag = dag_module.DAG("module_dag")
+                """,
+                {"aliased_dag", "module_dag"},
+                id="aliased_constructor",
+            ),
+            pytest.param(
+                """
+                from airflow.decorators import dag, task
+
+                @task
+                def hello():
+                    print("hello")
+
+                @dag(schedule="@daily")
+                def decorated_dag():
+                    hello()
+
+                @dag("named_dag")
+                def named():
+                    hello()
+
+                @dag()
+                def unused():
+                    hello()
+
+                decorated_dag()
+                named_dag = named()
+
+                if __name__ == "__main__":
+                    unused().test()
+                """,
+                {"decorated_dag", "named_dag"},
+                id="decorator",
+            ),
+            pytest.param(
+                """
+                from airflow.decorators import dag as airflow_dag
+
+                @airflow_dag()
+                def decorated_dag():
+                    pass
+
+                decorated_dag()
+                """,
+                {"decorated_dag"},
+                id="aliased_decorator",
+            ),
+            pytest.param(
+                """
+                from datetime import timedelta
+
+                import pendulum
+                from airflow import DAG
+
+                default_args = {"retry_delay": timedelta(minutes=5)}
+
+                with DAG("dag", start_date=pendulum.datetime(2021, 1, 1), default_args=default_args):
+                    pass
+                """,
+                {"dag"},
+                id="imported_function_in_arguments",
+            ),
+            pytest.param(
+                """
+                from airflow.utils.helpers import chain
+
+                def helper():
+                    pass
+                """,
+                set(),
+                id="no_dag",
+            ),
+        ],
+    )
+    def test_static_dags(self, tmp_path, code, dag_ids):
+        info = _analyze(tmp_path, code)
+        assert info.is_static
+        assert info.dag_ids == dag_ids
+
+    @pytest.mark.parametrize(
+        "code",
+        [
+            pytest.param(
+                """
+                from airflow import DAG
+
+                for name in ("a", "b"):
+                    DAG(f"dag_{name}")
+                """,
+                id="loop",
+            ),
+            pytest.param(
+                """
+                from airflow import DAG
+
+                DAG_ID = "dag"
+                dag = DAG(DAG_ID)
+                """,
+                id="non_literal_dag_id",
+            ),
+            pytest.param(
+                """
+                from airflow import DAG
+
+                def create_dag(dag_id):
+                    return DAG(dag_id)
+
+                dag = create_dag("dag")
+                """,
+                id="factory",
+            ),
+            pytest.param(
+                """
+                globals()["dag"] = object()
+                """,
+                id="globals",
+            ),
+            pytest.param(
+                """
+                from json import loads as make_dag
+
+                dag = make_dag("dag")
+                """,
+                id="imported_function",
+            ),
+            pytest.param(
+                """
+                import dag_factory
+
+                dag_factory.create_dags()
+                """,
+                id="imported_module_function",
+            ),
+            pytest.param(
+                """
+                from dag_factory import dag_context
+
+                with dag_context("dag"):
+                    pass
+                """,
+                id="imported_context_manager",
+            ),
+            pytest.param(
+                """
+                from dag_factory import DAG
+
+                dag = DAG("dag")
+                """,
+                id="non_airflow_dag",
+            ),
+            pytest.param(
+                """
+                from airflow.models import *
+
+                dag = DAG("dag")
+                """,
+                id="star_import",
+            ),
+        ],
+    )
+    def test_dynamic_dags(self, tmp_path, code):
+        assert not _analyze(tmp_path, code).is_static
+
+    def test_local_modules(self, tmp_path):
+        (tmp_path / "common").mkdir()
+        (tmp_path / "common" / "__init__.py").write_text("")
+        (tmp_path / "common" / "constants.py").write_text("OWNER = 'airflow'\n")
+        (tmp_path / "common" / "factory.py").write_text(
+            "from airflow import DAG\n\ndef create_dag(dag_id):\n    return DAG(dag_id)\n"
+        )
+
+        info = _analyze(
+            tmp_path, "from airflow import DAG\nfrom common.constants import OWNER\ndag = DAG('dag')\n"
+        )
+        assert info.is_static
+        assert info.dag_ids == {"dag"}
+        assert info.dependencies == {
+            str(tmp_path / "common" / "__init__.py"),
+            str(tmp_path / "common" / "constants.py"),
+        }
+
+        # The functions of local modules may create DAGs.
+        assert not _analyze(tmp_path, "from common.factory import create_dag\ncreate_dag('dag')\n").is_static
+        assert not _analyze(tmp_path, "import common.factory\ncommon.factory.create_dag('dag')\n").is_static
+        # So do the modules themselves.
+        (tmp_path / "common" / "constants.py").write_text("from airflow import DAG\ndag = DAG('other')\n")
+        assert not _analyze(tmp_path, "from common.constants import dag\n").is_static
+
+    def test_cannot_analyze(self, tmp_path):
+        assert _analyze(tmp_path, "def invalid(:\n") is None
+
+        zip_path = tmp_path / "dags.zip"
+        with zipfile.ZipFile(zip_path, "w") as zf:
+            zf.writestr("dag.py", "from airflow import DAG\ndag = DAG('dag')\n")
+        analyzer = StaticDagFileAnalyzer(search_paths=[str(tmp_path)])
+        assert analyzer.analyze(str(zip_path)) is None
+        assert analyzer.analyze(str(tmp_path / "missing.py")) is None
+
+    def test_analysis_is_cached_until_file_changes(self, tmp_path):
+        dag_file = tmp_path / "dag.py"
+        dag_file.write_text("from airflow import DAG\ndag = DAG('dag')\n")
+        analyzer = StaticDagFileAnalyzer(search_paths=[str(tmp_path)])
+        info = analyzer.analyze(str(dag_file))
+        assert analyzer.analyze(str(dag_file)) is info
+
+        dag_file.write_text("from airflow import DAG\ndag = DAG('renamed_dag')\n")
+        assert analyzer.analyze(str(dag_file)).dag_ids == {"renamed_dag"}
+
+    @pytest.mark.parametrize(
+        "file_name",
+        [
+            "test_cli_triggered_dags.py",
+            "test_example_bash_operator.py",
+            "test_external_task_sensor_check_existense.py",
+            "test_scheduler_dags.py",
+        ],
+    )
+    def test_same_dags_as_when_parsed(self, file_name):
+        file_path = str(TEST_DAG_FOLDER / file_name)
+        info = StaticDagFileAnalyzer(search_paths=[str(TEST_DAG_FOLDER)]).analyze(file_path)
+        dagbag = DagBag(file_path, include_examples=False, read_dags_from_db=False)
+
+        assert info.is_static
+        assert info.dag_ids == set(dagbag.dag_ids)
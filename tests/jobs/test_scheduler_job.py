@@ -31,6 +31,7 @@ import psutil
 import pytest
 import time_machine
 from sqlalchemy import func
+from sqlalchemy.exc import OperationalError
 
 import airflow.example_dags
 from airflow import settings
@@ -46,7 +47,12 @@ from airflow.executors.executor_loader import ExecutorLoader
 from airflow.jobs.backfill_job_runner import BackfillJobRunner
 from airflow.jobs.job import Job, run_job
 from airflow.jobs.local_task_job_runner import LocalTaskJobRunner
-from airflow.jobs.scheduler_job_runner import SchedulerJobRunner
+from airflow.jobs.scheduler_job_runner import (
+    DagRunSchedulingStateCache,
+    ExaminedDagRuns,
+    SchedulerJobRunner,
+    SlotAccounting,
+)
 from airflow.models.dag import DAG, DagModel
 from airflow.models.dagbag import DagBag
 from airflow.models.dagrun import DagRun
@@ -60,6 +66,7 @@ from airflow.operators.empty import EmptyOperator
 from airflow.serialization.serialized_objects import SerializedDAG
 from airflow.utils import timezone
 from airflow.utils.file import list_py_file_paths
+from airflow.utils.retries import run_with_db_retries
 from airflow.utils.session import create_session, provide_session
 from airflow.utils.state import DagRunState, JobState, State, TaskInstanceState
 from airflow.utils.types import DagRunType
@@ -392,13 +399,19 @@ class TestSchedulerJob:
         )
         scheduler_job.executor.callback_sink.send.assert_called_once_with(task_callback)
         scheduler_job.executor.callback_sink.reset_mock()
-        mock_stats_incr.assert_called_once_with(
-            "scheduler.tasks.killed_externally",
-            tags={
-                "dag_id": "test_process_executor_events_with_callback",
-                "task_id": "dummy_task",
-            },
-        )
+        # The DagBag also counts the DAG it read from DB.
+        scheduler_incr_calls = [
+            call for call in mock_stats_incr.call_args_list if not call.args[0].startswith("dagbag.")
+        ]
+        assert scheduler_incr_calls == [
+            mock.call(
+                "scheduler.tasks.killed_externally",
+                tags={
+                    "dag_id": "test_process_executor_events_with_callback",
+                    "task_id": "dummy_task",
+                },
+            )
+        ]
 
     @mock.patch("airflow.jobs.scheduler_job_runner.TaskCallbackRequest")
     @mock.patch("airflow.jobs.scheduler_job_runner.Stats.incr")
@@ -1694,6 +1707,31 @@ class TestSchedulerJob:
             job_runner._fail_tasks_stuck_in_queued()
         assert "Executor doesn't support cleanup of stuck queued tasks. Skipping." in caplog.text
 
+    def test_fail_stuck_queued_tasks_in_batches(self, dag_maker, session):
+        with dag_maker("test_fail_stuck_queued_tasks_in_batches"):
+            for i in range(3):
+                EmptyOperator(task_id=f"op{i}")
+
+        dr = dag_maker.create_dagrun()
+        for i, ti in enumerate(sorted(dr.get_task_instances(session=session), key=lambda ti: ti.task_id)):
+            ti.state = State.QUEUED
+            ti.queued_dttm = timezone.utcnow() - timedelta(minutes=15 - i)
+        session.commit()
+        executor = MagicMock()
+        # The task instances stay queued until the executor events are processed.
+        executor.cleanup_stuck_queued_tasks.return_value = []
+        scheduler_job = Job(executor=executor)
+        scheduler_job.max_tis_per_query = 2
+        job_runner = SchedulerJobRunner(job=scheduler_job, num_runs=0)
+        job_runner._task_queued_timeout = 300
+
+        job_runner._fail_tasks_stuck_in_queued()
+
+        batches = [
+            [ti.task_id for ti in c.kwargs["tis"]] for c in executor.cleanup_stuck_queued_tasks.call_args_list
+        ]
+        assert batches == [["op0", "op1"], ["op2"]]
+
     @mock.patch("airflow.dag_processing.manager.DagFileProcessorAgent")
     def test_executor_end_called(self, mock_processor_agent):
         """
@@ -3165,6 +3203,22 @@ class TestSchedulerJob:
         session = settings.Session()
         assert 0 == self.job_runner.adopt_or_reset_orphaned_tasks(session=session)
 
+    @mock.patch("airflow.jobs.scheduler_job_runner.Stats.timer")
+    def test_adopt_or_reset_orphaned_tasks_duration_is_sent_on_failure(self, mock_timer):
+        scheduler_job = Job()
+        self.job_runner = SchedulerJobRunner(job=scheduler_job)
+        session = mock.MagicMock()
+        session.execute.side_effect = OperationalError("UPDATE", {}, Exception("deadlock"))
+
+        with mock.patch(
+            "airflow.jobs.scheduler_job_runner.run_with_db_retries",
+            side_effect=lambda logger: run_with_db_retries(max_retries=1, logger=logger),
+        ), pytest.raises(OperationalError):
+            self.job_runner.adopt_or_reset_orphaned_tasks(session=session)
+
+        mock_timer.assert_called_once_with("scheduler.scan_duration.adopt_or_reset_orphaned_tasks")
+        mock_timer.return_value.__exit__.assert_called_once()
+
     @pytest.mark.parametrize(
         "adoptable_state",
         list(sorted(State.adoptable_states)),
@@ -3339,6 +3393,42 @@ class TestSchedulerJob:
         if old_job_runner.processor_agent:
             old_job_runner.processor_agent.end()
 
+    def test_adopt_or_reset_orphaned_tasks_in_batches(self, dag_maker, session):
+        with dag_maker("test_adopt_or_reset_orphaned_tasks_in_batches", session=session):
+            for i in range(3):
+                EmptyOperator(task_id=f"op{i}")
+
+        old_job = Job()
+        old_job.state = State.FAILED
+        session.add(old_job)
+        session.flush()
+
+        dr = dag_maker.create_dagrun(state=State.RUNNING)
+        for ti in dr.get_task_instances(session=session):
+            ti.state = State.QUEUED
+            ti.queued_by_job_id = old_job.id
+        session.flush()
+
+        executor = MagicMock()
+        # Adopt the first task instance of each batch, reset the others.
+        executor.try_adopt_task_instances.side_effect = lambda tis: tis[1:]
+        scheduler_job = Job(executor=executor)
+        scheduler_job.max_tis_per_query = 2
+        session.add(scheduler_job)
+        session.flush()
+        self.job_runner = SchedulerJobRunner(job=scheduler_job, subdir=os.devnull)
+
+        num_reset_tis = self.job_runner.adopt_or_reset_orphaned_tasks(session=session)
+
+        assert [len(c.args[0]) for c in executor.try_adopt_task_instances.call_args_list] == [2, 1]
+        assert num_reset_tis == 1
+        tis = dr.get_task_instances(session=session)
+        assert sorted((ti.state, ti.queued_by_job_id) for ti in tis if ti.state) == [
+            (State.QUEUED, scheduler_job.id),
+            (State.QUEUED, scheduler_job.id),
+        ]
+        session.rollback()
+
     def test_adopt_or_reset_orphaned_tasks_only_fails_scheduler_jobs(self, caplog):
         """Make sure we only set SchedulerJobs to failed, not all jobs"""
         session = settings.Session()
@@ -3554,6 +3644,75 @@ class TestSchedulerJob:
 
         assert dag.get_last_dagrun().creating_job_id == scheduler_job.id
 
+    @pytest.mark.need_serialized_dag
+    def test_create_dag_runs_in_bulk(self, session, dag_maker):
+        """Test that the DAG runs of all the DAGs, and their task instances, are inserted together."""
+        dag_models = []
+        for i in range(3):
+            with dag_maker(dag_id=f"test_create_dag_runs_in_bulk_{i}", session=session):
+                EmptyOperator(task_id="dummy_1") >> EmptyOperator(task_id="dummy_2")
+            dag_models.append(dag_maker.dag_model)
+        session.flush()
+
+        scheduler_job = Job(executor=self.null_exec)
+        self.job_runner = SchedulerJobRunner(job=scheduler_job, subdir=os.devnull)
+
+        with mock.patch.object(DAG, "create_dagrun") as create_dagrun:
+            self.job_runner._create_dag_runs(dag_models, session)
+        create_dagrun.assert_not_called()
+        session.flush()
+
+        for dag_model in dag_models:
+            (dr,) = session.query(DagRun).filter(DagRun.dag_id == dag_model.dag_id).all()
+            assert dr.state == State.QUEUED
+            assert dr.creating_job_id == scheduler_job.id
+            assert {ti.task_id for ti in dr.get_task_instances(session=session)} == {"dummy_1", "dummy_2"}
+
+    @pytest.mark.need_serialized_dag
+    def test_create_dag_runs_in_bulk_skips_failing_dag_runs(self, session, dag_maker):
+        """Test that a DAG run failing to be inserted does not prevent the runs of other DAGs."""
+        dag_models = []
+        for i in range(3):
+            with dag_maker(dag_id=f"test_create_dag_runs_in_bulk_{i}", session=session):
+                EmptyOperator(task_id="dummy")
+            dag_models.append(dag_maker.dag_model)
+        session.flush()
+        # The run_id of the next run of the second DAG is already used by a run of another date.
+        failing_dag_model = dag_models[1]
+        session.add(
+            DagRun(
+                dag_id=failing_dag_model.dag_id,
+                run_id=DagRunType.SCHEDULED.generate_run_id(failing_dag_model.next_dagrun),
+                execution_date=failing_dag_model.next_dagrun - datetime.timedelta(days=1),
+                run_type=DagRunType.SCHEDULED,
+            )
+        )
+        session.flush()
+        next_dagrun = failing_dag_model.next_dagrun
+
+        scheduler_job = Job(executor=self.null_exec)
+        self.job_runner = SchedulerJobRunner(job=scheduler_job, subdir=os.devnull)
+        self.job_runner._create_dag_runs(dag_models, session)
+        session.flush()
+
+        for dag_model in (dag_models[0], dag_models[2]):
+            (dr,) = session.query(DagRun).filter(DagRun.dag_id == dag_model.dag_id).all()
+            assert dr.state == State.QUEUED
+            assert [ti.task_id for ti in dr.get_task_instances(session=session)] == ["dummy"]
+        assert session.query(DagRun).filter(DagRun.dag_id == failing_dag_model.dag_id).count() == 1
+        assert failing_dag_model.next_dagrun == next_dagrun
+
+    def test_insert_new_dag_runs_raises_database_errors(self, session):
+        """Test that errors other than constraint violations are raised, for the transaction to be retried."""
+        scheduler_job = Job(executor=self.null_exec)
+        self.job_runner = SchedulerJobRunner(job=scheduler_job, subdir=os.devnull)
+        dag_run = DagRun(dag_id="test_dag", run_id="test_run", run_type=DagRunType.MANUAL)
+
+        with mock.patch.object(
+            session, "add_all", side_effect=OperationalError("INSERT", {}, Exception("deadlock"))
+        ), pytest.raises(OperationalError):
+            self.job_runner._insert_new_dag_runs([dag_run], session)
+
     @pytest.mark.need_serialized_dag
     def test_create_dag_runs_datasets(self, session, dag_maker):
         """
@@ -5210,6 +5369,223 @@ def test_schedule_dag_run_with_upstream_skip(dag_maker, session):
     assert tis[dummy3.task_id].state == State.SKIPPED
 
 
+@pytest.mark.need_serialized_dag
+@conf_vars({("scheduler", "use_scheduling_state_cache"): "True"})
+def test_schedule_all_dag_runs_skips_unchanged_dag_runs(dag_maker, session):
+    with dag_maker(dag_id="test_scheduling_state_cache", start_date=DEFAULT_DATE, session=session):
+        EmptyOperator(task_id="upstream") >> EmptyOperator(task_id="downstream")
+    dr = dag_maker.create_dagrun(state=State.RUNNING)
+    dr.get_task_instance("upstream", session=session).state = State.RUNNING
+    session.flush()
+
+    job_runner = SchedulerJobRunner(job=Job(), subdir=os.devnull)
+    assert job_runner._scheduling_state_cache is not None
+
+    with mock.patch.object(DagRun, "update_state", autospec=True, side_effect=DagRun.update_state) as m:
+        job_runner._schedule_all_dag_runs(MagicMock(), [dr], session)
+        assert m.call_count == 1
+
+        # Nothing changed, the run must not be evaluated again.
+        job_runner._schedule_all_dag_runs(MagicMock(), [dr], session)
+        assert m.call_count == 1
+
+        # An executor event for the run invalidates the cached decision.
+        job_runner._scheduling_state_cache.invalidate(dr.dag_id, dr.run_id)
+        job_runner._schedule_all_dag_runs(MagicMock(), [dr], session)
+        assert m.call_count == 2
+
+        dr.get_task_instance("upstream", session=session).state = State.SUCCESS
+        session.flush()
+        job_runner._schedule_all_dag_runs(MagicMock(), [dr], session)
+        assert m.call_count == 3
+
+    # EmptyOperator is marked as success directly when scheduled.
+    session.expire_all()
+    assert dr.get_task_instance("downstream", session=session).state == State.SUCCESS
+
+
+@pytest.mark.need_serialized_dag
+@conf_vars({("scheduler", "use_scheduling_state_cache"): "True"})
+def test_schedule_all_dag_runs_does_not_skip_dag_runs_with_retries(dag_maker, session):
+    with dag_maker(dag_id="test_scheduling_state_cache_retry", start_date=DEFAULT_DATE, session=session):
+        EmptyOperator(task_id="task")
+    dr = dag_maker.create_dagrun(state=State.RUNNING)
+    ti = dr.get_task_instance("task", session=session)
+    ti.state = State.UP_FOR_RETRY
+    ti.end_date = timezone.utcnow()
+    session.flush()
+
+    job_runner = SchedulerJobRunner(job=Job(), subdir=os.devnull)
+    with mock.patch.object(DagRun, "update_state", autospec=True, side_effect=DagRun.update_state) as m:
+        job_runner._schedule_all_dag_runs(MagicMock(), [dr], session)
+        job_runner._schedule_all_dag_runs(MagicMock(), [dr], session)
+    assert m.call_count == 2
+
+
+def test_scheduling_state_cache_is_pruned_to_examined_runs():
+    cache = DagRunSchedulingStateCache()
+    examined_run = MagicMock(dag_id="dag", run_id="examined")
+    cache._examined = {("dag", "examined"): MagicMock(), ("dag", "deleted"): MagicMock()}
+
+    for _ in range(ExaminedDagRuns.PRUNE_INTERVAL - 1):
+        cache.refresh([examined_run], session=MagicMock())
+    assert len(cache) == 2
+    cache.refresh([], session=MagicMock())
+    assert list(cache._examined) == [("dag", "examined")]
+
+
+@pytest.mark.need_serialized_dag
+@conf_vars({("scheduler", "use_incremental_dependency_checks"): "True"})
+def test_schedule_dag_run_keeps_dependency_check_records(dag_maker, session):
+    with dag_maker(dag_id="test_incremental_dependency_checks", start_date=DEFAULT_DATE, session=session):
+        EmptyOperator(task_id="upstream") >> EmptyOperator(task_id="downstream")
+    dr = dag_maker.create_dagrun(state=State.RUNNING)
+    dr.get_task_instance("upstream", session=session).state = State.RUNNING
+    session.flush()
+
+    job_runner = SchedulerJobRunner(job=Job(), subdir=os.devnull)
+    with mock.patch.object(DagRun, "update_state", autospec=True, side_effect=DagRun.update_state) as m:
+        job_runner._schedule_dag_run(dr, session)
+        job_runner._schedule_dag_run(dr, session)
+    records = [c.kwargs["dependency_check_record"] for c in m.call_args_list]
+    assert records[0] is records[1]
+    assert records[0] is job_runner._dependency_check_records[(dr.dag_id, dr.run_id)]
+
+    # The record is dropped once the run is finished.
+    dr.get_task_instance("upstream", session=session).state = State.SUCCESS
+    dr.get_task_instance("downstream", session=session).state = State.SUCCESS
+    session.flush()
+    job_runner._schedule_dag_run(dr, session)
+    assert dr.state == DagRunState.SUCCESS
+    assert job_runner._dependency_check_records == {}
+
+
+@conf_vars({("scheduler", "use_incremental_dependency_checks"): "True"})
+def test_dependency_check_records_are_pruned_to_examined_runs():
+    job_runner = SchedulerJobRunner(job=Job(), subdir=os.devnull)
+    examined_run = MagicMock(dag_id="dag", run_id="examined")
+    job_runner._dependency_check_records = {("dag", "examined"): MagicMock(), ("dag", "deleted"): MagicMock()}
+
+    for _ in range(ExaminedDagRuns.PRUNE_INTERVAL - 1):
+        job_runner._prune_dependency_check_records([examined_run])
+    assert len(job_runner._dependency_check_records) == 2
+    job_runner._prune_dependency_check_records([])
+    assert list(job_runner._dependency_check_records) == [("dag", "examined")]
+
+
+@pytest.mark.parametrize("num_other_schedulers", [0, 1, 2])
+def test_update_scheduler_partition(num_other_schedulers, session):
+    jobs = [Job(job_type=SchedulerJobRunner.job_type) for _ in range(num_other_schedulers + 1)]
+    for job in jobs:
+        job.state = State.RUNNING
+        job.latest_heartbeat = timezone.utcnow()
+        session.add(job)
+    # A scheduler which stopped heartbeating no longer takes a share of the DAGs.
+    dead_job = Job(job_type=SchedulerJobRunner.job_type)
+    dead_job.state = State.RUNNING
+    dead_job.latest_heartbeat = timezone.utcnow() - timedelta(days=1)
+    session.add(dead_job)
+    session.flush()
+
+    ranges = []
+    for job in jobs:
+        with conf_vars({("scheduler", "use_partitioned_scheduling"): "True"}):
+            job_runner = SchedulerJobRunner(job=job, subdir=os.devnull)
+        assert job_runner._partition_key_range is None
+        job_runner._update_scheduler_partition(session=session)
+        ranges.append(job_runner._partition_key_range)
+
+    # The key space is split between the alive schedulers, without gaps or overlaps.
+    assert len(set(ranges)) == len(jobs)
+    ranges.sort()
+    assert ranges[0][0] == 0
+    assert ranges[-1][1] == DagModel.PARTITION_KEY_SPACE
+    assert all(prev[1] == cur[0] for prev, cur in zip(ranges, ranges[1:]))
+
+    session.rollback()
+
+
+def test_partitioned_scheduling_only_queues_own_dags(dag_maker, session):
+    with dag_maker(dag_id="test_partitioned_scheduling", start_date=DEFAULT_DATE, session=session):
+        EmptyOperator(task_id="dummy")
+    dr = dag_maker.create_dagrun(state=State.RUNNING)
+    ti = dr.get_task_instance("dummy", session=session)
+    ti.state = State.SCHEDULED
+    session.flush()
+
+    key = DagModel.get_partition_key(dr.dag_id)
+    job_runner = SchedulerJobRunner(job=Job(), subdir=os.devnull)
+    job_runner._partition_key_range = (key + 1, DagModel.PARTITION_KEY_SPACE + 1)
+    assert job_runner._executable_task_instances_to_queued(max_tis=32, session=session) == []
+
+    job_runner._partition_key_range = (key, key + 1)
+    queued = job_runner._executable_task_instances_to_queued(max_tis=32, session=session)
+    assert [queued_ti.key for queued_ti in queued] == [ti.key]
+
+
+def test_slot_accounting(dag_maker, session):
+    with dag_maker(dag_id="test_slot_accounting", start_date=DEFAULT_DATE, session=session):
+        EmptyOperator(task_id="running", pool="test_slot_accounting_pool", pool_slots=2)
+        EmptyOperator(task_id="deferred", pool="test_slot_accounting_pool")
+        EmptyOperator(task_id="scheduled", pool="test_slot_accounting_pool")
+    dr = dag_maker.create_dagrun(state=State.RUNNING)
+    session.add(Pool(pool="test_slot_accounting_pool", slots=5, include_deferred=True))
+    for task_id, state in [
+        ("running", State.RUNNING),
+        ("deferred", State.DEFERRED),
+        ("scheduled", State.SCHEDULED),
+    ]:
+        dr.get_task_instance(task_id, session=session).state = state
+    session.flush()
+
+    slot_accounting = SlotAccounting.from_db(lock_rows=False, session=session)
+    assert slot_accounting.pools == Pool.slots_stats(session=session)
+    assert slot_accounting.pools["test_slot_accounting_pool"]["open"] == 2
+    concurrency_map = slot_accounting.concurrency_map
+    assert concurrency_map.dag_active_tasks_map == {dr.dag_id: 1}
+    assert concurrency_map.task_concurrency_map == {(dr.dag_id, "running"): 1}
+    assert concurrency_map.task_dagrun_concurrency_map == {(dr.dag_id, dr.run_id, "running"): 1}
+
+    slot_accounting.record_queued(dr.get_task_instance("scheduled", session=session))
+    assert slot_accounting.pools["test_slot_accounting_pool"]["open"] == 1
+    assert concurrency_map.dag_active_tasks_map[dr.dag_id] == 2
+    assert concurrency_map.task_concurrency_map[(dr.dag_id, "scheduled")] == 1
+    assert concurrency_map.task_dagrun_concurrency_map[(dr.dag_id, dr.run_id, "scheduled")] == 1
+
+
+def test_executable_task_instances_to_queued_gets_slot_accounting_once(dag_maker, session):
+    with dag_maker(dag_id="test_slot_accounting_once", max_active_tasks=1, session=session):
+        EmptyOperator(task_id="dummy")
+    dr1 = dag_maker.create_dagrun(run_type=DagRunType.SCHEDULED)
+    dr2 = dag_maker.create_dagrun_after(dr1, run_type=DagRunType.SCHEDULED)
+    dr1.get_task_instance("dummy", session=session).state = State.RUNNING
+    dr2.get_task_instance("dummy", session=session).state = State.SCHEDULED
+    session.flush()
+
+    job_runner = SchedulerJobRunner(job=Job(), subdir=os.devnull)
+    with mock.patch.object(SlotAccounting, "from_db", side_effect=SlotAccounting.from_db) as from_db:
+        # The DAG is starved on the first candidates query, which is run again without it.
+        assert job_runner._executable_task_instances_to_queued(max_tis=1, session=session) == []
+    from_db.assert_called_once()
+
+
+@conf_vars({("scheduler", "enable_loop_profiler"): "True"})
+def test_do_scheduling_records_loop_phases(dag_maker, session):
+    with dag_maker(dag_id="test_loop_profiler", start_date=DEFAULT_DATE, session=session):
+        EmptyOperator(task_id="dummy")
+    dag_maker.create_dagrun(state=State.RUNNING)
+
+    job_runner = SchedulerJobRunner(job=Job(executor=MockExecutor()), subdir=os.devnull)
+    try:
+        job_runner._do_scheduling(session)
+        stats = job_runner._loop_profiler.get_stats()
+    finally:
+        job_runner._loop_profiler.close()
+
+    assert {"create_dagruns", "start_queued_dagruns", "schedule_dag_runs", "critical_section"} <= set(stats)
+    assert stats["schedule_dag_runs"].mean_queries > 0
+
+
 class TestSchedulerJobQueriesCount:
     """
     These tests are designed to detect changes in the number of queries for
@@ -20,9 +20,10 @@ from __future__ import annotations
 import asyncio
 import datetime
 import importlib
+import threading
 import time
 from threading import Thread
-from unittest.mock import MagicMock, patch
+from unittest.mock import ANY, MagicMock, call, patch
 
 import pendulum
 import pytest
@@ -36,7 +37,7 @@ from airflow.models.baseoperator import BaseOperator
 from airflow.models.dag import DAG
 from airflow.operators.empty import EmptyOperator
 from airflow.operators.python import PythonOperator
-from airflow.triggers.base import TriggerEvent
+from airflow.triggers.base import BaseTrigger, TriggerEvent
 from airflow.triggers.temporal import DateTimeTrigger, TimeDeltaTrigger
 from airflow.triggers.testing import FailureTrigger, SuccessTrigger
 from airflow.utils import timezone
@@ -46,6 +47,7 @@ from airflow.utils.session import create_session
 from airflow.utils.state import State, TaskInstanceState
 from airflow.utils.types import DagRunType
 from tests.core.test_logging_config import reset_logging
+from tests.test_utils.config import conf_vars
 from tests.test_utils.db import clear_db_dags, clear_db_runs
 
 pytestmark = pytest.mark.db_test
@@ -70,6 +72,21 @@ class TimeDeltaTrigger_(TimeDeltaTrigger):
         )
 
 
+class BlockingTrigger(BaseTrigger):
+    """Block the event loop, then fire an event with the name of the thread it ran in."""
+
+    def __init__(self, duration):
+        super().__init__()
+        self.duration = duration
+
+    async def run(self):
+        time.sleep(self.duration)
+        yield TriggerEvent(threading.current_thread().name)
+
+    def serialize(self):
+        return ("tests.jobs.test_triggerer_job.BlockingTrigger", {"duration": self.duration})
+
+
 @pytest.fixture(autouse=True)
 def clean_database():
     """Fixture that cleans the database before and after every test."""
@@ -218,6 +235,196 @@ def test_capacity_decode():
             TriggererJobRunner(job=job, capacity=input_str)
 
 
+def test_num_loops_decode():
+    job_runner = TriggererJobRunner(Job(), num_loops=3)
+    assert [runner.loop_index for runner in job_runner.trigger_runners] == [0, 1, 2]
+    assert job_runner.trigger_runner is job_runner.trigger_runners[0]
+
+    assert len(TriggererJobRunner(Job()).trigger_runners) == 1
+
+    for num_loops in [0, -1, 1.5, "2"]:
+        with pytest.raises(ValueError):
+            TriggererJobRunner(Job(), num_loops=num_loops)
+
+
+@patch("airflow.jobs.triggerer_job_runner.Trigger.assign_unassigned")
+@patch("airflow.jobs.triggerer_job_runner.Trigger.ids_for_triggerer", return_value=[1, 2, 3, 4, 5])
+def test_triggers_are_split_between_loops(mock_ids_for_triggerer, mock_assign_unassigned):
+    job_runner = TriggererJobRunner(Job(), num_loops=2)
+    for trigger_runner in job_runner.trigger_runners:
+        trigger_runner.update_triggers = MagicMock()
+
+    job_runner.load_triggers()
+
+    job_runner.trigger_runners[0].update_triggers.assert_called_once_with({2, 4})
+    job_runner.trigger_runners[1].update_triggers.assert_called_once_with({1, 3, 5})
+
+
+@patch("airflow.jobs.triggerer_job_runner.Trigger.bulk_fetch")
+@patch("airflow.jobs.triggerer_job_runner.Trigger.assign_unassigned")
+@patch("airflow.jobs.triggerer_job_runner.Trigger.ids_for_triggerer", return_value=list(range(1, 9)))
+def test_deduplicated_triggers_are_split_between_loops_by_key(
+    mock_ids_for_triggerer, mock_assign_unassigned, mock_bulk_fetch
+):
+    moment = timezone.utcnow()
+    triggers = {
+        trigger_id: Trigger.from_object(DateTimeTrigger(moment + datetime.timedelta(seconds=trigger_id % 2)))
+        for trigger_id in range(1, 9)
+    }
+    mock_bulk_fetch.side_effect = lambda ids: {trigger_id: triggers[trigger_id] for trigger_id in ids}
+    with conf_vars({("triggerer", "deduplicate_triggers"): "True"}):
+        job_runner = TriggererJobRunner(Job(), num_loops=4)
+    for trigger_runner in job_runner.trigger_runners:
+        trigger_runner.update_triggers = MagicMock()
+
+    job_runner.load_triggers()
+
+    # Identical triggers run in the same loop, to share their run.
+    loop_ids = [runner.update_triggers.call_args.args[0] for runner in job_runner.trigger_runners]
+    assert any({2, 4, 6, 8} <= ids for ids in loop_ids)
+    assert any({1, 3, 5, 7} <= ids for ids in loop_ids)
+    # The keys of the triggers are only computed once.
+    job_runner.load_triggers()
+    mock_bulk_fetch.assert_called_once()
+
+
+@patch("airflow.jobs.triggerer_job_runner.Trigger.submit_failure")
+@patch("airflow.jobs.triggerer_job_runner.Trigger.submit_events")
+def test_events_of_all_loops_are_handled(mock_submit_events, mock_submit_failure):
+    job_runner = TriggererJobRunner(Job(), num_loops=2)
+    exc = RuntimeError("failed")
+    job_runner.trigger_runners[0].events.append((2, TriggerEvent(True)))
+    job_runner.trigger_runners[1].events.append((1, TriggerEvent(False)))
+    job_runner.trigger_runners[1].failed_triggers.append((3, exc))
+
+    job_runner.handle_events()
+    job_runner.handle_failed_triggers()
+
+    mock_submit_events.assert_called_once_with([(2, TriggerEvent(True)), (1, TriggerEvent(False))])
+    mock_submit_failure.assert_called_once_with(trigger_id=3, exc=exc)
+    assert not any(runner.events or runner.failed_triggers for runner in job_runner.trigger_runners)
+
+
+@patch("airflow.jobs.triggerer_job_runner.EVENT_BATCH_SIZE", 2)
+@patch("airflow.jobs.triggerer_job_runner.Stats")
+@patch("airflow.jobs.triggerer_job_runner.Trigger.submit_events")
+def test_events_are_submitted_in_batches(mock_submit_events, mock_stats):
+    job_runner = TriggererJobRunner(Job())
+    trigger_runner = job_runner.trigger_runner
+    for trigger_id in range(1, 6):
+        trigger_runner.event_fired_at[trigger_id] = time.monotonic()
+        trigger_runner.events.append((trigger_id, TriggerEvent(trigger_id)))
+
+    job_runner.handle_events()
+
+    assert mock_submit_events.call_args_list == [
+        call([(1, TriggerEvent(1)), (2, TriggerEvent(2))]),
+        call([(3, TriggerEvent(3)), (4, TriggerEvent(4))]),
+        call([(5, TriggerEvent(5))]),
+    ]
+    mock_stats.incr.assert_called_once_with("triggers.succeeded", 5)
+    assert mock_stats.timing.call_count == 5
+    assert all(c.args[0] == "triggers.event_resume_delay" for c in mock_stats.timing.call_args_list)
+    assert not trigger_runner.event_fired_at
+
+
+@patch("airflow.jobs.triggerer_job_runner.Stats.gauge")
+def test_emit_metrics_per_loop(mock_gauge):
+    job = Job()
+    job.hostname = "host"
+    job_runner = TriggererJobRunner(job, num_loops=2)
+    job_runner.trigger_runners[0].triggers = {1: MagicMock(), 2: MagicMock()}
+    job_runner.trigger_runners[1].triggers = {3: MagicMock()}
+    job_runner.trigger_runners[1].max_loop_lag = 1.5
+
+    job_runner.emit_metrics()
+
+    mock_gauge.assert_has_calls(
+        [
+            call("triggers.running.host", 3),
+            call("triggers.loop_lag.host.0", 0.0),
+            call("triggers.loop_lag.host.1", 1.5),
+            call("triggers.loop_lag", 1.5, tags={"hostname": "host", "loop": 1}),
+        ],
+        any_order=True,
+    )
+    assert job_runner.trigger_runners[1].max_loop_lag == 0.0
+
+
+@patch("airflow.jobs.triggerer_job_runner.TriggererLoad.record")
+@patch("airflow.jobs.triggerer_job_runner.Stats.gauge")
+def test_record_load(mock_gauge, mock_record):
+    job = Job(heartrate=5)
+    job.id = 42
+    job.hostname = "host"
+    job_runner = TriggererJobRunner(job, num_loops=2)
+    classpath = "airflow.triggers.temporal.DateTimeTrigger"
+    job_runner.trigger_runners[0].triggers = {1: {"classpath": classpath}, 2: {"classpath": classpath}}
+    job_runner.trigger_runners[1].max_loop_lag = 0.5
+    job_runner.trigger_runners[1].step_time_by_classpath[classpath] = 2.0
+    job_runner.emit_metrics()
+
+    # The load is recorded once per heartbeat.
+    job_runner.record_load()
+    mock_record.assert_not_called()
+
+    job_runner._load_start_time -= 10
+    job_runner.record_load()
+    mock_record.assert_called_once_with(
+        triggerer_id=42, loop_lag=0.5, cpu_usage=ANY, load_by_classpath={classpath: {"count": 2, "busy": ANY}}
+    )
+    assert mock_record.call_args.kwargs["load_by_classpath"][classpath]["busy"] == pytest.approx(0.2, rel=0.1)
+    assert job_runner._load_loop_lag == 0.0
+    assert not job_runner._load_step_time_by_classpath
+
+
+@patch("airflow.jobs.triggerer_job_runner.TriggererLoad.record")
+@patch("airflow.jobs.triggerer_job_runner.Trigger.ids_for_triggerer", return_value=[])
+@patch("airflow.jobs.triggerer_job_runner.Trigger.assign_unassigned")
+def test_triggers_are_rebalanced_once_per_recorded_load(mock_assign, mock_ids, mock_record):
+    job = Job(heartrate=5)
+    job.id = 42
+    with conf_vars({("triggerer", "max_rebalanced_triggers"): "3"}):
+        job_runner = TriggererJobRunner(job)
+
+    job_runner.load_triggers()
+    assert mock_assign.call_args.kwargs["max_rebalanced_triggers"] == 0
+
+    job_runner._load_start_time -= 10
+    job_runner.record_load()
+    job_runner.load_triggers()
+    assert mock_assign.call_args.kwargs["max_rebalanced_triggers"] == 3
+    job_runner.load_triggers()
+    assert mock_assign.call_args.kwargs["max_rebalanced_triggers"] == 0
+
+
+@patch("airflow.jobs.triggerer_job_runner.TriggererLoad.remove")
+def test_load_is_removed_on_exit(mock_remove):
+    job = Job()
+    job.id = 42
+    job_runner = TriggererJobRunner(job)
+    job_runner.trigger_runners = []
+
+    with patch.object(job_runner, "_run_trigger_loop"):
+        job_runner._execute()
+
+    mock_remove.assert_called_once_with(42)
+
+
+def test_trigger_runner_of_any_loop_stopping_stops_triggerer():
+    job_runner = TriggererJobRunner(Job(), num_loops=2)
+    for trigger_runner in job_runner.trigger_runners:
+        trigger_runner.is_alive = MagicMock(return_value=True)
+    job_runner.trigger_runners[1].stop = True
+
+    with patch.object(job_runner, "load_triggers") as mock_load_triggers:
+        job_runner._run_trigger_loop()
+
+    mock_load_triggers.assert_not_called()
+    job_runner.on_kill()
+    assert all(runner.stop for runner in job_runner.trigger_runners)
+
+
 def test_trigger_lifecycle(session):
     """
     Checks that the triggerer will correctly see a new Trigger in the database
@@ -289,6 +496,140 @@ class TestTriggerRunner:
             await trigger_runner.run_trigger(1, mock_trigger)
         assert "Trigger cancelled due to timeout" in caplog.text
 
+    @staticmethod
+    def _queue_triggers(trigger_runner, triggers):
+        for trigger_id, trigger in triggers.items():
+            trigger_runner.set_trigger_logging_metadata(MagicMock(trigger_timeout=None), trigger_id, trigger)
+            trigger_runner.to_create.append((trigger_id, trigger))
+
+    def test_get_trigger_key(self):
+        moment = timezone.utcnow()
+        key = TriggerRunner.get_trigger_key(DateTimeTrigger(moment))
+        assert key == TriggerRunner.get_trigger_key(DateTimeTrigger(moment))
+        assert key != TriggerRunner.get_trigger_key(DateTimeTrigger(moment + datetime.timedelta(seconds=1)))
+        assert key != TriggerRunner.get_trigger_key(TimeDeltaTrigger(datetime.timedelta(0)))
+
+    @pytest.mark.asyncio
+    @patch("airflow.jobs.triggerer_job_runner.TriggerRunner.set_individual_trigger_logging")
+    async def test_identical_triggers_share_one_run(self, mock_set_logging):
+        with conf_vars({("triggerer", "deduplicate_triggers"): "True"}):
+            trigger_runner = TriggerRunner()
+        moment = timezone.utcnow() + datetime.timedelta(hours=1)
+        self._queue_triggers(
+            trigger_runner,
+            {
+                1: DateTimeTrigger(moment),
+                2: DateTimeTrigger(moment),
+                3: DateTimeTrigger(moment + datetime.timedelta(seconds=1)),
+            },
+        )
+        await trigger_runner.create_triggers()
+
+        shared_task = trigger_runner.triggers[1]["task"]
+        assert trigger_runner.triggers[2]["task"] is shared_task
+        assert trigger_runner.triggers[3]["task"] is not shared_task
+
+        # The shared run goes on as long as a trigger shares it.
+        trigger_runner.to_cancel.append(1)
+        await trigger_runner.cancel_triggers()
+        await asyncio.sleep(0)
+        assert not shared_task.done()
+        assert set(trigger_runner.triggers) == {2, 3}
+
+        trigger_runner.to_cancel.extend([2, 3])
+        await trigger_runner.cancel_triggers()
+        await asyncio.wait([shared_task, trigger_runner.triggers[3]["task"]])
+        assert shared_task.cancelled()
+        await trigger_runner.cleanup_finished_triggers()
+        assert not trigger_runner.triggers
+        assert not trigger_runner.shared_trigger_ids
+        assert not trigger_runner.failed_triggers
+
+    @pytest.mark.asyncio
+    @patch("airflow.jobs.triggerer_job_runner.TriggerRunner.set_individual_trigger_logging")
+    async def test_shared_run_events_are_fanned_out(self, mock_set_logging):
+        with conf_vars({("triggerer", "deduplicate_triggers"): "True"}):
+            trigger_runner = TriggerRunner()
+        moment = timezone.utcnow() + datetime.timedelta(seconds=0.2)
+        self._queue_triggers(trigger_runner, {1: DateTimeTrigger(moment), 2: DateTimeTrigger(moment)})
+        await trigger_runner.create_triggers()
+        shared_task = trigger_runner.triggers[1]["task"]
+        await asyncio.wait_for(shared_task, timeout=10)
+        assert list(trigger_runner.events) == [(1, TriggerEvent(moment)), (2, TriggerEvent(moment))]
+
+        # A trigger identical to one which fired does not share its run.
+        self._queue_triggers(trigger_runner, {3: DateTimeTrigger(moment)})
+        await trigger_runner.create_triggers()
+        new_task = trigger_runner.triggers[3]["task"]
+        assert new_task is not shared_task
+        await asyncio.wait_for(new_task, timeout=10)
+
+        await trigger_runner.cleanup_finished_triggers()
+        assert not trigger_runner.triggers
+        assert not trigger_runner.failed_triggers
+
+    @pytest.mark.asyncio
+    @patch("airflow.jobs.triggerer_job_runner.TriggerRunner.set_individual_trigger_logging")
+    async def test_triggers_are_not_deduplicated_by_default(self, mock_set_logging):
+        trigger_runner = TriggerRunner()
+        moment = timezone.utcnow() + datetime.timedelta(hours=1)
+        self._queue_triggers(trigger_runner, {1: DateTimeTrigger(moment), 2: DateTimeTrigger(moment)})
+        await trigger_runner.create_triggers()
+
+        assert trigger_runner.triggers[1]["task"] is not trigger_runner.triggers[2]["task"]
+        for details in trigger_runner.triggers.values():
+            details["task"].cancel()
+
+    @pytest.mark.asyncio
+    @patch("airflow.jobs.triggerer_job_runner.Stats")
+    @patch("airflow.jobs.triggerer_job_runner.TriggerRunner.set_individual_trigger_logging")
+    async def test_blocking_steps_are_attributed_to_triggers(self, mock_set_logging, mock_stats, caplog):
+        with conf_vars({("triggerer", "blocking_step_threshold"): "0.05"}):
+            trigger_runner = TriggerRunner()
+        self._queue_triggers(trigger_runner, {1: BlockingTrigger(0.1), 2: BlockingTrigger(0)})
+        await trigger_runner.create_triggers()
+        await asyncio.wait_for(
+            asyncio.gather(*(details["task"] for details in trigger_runner.triggers.values())), timeout=10
+        )
+
+        classpath = "tests.jobs.test_triggerer_job.BlockingTrigger"
+        blocking_details, other_details = trigger_runner.triggers[1], trigger_runner.triggers[2]
+        assert blocking_details["classpath"] == classpath
+        assert blocking_details["steps"] == other_details["steps"] == 1
+        assert blocking_details["blocked_time"] >= 0.1
+        assert other_details["blocked_time"] == 0
+        assert trigger_runner.blocking_steps_by_classpath == {classpath: 1}
+        assert trigger_runner.step_time_by_classpath[classpath] >= 0.1
+        assert f"({classpath}) blocked the event loop" in caplog.text
+        mock_stats.timing.assert_any_call(f"triggers.blocking_step_duration.{classpath}", ANY)
+        mock_stats.timing.assert_any_call(
+            "triggers.blocking_step_duration", ANY, tags={"classpath": classpath}
+        )
+
+    @pytest.mark.asyncio
+    @patch("airflow.jobs.triggerer_job_runner.TriggerRunner.set_individual_trigger_logging")
+    async def test_blocking_triggers_are_offloaded(self, mock_set_logging):
+        with conf_vars(
+            {
+                ("triggerer", "blocking_step_threshold"): "0.05",
+                ("triggerer", "offload_blocking_triggers_after"): "1",
+            }
+        ):
+            trigger_runner = TriggerRunner()
+        self._queue_triggers(trigger_runner, {1: BlockingTrigger(0.1)})
+        await trigger_runner.create_triggers()
+        await asyncio.wait_for(trigger_runner.triggers[1]["task"], timeout=10)
+        assert trigger_runner.offloaded_classpaths == {"tests.jobs.test_triggerer_job.BlockingTrigger"}
+        assert trigger_runner.events.popleft() == (1, TriggerEvent(threading.current_thread().name))
+
+        # The new triggers of the class run in the offload loop, and their events still reach the runner.
+        self._queue_triggers(trigger_runner, {2: BlockingTrigger(0.1)})
+        await trigger_runner.create_triggers()
+        await asyncio.wait_for(trigger_runner.triggers[2]["task"], timeout=10)
+        assert trigger_runner.events.popleft() == (2, TriggerEvent("TriggerRunner-0-offload"))
+        assert trigger_runner.triggers[2]["blocked_time"] == 0
+        trigger_runner._offload_loop.call_soon_threadsafe(trigger_runner._offload_loop.stop)
+
     @patch("airflow.models.trigger.Trigger.bulk_fetch")
     @patch(
         "airflow.jobs.triggerer_job_runner.TriggerRunner.get_trigger_by_classpath",
@@ -826,12 +826,13 @@ class TestDagBag:
             new_serialized_dags_count = session.query(func.count(SerializedDagModel.dag_id)).scalar()
             assert new_serialized_dags_count == 1
 
-    @patch("airflow.models.serialized_dag.SerializedDagModel.write_dag")
+    @patch("airflow.models.serialized_dag.SerializedDAG.to_dict")
     def test_serialized_dag_errors_are_import_errors(self, mock_serialize, caplog):
         """
         Test that errors serializing a DAG are recorded as import_errors in the DB
         """
         mock_serialize.side_effect = SerializationError
+        db_clean_up()
 
         with create_session() as session:
             path = os.path.join(TEST_DAGS_FOLDER, "test_example_bash_operator.py")
@@ -852,9 +853,9 @@ class TestDagBag:
             session.rollback()
 
     @patch("airflow.models.dagbag.DagBag.collect_dags")
-    @patch("airflow.models.serialized_dag.SerializedDagModel.write_dag")
+    @patch("airflow.models.serialized_dag.SerializedDagModel.write_dags", return_value=([], {}))
     @patch("airflow.models.dag.DAG.bulk_write_to_db")
-    def test_sync_to_db_is_retried(self, mock_bulk_write_to_db, mock_s10n_write_dag, mock_collect_dags):
+    def test_sync_to_db_is_retried(self, mock_bulk_write_to_db, mock_s10n_write_dags, mock_collect_dags):
         """Test that dagbag.sync_to_db is retried on OperationalError"""
 
         dagbag = DagBag("/dev/null")
@@ -882,15 +883,15 @@ class TestDagBag:
         )
         # Assert that rollback is called twice (i.e. whenever OperationalError occurs)
         mock_session.rollback.assert_has_calls([mock.call(), mock.call()])
-        # Check that 'SerializedDagModel.write_dag' is also called
-        # Only called once since the other two times the 'DAG.bulk_write_to_db' error'd
-        # and the session was roll-backed before even reaching 'SerializedDagModel.write_dag'
-        mock_s10n_write_dag.assert_has_calls(
+        # Check that 'SerializedDagModel.write_dags' is also called, on each attempt since it runs
+        # before 'DAG.bulk_write_to_db'
+        mock_s10n_write_dags.assert_has_calls(
             [
                 mock.call(
-                    mock_dag, min_update_interval=mock.ANY, processor_subdir=None, session=mock_session
+                    [mock_dag], min_update_interval=mock.ANY, processor_subdir=None, session=mock_session
                 ),
             ]
+            * 3
         )
 
     @patch("airflow.models.dagbag.settings.MIN_SERIALIZED_DAG_UPDATE_INTERVAL", 5)
@@ -1049,6 +1050,75 @@ class TestDagBag:
         assert set(updated_ser_dag.tags) == {"example", "example2", "new_tag"}
         assert updated_ser_dag_update_time > ser_dag_update_time
 
+    @patch("airflow.models.dagbag.settings.MIN_SERIALIZED_DAG_UPDATE_INTERVAL", 5)
+    @patch("airflow.models.dagbag.settings.MIN_SERIALIZED_DAG_FETCH_INTERVAL", 5)
+    def test_get_dags_refreshes_updated_dags_in_bulk(self):
+        dag_ids = ["example_bash_operator", "example_branch_labels", "example_xcom"]
+        with time_machine.travel((tz.datetime(2020, 1, 5, 0, 0, 0)), tick=False):
+            example_dags = DagBag(include_examples=True).dags
+            for dag_id in dag_ids:
+                SerializedDagModel.write_dag(dag=example_dags[dag_id])
+
+            dag_bag = DagBag(read_dags_from_db=True)
+            with assert_queries_count(1):
+                assert list(dag_bag.get_dags(dag_ids)) == dag_ids
+            assert dag_bag.get_dags(["missing"]) == {}
+
+        with time_machine.travel((tz.datetime(2020, 1, 5, 0, 0, 6)), tick=False):
+            example_dags["example_xcom"].tags = ["new_tag"]
+            SerializedDagModel.write_dag(dag=example_dags["example_xcom"])
+
+        # The DAGs are checked in one query, and the updated one is fetched in another.
+        with time_machine.travel((tz.datetime(2020, 1, 5, 0, 0, 8)), tick=False):
+            with assert_queries_count(2):
+                dags = dag_bag.get_dags(dag_ids)
+        assert dags["example_xcom"].tags == ["new_tag"]
+        assert dag_bag.dags_last_fetched["example_xcom"] == tz.datetime(2020, 1, 5, 0, 0, 8)
+        assert dag_bag.dags_last_fetched["example_bash_operator"] == tz.datetime(2020, 1, 5, 0, 0, 0)
+
+    @patch("airflow.models.dagbag.Stats.incr")
+    def test_max_size_evicts_least_recently_used_dags(self, mock_incr):
+        dag_ids = ["example_bash_operator", "example_branch_labels", "example_xcom"]
+        example_dags = DagBag(include_examples=True).dags
+        for dag_id in dag_ids:
+            SerializedDagModel.write_dag(dag=example_dags[dag_id])
+        dag_bag = DagBag(read_dags_from_db=True, max_size=2)
+        mock_incr.reset_mock()
+
+        dag_bag.get_dag("example_bash_operator")
+        dag_bag.get_dag("example_branch_labels")
+        dag_bag.get_dag("example_bash_operator")
+        dag_bag.get_dag("example_xcom")
+
+        assert list(dag_bag.dags) == ["example_bash_operator", "example_xcom"]
+        assert set(dag_bag.dags_last_fetched) == {"example_bash_operator", "example_xcom"}
+        assert mock_incr.call_args_list == [
+            mock.call("dagbag.cache.miss", 1),
+            mock.call("dagbag.cache.miss", 1),
+            mock.call("dagbag.cache.hit"),
+            mock.call("dagbag.cache.miss", 1),
+            mock.call("dagbag.cache.evicted"),
+        ]
+
+        # Evicted DAGs are read from DB again when needed.
+        assert dag_bag.get_dag("example_branch_labels").dag_id == "example_branch_labels"
+        assert list(dag_bag.dags) == ["example_xcom", "example_branch_labels"]
+
+    def test_collect_dags_from_db_with_max_size(self):
+        db.clear_db_serialized_dags()
+        example_dags = DagBag(str(example_dags_folder), include_examples=False).dags
+        for dag in example_dags.values():
+            SerializedDagModel.write_dag(dag)
+
+        dagbag = DagBag(read_dags_from_db=True, max_size=5)
+        dagbag.collect_dags_from_db()
+
+        assert len(dagbag.dags) == 5
+        assert set(dagbag.dags) <= set(example_dags)
+        # The DAGs kept are refreshed from DB as the other DAGs read from DB.
+        assert set(dagbag.dags_last_fetched) == set(dagbag.dags_hash) == set(dagbag.dags)
+        db.clear_db_serialized_dags()
+
     def test_collect_dags_from_db(self):
         """DAGs are collected from Database"""
         db.clear_db_dags()
@@ -17,15 +17,16 @@
 # under the License.
 from __future__ import annotations
 
+import os
 from datetime import timedelta
 from unittest.mock import patch
 
 import pytest
 
 import airflow.example_dags as example_dags_module
-from airflow.exceptions import AirflowException
+from airflow.exceptions import AirflowException, DagCodeNotFound
 from airflow.models import DagBag
-from airflow.models.dagcode import DagCode
+from airflow.models.dagcode import DagCode, DagCodeBlob
 
 # To move it to a shared module.
 from airflow.utils.file import open_maybe_zipped
@@ -110,7 +111,7 @@ class TestDagCode:
                 assert DagCode.has_dag(dag.fileloc)
                 dag_fileloc_hash = DagCode.dag_fileloc_hash(dag.fileloc)
                 result = (
-                    session.query(DagCode.fileloc, DagCode.fileloc_hash, DagCode.source_code)
+                    session.query(DagCode)
                     .filter(DagCode.fileloc == dag.fileloc)
                     .filter(DagCode.fileloc_hash == dag_fileloc_hash)
                     .one()
@@ -161,3 +162,105 @@ class TestDagCode:
                     assert new_result.fileloc == example_dag.fileloc
                     assert new_result.source_code == "# dummy code"
                     assert new_result.last_updated > result.last_updated
+
+    def test_same_code_is_stored_once(self, tmp_path):
+        """Files with the same code share the same compressed code."""
+        code = "# generated DAG\n" * 100
+        files = [tmp_path / f"dag_{i}.py" for i in range(3)]
+        for file in files:
+            file.write_text(code)
+        (tmp_path / "other.py").write_text("# other DAG\n")
+        filelocs = [str(file) for file in [*files, tmp_path / "other.py"]]
+
+        DagCode.bulk_sync_to_db(filelocs)
+
+        with create_session() as session:
+            assert session.query(DagCode).count() == 4
+            blob = (
+                session.query(DagCodeBlob)
+                .filter(DagCodeBlob.source_hash == DagCodeBlob.hash_source(code))
+                .one()
+            )
+            assert session.query(DagCodeBlob).count() == 2
+            assert blob.source_size == len(code)
+            assert len(blob.compressed_source) < blob.source_size
+        for fileloc in filelocs[:3]:
+            assert DagCode.code(fileloc) == code
+
+    def test_unreferenced_code_is_removed(self, tmp_path):
+        """Code is removed once no file has it anymore."""
+        shared, changed = tmp_path / "shared.py", tmp_path / "changed.py"
+        shared.write_text("# shared\n")
+        changed.write_text("# shared\n")
+        DagCode.bulk_sync_to_db([str(shared), str(changed)])
+
+        changed.write_text("# changed\n")
+        with create_session() as session:
+            last_updated = (
+                session.query(DagCode.last_updated).filter(DagCode.fileloc == str(changed)).scalar()
+            )
+        mtime = (last_updated + timedelta(seconds=1)).timestamp()
+        os.utime(changed, (mtime, mtime))
+        DagCode.bulk_sync_to_db([str(shared), str(changed)])
+
+        with create_session() as session:
+            assert session.query(DagCodeBlob).count() == 2
+        assert DagCode.code(str(changed)) == "# changed\n"
+
+        DagCode.remove_deleted_code([str(shared)], str(tmp_path))
+        with create_session() as session:
+            assert session.query(DagCodeBlob.source_hash).all() == [(DagCodeBlob.hash_source("# shared\n"),)]
+
+    def test_missing_code_is_written_again(self, tmp_path):
+        """Code removed while a file referenced it, e.g. by another DAG processor, is written again."""
+        dag_file = tmp_path / "dag.py"
+        dag_file.write_text("# dag\n")
+        DagCode.bulk_sync_to_db([str(dag_file)])
+        with create_session() as session:
+            session.query(DagCodeBlob).delete()
+
+        DagCode.bulk_sync_to_db([str(dag_file)])
+
+        assert DagCode.code(str(dag_file)) == "# dag\n"
+
+    def test_code_of_unchanged_files_is_not_locked(self, tmp_path):
+        dag_file = tmp_path / "dag.py"
+        dag_file.write_text("# dag\n")
+        DagCode.bulk_sync_to_db([str(dag_file)])
+
+        with patch.object(DagCode, "_lock_blobs", wraps=DagCode._lock_blobs) as mock_lock_blobs:
+            DagCode.bulk_sync_to_db([str(dag_file)])
+        mock_lock_blobs.assert_not_called()
+
+    @pytest.mark.parametrize(
+        "start, end",
+        [(0, None), (0, 10), (100, 20000), (70000, None), (0, 200000)],
+    )
+    def test_code_stream(self, tmp_path, start, end):
+        code = "".join(f"task_{i} = EmptyOperator(task_id='task_{i}')\n" for i in range(3000))
+        dag_file = tmp_path / "dag.py"
+        dag_file.write_text(code)
+        DagCode.bulk_sync_to_db([str(dag_file)])
+
+        assert DagCode.get_code_size(str(dag_file)) == len(code)
+        assert b"".join(DagCode.code_stream(str(dag_file), start, end)) == code.encode()[start:end]
+
+    def test_code_stored_before_blobs_can_be_read(self, tmp_path):
+        dag_file = tmp_path / "dag.py"
+        dag_file.write_text("# dag\n")
+        DagCode.bulk_sync_to_db([str(dag_file)])
+        with create_session() as session:
+            dag_code = session.query(DagCode).one()
+            dag_code.source_hash = None
+            dag_code._source_code = "# legacy dag\n"
+            session.query(DagCodeBlob).delete()
+
+        assert DagCode.code(str(dag_file)) == "# legacy dag\n"
+        assert DagCode.get_code_size(str(dag_file)) == len("# legacy dag\n")
+        assert b"".join(DagCode.code_stream(str(dag_file), 2, 8)) == b"legacy"
+
+    def test_missing_code(self, tmp_path):
+        with pytest.raises(DagCodeNotFound):
+            DagCode.get_code_size(str(tmp_path / "missing.py"))
+        with pytest.raises(DagCodeNotFound):
+            DagCode.code_stream(str(tmp_path / "missing.py"))
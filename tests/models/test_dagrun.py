@@ -33,7 +33,7 @@ from airflow.exceptions import AirflowException
 from airflow.models.baseoperator import BaseOperator
 from airflow.models.dag import DAG, DagModel
 from airflow.models.dagbag import DagBag
-from airflow.models.dagrun import DagRun, DagRunNote
+from airflow.models.dagrun import DagRun, DagRunNote, TIDependencyCheckRecord
 from airflow.models.taskinstance import TaskInstance, TaskInstanceNote, clear_task_instances
 from airflow.models.taskmap import TaskMap
 from airflow.models.taskreschedule import TaskReschedule
@@ -847,6 +847,38 @@ class TestDagRun:
         runs = DagRun.next_dagruns_to_examine(state, session).all()
         assert runs == []
 
+    def test_next_dagruns_to_examine_partition(self, session):
+        """Check that "next_dagruns_to_examine" only returns runs of DAGs in the given partition"""
+        dag = DAG(dag_id="test_dags_partition", start_date=DEFAULT_DATE)
+        EmptyOperator(task_id="dummy", dag=dag, owner="airflow")
+
+        orm_dag = DagModel(dag_id=dag.dag_id, has_task_concurrency_limits=False, is_active=True)
+        session.add(orm_dag)
+        session.flush()
+        dr = dag.create_dagrun(
+            run_type=DagRunType.SCHEDULED,
+            state=DagRunState.RUNNING,
+            execution_date=DEFAULT_DATE,
+            data_interval=dag.infer_automated_data_interval(DEFAULT_DATE),
+            start_date=DEFAULT_DATE,
+            session=session,
+        )
+        key = DagModel.get_partition_key(dag.dag_id)
+        assert orm_dag.partition_key == key
+
+        def runs_in(partition_key_range):
+            return DagRun.next_dagruns_to_examine(
+                DagRunState.RUNNING, session, partition_key_range=partition_key_range
+            ).all()
+
+        assert runs_in((key, key + 1)) == [dr]
+        assert runs_in((key + 1, DagModel.PARTITION_KEY_SPACE)) == []
+
+        # DAGs without a partition key are part of every partition.
+        orm_dag.partition_key = None
+        session.flush()
+        assert runs_in((key + 1, DagModel.PARTITION_KEY_SPACE)) == [dr]
+
     @mock.patch.object(Stats, "timing")
     def test_no_scheduling_delay_for_nonscheduled_runs(self, stats_mock, session):
         """
@@ -1012,6 +1044,54 @@ def test_expand_mapped_task_instance_at_create(is_noop, dag_maker, session):
         assert indices == [(0,), (1,), (2,), (3,)]
 
 
+@pytest.mark.parametrize("is_noop", [True, False])
+def test_create_task_instances_for_new_runs(is_noop, dag_maker, session):
+    with mock.patch("airflow.settings.task_instance_mutation_hook") as mock_mut:
+        mock_mut.is_noop = is_noop
+        with dag_maker(session=session, dag_id="test_dag", start_date=DEFAULT_DATE):
+            EmptyOperator(task_id="task_1")
+            MockOperator.partial(task_id="task_2").expand(arg2=[1, 2, 3])
+            # Not part of the first DAG run.
+            EmptyOperator(task_id="task_3", start_date=DEFAULT_DATE + datetime.timedelta(days=1))
+        dag = dag_maker.dag
+
+        dag_runs = []
+        for i in range(2):
+            execution_date = DEFAULT_DATE + datetime.timedelta(days=i)
+            dag_run = dag._build_dagrun(
+                state=DagRunState.QUEUED,
+                execution_date=execution_date,
+                run_id=None,
+                start_date=None,
+                external_trigger=False,
+                conf=None,
+                run_type=DagRunType.SCHEDULED,
+                dag_hash=None,
+                creating_job_id=None,
+                data_interval=dag.infer_automated_data_interval(execution_date),
+            )
+            dag_run.dag = dag
+            dag_runs.append(dag_run)
+        session.add_all(dag_runs)
+        session.flush()
+
+        DagRun.create_task_instances_for_new_runs(dag_runs, session=session)
+
+        tis = session.query(TI.run_id, TI.task_id, TI.map_index).filter_by(dag_id="test_dag").all()
+        assert sorted(tis) == sorted(
+            [
+                (dag_runs[0].run_id, "task_1", -1),
+                *((dag_runs[0].run_id, "task_2", i) for i in range(3)),
+                (dag_runs[1].run_id, "task_1", -1),
+                *((dag_runs[1].run_id, "task_2", i) for i in range(3)),
+                (dag_runs[1].run_id, "task_3", -1),
+            ]
+        )
+        # Creating the task instances of the first run does what verify_integrity would have done.
+        dag_runs[0].verify_integrity(session=session)
+        assert session.query(TI).filter_by(dag_id="test_dag", run_id=dag_runs[0].run_id).count() == 4
+
+
 @pytest.mark.need_serialized_dag
 @pytest.mark.parametrize("is_noop", [True, False])
 def test_expand_mapped_task_instance_task_decorator(is_noop, dag_maker, session):
@@ -1975,6 +2055,40 @@ def test_mapped_task_all_finish_before_downstream(dag_maker, session):
     assert result == [2, 4]
 
 
+def test_task_instance_scheduling_decisions_with_dependency_check_record(dag_maker, session):
+    with dag_maker(session=session):
+        first = EmptyOperator(task_id="first")
+        second = EmptyOperator(task_id="second")
+        third = EmptyOperator(task_id="third")
+        sibling = EmptyOperator(task_id="sibling")
+        first >> second >> third
+        first >> sibling
+
+    dr: DagRun = dag_maker.create_dagrun()
+    record = TIDependencyCheckRecord(dr.dag_hash)
+    are_dependencies_met = TaskInstance.are_dependencies_met
+
+    def _decide():
+        with mock.patch.object(
+            TaskInstance, "are_dependencies_met", autospec=True, side_effect=are_dependencies_met
+        ) as mock_are_dependencies_met:
+            decision = dr.task_instance_scheduling_decisions(session=session, dependency_check_record=record)
+        checked = sorted(c.args[0].task_id for c in mock_are_dependencies_met.call_args_list)
+        return sorted(ti.task_id for ti in decision.schedulable_tis), checked
+
+    assert _decide() == (["first"], ["first", "second", "sibling", "third"])
+    # Nothing changed: only the ready task instance is checked again.
+    assert _decide() == (["first"], ["first"])
+
+    dr.get_task_instance("first", session=session).set_state(TaskInstanceState.SUCCESS, session=session)
+    # The downstream tasks of the changed task instance are checked, not the ones further down.
+    assert _decide() == (["second", "sibling"], ["second", "sibling"])
+    assert _decide() == (["second", "sibling"], ["second", "sibling"])
+
+    dr.get_task_instance("second", session=session).set_state(TaskInstanceState.SUCCESS, session=session)
+    assert _decide() == (["sibling", "third"], ["sibling", "third"])
+
+
 def test_schedule_tis_map_index(dag_maker, session):
     with dag_maker(session=session, dag_id="test"):
         task = BaseOperator(task_id="task_1")
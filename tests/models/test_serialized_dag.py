@@ -25,6 +25,8 @@ import pytest
 
 import airflow.example_dags as example_dags_module
 from airflow.datasets import Dataset
+from airflow.exceptions import SerializationError, TaskNotFound
+from airflow.models import serialized_dag
 from airflow.models.dag import DAG
 from airflow.models.dagbag import DagBag
 from airflow.models.dagcode import DagCode
@@ -34,6 +36,7 @@ from airflow.serialization.serialized_objects import SerializedDAG
 from airflow.settings import json
 from airflow.utils.hashlib_wrapper import md5
 from airflow.utils.session import create_session
+from airflow.utils.task_group import TaskGroup
 from tests.test_utils import db
 from tests.test_utils.asserts import assert_queries_count
 
@@ -53,13 +56,17 @@ class TestSerializedDagModel:
     @pytest.fixture(
         autouse=True,
         params=[
-            pytest.param(False, id="raw-serialized_dags"),
-            pytest.param(True, id="compress-serialized_dags"),
+            pytest.param((False, False), id="raw-serialized_dags"),
+            pytest.param((True, False), id="compress-serialized_dags"),
+            pytest.param((False, True), id="indexed-serialized_dags"),
         ],
     )
     def setup_test_cases(self, request, monkeypatch):
         db.clear_db_serialized_dags()
-        with mock.patch("airflow.models.serialized_dag.COMPRESS_SERIALIZED_DAGS", request.param):
+        compress, index = request.param
+        with mock.patch("airflow.models.serialized_dag.COMPRESS_SERIALIZED_DAGS", compress), mock.patch(
+            "airflow.models.serialized_dag.INDEX_SERIALIZED_DAG_TASKS", index
+        ):
             yield
         db.clear_db_serialized_dags()
 
@@ -186,9 +193,115 @@ class TestSerializedDagModel:
             DAG("dag_2"),
             DAG("dag_3"),
         ]
-        with assert_queries_count(10):
+        with assert_queries_count(3):
             SDM.bulk_sync_to_db(dags)
 
+    def test_write_dags(self):
+        """DAGs are written in bulk, only if they are new or changed"""
+        dags = [DAG("dag_1"), DAG("dag_2"), DAG("dag_3")]
+        with create_session() as session:
+            updated_dags, errors = SDM.write_dags(dags[:2], session=session)
+        assert updated_dags == dags[:2]
+        assert errors == {}
+
+        dags[0].tags = ["new_tag"]
+        with create_session() as session, assert_queries_count(3):
+            updated_dags, errors = SDM.write_dags(dags, session=session)
+        assert updated_dags == [dags[2], dags[0]]
+        assert errors == {}
+
+        with create_session() as session:
+            assert session.get(SDM, "dag_1").data["dag"]["tags"] == ["new_tag"]
+            assert {sdm.dag_id for sdm in session.query(SDM)} == {"dag_1", "dag_2", "dag_3"}
+            updated_dags, _ = SDM.write_dags(dags, processor_subdir="/tmp/test", session=session)
+        assert {dag.dag_id for dag in updated_dags} == {"dag_1", "dag_2", "dag_3"}
+
+    def test_write_dags_min_update_interval(self):
+        dags = [DAG("dag_1"), DAG("dag_2")]
+        SDM.write_dag(dags[0])
+        dags[0].tags = ["new_tag"]
+        updated_dags, errors = SDM.write_dags(dags, min_update_interval=30)
+        assert updated_dags == [dags[1]]
+        assert errors == {}
+
+    def test_write_dags_captures_serialization_errors(self):
+        dags = [DAG("dag_1"), DAG("dag_2")]
+        error = SerializationError("Failed to serialize")
+        to_dict = SerializedDAG.to_dict
+
+        def mock_to_dict(dag):
+            if dag.dag_id == "dag_1":
+                raise error
+            return to_dict(dag)
+
+        with mock.patch.object(SerializedDAG, "to_dict", side_effect=mock_to_dict):
+            updated_dags, errors = SDM.write_dags(dags)
+        assert updated_dags == [dags[1]]
+        assert errors == {"dag_1": error}
+        assert not SDM.has_dag("dag_1")
+
+    def test_get_partial_dag(self):
+        """Only the given tasks and their upstream tasks are deserialized"""
+        with DAG("dag", start_date=pendulum.datetime(2021, 1, 1, tz="UTC")) as dag:
+            first = BashOperator(task_id="first", bash_command="echo 1")
+            with TaskGroup("group"):
+                second = BashOperator(task_id="second", bash_command="echo 2")
+                BashOperator(task_id="other", bash_command="echo 3")
+            with TaskGroup("other_group"):
+                last = BashOperator(task_id="last", bash_command="echo 4")
+            first >> second >> last
+        SDM.write_dag(dag)
+
+        with create_session() as session:
+            sdm = session.get(SDM, "dag")
+            assert sdm.data == json.loads(json.dumps(SerializedDAG.to_dict(dag)))
+
+            partial_dag = sdm.get_partial_dag(["group.second"])
+            assert partial_dag.partial
+            assert set(partial_dag.task_dict) == {"first", "group.second"}
+            assert set(partial_dag.task_group_dict) == {"group"}
+            assert partial_dag.task_group_dict["group"].children.keys() == {"group.second"}
+            task = partial_dag.get_task("group.second")
+            assert task.upstream_task_ids == {"first"}
+            assert task.downstream_task_ids == set()
+            assert task.dag is partial_dag
+
+            full_dag = sdm.get_partial_dag(["other_group.last", "group.other"])
+            assert not full_dag.partial
+            assert set(full_dag.task_dict) == set(dag.task_dict)
+
+            with pytest.raises(TaskNotFound):
+                sdm.get_partial_dag(["missing"])
+
+            assert SDM.get_serialized_dag("dag", "group.second", session=session).task_id == "group.second"
+            assert SDM.get_serialized_dag("dag", "missing", session=session) is None
+
+    @pytest.mark.parametrize("fail_stop", [False, True])
+    def test_get_serialized_dag_is_partial_only_with_indexed_tasks(self, fail_stop):
+        """Stopping the remaining tasks of fail_stop DAGs needs all the tasks of the DAG"""
+        with DAG("dag", start_date=pendulum.datetime(2021, 1, 1, tz="UTC"), fail_stop=fail_stop) as dag:
+            BashOperator(task_id="first", bash_command="echo 1")
+            BashOperator(task_id="second", bash_command="echo 2")
+        SDM.write_dag(dag)
+
+        from_dict = SerializedDAG.from_dict
+
+        def from_dict_with_fail_stop(*args, **kwargs):
+            # fail_stop is not serialized, set it on the deserialized DAG instead
+            deserialized_dag = from_dict(*args, **kwargs)
+            deserialized_dag.fail_stop = fail_stop
+            return deserialized_dag
+
+        with create_session() as session, mock.patch.object(
+            SerializedDAG, "from_dict", side_effect=from_dict_with_fail_stop
+        ):
+            task = SDM.get_serialized_dag("dag", "first", session=session)
+
+        if serialized_dag.INDEX_SERIALIZED_DAG_TASKS and not fail_stop:
+            assert set(task.dag.task_dict) == {"first"}
+        else:
+            assert set(task.dag.task_dict) == {"first", "second"}
+
     @pytest.mark.parametrize("dag_dependencies_fields", [{"dag_dependencies": None}, {}])
     def test_get_dag_dependencies_default_to_empty(self, dag_dependencies_fields):
         """Test a pre-2.1.0 serialized DAG can deserialize DAG dependencies."""
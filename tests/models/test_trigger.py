@@ -22,10 +22,12 @@ from typing import Any, AsyncIterator
 import pytest
 import pytz
 from cryptography.fernet import Fernet
+from sqlalchemy import select
 
 from airflow.jobs.job import Job
 from airflow.jobs.triggerer_job_runner import TriggererJobRunner, TriggerRunner
 from airflow.models import TaskInstance, Trigger
+from airflow.models.triggererload import TriggererLoad
 from airflow.operators.empty import EmptyOperator
 from airflow.triggers.base import BaseTrigger, TriggerEvent
 from airflow.utils import timezone
@@ -48,10 +50,12 @@ def clear_db(session):
     session.query(TaskInstance).delete()
     session.query(Trigger).delete()
     session.query(Job).delete()
+    session.query(TriggererLoad).delete()
     yield session
     session.query(TaskInstance).delete()
     session.query(Trigger).delete()
     session.query(Job).delete()
+    session.query(TriggererLoad).delete()
     session.commit()
 
 
@@ -118,6 +122,47 @@ def test_submit_event(session, create_task_instance):
     assert updated_task_instance.next_kwargs == {"event": 42, "cheesecake": True}
 
 
+def test_submit_events(session, dag_maker):
+    """
+    Tests that the events of several triggers are submitted at once, and only
+    the first event of each trigger re-wakes its dependent task instances.
+    """
+    triggers = [Trigger(classpath="airflow.triggers.testing.SuccessTrigger", kwargs={}) for _ in range(3)]
+    for trigger_id, trigger in enumerate(triggers, start=1):
+        trigger.id = trigger_id
+    session.add_all(triggers)
+    with dag_maker(session=session):
+        for task_id in ["waits_1", "waits_1_too", "waits_2", "not_deferred", "waits_3"]:
+            EmptyOperator(task_id=task_id)
+    dag_run = dag_maker.create_dagrun()
+    tis = {ti.task_id: ti for ti in dag_run.task_instances}
+    for task_id, trigger_id in [("waits_1", 1), ("waits_1_too", 1), ("waits_2", 2), ("not_deferred", 2)]:
+        tis[task_id].state = State.DEFERRED
+        tis[task_id].trigger_id = trigger_id
+    tis["waits_1"].next_kwargs = {"cheesecake": True}
+    tis["not_deferred"].state = State.RUNNING
+    session.commit()
+
+    resumed = Trigger.submit_events(
+        [(1, TriggerEvent(42)), (2, TriggerEvent("two")), (1, TriggerEvent(43))], session=session
+    )
+    session.flush()
+    session.expunge_all()
+
+    assert resumed == 3
+    tis = {ti.task_id: ti for ti in session.query(TaskInstance)}
+    for task_id in ["waits_1", "waits_1_too", "waits_2"]:
+        assert tis[task_id].state == State.SCHEDULED
+        assert tis[task_id].trigger_id is None
+    assert tis["waits_1"].next_kwargs == {"event": 42, "cheesecake": True}
+    assert tis["waits_1_too"].next_kwargs == {"event": 42}
+    assert tis["waits_2"].next_kwargs == {"event": "two"}
+    assert tis["not_deferred"].state == State.RUNNING
+    assert tis["not_deferred"].trigger_id == 2
+    assert tis["waits_3"].state is None
+    assert Trigger.submit_events([], session=session) == 0
+
+
 def test_submit_failure(session, create_task_instance):
     """
     Tests that failures submitted to a trigger fail their dependent
@@ -242,6 +287,153 @@ def test_assign_unassigned(session, create_task_instance):
     )
 
 
+HEAVY_TRIGGER_CLASSPATH = "airflow.triggers.testing.SuccessTrigger"
+
+
+def _create_triggerer(session, busy=0.0, count=0, loop_lag=0.0):
+    triggerer = Job(heartrate=10, state=State.RUNNING)
+    TriggererJobRunner(triggerer)
+    session.add(triggerer)
+    session.commit()
+    TriggererLoad.record(
+        triggerer_id=triggerer.id,
+        loop_lag=loop_lag,
+        cpu_usage=busy,
+        load_by_classpath={HEAVY_TRIGGER_CLASSPATH: {"count": count, "busy": busy}} if count else {},
+        session=session,
+    )
+    session.commit()
+    return triggerer
+
+
+def _create_triggers(session, create_task_instance, triggerer_id, priority_weights, start_id):
+    trigger_ids = []
+    for trigger_id, priority_weight in enumerate(priority_weights, start=start_id):
+        trigger = Trigger(classpath=HEAVY_TRIGGER_CLASSPATH, kwargs={})
+        trigger.id = trigger_id
+        trigger.triggerer_id = triggerer_id
+        session.add(trigger)
+        ti = create_task_instance(
+            task_id=f"task_{trigger_id}",
+            execution_date=timezone.utcnow() + datetime.timedelta(hours=trigger_id),
+            run_id=f"run_{trigger_id}",
+        )
+        ti.priority_weight = priority_weight
+        ti.trigger_id = trigger_id
+        session.add(ti)
+        trigger_ids.append(trigger_id)
+    session.commit()
+    return trigger_ids
+
+
+def _triggerer_ids(session):
+    session.expire_all()
+    return dict(session.execute(select(Trigger.id, Trigger.triggerer_id)).all())
+
+
+def test_assign_unassigned_balances_load(session, create_task_instance):
+    """
+    Tests that triggerers heartbeating their load only take their share of the unassigned triggers.
+    """
+    # Each trigger runs 0.1 seconds per second.
+    loaded_triggerer = _create_triggerer(session, busy=0.2, count=2)
+    idle_triggerer = _create_triggerer(session)
+    _create_triggers(session, create_task_instance, loaded_triggerer.id, [1, 1], start_id=1)
+    _create_triggers(session, create_task_instance, None, [3, 2, 1], start_id=3)
+
+    # The average load with the unassigned triggers is 0.25, the loaded triggerer takes one trigger.
+    Trigger.assign_unassigned(loaded_triggerer.id, 100, health_check_threshold=30, session=session)
+    assert _triggerer_ids(session) == {
+        1: loaded_triggerer.id,
+        2: loaded_triggerer.id,
+        3: loaded_triggerer.id,
+        4: None,
+        5: None,
+    }
+
+    Trigger.assign_unassigned(idle_triggerer.id, 100, health_check_threshold=30, session=session)
+    assert _triggerer_ids(session) == {
+        1: loaded_triggerer.id,
+        2: loaded_triggerer.id,
+        3: loaded_triggerer.id,
+        4: idle_triggerer.id,
+        5: idle_triggerer.id,
+    }
+
+
+def test_assign_unassigned_skips_lagging_triggerers(session, create_task_instance):
+    lagging_triggerer = _create_triggerer(session, loop_lag=1)
+    other_triggerer = _create_triggerer(session, busy=0.2, count=2)
+    _create_triggers(session, create_task_instance, other_triggerer.id, [1, 1], start_id=1)
+    _create_triggers(session, create_task_instance, None, [1], start_id=3)
+
+    Trigger.assign_unassigned(
+        lagging_triggerer.id, 100, health_check_threshold=30, loop_lag_threshold=0.2, session=session
+    )
+    assert _triggerer_ids(session)[3] is None
+    Trigger.assign_unassigned(
+        other_triggerer.id, 100, health_check_threshold=30, loop_lag_threshold=0.2, session=session
+    )
+    assert _triggerer_ids(session)[3] == other_triggerer.id
+
+
+@pytest.mark.parametrize("max_rebalanced_triggers, expected_moved_ids", [(0, []), (1, [1]), (10, [1, 2])])
+def test_assign_unassigned_rebalances_triggers(
+    session, create_task_instance, max_rebalanced_triggers, expected_moved_ids
+):
+    """
+    Tests that a new triggerer takes the triggers of the lowest priority off a loaded triggerer,
+    until they have the same load.
+    """
+    loaded_triggerer = _create_triggerer(session, busy=0.4, count=4)
+    new_triggerer = _create_triggerer(session)
+    _create_triggers(session, create_task_instance, loaded_triggerer.id, [1, 2, 3, 4], start_id=1)
+
+    Trigger.assign_unassigned(
+        new_triggerer.id,
+        100,
+        health_check_threshold=30,
+        max_rebalanced_triggers=max_rebalanced_triggers,
+        session=session,
+    )
+    assert _triggerer_ids(session) == {
+        trigger_id: new_triggerer.id if trigger_id in expected_moved_ids else loaded_triggerer.id
+        for trigger_id in [1, 2, 3, 4]
+    }
+
+
+def test_assign_unassigned_accounts_for_moved_triggers(session, create_task_instance):
+    """
+    Tests that the triggers moved off a triggerer since it heartbeated its load are not counted in it.
+    """
+    donor_triggerer = _create_triggerer(session, busy=0.4, count=4)
+    receiver_triggerer = _create_triggerer(session)
+    new_triggerer = _create_triggerer(session)
+    _create_triggers(session, create_task_instance, receiver_triggerer.id, [1, 2], start_id=1)
+    _create_triggers(session, create_task_instance, donor_triggerer.id, [3, 4], start_id=3)
+
+    # The triggerers already have the same load, as far as whole triggers go.
+    Trigger.assign_unassigned(
+        new_triggerer.id, 100, health_check_threshold=30, max_rebalanced_triggers=10, session=session
+    )
+    assert _triggerer_ids(session) == {
+        1: receiver_triggerer.id,
+        2: receiver_triggerer.id,
+        3: donor_triggerer.id,
+        4: donor_triggerer.id,
+    }
+
+
+def test_assign_unassigned_removes_load_of_dead_triggerers(session):
+    triggerer = _create_triggerer(session)
+    dead_triggerer = _create_triggerer(session)
+    dead_triggerer.end_date = timezone.utcnow()
+    session.commit()
+
+    Trigger.assign_unassigned(triggerer.id, 100, health_check_threshold=30, session=session)
+    assert session.scalars(select(TriggererLoad.triggerer_id)).all() == [triggerer.id]
+
+
 def test_get_sorted_triggers_same_priority_weight(session, create_task_instance):
     """
     Tests that triggers are sorted by the creation_date if they have the same priority.
@@ -2619,6 +2619,43 @@ def test_mapped_task_group_serde():
     assert serde_tg._expand_input == DictOfListsExpandInput({"a": [".", ".."]})
 
 
+def test_partial_dag_deserialization():
+    from airflow.decorators import task, task_group
+
+    with DAG("test-dag", start_date=datetime(2020, 1, 1)) as dag:
+
+        @task
+        def generate():
+            return [1, 2]
+
+        @task
+        def consume(x):
+            return x
+
+        @task_group
+        def tg(x):
+            consume(x)
+
+        tg.expand(x=generate())
+        EmptyOperator(task_id="other")
+
+    ser_dag = SerializedBaseOperator.serialize(dag)[Encoding.VAR]
+    ser_dag["tasks"] = [t for t in ser_dag["tasks"] if t["task_id"] in ("generate", "tg.consume")]
+    serde_dag = SerializedDAG.deserialize_dag(ser_dag, partial=True)
+
+    assert serde_dag.partial
+    assert set(serde_dag.task_dict) == {"generate", "tg.consume"}
+    assert set(serde_dag.task_group.children) == {"generate", "tg"}
+    assert serde_dag.get_task("generate").downstream_task_ids == {"tg.consume"}
+    assert serde_dag.get_task("tg.consume").upstream_task_ids == {"generate"}
+
+    ser_dag["tasks"] = [t for t in ser_dag["tasks"] if t["task_id"] == "generate"]
+    serde_dag = SerializedDAG.deserialize_dag(ser_dag, partial=True)
+
+    assert set(serde_dag.task_group.children) == {"generate"}
+    assert serde_dag.get_task("generate").downstream_task_ids == set()
+
+
 @pytest.mark.db_test
 def test_mapped_task_with_operator_extra_links_property():
     class _DummyOperator(BaseOperator):
@@ -21,6 +21,7 @@ import inspect
 import json
 from datetime import datetime, timedelta
 from importlib import import_module
+from unittest import mock
 
 import pytest
 from dateutil import relativedelta
@@ -222,6 +223,63 @@ def test_serialize_deserialize(input, encoded_type, cmp_func):
     json.dumps(serialized)  # does not raise
 
 
+@pytest.mark.parametrize(
+    "input",
+    [
+        None,
+        "test_str",
+        1,
+        1.5,
+        True,
+        {"test": {"nested": ["dict", 1, None]}, 1: (2, 3)},
+        ["array_item", [timedelta(minutes=2)]],
+        ("tuple_item", 3),
+        {"set_item", 3},
+        {1, "unsortable"},
+        datetime(2024, 1, 1, 12),
+        timezone.datetime(2024, 1, 1, 12),
+        timedelta(minutes=2),
+    ],
+)
+def test_serialize_dispatch_is_same_as_checks(input):
+    """The values serialized by type are serialized as when going through the checks."""
+    expected = BaseSerialization.serialize(input)
+    with mock.patch.dict("airflow.serialization.serialized_objects._SERIALIZERS", clear=True):
+        assert BaseSerialization.serialize(input) == expected
+
+
+@pytest.mark.parametrize("encoded_type", [DAT.TUPLE, DAT.TUPLE.value])
+def test_deserialize_enum_and_string_types(encoded_type):
+    assert BaseSerialization.deserialize({Encoding.TYPE: encoded_type, Encoding.VAR: [1, 2]}) == (1, 2)
+
+
+def test_deserialize_invalid_type():
+    with pytest.raises(TypeError, match="Invalid type unknown in deserialization."):
+        BaseSerialization.deserialize({Encoding.TYPE: "unknown", Encoding.VAR: None})
+
+
+def test_serialization_plan_excludes_as_is_excluded():
+    """Attributes are excluded by the serialization plans as by _is_excluded."""
+    from airflow.serialization.serialized_objects import SerializedBaseOperator, SerializedDAG
+
+    with DAG("test_dag", start_date=datetime(2024, 1, 1), access_control={}) as dag:
+        op = PythonOperator(
+            task_id="test_task",
+            python_callable=int,
+            start_date=datetime(2024, 1, 1),
+            end_date=datetime(2024, 2, 1),
+            op_kwargs={},
+            retries=0,
+        )
+
+    for serialization_cls, obj in ((SerializedDAG, dag), (SerializedBaseOperator, op)):
+        serialized = serialization_cls.serialize_to_json(obj, serialization_cls._decorated_fields)
+        for key in obj.get_serialized_fields() - serialization_cls._fields_serialized_separately:
+            is_excluded = serialization_cls._is_excluded(getattr(obj, key, None), key, obj)
+            if key != "_operator_name":
+                assert (key not in serialized) == is_excluded, key
+
+
 @pytest.mark.parametrize(
     "conn_uri",
     [
@@ -37,7 +37,8 @@ from airflow.models import (
     errors,
 )
 from airflow.models.dag import DagOwnerAttributes
-from airflow.models.dagcode import DagCode
+from airflow.models.dagcode import DagCode, DagCodeBlob
+from airflow.models.dagfileparsingstats import DagFileParsingStats
 from airflow.models.dagwarning import DagWarning
 from airflow.models.dataset import (
     DagScheduleDatasetReference,
@@ -47,6 +48,7 @@ from airflow.models.dataset import (
     TaskOutletDatasetReference,
 )
 from airflow.models.serialized_dag import SerializedDagModel
+from airflow.models.triggererload import TriggererLoad
 from airflow.providers.fab.auth_manager.models import Permission, Resource, assoc_permission_role
 from airflow.security.permissions import RESOURCE_DAG_PREFIX
 from airflow.utils.db import add_default_pool_if_not_exists, create_default_connections, reflect_tables
@@ -56,6 +58,7 @@ from airflow.utils.session import create_session
 def clear_db_runs():
     with create_session() as session:
         session.query(Job).delete()
+        session.query(TriggererLoad).delete()
         session.query(Trigger).delete()
         session.query(DagRun).delete()
         session.query(TaskInstance).delete()
@@ -116,6 +119,7 @@ def clear_db_variables():
 def clear_db_dag_code():
     with create_session() as session:
         session.query(DagCode).delete()
+        session.query(DagCodeBlob).delete()
 
 
 def clear_db_callbacks():
@@ -144,6 +148,11 @@ def clear_db_dag_warnings():
         session.query(DagWarning).delete()
 
 
+def clear_db_dag_file_parsing_stats():
+    with create_session() as session:
+        session.query(DagFileParsingStats).delete()
+
+
 def clear_db_xcom():
     with create_session() as session:
         session.query(XCom).delete()
@@ -197,6 +206,7 @@ def clear_all():
     clear_rendered_ti_fields()
     clear_db_import_errors()
     clear_db_dag_warnings()
+    clear_db_dag_file_parsing_stats()
     clear_db_logs()
     clear_db_jobs()
     clear_db_task_fail()
@@ -1066,6 +1066,45 @@ class TestTriggerRuleDep:
         dr.update_state(session=session)
         assert dr.state == DagRunState.SUCCESS
 
+    def test_only_finished_upstream_tis_are_counted(self, monkeypatch, session, dag_maker):
+        """Upstream states are counted from the finished tis indexed by task_id on the dep context."""
+        with dag_maker(session=session):
+            upstreams = [EmptyOperator(task_id=f"upstream_{i}") for i in range(3)]
+            for i in range(3):
+                EmptyOperator(task_id=f"unrelated_{i}")
+            upstreams >> EmptyOperator(task_id="op")
+
+        dr = dag_maker.create_dagrun()
+        tis = {ti.task_id: ti for ti in dr.task_instances}
+        finished_tis = [ti for task_id, ti in tis.items() if task_id != "op"]
+        for ti in finished_tis:
+            ti.state = SUCCESS
+        tis["upstream_0"].state = FAILED
+        dep_context = DepContext(finished_tis=finished_tis)
+
+        counted: list[list[str]] = []
+        calculate = _UpstreamTIStates.calculate
+
+        def _calculate(finished_upstreams):
+            finished_upstreams = list(finished_upstreams)
+            counted.append(sorted(ti.task_id for ti in finished_upstreams))
+            return calculate(finished_upstreams)
+
+        monkeypatch.setattr(_UpstreamTIStates, "calculate", _calculate)
+
+        dep_statuses = tuple(
+            TriggerRuleDep()._evaluate_trigger_rule(ti=tis["op"], dep_context=dep_context, session=session)
+        )
+        assert len(dep_statuses) == 1
+        assert not dep_statuses[0].passed
+        assert counted == [["upstream_0", "upstream_1", "upstream_2"]]
+
+        by_task_id = dep_context.ensure_finished_tis_by_task_id(dr, session)
+        assert set(by_task_id) == {ti.task_id for ti in finished_tis}
+        assert dep_context.ensure_finished_tis_by_task_id(dr, session) is by_task_id
+        finished_tis.append(tis["op"])
+        assert "op" in dep_context.ensure_finished_tis_by_task_id(dr, session)
+
     @pytest.mark.parametrize("flag_upstream_failed, expected_ti_state", [(True, REMOVED), (False, None)])
     def test_mapped_task_upstream_removed_with_all_success_trigger_rules(
         self,
@@ -0,0 +1,137 @@
+#
+# Licensed to the Apache Software Foundation (ASF) under one
+# or more contributor license agreements.  See the NOTICE file
+# distributed with this work for additional information
+# regarding copyright ownership.  The ASF licenses this file
+# to you under the Apache License, Version 2.0 (the
+# "License"); you may not use this file except in compliance
+# with the License.  You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+# KIND, either express or implied.  See the License for the
+# specific language governing permissions and limitations
+# under the License.
+from __future__ import annotations
+
+import threading
+import time
+from unittest import mock
+
+import pytest
+from sqlalchemy import text
+
+from airflow.utils.loop_profiler import (
+    LoopPhaseProfiler,
+    StackSampler,
+    _percentile,
+    dump_sampled_stacks_in_background,
+)
+from airflow.utils.session import create_session
+
+pytestmark = pytest.mark.db_test
+
+
+@pytest.fixture
+def profiler():
+    profiler = LoopPhaseProfiler(metric_prefix="test.loop_phase_duration", window_size=3)
+    yield profiler
+    profiler.close()
+
+
+class TestLoopPhaseProfiler:
+    @mock.patch("airflow.utils.loop_profiler.Stats")
+    def test_phase(self, mock_stats, profiler):
+        with create_session() as session:
+            with profiler.phase("outer"):
+                session.execute(text("SELECT 1"))
+                with profiler.phase("inner"):
+                    session.execute(text("SELECT 1"))
+                    session.execute(text("SELECT 1"))
+
+        stats = profiler.get_stats()
+        assert stats.keys() == {"outer", "inner"}
+        assert stats["outer"].count == 1
+        assert stats["outer"].mean_queries == 3
+        assert stats["inner"].mean_queries == 2
+        assert stats["outer"].max >= stats["inner"].max
+        timer_names = [c.args[0] for c in mock_stats.timing.call_args_list]
+        assert timer_names == ["test.loop_phase_duration.inner", "test.loop_phase_duration.outer"]
+
+    def test_phase_not_recorded_if_raises(self, profiler):
+        with pytest.raises(ValueError):
+            with profiler.phase("failing"):
+                raise ValueError
+        assert profiler.get_stats() == {}
+
+    def test_stats_are_rolling(self, profiler):
+        for duration in (10.0, 1.0, 2.0, 3.0):
+            with mock.patch("airflow.utils.loop_profiler.time.monotonic", side_effect=[0.0, duration]):
+                with profiler.phase("phase"):
+                    pass
+        stats = profiler.get_stats()["phase"]
+        # Only the last three samples are kept.
+        assert (stats.count, stats.p50, stats.p90, stats.max) == (3, 2.0, 3.0, 3.0)
+
+    def test_wrap(self, profiler):
+        def action(x):
+            return x * 2
+
+        wrapped = profiler.wrap("timers.action", action)
+        assert wrapped.__name__ == "action"
+        assert wrapped(21) == 42
+        assert profiler.get_stats()["timers.action"].count == 1
+
+
+@pytest.mark.parametrize(
+    "percent, expected",
+    [(0, 1), (50, 5), (90, 9), (99, 10), (100, 10)],
+)
+def test_percentile(percent, expected):
+    assert _percentile(list(range(1, 11)), percent) == expected
+
+
+def _sleeping_function(event):
+    event.wait(5)
+
+
+class TestStackSampler:
+    def test_sample(self):
+        event = threading.Event()
+        thread = threading.Thread(target=_sleeping_function, args=(event,))
+        thread.start()
+        try:
+            sampler = StackSampler(thread_id=thread.ident)
+            sampler.sample()
+            sampler.sample()
+        finally:
+            event.set()
+            thread.join()
+
+        ((stack, count),) = sampler.stacks.items()
+        assert count == 2
+        frames = stack.split(";")
+        assert frames[0] == "threading:_bootstrap"
+        assert f"{__name__}:_sleeping_function" in frames
+
+    def test_dump_sampled_stacks_in_background(self, tmp_path):
+        thread = dump_sampled_stacks_in_background(
+            name="test", duration=0.2, dump_dir=str(tmp_path), interval=0.01
+        )
+        # Keep the sampled thread busy in an identifiable function meanwhile.
+        while thread.is_alive():
+            time.sleep(0.01)
+        thread.join()
+
+        (dump_file,) = tmp_path.iterdir()
+        assert dump_file.name.startswith("test-")
+        assert dump_file.suffix == ".folded"
+        lines = dump_file.read_text().splitlines()
+        assert lines
+        for line in lines:
+            stack, count = line.rsplit(" ", 1)
+            assert int(count) > 0
+        assert any(f"{__name__}:test_dump_sampled_stacks_in_background" in line for line in lines)
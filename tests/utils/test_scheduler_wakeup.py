@@ -0,0 +1,99 @@
+#
+# Licensed to the Apache Software Foundation (ASF) under one
+# or more contributor license agreements.  See the NOTICE file
+# distributed with this work for additional information
+# regarding copyright ownership.  The ASF licenses this file
+# to you under the Apache License, Version 2.0 (the
+# "License"); you may not use this file except in compliance
+# with the License.  You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+# KIND, either express or implied.  See the License for the
+# specific language governing permissions and limitations
+# under the License.
+from __future__ import annotations
+
+import time
+from unittest import mock
+
+import pytest
+
+from airflow.utils.scheduler_wakeup import SchedulerWakeupListener, notify_scheduler
+from airflow.utils.session import create_session
+from tests.test_utils.config import conf_vars
+
+pytestmark = [
+    pytest.mark.db_test,
+    pytest.mark.backend("sqlite", "mysql"),
+]
+
+
+@pytest.fixture
+def listener(tmp_path):
+    with mock.patch("airflow.utils.scheduler_wakeup._get_socket_dir", return_value=str(tmp_path)):
+        listener = SchedulerWakeupListener()
+        yield listener
+        listener.close()
+
+
+@conf_vars({("scheduler", "enable_wakeup_notifications"): "True"})
+def test_wait_returns_once_notified(listener):
+    # Nothing notified yet
+    start = time.monotonic()
+    assert listener.wait(0.2) is False
+    assert time.monotonic() - start >= 0.2
+
+    with create_session() as session:
+        notify_scheduler(session=session)
+        notify_scheduler(session=session)
+        # The notification is only sent once the transaction is committed.
+        assert listener.wait(0) is False
+
+    start = time.monotonic()
+    assert listener.wait(5) is True
+    assert time.monotonic() - start < 1
+    # Both notifications were consumed at once.
+    assert listener.wait(0) is False
+
+
+@conf_vars({("scheduler", "enable_wakeup_notifications"): "False"})
+def test_nothing_notified_if_disabled(listener):
+    listener.wait(0)
+    with create_session() as session:
+        notify_scheduler(session=session)
+    assert listener.wait(0) is False
+
+
+@conf_vars({("scheduler", "enable_wakeup_notifications"): "True"})
+def test_stale_sockets_are_removed(listener, tmp_path):
+    stale_socket = tmp_path / "0.sock"
+    stale_socket.touch()
+    listener.wait(0)
+
+    with create_session() as session:
+        notify_scheduler(session=session)
+
+    assert listener.wait(0) is True
+    assert not stale_socket.exists()
+
+
+@conf_vars({("scheduler", "enable_wakeup_notifications"): "True"})
+def test_commit_succeeds_if_notifying_fails(listener):
+    with mock.patch(
+        "airflow.utils.scheduler_wakeup.os.listdir", side_effect=PermissionError
+    ), create_session() as session:
+        notify_scheduler(session=session)
+
+    assert listener.wait(0) is False
+
+
+def test_wait_sleeps_if_listening_fails(listener):
+    with mock.patch.object(listener, "_listen", side_effect=OSError), mock.patch(
+        "airflow.utils.scheduler_wakeup.time.sleep"
+    ) as mock_sleep:
+        assert listener.wait(3) is False
+    mock_sleep.assert_called_once_with(3)
@@ -159,6 +159,14 @@ class TestSqlAlchemyUtils:
                 self.session.execute(text("SELECT 1"))
                 self.session.commit()
 
+    def test_prohibit_commit_allows_savepoints(self):
+        with prohibit_commit(self.session):
+            with self.session.begin_nested():
+                self.session.execute(text("SELECT 1"))
+            with pytest.raises(RuntimeError):
+                self.session.commit()
+            self.session.rollback()
+
     def test_prohibit_commit_specific_session_only(self):
         """
         Test that "prohibit_commit" applies only to the given session object,